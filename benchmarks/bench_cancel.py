@@ -0,0 +1,111 @@
+"""
+處理管線取消延遲測試
+
+以延遲很高的本機模擬伺服器 (mock_servers.py) 執行 asyncio 處理管線 (STT → LLM)，
+在指定時間點取消工作把手，量測「要求取消 → Task 實際結束」的延遲，
+並確認伺服器端看到用戶端中斷連線、取消後的下一次請求仍可正常完成
+
+用法：
+  uv run benchmarks/bench_cancel.py                          # 在 STT 上傳途中取消
+  uv run benchmarks/bench_cancel.py --cancel-after 2500      # 在 LLM 等待首字時取消
+  uv run benchmarks/bench_cancel.py --llm anthropic --stream --runs 20
+"""
+
+import argparse
+import os
+import tempfile
+import time
+
+from common import synth_speech
+from mock_servers import MockServer, add_profile_args, profile_from_args
+
+from config.settings import Settings
+from core.llm import LLMProcessor
+from core.metrics import metrics
+from core.pipeline import get_pipeline
+from core.stt import SpeechToText
+
+LLM_PROVIDERS = ["openai", "groq", "anthropic", "gemini", "ollama"]
+
+
+async def dictation(stt: SpeechToText, llm: LLMProcessor, audio):
+    """與 main.py 相同的 STT → LLM 流程（不含注入）"""
+    raw_text = await stt.atranscribe(audio)
+    polished = await llm.apolish(raw_text)
+    if isinstance(polished, str):
+        return polished
+    return "".join([chunk async for chunk in polished])
+
+
+def main():
+    parser = argparse.ArgumentParser(description="VoiceType 處理管線取消延遲測試")
+    parser.add_argument("--stt", choices=["groq", "openai"], default="groq")
+    parser.add_argument("--llm", choices=LLM_PROVIDERS, default="openai")
+    parser.add_argument("--stream", action="store_true", help="串流輸出 LLM 結果")
+    parser.add_argument("--cancel-after", type=float, default=300, help="送出後多少 ms 取消")
+    parser.add_argument("--runs", type=int, default=10)
+    add_profile_args(parser)
+    # 預設使用很慢的伺服器，確保取消時請求仍在進行中
+    parser.set_defaults(latency=1500.0, ttft=1500.0)
+    args = parser.parse_args()
+
+    server = MockServer(profile_from_args(args)).start()
+    os.environ.update(server.env())
+    pipeline = get_pipeline()
+    audio = synth_speech(3.0, seed=1)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        settings = Settings(config_dir=tmp)
+        settings.update_all({
+            "sttProvider": args.stt,
+            "llmProvider": args.llm,
+            "streamOutput": args.stream,
+            "contextAware": False,
+            "polishCache": False,
+            "fastPath": False,
+        })
+        stt = SpeechToText(settings)
+        llm = LLMProcessor(settings)
+
+        print(f"mock server {server.url}  stt={args.stt} llm={args.llm} stream={args.stream} "
+              f"latency={args.latency}ms ttft={args.ttft}ms cancel-after={args.cancel_after}ms")
+
+        # 完整執行一次：載入 SDK、建立連線，並作為未取消時的對照
+        start = time.perf_counter()
+        text = pipeline.run(dictation, stt, llm, audio)
+        full_ms = (time.perf_counter() - start) * 1000
+        print(f"  未取消：{full_ms:.0f}ms → {text}")
+        metrics.reset()
+
+        latencies = []
+        for _ in range(args.runs):
+            handle = pipeline.submit(dictation, stt, llm, audio, name="bench")
+            time.sleep(args.cancel_after / 1000)
+            if not handle.cancel():
+                print(f"  #{handle.id} 在取消前已完成，請縮短 --cancel-after")
+                continue
+            if not handle.wait_finished(timeout=5):
+                print(f"  #{handle.id} 取消後 5 秒仍未結束")
+                continue
+            latencies.append(handle.cancel_latency * 1000)
+
+        # 取消後的下一次請求必須正常完成（連線池沒有殘留壞掉的連線）
+        start = time.perf_counter()
+        text = pipeline.run(dictation, stt, llm, audio)
+        after_ms = (time.perf_counter() - start) * 1000
+
+        if latencies:
+            latencies.sort()
+            print(f"\n取消延遲 ({len(latencies)} 次)：p50 {latencies[len(latencies) // 2]:.2f}ms  "
+                  f"max {latencies[-1]:.2f}ms")
+        print(f"取消後的下一次請求：{after_ms:.0f}ms → {text}")
+
+        # 伺服器要等到模擬延遲結束、寫入回應時才會發現用戶端已中斷
+        time.sleep((args.latency + args.ttft) / 1000 + 0.5)
+        print(f"mock server requests: {server.stats}")
+
+    server.stop()
+
+
+if __name__ == "__main__":
+    main()
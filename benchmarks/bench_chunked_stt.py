@@ -0,0 +1,101 @@
+"""
+長錄音分段辨識基準測試
+
+  - 牆鐘時間 vs 錄音長度：整段一次上傳（循序）vs 在停頓處分段、同時辨識（並行）
+    STT 以模擬伺服器代替，伺服器處理時間與音訊長度成正比（--stt-rtf）
+  - 拼接正確性：以時間軸上已知的文字模擬各段的辨識結果（重疊處兩段都會辨識到），
+    確認去除重疊後與完整文字一致
+
+用法：
+  uv run benchmarks/bench_chunked_stt.py
+  uv run benchmarks/bench_chunked_stt.py --lengths 60 180 600 --stt-rtf 0.05 --workers 8
+"""
+
+import argparse
+import os
+import tempfile
+import time
+
+import numpy as np
+
+from common import SAMPLE_RATE, synth_speech
+from mock_servers import MockProfile, MockServer
+
+from config.settings import Settings
+from core.chunking import split_audio, stitch_transcripts
+from core.stt import SpeechToText
+
+# 模擬辨識結果用的字元（每 250ms 一個字，約為中文語速）
+CHARS_PER_SECOND = 4
+VOCAB = "今天我們討論專案進度目前落後兩週需要增加人力並調整時程下次會議再確認細節"
+
+
+def run_stt(stt: SpeechToText, audio: np.ndarray, repeat: int) -> float:
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        stt.transcribe(audio)
+        times.append(time.perf_counter() - start)
+    return min(times)
+
+
+def check_stitching(lengths: list[int], chunk_seconds: float, overlap: float, trials: int) -> tuple[int, int]:
+    """以已知文字檢查拼接結果，回傳 (正確數, 總數)"""
+    ok = total = 0
+    for seconds in lengths:
+        for seed in range(trials):
+            rng = np.random.default_rng(seed)
+            audio = synth_speech(seconds, seed=seed)
+            n = int(seconds * CHARS_PER_SECOND)
+            words = rng.choice(list(VOCAB), n)
+            stamps = (np.arange(n) + 0.5) / CHARS_PER_SECOND * SAMPLE_RATE
+            expected = "".join(words)
+            texts = ["".join(words[(stamps >= s) & (stamps < e)]) for s, e in split_audio(audio, chunk_seconds, overlap)]
+            ok += stitch_transcripts(texts, overlap) == expected
+            total += 1
+    return ok, total
+
+
+def main():
+    parser = argparse.ArgumentParser(description="VoiceType 長錄音分段辨識基準測試")
+    parser.add_argument("--lengths", type=int, nargs="+", default=[30, 60, 120, 300], help="錄音長度（秒）")
+    parser.add_argument("--stt-rtf", type=float, default=0.03, help="模擬伺服器處理時間 / 音訊秒數")
+    parser.add_argument("--latency", type=float, default=80, help="模擬網路延遲 ms")
+    parser.add_argument("--chunk-seconds", type=float, default=30.0)
+    parser.add_argument("--overlap", type=float, default=1.0)
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--repeat", type=int, default=2)
+    args = parser.parse_args()
+
+    server = MockServer(MockProfile(latency_ms=args.latency, jitter_ms=0, stt_rtf=args.stt_rtf)).start()
+    os.environ.update(server.env())
+
+    with tempfile.TemporaryDirectory() as tmp:
+        settings = Settings(config_dir=tmp)
+        settings.update_all({
+            "sttProvider": "openai", "sttModel": "whisper-1", "uploadCodec": "wav",
+            "chunkThresholdSeconds": 10, "chunkSeconds": args.chunk_seconds,
+            "chunkOverlapSeconds": args.overlap, "chunkWorkers": args.workers,
+        })
+        stt = SpeechToText(settings)
+
+        print(f"模擬 STT：網路 {args.latency:.0f}ms + 伺服器 {args.stt_rtf * 1000:.0f}ms/秒音訊；"
+              f"每段 {args.chunk_seconds:.0f}s、重疊 {args.overlap}s、{args.workers} 個並行請求")
+        print(f"  {'長度':>6} {'段數':>4} {'循序 ms':>9} {'並行 ms':>9} {'加速':>6}")
+        for seconds in args.lengths:
+            audio = synth_speech(seconds)
+            chunks = len(split_audio(audio, args.chunk_seconds, args.overlap))
+            settings.update("chunkedStt", False)
+            sequential = run_stt(stt, audio, args.repeat)
+            settings.update("chunkedStt", True)
+            parallel = run_stt(stt, audio, args.repeat)
+            print(f"  {seconds:>5}s {chunks:>4} {sequential * 1000:>9.0f} {parallel * 1000:>9.0f} {sequential / parallel:>5.1f}×")
+        settings.flush()
+
+    ok, total = check_stitching(args.lengths, args.chunk_seconds, args.overlap, trials=20)
+    print(f"\n拼接正確性：{ok}/{total} 段錄音去除重疊後與完整文字一致")
+    server.stop()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,87 @@
+"""
+上傳編碼效能比較：WAV / FLAC / Ogg Opus
+
+比較各編碼格式的上傳大小與編碼時間（錄音期間逐區塊編碼 vs 放開後一次編碼），
+以及預設（開啟 VAD 靜音裁剪）時放開後的等待時間：
+  - vad stream：錄音期間在背景裁剪並編碼，放開後只需 VAD 與比對結果
+  - vad oneshot：放開後 VAD 裁剪，再一次編碼裁剪後的音訊
+  - match：背景裁剪與 VAD 結果相同（不同時退回 oneshot）
+
+用法：
+  uv run benchmarks/bench_codec.py                 # 使用合成語音訊號
+  uv run benchmarks/bench_codec.py a.wav corpus/  # 使用指定的 WAV 檔或資料夾
+
+需求：
+  uv pip install soundfile   (FLAC / Opus)
+"""
+
+import sys
+import time
+
+import numpy as np
+
+from common import SAMPLE_RATE, load_corpus, synth_speech
+from core.encoder import StreamingEncoder, encode_audio
+from core.vad import StreamingTrimmer, trim_silence
+
+BLOCK = 1024
+CODECS = ["wav", "flac", "opus"]
+
+
+def bench(name: str, audio: np.ndarray):
+    seconds = len(audio) / SAMPLE_RATE
+    raw = len(audio) * 2
+    print(f"\n{name}  ({seconds:.1f}s, PCM {raw / 1024:.0f} KB)")
+    print(
+        f"  {'codec':<6} {'size KB':>9} {'ratio':>7} {'stream ms':>10} {'realtime':>9} {'oneshot ms':>11}"
+        f" {'vad stream':>11} {'vad oneshot':>12} {'match':>6}"
+    )
+
+    for codec in CODECS:
+        # 逐區塊餵入（模擬錄音回呼）；實際錄音時編碼與說話同時進行，
+        # 放開後只剩最後一個區塊需要處理，realtime 欄位為編碼所佔的即時比例
+        t0 = time.perf_counter()
+        enc = StreamingEncoder(codec)
+        for i in range(0, len(audio), BLOCK):
+            enc.feed(audio[i:i + BLOCK])
+        payload = enc.finish()
+        t2 = time.perf_counter()
+
+        t3 = time.perf_counter()
+        encode_audio(audio, codec)
+        t4 = time.perf_counter()
+
+        # 預設路徑：錄音期間背景裁剪並編碼（drain 模擬放開前已編碼完畢），放開後量測等待時間
+        vad_enc = StreamingEncoder(codec, trimmer=StreamingTrimmer())
+        for i in range(0, len(audio), BLOCK):
+            vad_enc.feed(audio[i:i + BLOCK])
+        vad_enc.drain()
+        t5 = time.perf_counter()
+        matched = vad_enc.finish(trim_silence(audio).audio) is not None
+        t6 = time.perf_counter()
+        encode_audio(trim_silence(audio).audio, codec)
+        t7 = time.perf_counter()
+
+        size = payload.getbuffer().nbytes
+        actual = enc.extension
+        label = codec if actual != "wav" or codec == "wav" else f"{codec}*"
+        print(
+            f"  {label:<6} {size / 1024:>9.1f} {raw / size:>7.1f}x"
+            f" {(t2 - t0) * 1000:>10.1f} {(t2 - t0) / seconds * 100:>8.2f}% {(t4 - t3) * 1000:>11.1f}"
+            f" {(t6 - t5) * 1000:>11.1f} {(t7 - t6) * 1000:>12.1f} {'yes' if matched else 'no':>6}"
+        )
+
+
+def main():
+    if len(sys.argv) > 1:
+        for name, audio in load_corpus(sys.argv[1:]):
+            bench(name, audio)
+    else:
+        for seconds in (5, 30, 60):
+            # 按下快捷鍵後約 0.3 秒才開始說話
+            bench(f"synthetic-{seconds}s", synth_speech(seconds, lead_silence=0.3))
+    print("\n  * = soundfile 未安裝或不支援，已退回 WAV")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,90 @@
+"""
+設定讀寫基準測試
+
+  - get_config() 熱路徑：舊版每次 model_dump()（含很長的 systemPrompt）vs 共用的唯讀快照
+  - 連續修改設定（模擬 Web UI 一次送出多個欄位）：舊版每次重新實例化 BaseSettings（重讀 .env）
+    並同步寫檔 vs 只做型別檢查、合併為一次原子寫檔
+
+用法：
+  uv run benchmarks/bench_config.py
+  uv run benchmarks/bench_config.py --calls 200000 --burst 50
+"""
+
+import argparse
+import json
+import logging
+import tempfile
+import time
+
+import common  # noqa: F401  專案路徑設定
+
+from config.settings import SAVE_DEBOUNCE_SECONDS, Settings, VoiceTypeConfig
+
+
+class _WriteCounter(logging.Handler):
+    """以「設定已儲存」日誌計算實際寫檔次數"""
+
+    def __init__(self):
+        super().__init__()
+        self.writes = 0
+
+    def emit(self, record):
+        if record.getMessage().startswith("設定已儲存"):
+            self.writes += 1
+
+
+def per_call_ns(fn, calls: int) -> float:
+    start = time.perf_counter_ns()
+    for _ in range(calls):
+        fn()
+    return (time.perf_counter_ns() - start) / calls
+
+
+def old_update(settings: Settings, key: str, value):
+    """舊版 update()：重新實例化 VoiceTypeConfig 並同步寫檔"""
+    current = settings._config_model.model_dump()
+    current[key] = value
+    settings._config_model = VoiceTypeConfig(**current)
+    with open(settings.config_path, "w", encoding="utf-8") as f:
+        json.dump(settings._config_model.model_dump(), f, ensure_ascii=False, indent=2)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="VoiceType 設定讀寫基準測試")
+    parser.add_argument("--calls", type=int, default=100000, help="get_config() 呼叫次數")
+    parser.add_argument("--burst", type=int, default=20, help="連續修改設定的次數")
+    args = parser.parse_args()
+
+    counter = _WriteCounter()
+    settings_logger = logging.getLogger("VoiceType.Settings")
+    settings_logger.addHandler(counter)
+    settings_logger.setLevel(logging.INFO)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        settings = Settings(config_dir=tmp)
+        settings.load()
+
+        old_ns = per_call_ns(settings._config_model.model_dump, args.calls // 10)
+        new_ns = per_call_ns(settings.get_config, args.calls)
+        print(f"get_config()：舊版 model_dump {old_ns / 1000:.2f}µs → 快照 {new_ns:.0f}ns（{old_ns / new_ns:.0f}×）")
+
+        start = time.perf_counter()
+        for i in range(args.burst):
+            old_update(settings, "streamFlushMs", 100 + i)
+        old_ms = (time.perf_counter() - start) * 1000
+
+        counter.writes = 0
+        start = time.perf_counter()
+        for i in range(args.burst):
+            settings.update("streamFlushMs", 200 + i)
+        new_ms = (time.perf_counter() - start) * 1000
+        time.sleep(SAVE_DEBOUNCE_SECONDS + 0.3)
+
+        with open(settings.config_path, encoding="utf-8") as f:
+            saved = json.load(f)["streamFlushMs"]
+        print(f"連續修改 {args.burst} 次：舊版 {old_ms:.1f}ms（寫檔 {args.burst} 次）→ "
+              f"{new_ms:.1f}ms（寫檔 {counter.writes} 次，檔案內容 {'正確' if saved == 200 + args.burst - 1 else '錯誤'}）")
+
+
+if __name__ == "__main__":
+    main()
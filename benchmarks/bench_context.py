@@ -0,0 +1,122 @@
+"""
+語境偵測基準測試（以 FakeWindowProvider 模擬 Win32 / psutil 查詢，可在 Linux 執行）
+
+  - 規則比對：舊版 if/elif 鏈 vs 編譯後的 dict 查表 + 預先編譯的標題 Regex（並確認結果一致）
+  - 單次偵測成本：每次查詢 psutil vs pid → 執行檔 TTL 快取
+  - 關鍵路徑：舊版在 STT 完成後才偵測 vs 按下快捷鍵時在背景偵測（STT 完成後只需取用結果）
+
+用法：
+  uv run benchmarks/bench_context.py
+  uv run benchmarks/bench_context.py --process-ms 5 --lookups 2000
+"""
+
+import argparse
+import time
+
+import common  # noqa: F401  專案路徑設定
+
+from config.settings import DEFAULT_CONTEXT_RULES
+from core.context import CompiledRules, ContextDetector, FakeWindowProvider
+
+WINDOWS = {
+    1: ("收件匣 - Gmail - Google Chrome", 101),
+    2: ("Hacker News - Google Chrome", 101),
+    3: ("main.py - voicetype - Visual Studio Code", 102),
+    4: ("general | Acme - Slack", 103),
+    5: ("Outlook 網頁版 - Mozilla Firefox", 104),
+    6: ("週報.docx - Word", 105),
+    7: ("LINE", 106),
+    8: ("未命名 - 記事本", 107),
+}
+PROCESSES = {
+    101: "chrome.exe", 102: "Code.exe", 103: "slack.exe", 104: "firefox.exe",
+    105: "WINWORD.EXE", 106: "LINE.exe", 107: "notepad.exe",
+}
+
+
+def legacy_rules(exe_name: str, title: str) -> str:
+    """舊版 _detect_context_key 的 if/elif 規則（標題已轉小寫）"""
+    if exe_name in ["chrome.exe", "msedge.exe", "firefox.exe", "brave.exe", "arc.exe"]:
+        if any(k in title for k in ["gmail", "outlook", "mail"]):
+            return "web_mail"
+        elif any(k in title for k in ["chat", "messenger", "line", "discord"]):
+            return "web_chat"
+        else:
+            return "browser"
+    elif exe_name in ["code.exe", "pycharm.exe", "idea.exe", "devenv.exe", "cursor.exe", "windows terminal.exe", "powershell.exe", "cmd.exe"]:
+        return "code"
+    elif exe_name in ["winword.exe", "excel.exe", "powerpnt.exe", "obsidian.exe", "notion.exe", "evernote.exe"]:
+        return "document"
+    elif exe_name in ["discord.exe", "line.exe", "slack.exe", "teams.exe", "telegram.exe", "whatsapp.exe"]:
+        if exe_name in ["slack.exe", "teams.exe"]:
+            return "work_chat"
+        return "chat"
+    if any(k in title for k in ["outlook", "gmail", "mail", "thunderbird"]):
+        return "mail"
+    elif any(k in title for k in ["word", "docs", "notion", "obsidian"]):
+        return "web_document"
+    return ""
+
+
+def legacy_detect(provider: FakeWindowProvider, hwnd: int) -> str:
+    """舊版：每次都查詢標題、pid 與 psutil 行程名稱"""
+    title = provider.window_title(hwnd).lower()
+    try:
+        exe_name = provider.process_name(provider.window_pid(hwnd)).lower()
+    except Exception:
+        exe_name = ""
+    return legacy_rules(exe_name, title)
+
+
+def per_call_us(fn, n: int) -> float:
+    start = time.perf_counter()
+    for i in range(n):
+        fn(i)
+    return (time.perf_counter() - start) * 1e6 / n
+
+
+def main():
+    parser = argparse.ArgumentParser(description="VoiceType 語境偵測基準測試")
+    parser.add_argument("--process-ms", type=float, default=2.0, help="模擬 psutil.Process(pid).name() 的成本")
+    parser.add_argument("--title-ms", type=float, default=0.05, help="模擬 GetWindowText 的成本")
+    parser.add_argument("--stt-ms", type=float, default=400, help="模擬 STT 時間（背景偵測與其重疊）")
+    parser.add_argument("--lookups", type=int, default=500)
+    args = parser.parse_args()
+
+    cfg = {"contextRules": DEFAULT_CONTEXT_RULES}
+    call_ms = {"process_name": args.process_ms, "window_title": args.title_ms}
+    hwnds = list(WINDOWS)
+
+    # 規則比對（不含平台查詢）
+    samples = [(PROCESSES[pid].lower(), title) for title, pid in WINDOWS.values()]
+    rules = CompiledRules(DEFAULT_CONTEXT_RULES)
+    mismatches = [(exe, title) for exe, title in samples if rules.match(exe, title) != legacy_rules(exe, title.lower())]
+    n = args.lookups * 20
+    legacy_us = per_call_us(lambda i: legacy_rules(samples[i % len(samples)][0], samples[i % len(samples)][1].lower()), n)
+    compiled_us = per_call_us(lambda i: rules.match(*samples[i % len(samples)]), n)
+    print(f"規則比對：if/elif {legacy_us:.2f}µs → 編譯後 {compiled_us:.2f}µs；"
+          f"{len(samples)} 個視窗結果{'一致' if not mismatches else f'不一致 {mismatches}'}")
+
+    # 單次偵測（含模擬的平台查詢）
+    provider = FakeWindowProvider(WINDOWS, PROCESSES, call_ms)
+    legacy_ms = per_call_us(lambda i: legacy_detect(provider, hwnds[i % len(hwnds)]), args.lookups) / 1000
+    detector = ContextDetector(FakeWindowProvider(WINDOWS, PROCESSES, call_ms))
+    cold_ms = per_call_us(lambda i: detector.detect(cfg, hwnds[i % len(hwnds)]), len(hwnds)) / 1000
+    warm_ms = per_call_us(lambda i: detector.detect(cfg, hwnds[i % len(hwnds)]), args.lookups) / 1000
+    print(f"單次偵測：每次查詢 psutil {legacy_ms:.2f}ms → 快取未命中 {cold_ms:.2f}ms / 命中 {warm_ms:.3f}ms")
+
+    # 關鍵路徑：STT 完成到可以呼叫 LLM 之間的等待
+    detector.invalidate()
+    future = detector.resolve_async(1, cfg)          # 按下快捷鍵
+    time.sleep(args.stt_ms / 1000)                   # 錄音 + STT
+    start = time.perf_counter()
+    key = future.result()
+    async_wait_ms = (time.perf_counter() - start) * 1000
+    start = time.perf_counter()
+    legacy_detect(provider, 1)
+    sync_ms = (time.perf_counter() - start) * 1000
+    print(f"STT 後到 LLM 前：同步偵測 {sync_ms:.2f}ms → 按下時背景偵測 {async_wait_ms:.3f}ms（{key}）")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,101 @@
+"""
+延遲預算基準測試
+
+以模擬伺服器模擬卡住的引擎，量測放開快捷鍵到有結果（或放棄）的時間：
+  - LLM 卡住（首字延遲 --hang-ms）：超過 llmDeadlineMs 後直接輸出原文
+  - STT 卡住（伺服器處理極慢）：超過 sttDeadlineMs 後改用本地 Whisper（未載入時放棄本次輸入）
+處理流程與 main.py 的 _process_audio 相同（within + DeadlineExceeded 降級）；latencyBudgetMs 設為 0 時為舊行為（無期限）
+
+用法：
+  uv run benchmarks/bench_deadline.py
+  uv run benchmarks/bench_deadline.py --stt-deadline 3000 --llm-deadline 2000 --hang-ms 30000
+"""
+
+import argparse
+import asyncio
+import os
+import tempfile
+import time
+
+from common import synth_speech
+from mock_servers import MockProfile, MockServer
+
+from config.settings import Settings
+from core.deadline import DeadlineExceeded, LatencyBudget, within
+from core.llm import LLMProcessor
+from core.stt import SpeechToText
+
+RAW_TEXT = "嗯那個明天的會議改到下午兩點"
+
+
+async def dictate(stt: SpeechToText, llm: LLMProcessor, settings: Settings, audio) -> tuple[str, str]:
+    """回傳 (結果說明, 輸出文字)"""
+    cfg = settings.get_config()
+    budget = LatencyBudget(cfg, len(audio) / 16000)
+    try:
+        raw_text = await within(budget.stage("stt"), stt.atranscribe(audio))
+    except DeadlineExceeded:
+        if not stt.can_fallback_local():
+            return "STT 超過期限，放棄", ""
+        raw_text = await stt.afallback_local(audio)
+    try:
+        return "LLM 修飾", await within(budget.stage("llm"), llm.apolish(raw_text))
+    except DeadlineExceeded:
+        return "LLM 超過期限，輸出原文", llm.passthrough(raw_text, cfg)
+
+
+async def bench_async(stt, llm, settings, server: MockServer, args):
+    audio = synth_speech(3)
+    scenarios = [
+        ("正常", {}),
+        ("LLM 卡住", {"ttft_ms": args.hang_ms}),
+        ("STT 卡住", {"stt_rtf": args.hang_ms / 1000 / 3}),
+    ]
+    print(f"  {'情境':<10} {'預算':<6} {'耗時 ms':>9}  結果")
+    for name, overrides in scenarios:
+        saved = {k: getattr(server.profile, k) for k in overrides}
+        for k, v in overrides.items():
+            setattr(server.profile, k, v)
+        for budget_ms in (args.budget, 0):
+            if budget_ms == 0 and not overrides:
+                continue
+            settings.update("latencyBudgetMs", budget_ms)
+            start = time.perf_counter()
+            try:
+                outcome, text = await asyncio.wait_for(dictate(stt, llm, settings, audio), args.give_up)
+            except TimeoutError:
+                outcome, text = f"{args.give_up:.0f} 秒後仍未完成（無期限時會一直卡在「處理中」）", ""
+            elapsed = (time.perf_counter() - start) * 1000
+            print(f"  {name:<10} {'開' if budget_ms else '關':<6} {elapsed:>9.0f}  {outcome}{'：' + text if text else ''}")
+        for k, v in saved.items():
+            setattr(server.profile, k, v)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="VoiceType 延遲預算基準測試")
+    parser.add_argument("--budget", type=int, default=8000, help="latencyBudgetMs")
+    parser.add_argument("--stt-deadline", type=int, default=4000, help="sttDeadlineMs")
+    parser.add_argument("--llm-deadline", type=int, default=3000, help="llmDeadlineMs")
+    parser.add_argument("--hang-ms", type=float, default=60000, help="卡住的引擎延遲 ms")
+    parser.add_argument("--give-up", type=float, default=15, help="無期限時最多等待秒數（僅為了讓測試結束）")
+    args = parser.parse_args()
+
+    server = MockServer(MockProfile(latency_ms=60, jitter_ms=0, ttft_ms=100, tokens_per_sec=300, transcript=RAW_TEXT)).start()
+    os.environ.update(server.env())
+
+    with tempfile.TemporaryDirectory() as tmp:
+        settings = Settings(config_dir=tmp)
+        settings.update_all({
+            "sttProvider": "groq", "llmProvider": "openai", "llmModel": "gpt-4o-mini",
+            "sttDeadlineMs": args.stt_deadline, "llmDeadlineMs": args.llm_deadline,
+            "polishCache": False, "fastPath": False, "contextAware": False, "streamOutput": False,
+        })
+        stt, llm = SpeechToText(settings), LLMProcessor(settings)
+        print(f"延遲預算 {args.budget}ms（STT {args.stt_deadline}ms、LLM {args.llm_deadline}ms）；卡住的引擎延遲 {args.hang_ms:.0f}ms")
+        asyncio.run(bench_async(stt, llm, settings, server, args))
+        settings.flush()
+    server.stop()
+
+
+if __name__ == "__main__":
+    main()
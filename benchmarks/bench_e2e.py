@@ -0,0 +1,193 @@
+"""
+端對端延遲基準測試（無頭模式）
+
+以假麥克風 (FakeSoundDevice) 播放語料，經過實際的錄音 → 靜音裁剪 → STT → LLM 修飾管線，
+雲端 API 由本機模擬伺服器 (mock_servers.py) 提供，可設定延遲、抖動、首字延遲與 token 速率；
+注入階段以只記錄時間的 NullInjector 取代，因此可在一般 Linux 機器上執行
+
+輸出每個階段與端對端（放開快捷鍵 → 第一個字出現 / 全部完成）的 p50/p95/p99
+
+用法：
+  uv run benchmarks/bench_e2e.py                                # 合成語音，groq + openai
+  uv run benchmarks/bench_e2e.py corpus/ --runs 20 --stream
+  uv run benchmarks/bench_e2e.py --stt openai --llm anthropic --latency 120 --jitter 40
+  uv run benchmarks/bench_e2e.py --realtime --trace trace.json  # 依實際時間錄音，匯出 trace
+  uv run benchmarks/bench_e2e.py --stall-ms 3000 --stall-rate 0.2 --hedge-stt openai --hedge-llm anthropic
+"""
+
+import argparse
+import dataclasses
+import json
+import os
+import tempfile
+import time
+
+import numpy as np
+
+from common import SAMPLE_RATE, load_corpus, synth_speech
+from mock_servers import MockServer, add_profile_args, profile_from_args
+
+from config.settings import Settings
+from core.audio_backends import FakeSoundDevice
+from core.http_clients import get_clients as get_http_clients
+from core.llm import LLMProcessor
+from core.metrics import Trace, metrics
+from core.recorder import AudioRecorder
+from core.stt import SpeechToText
+from core.vad import trim_silence
+
+LLM_PROVIDERS = ["openai", "groq", "anthropic", "gemini", "ollama"]
+REPORT_STAGES = [
+    "capture", "vad", "encode", "stt.upload", "stt.server", "stt",
+    "prompt_build", "llm.ttft", "llm", "inject", "e2e.first_text", "e2e.done",
+]
+
+
+class NullInjector:
+    """不實際輸入文字的注入器：只記錄第一段文字與全部文字出現的時間"""
+
+    def __init__(self):
+        self.text = ""
+        self.first_at: float | None = None
+
+    def inject(self, text_or_generator):
+        chunks = [text_or_generator] if isinstance(text_or_generator, str) else text_or_generator
+        for chunk in chunks:
+            if chunk and self.first_at is None:
+                self.first_at = time.perf_counter()
+            self.text += chunk
+
+
+def dictate(recorder: AudioRecorder, mic: FakeSoundDevice, stt: SpeechToText, llm: LLMProcessor,
+            audio: np.ndarray, cfg: dict) -> str:
+    """模擬一次完整的語音輸入；回傳注入的文字"""
+    trace = Trace()
+    press = time.perf_counter()
+    recorder.start()
+    mic.play(audio)
+    while not mic.exhausted:
+        time.sleep(0.005)
+    release = time.perf_counter()
+    recorded = recorder.stop()
+    trace.add("capture", press, release)
+
+    try:
+        if cfg["vadEnabled"]:
+            with trace.span("vad"):
+                result = trim_silence(recorded, cfg["vadMaxPauseMs"])
+            if not result.has_speech:
+                return ""
+            recorded = result.audio
+
+        raw_text = stt.transcribe(recorded, trace=trace)
+        polished = llm.polish(raw_text, trace=trace)
+
+        injector = NullInjector()
+        with trace.span("inject", "null"):
+            injector.inject(polished)
+        done = time.perf_counter()
+        trace.add("e2e.first_text", release, injector.first_at or done)
+        trace.add("e2e.done", release, done)
+        return injector.text
+    finally:
+        trace.finish()
+
+
+def print_report(title: str):
+    summary = metrics.summary()
+    print(f"\n{title}")
+    print(f"  {'stage':<16} {'provider':<10} {'n':>4} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9}")
+    stages = summary["stages"]
+    for stage in REPORT_STAGES + sorted(set(stages) - set(REPORT_STAGES)):
+        for provider, s in stages.get(stage, {}).items():
+            if "p50_ms" not in s:
+                continue
+            print(f"  {stage:<16} {provider:<10} {s['count']:>4} "
+                  f"{s['p50_ms']:>9.1f} {s['p95_ms']:>9.1f} {s['p99_ms']:>9.1f}")
+    if summary["counters"]:
+        print(f"  counters: {json.dumps(summary['counters'])}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="VoiceType 端對端延遲基準測試")
+    parser.add_argument("corpus", nargs="*", help="WAV 檔或資料夾（省略時使用合成語音）")
+    parser.add_argument("--stt", choices=["groq", "openai"], default="groq")
+    parser.add_argument("--llm", choices=LLM_PROVIDERS, default="openai")
+    parser.add_argument("--stream", action="store_true", help="串流輸出 LLM 結果")
+    parser.add_argument("--codec", choices=["wav", "flac", "opus"], default="wav")
+    parser.add_argument("--no-vad", action="store_true", help="停用靜音裁剪")
+    parser.add_argument("--cache", action="store_true", help="啟用 LLM 修飾快取（重複語料會命中）")
+    parser.add_argument("--fast-path", action="store_true", help="啟用本地規則修飾（乾淨的短句略過 LLM）")
+    parser.add_argument("--hedge-stt", choices=["groq", "openai"], help="STT 對沖備援引擎（連到不會卡住的第二台模擬伺服器）")
+    parser.add_argument("--hedge-llm", choices=LLM_PROVIDERS, help="LLM 對沖備援引擎（連到不會卡住的第二台模擬伺服器）")
+    parser.add_argument("--runs", type=int, default=10, help="每個語料重複次數")
+    parser.add_argument("--prewarm", action="store_true", help="每次「按下快捷鍵」時在背景預先連線（同 main.py）")
+    parser.add_argument("--realtime", action="store_true", help="假麥克風依實際時間速率送出音訊")
+    parser.add_argument("--trace", help="匯出 Chrome trace-event JSON 的路徑")
+    add_profile_args(parser)
+    args = parser.parse_args()
+
+    corpus = load_corpus(args.corpus) if args.corpus else [
+        ("synth-3s", synth_speech(3.0, seed=1, lead_silence=0.3)),
+        ("synth-8s", synth_speech(8.0, seed=2, lead_silence=0.3)),
+    ]
+
+    profile = profile_from_args(args)
+    server = MockServer(profile).start()
+    os.environ.update(server.env())
+    # 對沖備援引擎連到另一台不會卡住的模擬伺服器
+    hedge_providers = [p for p in (args.hedge_stt, args.hedge_llm) if p]
+    backup = None
+    if hedge_providers:
+        backup = MockServer(dataclasses.replace(profile, stall_ms=0.0, stall_rate=0.0)).start()
+        os.environ.update(backup.env(hedge_providers))
+
+    with tempfile.TemporaryDirectory() as tmp:
+        settings = Settings(config_dir=tmp)
+        settings.update_all({
+            "sttProvider": args.stt,
+            "llmProvider": args.llm,
+            "streamOutput": args.stream,
+            "uploadCodec": args.codec,
+            "vadEnabled": not args.no_vad,
+            "contextAware": False,
+            "polishCache": args.cache,
+            "fastPath": args.fast_path,
+            "hedgeSttProvider": args.hedge_stt or "",
+            "hedgeLlmProvider": args.hedge_llm or "",
+        })
+        cfg = settings.get_config()
+        mic = FakeSoundDevice(realtime=args.realtime, noise=40)
+        recorder = AudioRecorder(backend=mic)
+        stt = SpeechToText(settings)
+        llm = LLMProcessor(settings)
+
+        print(f"mock server {server.url}  stt={args.stt} llm={args.llm} stream={args.stream} "
+              f"codec={args.codec} latency={args.latency}±{args.jitter}ms ttft={args.ttft}ms tps={args.tps}")
+
+        # 暖機一次（建立 HTTP 連線、載入 SDK），不列入統計
+        dictate(recorder, mic, stt, llm, corpus[0][1], cfg)
+        metrics.reset()
+
+        for name, audio in corpus:
+            for _ in range(args.runs):
+                if args.prewarm:
+                    get_http_clients().warm(settings, cfg)
+                text = dictate(recorder, mic, stt, llm, audio, cfg)
+            print(f"  {name:<20} {len(audio) / SAMPLE_RATE:5.1f}s → {text}")
+
+        print_report(f"{len(corpus)} 個語料 × {args.runs} 次")
+        print(f"\nmock server requests: {json.dumps(server.stats)}")
+        if backup:
+            print(f"backup server requests: {json.dumps(backup.stats)}")
+        if args.trace:
+            metrics.dump_trace(args.trace)
+            print(f"trace 已匯出: {args.trace}")
+
+    server.stop()
+    if backup:
+        backup.stop()
+
+
+if __name__ == "__main__":
+    main()
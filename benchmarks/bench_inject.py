@@ -0,0 +1,82 @@
+"""
+串流注入吞吐量比較：逐字模擬打字 vs 分段貼上
+
+以模擬的 LLM token 串流（首字延遲 + 固定 token 速率）餵給 TextInjector，
+輸入後端換成 FakeInputBackend（模擬每個按鍵事件與 Ctrl+V 的成本，記錄文字出現的時間），
+比較兩種串流模式的首字出現時間、全部完成時間與每秒字數
+
+用法：
+  uv run benchmarks/bench_inject.py
+  uv run benchmarks/bench_inject.py --tps 40 --ttft 300 --flush-ms 250
+  uv run benchmarks/bench_inject.py --key-event-ms 2 --paste-ms 15 --chars 600
+"""
+
+import argparse
+import tempfile
+import time
+
+import common  # noqa: F401  專案路徑設定
+
+from config.settings import Settings
+from core.injector import TextInjector
+from core.input_backends import FakeInputBackend
+
+SAMPLE_TEXT = (
+    "明天的會議改到禮拜三下午兩點，請大家準備一下 API 的文件。"
+    "另外，上週提到的效能問題已經找到原因，主要是資料庫查詢沒有使用索引，修正後延遲降低了一半。"
+    "如果還有其他問題，請在週二之前回覆我，謝謝。"
+)
+
+
+def token_stream(text: str, ttft_ms: float, tokens_per_sec: float, chars_per_token: int):
+    time.sleep(ttft_ms / 1000)
+    for i in range(0, len(text), chars_per_token):
+        if i:
+            time.sleep(1 / tokens_per_sec)
+        yield text[i:i + chars_per_token]
+
+
+def run(mode: str, settings: Settings, text: str, args) -> dict:
+    settings.update_all({"streamInjectMode": mode, "streamFlushMs": args.flush_ms})
+    screen = FakeInputBackend(key_event_ms=args.key_event_ms, paste_ms=args.paste_ms, clipboard="原本的剪貼簿")
+    injector = TextInjector(settings, backend=screen)
+
+    start = time.perf_counter()
+    injector.inject(token_stream(text, args.ttft, args.tps, args.chars_per_token))
+    done = time.perf_counter()
+
+    assert screen.text == text, f"{mode}: 輸出內容不一致"
+    assert screen.clipboard == "原本的剪貼簿", f"{mode}: 剪貼簿未還原"
+    return {
+        "first_ms": (screen.first_visible_at - start) * 1000,
+        "done_ms": (done - start) * 1000,
+        "cps": len(text) / (done - start),
+        "events": screen.key_events + screen.pastes,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="VoiceType 串流注入吞吐量比較")
+    parser.add_argument("--chars", type=int, default=len(SAMPLE_TEXT), help="輸出文字長度（重複範例文字）")
+    parser.add_argument("--ttft", type=float, default=300, help="LLM 首字延遲 ms")
+    parser.add_argument("--tps", type=float, default=60, help="LLM 每秒 token 數")
+    parser.add_argument("--chars-per-token", type=int, default=2)
+    parser.add_argument("--flush-ms", type=int, default=400, help="分段貼上的最長等待時間 (streamFlushMs)")
+    parser.add_argument("--key-event-ms", type=float, default=1.0, help="每個合成按鍵事件的成本")
+    parser.add_argument("--paste-ms", type=float, default=8.0, help="目標程式處理一次貼上的時間")
+    args = parser.parse_args()
+
+    text = (SAMPLE_TEXT * (args.chars // len(SAMPLE_TEXT) + 1))[:args.chars]
+    llm_ms = args.ttft + 1000 * (len(text) / args.chars_per_token - 1) / args.tps
+    print(f"{len(text)} 字，LLM 首字 {args.ttft:.0f}ms、{args.tps:.0f} tok/s（串流本身約 {llm_ms:.0f}ms）")
+    print(f"  {'mode':<8} {'first ms':>9} {'done ms':>9} {'chars/s':>8} {'events':>7}")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        settings = Settings(config_dir=tmp)
+        for mode in ("typing", "chunked"):
+            r = run(mode, settings, text, args)
+            print(f"  {mode:<8} {r['first_ms']:>9.0f} {r['done_ms']:>9.0f} {r['cps']:>8.1f} {r['events']:>7}")
+
+
+if __name__ == "__main__":
+    main()
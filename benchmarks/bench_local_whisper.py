@@ -0,0 +1,109 @@
+"""
+本地 Whisper 推論設定檔基準測試
+
+以固定語料比較各推論設定檔（localWhisperProfile）與 worker 數在 CPU 上的表現：
+  - 載入 + 暖機時間
+  - 各段音訊的辨識延遲（p50）與即時率 RTF（辨識耗時 / 音訊長度，越小越快，< 1 表示比即時快）
+  - 辨識結果（確認低延遲設定檔沒有明顯犧牲品質）
+辨識流程與 SpeechToText.transcribe 相同（含 localWorkers > 1 時的長錄音分段）
+
+需要安裝 faster-whisper；建議以 --corpus 指定真人錄音的 WAV 檔或資料夾，
+未指定時使用合成語音（內建 VAD 可能把整段判為非語音，延遲會偏低，僅供比較相對差異）
+
+用法：
+  uv run benchmarks/bench_local_whisper.py --corpus recordings/
+  uv run benchmarks/bench_local_whisper.py --model small --profiles fast balanced --workers 1 2 --threads 4
+"""
+
+import argparse
+import tempfile
+import time
+
+import numpy as np
+
+from common import SAMPLE_RATE, load_corpus, synth_speech
+
+from config.settings import Settings
+from core.local_whisper import get_worker, resolve_profile
+from core.stt import SpeechToText
+
+SYNTH_SECONDS = (3, 10, 30, 90)
+
+
+def bench_profile(stt: SpeechToText, settings: Settings, corpus, profile: str, workers: int, args) -> dict:
+    settings.update_all({"localWhisperProfile": profile, "localWorkers": workers, "localCpuThreads": args.threads})
+    cfg = settings.get_config()
+    name, model_options, decode_options = resolve_profile(cfg)
+    worker = get_worker()
+    worker.ensure_model(args.model, **model_options)
+    worker.ready.wait()
+
+    rows = []
+    for clip, audio in corpus:
+        times = []
+        for _ in range(args.repeat):
+            start = time.perf_counter()
+            text = stt.transcribe(audio)
+            times.append(time.perf_counter() - start)
+        seconds = len(audio) / SAMPLE_RATE
+        rows.append({"clip": clip, "seconds": seconds, "p50": float(np.median(times)), "text": text})
+    total_audio = sum(r["seconds"] for r in rows)
+    return {
+        "name": name,
+        "model": model_options,
+        "decode": decode_options,
+        "ready": worker.ready_seconds or 0.0,
+        "rows": rows,
+        "rtf": sum(r["p50"] for r in rows) / total_audio if total_audio else 0.0,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="VoiceType 本地 Whisper 推論設定檔基準測試")
+    parser.add_argument("--corpus", nargs="*", default=[], help="WAV 檔或資料夾（16kHz mono int16）")
+    parser.add_argument("--model", default="small", help="faster-whisper 模型（tiny / base / small / medium / large-v3）")
+    parser.add_argument("--profiles", nargs="+", default=["accurate", "balanced", "fast"])
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2], help="localWorkers（> 1 時長錄音分段同時辨識）")
+    parser.add_argument("--threads", type=int, default=0, help="localCpuThreads（0 為各 worker 平分實體核心）")
+    parser.add_argument("--language", default="zh-TW")
+    parser.add_argument("--repeat", type=int, default=3, help="每段音訊重複次數（取中位數）")
+    args = parser.parse_args()
+
+    try:
+        import faster_whisper  # noqa: F401
+    except ImportError:
+        raise SystemExit("需要安裝 faster-whisper：pip install faster-whisper")
+
+    corpus = load_corpus(args.corpus) if args.corpus else [
+        (f"synth_{s}s", synth_speech(s, seed=i)) for i, s in enumerate(SYNTH_SECONDS)
+    ]
+
+    with tempfile.TemporaryDirectory() as tmp:
+        settings = Settings(config_dir=tmp)
+        settings.update_all({
+            "sttProvider": "local", "sttModel": args.model, "language": args.language,
+            "latencyBudgetMs": 0, "chunkThresholdSeconds": 60.0,
+        })
+        stt = SpeechToText(settings)
+        print(f"模型 {args.model}；語料 {len(corpus)} 段，共 {sum(len(a) for _, a in corpus) / SAMPLE_RATE:.0f} 秒；每段重複 {args.repeat} 次")
+
+        results = []
+        for profile in args.profiles:
+            for workers in args.workers:
+                r = bench_profile(stt, settings, corpus, profile, workers, args)
+                results.append((workers, r))
+                opts = r["model"]
+                print(f"\n[{r['name']}] {opts['device']} / {opts['compute_type']}，worker {workers} × 執行緒 {opts['cpu_threads']}，"
+                      f"beam {r['decode']['beam_size']}，VAD {'開' if r['decode']['vad_filter'] else '關'}；載入 + 暖機 {r['ready']:.1f}s")
+                for row in r["rows"]:
+                    print(f"  {row['clip']:<16} {row['seconds']:>6.1f}s  p50 {row['p50'] * 1000:>7.0f}ms"
+                          f"  RTF {row['p50'] / row['seconds']:.3f}  {row['text'][:40]}")
+
+        print(f"\n  {'設定檔':<10} {'worker':>6} {'RTF':>7}")
+        for workers, r in results:
+            print(f"  {r['name']:<10} {workers:>6} {r['rtf']:>7.3f}")
+        settings.flush()
+
+
+if __name__ == "__main__":
+    main()
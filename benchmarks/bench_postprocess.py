@@ -0,0 +1,102 @@
+"""
+後處理鏈微基準測試
+
+分別量測每個後處理器（中英夾雜空格、簡轉繁、整條處理鏈）：
+  - 整段處理的吞吐量（字 / ms）
+  - 串流模式下每個 chunk 的平均成本（µs），模擬 LLM 每次吐出 1–4 個字
+並與原本只支援非串流的 Regex 空格處理比較；同時檢查逐段輸出與整段處理的結果完全一致
+
+用法：
+  uv run benchmarks/bench_postprocess.py
+  uv run benchmarks/bench_postprocess.py --chars 5000 --chunk 1-8 --repeat 50
+"""
+
+import argparse
+import random
+import re
+import time
+
+import common  # noqa: F401  專案路徑設定
+
+from core.postprocess import MixedSpacing, ProcessorChain, S2TConverter
+
+SAMPLE_TEXT = (
+    "我们明天下午3点在会议室讨论API的设计，请大家先看一下GitHub上的文档。"
+    "这周末我去理发，顺便买了面包和饼干，没关系，下周再说。"
+    "Python开发的后端服务延迟降低了一半，复杂的SQL查询也重新写过。"
+)
+
+
+def _format_mixed_text(text: str) -> str:
+    """舊版中英夾雜空格（兩次 re.sub，只涵蓋 \\u4e00-\\u9fa5，只能整段處理）"""
+    text = re.sub(r'([a-zA-Z0-9])([一-龥])', r'\1 \2', text)
+    text = re.sub(r'([一-龥])([a-zA-Z0-9])', r'\1 \2', text)
+    return text
+
+
+def split_chunks(text: str, low: int, high: int, seed: int = 0) -> list[str]:
+    rng = random.Random(seed)
+    chunks, i = [], 0
+    while i < len(text):
+        size = rng.randint(low, high)
+        chunks.append(text[i:i + size])
+        i += size
+    return chunks
+
+
+def bench_whole(fn, text: str, repeat: int) -> float:
+    """整段處理，回傳每 ms 處理的字數"""
+    start = time.perf_counter()
+    for _ in range(repeat):
+        fn(text)
+    return len(text) * repeat / ((time.perf_counter() - start) * 1000)
+
+
+def bench_stream(make, chunks: list[str], repeat: int) -> float:
+    """逐段處理，回傳每個 chunk 的平均成本 (µs)"""
+    start = time.perf_counter()
+    for _ in range(repeat):
+        processor = make()
+        for chunk in chunks:
+            processor.feed(chunk)
+        processor.flush()
+    return (time.perf_counter() - start) * 1e6 / (len(chunks) * repeat)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="VoiceType 後處理鏈微基準測試")
+    parser.add_argument("--chars", type=int, default=2000, help="測試文字長度（重複範例文字）")
+    parser.add_argument("--chunk", default="1-4", help="串流 chunk 字數範圍，例如 1-4")
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    text = (SAMPLE_TEXT * (args.chars // len(SAMPLE_TEXT) + 1))[:args.chars]
+    low, high = (int(x) for x in args.chunk.split("-"))
+    chunks = split_chunks(text, low, high)
+
+    processors = {
+        "spacing": MixedSpacing,
+        "s2t": S2TConverter,
+        "chain": lambda: ProcessorChain([S2TConverter(), MixedSpacing()]),
+    }
+    S2TConverter().process("预热")  # 載入對照表
+
+    print(f"{len(text)} 字，串流 {len(chunks)} 個 chunk（每個 {low}-{high} 字），重複 {args.repeat} 次")
+    print(f"  {'processor':<14} {'whole 字/ms':>12} {'stream µs/chunk':>16} {'一致':>4}")
+    whole = bench_whole(_format_mixed_text, text, args.repeat)
+    print(f"  {'regex (舊版)':<12} {whole:>12.0f} {'-':>16} {'-':>4}")
+
+    for name, make in processors.items():
+        whole = bench_whole(lambda t: make().process(t), text, args.repeat)
+        per_chunk = bench_stream(make, chunks, args.repeat)
+
+        processor = make()
+        streamed = "".join(processor.feed(c) for c in chunks) + processor.flush()
+        same = streamed == make().process(text)
+        print(f"  {name:<14} {whole:>12.0f} {per_chunk:>16.2f} {'✓' if same else '✗':>4}")
+
+    print(f"\n範例：{ProcessorChain([S2TConverter(), MixedSpacing()]).process(SAMPLE_TEXT[:60])}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,91 @@
+"""
+供應商端提示詞快取基準測試
+
+以模擬伺服器（--prefill-ms 模擬每 1000 個未快取輸入 token 的 prefill 時間）比較
+OpenAI（自動前綴快取）、Anthropic（cache_control）、Gemini（cachedContents）在
+promptCaching 開啟 / 關閉時的首字延遲 (TTFT) 與快取命中的輸入 token 比例；
+每次請求輪流使用不同的語境，確認語境資訊放在最後不會破壞可快取的前綴
+
+用法：
+  uv run benchmarks/bench_prompt_cache.py
+  uv run benchmarks/bench_prompt_cache.py --prefill-ms 300 --pad-chars 4000 --requests 30
+"""
+
+import argparse
+import asyncio
+import os
+import tempfile
+
+import numpy as np
+
+import common  # noqa: F401  專案路徑設定
+from mock_servers import MockProfile, MockServer
+
+from config.settings import DEFAULT_SYSTEM_PROMPT, Settings
+from core.llm import LLMProcessor
+from core.metrics import Trace, metrics
+from core.prompt_cache import get_gemini_cache
+
+PROVIDERS = {"openai": "gpt-4o-mini", "anthropic": "claude-haiku-4-5-20251001", "gemini": "gemini-2.5-flash"}
+CONTEXTS = ["web_mail", "code", "chat", "document", ""]
+UTTERANCES = ["嗯那個明天的會議改到下午兩點", "呃我覺得這個方案可以再討論一下", "然後請大家準備一下 API 的文件"]
+
+
+async def run(llm: LLMProcessor, provider: str, requests: int) -> tuple[list[float], float]:
+    """回傳 (各次 TTFT 秒數, 快取命中的輸入 token 比例)"""
+    metrics.reset()
+    ttfts = []
+    for i in range(requests):
+        trace = Trace()
+        result = await llm.apolish(UTTERANCES[i % len(UTTERANCES)] + f"（第 {i} 次）", trace=trace,
+                                   context_key=CONTEXTS[i % len(CONTEXTS)])
+        async for _ in result:
+            pass
+        ttfts.append(trace.duration("llm.ttft"))
+        if provider == "gemini" and i == 0:
+            get_gemini_cache().wait(5)   # 讓背景建立的 cachedContents 完成，模擬持續使用時的狀態
+    counters = metrics.summary()["counters"]
+    total = counters.get(f"llm.prompt.{provider}.input", 0)
+    return ttfts, counters.get(f"llm.prompt.{provider}.cached", 0) / total if total else 0.0
+
+
+async def bench_all(settings: Settings, server: MockServer, system_prompt: str, requests: int):
+    # 共用的非同步客戶端綁定在事件迴圈上，所有引擎在同一個事件迴圈中執行
+    llm = LLMProcessor(settings)
+    for provider, model in PROVIDERS.items():
+        for caching in (False, True):
+            server.handler.prompt_caches.clear()
+            settings.update_all({
+                "llmProvider": provider, "llmModel": model, "systemPrompt": system_prompt,
+                "promptCaching": caching, "streamOutput": True,
+                "polishCache": False, "fastPath": False, "contextAware": True,
+            })
+            ttfts, ratio = await run(llm, provider, requests)
+            print(f"  {provider:<10} {'開' if caching else '關':<4} {ttfts[0] * 1000:>8.0f}ms"
+                  f" {np.median(ttfts[1:]) * 1000:>8.0f}ms {ratio:>8.0%}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="VoiceType 提示詞快取基準測試")
+    parser.add_argument("--prefill-ms", type=float, default=200, help="每 1000 個未快取輸入 token 的 prefill 延遲 ms")
+    parser.add_argument("--pad-chars", type=int, default=2000, help="在系統提示詞後加上的範例字數（模擬較長的自訂提示詞）")
+    parser.add_argument("--requests", type=int, default=20)
+    args = parser.parse_args()
+
+    server = MockServer(MockProfile(latency_ms=20, jitter_ms=0, ttft_ms=60, tokens_per_sec=500,
+                                    chars_per_token=1, prefill_ms_per_1k=args.prefill_ms)).start()
+    os.environ.update(server.env())
+    system_prompt = DEFAULT_SYSTEM_PROMPT + "\n\n範例：" + "好的，收到。" * (args.pad_chars // 6)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        settings = Settings(config_dir=tmp)
+        print(f"系統提示詞約 {len(system_prompt)} tokens，prefill {args.prefill_ms:.0f}ms / 1000 tokens，每個設定 {args.requests} 次請求")
+        print(f"  {'引擎':<10} {'快取':<4} {'首次 TTFT':>10} {'之後 p50':>10} {'快取比例':>9}")
+        asyncio.run(bench_all(settings, server, system_prompt, args.requests))
+        print("  （OpenAI 的前綴快取由伺服器自動進行，promptCaching 關閉時仍會命中）")
+        settings.flush()
+    server.stop()
+
+
+if __name__ == "__main__":
+    main()
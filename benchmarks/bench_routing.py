@@ -0,0 +1,124 @@
+"""
+自適應引擎路由基準測試
+
+主要引擎（Groq）與備援引擎（OpenAI）各由一個模擬伺服器代替，依序模擬四個階段：
+  1. 正常：全部由主要引擎處理
+  2. 主要引擎故障（全部回傳 503）：前幾次請求失敗後改用備援引擎，連續失敗後熔斷，之後直接送給備援引擎
+  3. 主要引擎恢復：冷卻結束後放行一個探測請求，成功即切回
+  4. 主要引擎變慢：延遲的移動平均超過備援引擎 1.5 倍後改用備援引擎，並定期重新量測
+每個階段記錄各引擎處理的請求數、切換次數、熔斷次數、失敗（兩個引擎都失敗）數與延遲
+
+用法：
+  uv run benchmarks/bench_routing.py
+  uv run benchmarks/bench_routing.py --requests 30 --slow-ms 800 --cooldown 2
+"""
+
+import argparse
+import os
+import tempfile
+import time
+
+import numpy as np
+
+from common import synth_speech
+from mock_servers import MockProfile, MockServer
+
+from config.settings import Settings
+from core.llm import LLMProcessor
+from core.metrics import metrics
+from core.router import get_router
+from core.stt import SpeechToText
+
+PRIMARY, BACKUP = "groq", "openai"
+
+
+def run_phase(stage: str, call, requests: int) -> dict:
+    metrics.reset()
+    times = []
+    for _ in range(requests):
+        start = time.perf_counter()
+        try:
+            call()
+        except Exception:
+            pass    # 兩個引擎都失敗（LLM 修飾失敗時回退為原文，不會拋出例外）
+        times.append(time.perf_counter() - start)
+    counters = metrics.summary()["counters"]
+    served = {p: metrics.count(stage, p) for p in (PRIMARY, BACKUP)}
+    return {
+        "primary": served[PRIMARY],
+        "backup": served[BACKUP],
+        "failover": counters.get(f"router.{stage}.failover", 0),
+        "opened": counters.get(f"router.{stage}.opened", 0),
+        "failed": requests - sum(served.values()),
+        "p50": np.median(times) * 1000,
+        "max": max(times) * 1000,
+    }
+
+
+def bench_stage(stage: str, call, primary: MockServer, router, args):
+    phases = [
+        ("正常", lambda: None),
+        ("主要引擎故障", lambda: setattr(primary.profile, "error_rate", 1.0)),
+        ("主要引擎恢復", lambda: (setattr(primary.profile, "error_rate", 0.0), time.sleep(args.cooldown))),
+        ("主要引擎變慢", lambda: setattr(primary.profile, "latency_ms", args.slow_ms)),
+    ]
+    print(f"\n[{stage}] {'階段':<10} {'主要':>4} {'備援':>4} {'切換':>4} {'熔斷':>4} {'失敗':>4} {'p50 ms':>8} {'最大 ms':>8}")
+    for name, setup in phases:
+        setup()
+        r = run_phase(stage, call, args.requests)
+        print(f"  {name:<12} {r['primary']:>4} {r['backup']:>4} {r['failover']:>4} {r['opened']:>4} {r['failed']:>4}"
+              f" {r['p50']:>8.0f} {r['max']:>8.0f}")
+    state = router.snapshot()[stage]
+    for provider in (PRIMARY, BACKUP):
+        h = state.get(provider, {})
+        print(f"  {provider:<8} 狀態 {h.get('state')}，延遲 {h.get('latency_ms')} ms，錯誤率 {h.get('error_rate', 0):.0%}")
+    primary.profile.latency_ms = args.latency
+    primary.profile.error_rate = 0.0
+
+
+def main():
+    parser = argparse.ArgumentParser(description="VoiceType 自適應引擎路由基準測試")
+    parser.add_argument("--requests", type=int, default=20, help="每個階段的請求數")
+    parser.add_argument("--latency", type=float, default=80, help="正常時的網路延遲 ms")
+    parser.add_argument("--slow-ms", type=float, default=600, help="主要引擎變慢時的網路延遲 ms")
+    parser.add_argument("--cooldown", type=float, default=1.0, help="熔斷冷卻秒數（預設 30 秒，測試時縮短）")
+    parser.add_argument("--explore", type=float, default=0.5, help="被略過的引擎重新量測間隔秒數（預設 60 秒）")
+    parser.add_argument("--half-life", type=float, default=1.0, help="錯誤率衰減半衰期秒數（預設 120 秒）")
+    args = parser.parse_args()
+
+    profile = dict(latency_ms=args.latency, jitter_ms=5, stt_rtf=0.02, ttft_ms=60, tokens_per_sec=400)
+    primary = MockServer(MockProfile(**profile)).start()
+    backup = MockServer(MockProfile(**profile)).start()
+    os.environ.update(primary.env([PRIMARY]))
+    os.environ.update(backup.env([BACKUP]))
+
+    with tempfile.TemporaryDirectory() as tmp:
+        settings = Settings(config_dir=tmp)
+        settings.update_all({
+            "sttProvider": PRIMARY, "sttProviders": [BACKUP], "uploadCodec": "wav",
+            "llmProvider": PRIMARY, "llmModel": "llama-3.3-70b-versatile", "llmProviders": [BACKUP],
+            "polishCache": False, "fastPath": False, "contextAware": False, "streamOutput": False,
+        })
+        router = get_router(settings.config_dir)
+        router.cooldown = args.cooldown
+        router.explore_seconds = args.explore
+        router.error_half_life = args.half_life
+
+        print(f"主要引擎 {PRIMARY}、備援引擎 {BACKUP}；網路延遲 {args.latency:.0f}ms，變慢時 {args.slow_ms:.0f}ms；"
+              f"熔斷冷卻 {args.cooldown}s、重新量測間隔 {args.explore}s、錯誤率半衰期 {args.half_life}s；每階段 {args.requests} 次請求")
+        print("（故障階段的前幾次請求包含 SDK 內建的重試等待，熔斷後不再等待）")
+
+        stt = SpeechToText(settings)
+        audio = synth_speech(3)
+        bench_stage("stt", lambda: stt.transcribe(audio), primary, router, args)
+
+        llm = LLMProcessor(settings)
+        bench_stage("llm", lambda: llm.polish("嗯那個明天的會議改到下午兩點"), primary, router, args)
+
+        settings.flush()
+    primary.stop()
+    backup.stop()
+
+
+if __name__ == "__main__":
+    main()
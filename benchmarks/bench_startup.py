@@ -0,0 +1,56 @@
+"""
+啟動 import 時間報告
+
+以 python -X importtime 在新的直譯器中載入 main.py 模組層級的 import，列出：
+  - 啟動時載入的頂層模組與累計耗時（依耗時排序）
+  - 自身耗時最長的模組（不含子模組）
+  - 各引擎 SDK 單獨載入的耗時：這些模組改在快捷鍵註冊後於背景預先載入（core/startup.py），
+    沒有預先載入時第一次語音輸入要多等這段時間
+缺少套件（例如非 Windows 環境的 keyboard / winsound）的 import 會略過並列出
+
+用法：
+  uv run benchmarks/bench_startup.py
+  uv run benchmarks/bench_startup.py --top 30
+"""
+
+import argparse
+
+from common import import_times, startup_imports
+
+from core.startup import PROVIDER_MODULES
+
+SDKS = {provider: modules[0] for provider, modules in PROVIDER_MODULES.items() if provider != "groq"}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="VoiceType 啟動 import 時間報告")
+    parser.add_argument("--top", type=int, default=15, help="列出前幾名")
+    args = parser.parse_args()
+
+    entries, result = import_times(startup_imports())
+    top_level = [e for e in entries if e["depth"] == 0]
+    total = sum(e["cumulative_ms"] for e in top_level)
+    print(f"啟動 import 總計 {total:.0f}ms（{len(entries)} 個模組，含直譯器本身載入的模組）")
+    for stmt, error in result["missing"]:
+        print(f"  略過 {stmt}：{error}")
+
+    print(f"\n  {'頂層模組':<40} {'累計 ms':>9} {'自身 ms':>9}")
+    for e in sorted(top_level, key=lambda e: -e["cumulative_ms"])[:args.top]:
+        print(f"  {e['name']:<40} {e['cumulative_ms']:>9.1f} {e['self_ms']:>9.1f}")
+
+    print(f"\n  {'自身耗時最長':<40} {'自身 ms':>9}")
+    for e in sorted(entries, key=lambda e: -e["self_ms"])[:args.top]:
+        print(f"  {e['name']:<40} {e['self_ms']:>9.1f}")
+
+    print(f"\n  {'引擎 SDK（背景預先載入）':<30} {'ms':>9}")
+    for label, module in SDKS.items():
+        sdk_entries, sdk_result = import_times([f"import {module}"])
+        if sdk_result["missing"]:
+            print(f"  {label:<30} {'未安裝':>9}")
+            continue
+        ms = sum(e["cumulative_ms"] for e in sdk_entries if e["depth"] == 0 and e["name"].split(".")[0] == module.split(".")[0])
+        print(f"  {label:<30} {ms:>9.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,115 @@
+"""
+設定熱重載檢查
+
+以與 main.py 相同的方式註冊設定變更處理（預先連線、本地 Whisper 模型、快捷鍵），
+透過 Web 介面的 update_all() 與直接修改 config.json（ConfigWatcher）變更設定，確認：
+  - 無關的設定變更（playSounds、systemPrompt）不會觸發任何元件重建
+  - 已建立的 SDK 客戶端、連線池與本地 Whisper 模型在變更後仍是同一個物件
+  - 只有關心該鍵的元件收到通知；手動編輯設定檔會被偵測並自動套用
+  - 變更後下一次 LLM 請求直接使用新設定（不需要重新建立 LLMProcessor）
+
+用法：
+  uv run benchmarks/check_hot_reload.py
+"""
+
+import json
+import os
+import tempfile
+import time
+
+import common  # noqa: F401  專案路徑設定
+from mock_servers import MockProfile, MockServer
+
+from config.hot_reload import ConfigDispatcher, ConfigWatcher
+from config.settings import SAVE_DEBOUNCE_SECONDS, Settings
+from core.http_clients import get_clients
+from core.llm import LLMProcessor
+from core.local_whisper import get_worker, resolve_profile
+
+failures = 0
+
+
+def check(name: str, ok: bool):
+    global failures
+    failures += not ok
+    print(f"  [{'PASS' if ok else 'FAIL'}] {name}")
+
+
+def main():
+    server = MockServer(MockProfile(latency_ms=5, ttft_ms=5, tokens_per_sec=2000)).start()
+    os.environ.update(server.env())
+
+    with tempfile.TemporaryDirectory() as tmp:
+        settings = Settings(config_dir=tmp)
+        settings.update_all({"llmProvider": "openai", "contextAware": False, "polishCache": False, "fastPath": False})
+
+        calls: list[tuple[str, set]] = []
+        clients = get_clients()
+        whisper = get_worker()
+
+        def apply_http(cfg, keys):
+            calls.append(("http_clients", keys))
+            clients.configure(cfg)
+
+        def apply_whisper(cfg, keys):
+            calls.append(("local_whisper", keys))
+            if cfg.get("sttProvider") == "local":
+                whisper.ensure_model(cfg.get("sttModel", "base"), **resolve_profile(cfg)[1])
+
+        dispatcher = ConfigDispatcher(settings)
+        dispatcher.on({"httpHttp2", "httpKeepaliveSeconds", "apiKeys", "sttProvider", "llmProvider"}, apply_http, name="http_clients")
+        dispatcher.on({"sttProvider", "sttModel"}, apply_whisper, name="local_whisper")
+        dispatcher.on({"hotkey"}, lambda cfg, keys: calls.append(("hotkey", keys)), name="hotkey")
+        watcher = ConfigWatcher(settings, interval=0.2).start()
+
+        llm = LLMProcessor(settings)
+        llm.polish("我们明天开会")
+        api_key = settings.get_api_key("openai")
+        base_url = settings.get_base_url("openai")
+        client = clients.openai("openai", api_key, base_url)
+        pool = clients._pool("openai", base_url)
+        model_key = whisper._model_key
+
+        print("無關的設定變更")
+        calls.clear()
+        settings.update_all({"playSounds": False, "systemPrompt": "只回覆修正後的文字。"})
+        check("沒有元件被重建", calls == [])
+        check("SDK 客戶端沿用", clients.openai("openai", api_key, base_url) is client)
+        check("連線池沿用", clients._pool("openai", base_url) is pool)
+        check("本地 Whisper 模型沿用", whisper._model_key == model_key)
+        check("下一次請求使用新的提示詞", llm._get_system_prompt(settings.get_config()).startswith("只回覆"))
+
+        print("連線設定變更")
+        calls.clear()
+        settings.update("httpKeepaliveSeconds", 10)
+        check("只通知 http_clients", [name for name, _ in calls] == ["http_clients"])
+        check("未切換 HTTP/2 時連線池沿用", clients._pool("openai", base_url) is pool)
+
+        print("手動編輯 config.json")
+        time.sleep(SAVE_DEBOUNCE_SECONDS + 0.3)   # 等上面的變更寫入設定檔
+        calls.clear()
+        with open(settings.config_path, encoding="utf-8") as f:
+            saved = json.load(f)
+        saved["hotkey"] = "F9"
+        with open(settings.config_path, "w", encoding="utf-8") as f:
+            json.dump(saved, f, ensure_ascii=False, indent=2)
+        deadline = time.monotonic() + 3
+        while not calls and time.monotonic() < deadline:
+            time.sleep(0.05)
+        check("偵測到設定檔變更並套用", settings.get_config()["hotkey"] == "F9")
+        check("只通知 hotkey", calls == [("hotkey", {"hotkey"})])
+
+        settings.update("playSounds", True)
+        version = settings.version
+        time.sleep(SAVE_DEBOUNCE_SECONDS + 0.5)   # 等變更寫入設定檔，並讓 ConfigWatcher 檢查幾次
+        check("自己寫入的設定檔不會被當成外部修改", settings.version == version)
+
+        watcher.stop()
+        print(f"\n{'全部通過' if not failures else f'{failures} 項失敗'}")
+
+    server.stop()
+    raise SystemExit(1 if failures else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,138 @@
+"""
+處理管線取消正確性檢查
+
+不需要網路或模擬伺服器，以假的串流來源與注入函式檢查：
+  - 串流注入途中取消：之後不再輸出任何片段，注入執行緒結束後工作才結束，並關閉串流來源
+  - 一般（非串流）注入途中取消：注入執行緒結束後工作才結束
+  - 開始執行前就取消：工作不執行、移出進行中的工作，後面排隊的工作照常輸出
+
+用法：
+  uv run benchmarks/check_pipeline.py
+"""
+
+import asyncio
+import threading
+import time
+
+import common  # noqa: F401  專案路徑設定
+
+from core.pipeline import get_pipeline
+
+CHUNKS = 20
+CHUNK_INTERVAL = 0.05   # 串流來源每段的間隔（秒）
+CANCEL_AFTER = 0.2      # 送出後多久取消（秒）
+
+failures = 0
+
+
+def check(name: str, ok: bool):
+    global failures
+    failures += not ok
+    print(f"  [{'PASS' if ok else 'FAIL'}] {name}")
+
+
+class FakeStream:
+    """模擬 LLM 串流：每 CHUNK_INTERVAL 秒產生一段，記錄是否被關閉"""
+
+    def __init__(self):
+        self.closed = False
+
+    async def chunks(self):
+        try:
+            for i in range(CHUNKS):
+                await asyncio.sleep(CHUNK_INTERVAL)
+                yield f"{i} "
+        finally:
+            self.closed = True
+
+
+class FakeInjector:
+    """模擬注入器：在工作執行緒中逐段輸出，記錄輸出的片段與執行緒結束時間"""
+
+    def __init__(self, delay: float = 0.0):
+        self.delay = delay
+        self.typed: list[str] = []
+        self.exited_at: float | None = None
+
+    def inject(self, text_or_chunks):
+        try:
+            chunks = [text_or_chunks] if isinstance(text_or_chunks, str) else text_or_chunks
+            for chunk in chunks:
+                time.sleep(self.delay)
+                self.typed.append(chunk)
+        finally:
+            self.exited_at = time.perf_counter()
+
+
+def check_stream_cancel(pipeline):
+    print("[串流注入途中取消]")
+    stream, injector = FakeStream(), FakeInjector()
+
+    async def job():
+        await pipeline.stream_to_thread(stream.chunks(), injector.inject)
+
+    handle = pipeline.submit(job, name="check")
+    time.sleep(CANCEL_AFTER)
+    check("取消成功", handle.cancel())
+    check("工作在 1 秒內結束", handle.wait_finished(timeout=1))
+    typed = len(injector.typed)
+    time.sleep(CHUNK_INTERVAL * (CHUNKS + 2))
+    check(f"取消後不再輸出（輸出 {typed}/{CHUNKS} 段）", len(injector.typed) == typed < CHUNKS)
+    check("注入執行緒在工作結束前已結束",
+          injector.exited_at is not None and handle.finished_at is not None and injector.exited_at <= handle.finished_at)
+    check("串流來源已關閉", stream.closed)
+
+
+def check_inject_cancel(pipeline):
+    print("\n[一般注入途中取消]")
+    injector = FakeInjector(delay=0.5)
+
+    async def job():
+        await pipeline.to_thread(injector.inject, "完整的一段文字")
+
+    handle = pipeline.submit(job, name="check")
+    time.sleep(0.1)
+    check("取消成功", handle.cancel())
+    check("工作在 1 秒內結束", handle.wait_finished(timeout=1))
+    check("注入執行緒在工作結束前已結束",
+          injector.exited_at is not None and handle.finished_at is not None and injector.exited_at <= handle.finished_at)
+
+
+def check_cancel_before_start(pipeline):
+    print("\n[開始執行前就取消]")
+    started = []
+
+    async def job(label):
+        started.append(label)
+        await pipeline.wait_turn()
+        return label
+
+    # 讓事件迴圈忙碌，確保取消時工作還沒開始執行
+    pipeline.loop.call_soon_threadsafe(time.sleep, 0.2)
+    first = pipeline.submit(job, "first", name="check")
+    check("取消成功", first.cancel())
+    check("工作在 1 秒內結束", first.wait_finished(timeout=1))
+    check("工作內容沒有執行", "first" not in started)
+    check("已移出進行中的工作", first not in pipeline.active())
+
+    second = pipeline.submit(job, "second", name="check")
+    try:
+        result = second.result(timeout=1)
+    except Exception as e:
+        result = repr(e)
+    check(f"後面的工作照常輸出（{result}）", result == "second")
+    check("進行中的工作為 0", not pipeline.active())
+
+
+def main():
+    pipeline = get_pipeline()
+    check_stream_cancel(pipeline)
+    check_inject_cancel(pipeline)
+    check_cancel_before_start(pipeline)
+
+    print(f"\n{'全部通過' if not failures else f'{failures} 項失敗'}")
+    raise SystemExit(1 if failures else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,137 @@
+"""
+後處理器正確性檢查
+
+逐一檢查每個後處理器的已知正確 / 已知錯誤案例，避免對照表或規則改動後把正確的文字改錯：
+  - S2TConverter：簡體應轉為台灣用字；已經是繁體的文字（范先生、一里路、佣金、皇后）必須原樣保留
+  - MixedSpacing：中英夾雜加空格，不影響純中文、純英文與已有的空格
+  - 處理鏈：逐段餵入（每次 1–3 個字）與整段處理的結果完全一致
+  - 本地快速修飾：中英夾雜（python、api 等需要 LLM 修正大小寫的英文）必須交給 LLM，字典中的詞與純中文可以略過 LLM
+另外檢查對照表本身：CHARS 中的簡體字不可同時是任何對照的繁體結果（否則正確的繁體字會被轉掉）
+
+用法：
+  uv run benchmarks/check_postprocess.py
+"""
+
+import common  # noqa: F401  專案路徑設定
+
+from core.fast_path import local_polish
+from core.postprocess import MixedSpacing, ProcessorChain, S2TConverter
+from core.s2t_data import CHARS, PHRASES
+
+# (輸入, 預期輸出)
+S2T_CASES = [
+    # 簡體 → 繁體
+    ("我们明天开会", "我們明天開會"),
+    ("以后再讨论", "以後再討論"),
+    ("这里的头发很干净", "這裡的頭髮很乾淨"),
+    ("关于后端的计划", "關於後端的計劃"),
+    ("我准备发邮件给老板", "我準備發郵件給老闆"),
+    ("这个游戏的范围", "這個遊戲的範圍"),
+    ("几个人在战斗", "幾個人在戰鬥"),
+    ("没关系，周末见", "沒關係，週末見"),
+    ("干什么", "幹什麼"),
+    # 已經是繁體：原樣保留
+    ("范先生", "范先生"),
+    ("一里路", "一里路"),
+    ("佣金", "佣金"),
+    ("丑時", "丑時"),
+    ("一斗米", "一斗米"),
+    ("皇后", "皇后"),
+    ("茶几", "茶几"),
+    ("干擾", "干擾"),
+    ("公里", "公里"),
+    ("游泳", "游泳"),
+    ("批准", "批准"),
+    ("風采", "風采"),
+    ("于先生", "于先生"),
+    ("人云亦云", "人云亦云"),
+    ("污染", "污染"),
+    ("頭髮", "頭髮"),
+    ("以後再討論", "以後再討論"),
+]
+
+SPACING_CASES = [
+    ("使用Python开发", "使用 Python 开发"),
+    ("3点开会", "3 点开会"),
+    ("API文件v2", "API 文件 v2"),
+    ("使用 Python 開發", "使用 Python 開發"),
+    ("純中文句子", "純中文句子"),
+    ("plain English", "plain English"),
+    ("日本語とEnglish", "日本語と English"),
+]
+
+CHAIN_CASES = [
+    ("我们用Python写后端，然后发布到GitHub。", "我們用 Python 寫後端，然後發布到 GitHub。"),
+    ("范先生说这里的API很干净", "范先生說這裡的 API 很乾淨"),
+]
+
+# (輸入, 使用者字典, 是否可略過 LLM)
+FAST_PATH_CASES = [
+    ("我今天下午要開會", [], True),
+    ("嗯我們明天見", [], True),
+    ("版本2.0發布了", [], True),
+    ("我們用python寫後端", [], False),
+    ("我們用Python寫後端", [], False),
+    ("我們用Python寫後端", ["Python"], True),
+    ("幫我看一下api文件", ["API"], False),
+    ("幫我打開Visual Studio Code", ["Visual Studio Code"], True),
+    ("Please send me the report today", [], False),
+    ("我是說明天不對是後天", [], False),
+]
+
+failures = 0
+
+
+def check(name: str, ok: bool):
+    global failures
+    failures += not ok
+    print(f"  [{'PASS' if ok else 'FAIL'}] {name}")
+
+
+def run_cases(factory, cases):
+    for text, expected in cases:
+        got = factory().process(text)
+        check(f"{text} → {expected}" + ("" if got == expected else f"（實際：{got}）"), got == expected)
+
+
+def streamed(processor, text: str, size: int) -> str:
+    out = [processor.feed(text[i:i + size]) for i in range(0, len(text), size)]
+    return "".join(out) + processor.flush()
+
+
+def main():
+    print("[對照表]")
+    keys = {pair[0] for pair in CHARS.split()}
+    outputs = {pair[1] for pair in CHARS.split()}
+    outputs |= {ch for line in PHRASES.strip().splitlines() for ch in line.split()[1]}
+    overlap = sorted(keys & outputs)
+    check(f"CHARS 的簡體字不是任何對照的繁體結果 {''.join(overlap)}", not overlap)
+
+    print("\n[S2TConverter]")
+    run_cases(S2TConverter, S2T_CASES)
+
+    print("\n[MixedSpacing]")
+    run_cases(MixedSpacing, SPACING_CASES)
+
+    print("\n[處理鏈]")
+    chain = lambda: ProcessorChain([S2TConverter(), MixedSpacing()])  # noqa: E731
+    run_cases(chain, CHAIN_CASES)
+    texts = [t for t, _ in S2T_CASES + SPACING_CASES + CHAIN_CASES]
+    for factory in (S2TConverter, MixedSpacing, chain):
+        name = factory().name
+        same = all(streamed(factory(), t, size) == factory().process(t) for t in texts for size in (1, 2, 3))
+        check(f"{name} 逐段處理與整段處理一致", same)
+
+    print("\n[本地快速修飾]")
+    for text, dictionary, expected in FAST_PATH_CASES:
+        result = local_polish(text, known_terms=dictionary)
+        bypass = result.confidence >= 0.8
+        label = "略過 LLM" if expected else "交給 LLM"
+        check(f"{text} {dictionary or ''} → {label}（{result.confidence:.1f} {result.reasons}）", bypass == expected)
+
+    print(f"\n{'全部通過' if not failures else f'{failures} 項失敗'}")
+    raise SystemExit(1 if failures else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,122 @@
+"""
+啟動時間回歸檢查
+
+在新的直譯器中量測，確認：
+  - main.py 模組層級的 import 不會載入引擎 SDK、sounddevice、pyautogui 等延後載入的模組（core/startup.py 的 DEFERRED_MODULES）
+  - 啟動 import 總時間不超過 --import-budget-ms
+  - 就緒時間（直譯器啟動 → 載入設定並建立 STT / LLM / 注入 / 處理管線）不超過 --ready-budget-ms
+  - preload() 不阻塞呼叫端；背景預先載入完成後，第一次建立各引擎 SDK 客戶端的時間
+    不超過未預先載入時的 --max-client-ratio 倍（剩下的是建立客戶端與 TLS 設定本身，由預先連線負責）
+缺少套件（例如非 Windows 環境的 keyboard / winsound）的 import 會略過
+
+用法：
+  uv run benchmarks/check_startup.py
+  uv run benchmarks/check_startup.py --ready-budget-ms 1500
+"""
+
+import argparse
+import json
+import subprocess
+import sys
+import time
+
+from common import ROOT, import_times, startup_imports
+
+from core.startup import DEFERRED_MODULES
+
+# 就緒時間：與 VoiceType.__init__ 相同的元件（快捷鍵與系統列需要 Windows，不在此量測）
+READY_PROBE = """
+import tempfile
+from config.settings import Settings
+from core.stt import SpeechToText
+from core.llm import LLMProcessor
+from core.injector import TextInjector
+from core.recorder import AudioRecorder
+from core.pipeline import get_pipeline
+
+settings = Settings(config_dir=tempfile.mkdtemp())
+AudioRecorder(max_seconds=300)
+SpeechToText(settings), LLMProcessor(settings), TextInjector(settings)
+get_pipeline().loop
+print("ready", flush=True)
+"""
+
+# 第一次建立 SDK 客戶端的時間（即第一次語音輸入額外等待的時間）；argv[1] 為是否先預先載入
+CLIENT_PROBE = """
+import json, sys, time
+from core.http_clients import get_clients
+from core.startup import preload
+
+cfg = {"sttProvider": "groq", "llmProvider": "anthropic", "llmProviders": ["gemini"]}
+result = {}
+if sys.argv[1] == "1":
+    t0 = time.perf_counter()
+    preloader = preload(cfg)
+    result["preload_call_ms"] = (time.perf_counter() - t0) * 1000
+    preloader.done.wait()
+    result["preload_ms"] = (time.perf_counter() - t0) * 1000
+clients = get_clients()
+t0 = time.perf_counter()
+clients.openai("groq", "key", "http://127.0.0.1:9")
+clients.anthropic("key", "http://127.0.0.1:9")
+clients.gemini("key", "http://127.0.0.1:9")
+result["first_client_ms"] = (time.perf_counter() - t0) * 1000
+print(json.dumps(result))
+"""
+
+failures = 0
+
+
+def check(name: str, ok: bool):
+    global failures
+    failures += not ok
+    print(f"  [{'PASS' if ok else 'FAIL'}] {name}")
+
+
+def run_probe(code: str, *args: str) -> tuple[str, float]:
+    """在新的直譯器中執行，回傳 (最後一行輸出, 從啟動行程到結束的秒數)"""
+    start = time.perf_counter()
+    proc = subprocess.run([sys.executable, "-c", code, *args], cwd=ROOT, capture_output=True, text=True, encoding="utf-8")
+    elapsed = time.perf_counter() - start
+    if proc.returncode != 0:
+        raise RuntimeError(proc.stderr[-2000:])
+    return proc.stdout.strip().splitlines()[-1], elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description="VoiceType 啟動時間回歸檢查")
+    parser.add_argument("--import-budget-ms", type=float, default=1000, help="啟動 import 總時間上限")
+    parser.add_argument("--ready-budget-ms", type=float, default=2000, help="就緒時間上限（含直譯器啟動）")
+    parser.add_argument("--max-client-ratio", type=float, default=0.3, help="預先載入後第一次建立 SDK 客戶端的時間上限（相對於未預先載入）")
+    parser.add_argument("--runs", type=int, default=3, help="就緒時間量測次數（取中位數）")
+    args = parser.parse_args()
+
+    print("[啟動 import]")
+    entries, result = import_times(startup_imports())
+    for stmt, error in result["missing"]:
+        print(f"  略過 {stmt}：{error}")
+    loaded = [m for m in DEFERRED_MODULES if any(n == m or n.startswith(m + ".") for n in result["modules"])]
+    total = sum(e["cumulative_ms"] for e in entries if e["depth"] == 0)
+    check(f"沒有載入延後載入的模組 {loaded or ''}", not loaded)
+    check(f"import 總計 {total:.0f}ms ≤ {args.import_budget_ms:.0f}ms", total <= args.import_budget_ms)
+
+    print("\n[就緒時間]")
+    times = sorted(run_probe(READY_PROBE)[1] * 1000 for _ in range(args.runs))
+    ready = times[len(times) // 2]
+    check(f"就緒 {ready:.0f}ms ≤ {args.ready_budget_ms:.0f}ms", ready <= args.ready_budget_ms)
+
+    print("\n[背景預先載入]")
+    cold = json.loads(run_probe(CLIENT_PROBE, "0")[0])
+    warm = json.loads(run_probe(CLIENT_PROBE, "1")[0])
+    print(f"  未預先載入：第一次建立客戶端 {cold['first_client_ms']:.0f}ms")
+    print(f"  預先載入：背景耗時 {warm['preload_ms']:.0f}ms，之後第一次建立客戶端 {warm['first_client_ms']:.0f}ms")
+    check(f"preload() 不阻塞（{warm['preload_call_ms']:.1f}ms）", warm["preload_call_ms"] < 50)
+    ratio = warm["first_client_ms"] / cold["first_client_ms"]
+    check(f"預先載入後第一次建立客戶端為未預先載入的 {ratio:.0%} ≤ {args.max_client_ratio:.0%}", ratio <= args.max_client_ratio)
+
+    print(f"\n{'全部通過' if not failures else f'{failures} 項失敗'}")
+    raise SystemExit(1 if failures else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,100 @@
+"""
+基準測試共用工具：專案路徑設定、合成語音語料、import 時間量測
+"""
+
+import ast
+import json
+import subprocess
+import sys
+from pathlib import Path
+
+import numpy as np
+
+ROOT = Path(__file__).parent.parent
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+SAMPLE_RATE = 16000
+
+
+def synth_speech(seconds: float, seed: int = 0, lead_silence: float = 0.0) -> np.ndarray:
+    """產生類語音訊號：調變的諧波 + 噪音，中間穿插停頓"""
+    rng = np.random.default_rng(seed)
+    t = np.arange(int(seconds * SAMPLE_RATE)) / SAMPLE_RATE
+    pitch = 140 + 30 * np.sin(2 * np.pi * 0.7 * t)
+    phase = 2 * np.pi * np.cumsum(pitch) / SAMPLE_RATE
+    voice = sum(np.sin(k * phase) / k for k in range(1, 8))
+    envelope = (np.sin(2 * np.pi * 0.4 * t) > -0.3).astype(np.float32)
+    signal = 4000 * voice * envelope + rng.normal(0, 80, len(t))
+    audio = np.clip(signal, -32768, 32767).astype(np.int16)
+    if lead_silence:
+        silence = rng.normal(0, 80, int(lead_silence * SAMPLE_RATE)).astype(np.int16)
+        audio = np.concatenate((silence, audio, silence))
+    return audio
+
+
+def load_corpus(paths: list[str]) -> list[tuple[str, np.ndarray]]:
+    """載入 WAV 檔或資料夾內所有 WAV 檔"""
+    from core.audio_backends import load_wav
+
+    corpus = []
+    for p in paths:
+        path = Path(p)
+        files = sorted(path.glob("*.wav")) if path.is_dir() else [path]
+        corpus.extend((f.name, load_wav(f)) for f in files)
+    return corpus
+
+
+# main.py 中只在 Windows 有效的模組（ctypes.windll 在其他平台不存在）
+WINDOWS_ONLY_IMPORTS = {"ctypes"}
+
+_IMPORT_PROBE = """
+import json, sys
+missing = []
+for stmt in json.loads(sys.argv[1]):
+    try:
+        exec(stmt)
+    except ImportError as e:
+        missing.append([stmt, str(e)])
+print(json.dumps({"missing": missing, "modules": sorted(sys.modules)}))
+"""
+
+
+def startup_imports() -> list[str]:
+    """main.py 模組層級的 import 敘述（即啟動時一定會載入的模組）"""
+    tree = ast.parse((ROOT / "main.py").read_text(encoding="utf-8"))
+    statements = []
+    for node in tree.body:
+        if isinstance(node, (ast.Import, ast.ImportFrom)):
+            names = [a.name for a in node.names] if isinstance(node, ast.Import) else [node.module or ""]
+            if not any(n.split(".")[0] in WINDOWS_ONLY_IMPORTS for n in names):
+                statements.append(ast.unparse(node))
+    return statements
+
+
+def import_times(statements: list[str]) -> tuple[list[dict], dict]:
+    """
+    在新的直譯器中以 python -X importtime 執行 import 敘述
+
+    回傳 (各模組耗時, 子行程結果)；各模組為 {"name", "depth", "self_ms", "cumulative_ms"}，依載入順序排列，
+    子行程結果為 {"missing": [[敘述, 錯誤]], "modules": [已載入的模組]}（缺少套件的敘述會略過，不會中斷量測）
+    """
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", _IMPORT_PROBE, json.dumps(statements)],
+        cwd=ROOT, capture_output=True, text=True, encoding="utf-8",
+    )
+    if proc.returncode != 0:
+        raise RuntimeError(proc.stderr[-2000:])
+    entries = []
+    for line in proc.stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        # 格式：import time:  self [us] | cumulative | 模組名稱（縮排表示巢狀深度）
+        head, cumulative_us, name = line.split("|")
+        entries.append({
+            "name": name.strip(),
+            "depth": (len(name) - len(name.lstrip()) - 1) // 2,
+            "self_ms": int(head.split(":")[1]) / 1000,
+            "cumulative_ms": int(cumulative_us) / 1000,
+        })
+    return entries, json.loads(proc.stdout.strip().splitlines()[-1])
@@ -0,0 +1,465 @@
+"""
+模擬雲端 API 伺服器
+在本機以單一 HTTP 伺服器模擬 Groq/OpenAI（語音轉錄 + Chat Completions）、
+Anthropic Messages、Gemini generateContent 與 Ollama /api/chat，
+可設定網路延遲、抖動、首字延遲與 token 產生速率，串流與非串流皆支援；
+--prefill-ms 模擬輸入 token 的 prefill 成本，並模擬各家的提示詞快取（OpenAI 自動前綴快取、
+Anthropic cache_control、Gemini cachedContents），快取命中的 token 不計 prefill 時間
+
+用法：
+  uv run benchmarks/mock_servers.py --port 8900 --latency 80 --tps 60
+  然後在 .env 中設定：
+    GROQ_API_BASE=http://127.0.0.1:8900/v1
+    OPENAI_API_BASE=http://127.0.0.1:8900/v1
+    ANTHROPIC_API_BASE=http://127.0.0.1:8900
+    GEMINI_API_BASE=http://127.0.0.1:8900
+    OLLAMA_API_BASE=http://127.0.0.1:8900
+"""
+
+import argparse
+import json
+import os
+import random
+import re
+import threading
+import time
+from dataclasses import dataclass
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlparse
+
+DEFAULT_TRANSCRIPT = "嗯那個我想說明天的會議改到呃禮拜三下午兩點，然後請大家準備一下 API 的文件"
+FILLERS = re.compile(r"嗯|呃|啊|那個|然後|就是說")
+
+
+@dataclass
+class MockProfile:
+    """模擬延遲參數（毫秒 / 每秒 token 數）"""
+    latency_ms: float = 50.0        # 網路往返 + 伺服器排隊
+    jitter_ms: float = 10.0         # 延遲隨機抖動（常態分布標準差）
+    stt_rtf: float = 0.05           # STT 伺服器處理時間 / 音訊秒數
+    ttft_ms: float = 150.0          # LLM 首字延遲（prefill）
+    tokens_per_sec: float = 80.0    # LLM 產生速率
+    chars_per_token: int = 2
+    stall_ms: float = 0.0           # 模擬引擎卡住：每個請求以 stall_rate 機率額外延遲 stall_ms
+    stall_rate: float = 0.0
+    transcript: str = DEFAULT_TRANSCRIPT
+    prefill_ms_per_1k: float = 0.0  # 每 1000 個未快取的輸入 token 增加的首字延遲
+    prompt_cache: bool = True       # 模擬供應商端提示詞快取
+    error_rate: float = 0.0         # 模擬引擎故障：每個請求以此機率回傳 503
+
+
+def polish_text(text: str) -> str:
+    """模擬 LLM 修飾：去除贅字並補上句號"""
+    text = FILLERS.sub("", text).strip()
+    return text if text.endswith(("。", ".", "！", "？")) else text + "。"
+
+
+def _text_of(content) -> str:
+    """字串或 [{"text": ...}] 形式的內容"""
+    if isinstance(content, str):
+        return content
+    if isinstance(content, dict):
+        return _text_of(content.get("parts", content.get("text", "")))
+    return "".join(_text_of(block) for block in content or [])
+
+
+class MockAPIHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    profile: MockProfile = MockProfile()
+    stats: dict = {}
+    prompt_caches: dict = {}        # 已快取的提示詞前綴（OpenAI / Anthropic）與 Gemini cachedContents
+    _cache_lock = threading.Lock()
+
+    # ── 共用 ─────────────────────────────────────────────────────────────────
+
+    def log_message(self, format, *args):
+        pass
+
+    def setup(self):
+        super().setup()
+        self._count("connections")
+
+    def _count(self, name: str):
+        self.stats[name] = self.stats.get(name, 0) + 1
+
+    def _sleep_ms(self, ms: float):
+        if ms > 0:
+            time.sleep(ms / 1000)
+
+    def _network_delay(self):
+        p = self.profile
+        self._sleep_ms(max(0.0, random.gauss(p.latency_ms, p.jitter_ms)))
+        if p.stall_ms and random.random() < p.stall_rate:
+            self._count("stalls")
+            self._sleep_ms(p.stall_ms)
+
+    def _read_body(self) -> bytes:
+        length = int(self.headers.get("Content-Length", 0))
+        return self.rfile.read(length) if length else b""
+
+    def _send_json(self, data, code=200, headers=None):
+        body = json.dumps(data, ensure_ascii=False).encode("utf-8")
+        self.send_response(code)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        for k, v in (headers or {}).items():
+            self.send_header(k, v)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _start_stream(self, content_type: str):
+        self.send_response(200)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Transfer-Encoding", "chunked")
+        self.send_header("Cache-Control", "no-cache")
+        self.end_headers()
+
+    def _write_chunk(self, data: str):
+        raw = data.encode("utf-8")
+        self.wfile.write(f"{len(raw):X}\r\n".encode() + raw + b"\r\n")
+        self.wfile.flush()
+
+    def _end_stream(self):
+        self.wfile.write(b"0\r\n\r\n")
+        self.wfile.flush()
+
+    def _prompt_tokens(self, text: str) -> int:
+        return len(text) // max(1, self.profile.chars_per_token)
+
+    def _prefill(self, prefix: str, rest: str, cache: bool, auto: bool = False) -> tuple[int, int, int]:
+        """
+        模擬 prefill：回傳 (輸入 token 數, 快取讀取 token 數, 快取寫入 token 數)，並設定本次請求的 prefill 延遲
+
+        cache 為 True 時 prefix 可被快取（第一次寫入，之後命中）；
+        auto 為 True 時模擬 OpenAI 的自動快取：與先前任一請求的共同前綴都算命中
+        """
+        total = self._prompt_tokens(prefix) + self._prompt_tokens(rest)
+        cached = written = 0
+        if cache and self.profile.prompt_cache and prefix:
+            with self._cache_lock:
+                if auto:
+                    common = max((len(os.path.commonprefix([prefix, seen])) for seen in self.prompt_caches), default=0)
+                    cached = self._prompt_tokens(prefix[:common])
+                    self.prompt_caches.setdefault(prefix, True)
+                elif prefix in self.prompt_caches:
+                    cached = self._prompt_tokens(prefix)
+                else:
+                    self.prompt_caches[prefix] = True
+                    written = self._prompt_tokens(prefix)
+        self._count("prompt_cache_hit" if cached else "prompt_cache_miss")
+        self._prefill_ms = (total - cached) / 1000 * self.profile.prefill_ms_per_1k
+        return total, cached, written
+
+    def _tokens(self, text: str):
+        """依設定的首字延遲與 token 速率逐段產生文字"""
+        p = self.profile
+        self._sleep_ms(p.ttft_ms + getattr(self, "_prefill_ms", 0))
+        step = max(1, p.chars_per_token)
+        for i in range(0, len(text), step):
+            if i:
+                self._sleep_ms(1000 / p.tokens_per_sec)
+            yield text[i:i + step]
+
+    def _generate_all(self, text: str) -> str:
+        p = self.profile
+        n_tokens = max(1, len(text) // max(1, p.chars_per_token))
+        self._sleep_ms(p.ttft_ms + getattr(self, "_prefill_ms", 0) + 1000 * (n_tokens - 1) / p.tokens_per_sec)
+        return text
+
+    # ── 路由 ─────────────────────────────────────────────────────────────────
+
+    def do_POST(self):
+        path = urlparse(self.path).path
+        body = self._read_body()
+        self._network_delay()
+        if self.profile.error_rate and random.random() < self.profile.error_rate:
+            self._count("errors")
+            self._send_json({"error": {"message": "service unavailable", "type": "server_error"}}, code=503)
+            return
+        try:
+            if path.endswith("/audio/transcriptions"):
+                self._transcriptions(body)
+            elif path.endswith("/chat/completions"):
+                self._chat_completions(json.loads(body))
+            elif path.endswith("/v1/messages"):
+                self._anthropic_messages(json.loads(body))
+            elif path.endswith("/cachedContents"):
+                self._gemini_create_cache(json.loads(body))
+            elif ":generateContent" in path or ":streamGenerateContent" in path:
+                self._gemini(path, json.loads(body))
+            elif path == "/api/chat":
+                self._ollama_chat(json.loads(body))
+            else:
+                self._send_json({"error": f"unknown path {path}"}, code=404)
+        except (BrokenPipeError, ConnectionResetError):
+            self._count("client_disconnects")
+
+    def do_HEAD(self):
+        # 預先連線 / 保活用的輕量請求
+        self._count("head")
+        self.send_response(200)
+        self.send_header("Content-Length", "0")
+        self.end_headers()
+
+    def do_GET(self):
+        path = urlparse(self.path).path
+        if path in ("/health", "/v1/models", "/api/tags"):
+            self._send_json({"status": "ok", "data": []})
+        else:
+            self._send_json({"error": "not found"}, code=404)
+
+    # ── OpenAI / Groq ────────────────────────────────────────────────────────
+
+    def _transcriptions(self, body: bytes):
+        self._count("transcriptions")
+        # 以上傳大小估算音訊長度（16kHz int16 WAV = 32KB/s；壓縮格式會低估）
+        audio_seconds = max(0.5, len(body) / 32000)
+        server_ms = audio_seconds * self.profile.stt_rtf * 1000
+        self._sleep_ms(server_ms)
+        text = self.profile.transcript
+        as_json = b'name="response_format"\r\n\r\ntext' not in body
+        payload = json.dumps({"text": text}, ensure_ascii=False) if as_json else text
+        raw = payload.encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json" if as_json else "text/plain; charset=utf-8")
+        self.send_header("Content-Length", str(len(raw)))
+        self.send_header("openai-processing-ms", f"{server_ms:.0f}")
+        self.end_headers()
+        self.wfile.write(raw)
+
+    def _chat_completions(self, req: dict):
+        self._count("chat_completions")
+        text = polish_text(req["messages"][-1]["content"])
+        model = req.get("model", "mock")
+        # 自動前綴快取：系統提示詞與先前請求的共同前綴命中
+        system = "".join(_text_of(m["content"]) for m in req["messages"] if m["role"] == "system")
+        total, cached, _ = self._prefill(system, req["messages"][-1]["content"], cache=True, auto=True)
+        usage = {"prompt_tokens": total, "completion_tokens": len(text), "total_tokens": total + len(text),
+                 "prompt_tokens_details": {"cached_tokens": cached}}
+        if not req.get("stream"):
+            self._send_json({
+                "id": "chatcmpl-mock", "object": "chat.completion", "created": int(time.time()), "model": model,
+                "choices": [{"index": 0, "message": {"role": "assistant", "content": self._generate_all(text)},
+                             "finish_reason": "stop"}],
+                "usage": usage,
+            })
+            return
+        self._start_stream("text/event-stream")
+        for token in self._tokens(text):
+            chunk = {
+                "id": "chatcmpl-mock", "object": "chat.completion.chunk", "created": int(time.time()), "model": model,
+                "choices": [{"index": 0, "delta": {"content": token}, "finish_reason": None}],
+            }
+            self._write_chunk(f"data: {json.dumps(chunk, ensure_ascii=False)}\n\n")
+        done = {
+            "id": "chatcmpl-mock", "object": "chat.completion.chunk", "created": int(time.time()), "model": model,
+            "choices": [{"index": 0, "delta": {}, "finish_reason": "stop"}],
+        }
+        self._write_chunk(f"data: {json.dumps(done)}\n\n")
+        if (req.get("stream_options") or {}).get("include_usage"):
+            final = {"id": "chatcmpl-mock", "object": "chat.completion.chunk", "created": int(time.time()),
+                     "model": model, "choices": [], "usage": usage}
+            self._write_chunk(f"data: {json.dumps(final)}\n\n")
+        self._write_chunk("data: [DONE]\n\n")
+        self._end_stream()
+
+    # ── Anthropic ────────────────────────────────────────────────────────────
+
+    def _anthropic_messages(self, req: dict):
+        self._count("anthropic_messages")
+        content = req["messages"][-1]["content"]
+        if isinstance(content, list):
+            content = "".join(block.get("text", "") for block in content)
+        text = polish_text(content)
+        model = req.get("model", "mock")
+        # 只有標記 cache_control 的區塊（含之前的區塊）會被快取
+        system = req.get("system", "")
+        blocks = [{"text": system}] if isinstance(system, str) else system
+        marked = [i for i, block in enumerate(blocks) if block.get("cache_control")]
+        split = marked[-1] + 1 if marked else 0
+        prefix = "".join(block["text"] for block in blocks[:split])
+        rest = "".join(block["text"] for block in blocks[split:]) + content
+        total, cached, written = self._prefill(prefix, rest, cache=bool(marked))
+        usage = {"input_tokens": total - cached - written, "output_tokens": len(text),
+                 "cache_read_input_tokens": cached, "cache_creation_input_tokens": written}
+        if not req.get("stream"):
+            self._send_json({
+                "id": "msg_mock", "type": "message", "role": "assistant", "model": model,
+                "content": [{"type": "text", "text": self._generate_all(text)}],
+                "stop_reason": "end_turn", "stop_sequence": None, "usage": usage,
+            })
+            return
+
+        def event(name, data):
+            self._write_chunk(f"event: {name}\ndata: {json.dumps(data, ensure_ascii=False)}\n\n")
+
+        self._start_stream("text/event-stream")
+        event("message_start", {"type": "message_start", "message": {
+            "id": "msg_mock", "type": "message", "role": "assistant", "model": model, "content": [],
+            "stop_reason": None, "stop_sequence": None, "usage": {**usage, "output_tokens": 1}}})
+        event("content_block_start", {"type": "content_block_start", "index": 0,
+                                      "content_block": {"type": "text", "text": ""}})
+        for token in self._tokens(text):
+            event("content_block_delta", {"type": "content_block_delta", "index": 0,
+                                          "delta": {"type": "text_delta", "text": token}})
+        event("content_block_stop", {"type": "content_block_stop", "index": 0})
+        event("message_delta", {"type": "message_delta", "delta": {"stop_reason": "end_turn", "stop_sequence": None},
+                                "usage": {"output_tokens": len(text)}})
+        event("message_stop", {"type": "message_stop"})
+        self._end_stream()
+
+    # ── Gemini ───────────────────────────────────────────────────────────────
+
+    def _gemini(self, path: str, req: dict):
+        self._count("gemini")
+        # 最後一個 part 為使用者的原文（使用 cachedContents 時語境資訊在前面的 part）
+        parts = req["contents"][-1]["parts"]
+        text = polish_text(parts[-1].get("text", ""))
+        with self._cache_lock:
+            cached_prefix = self.prompt_caches.get(req.get("cachedContent", ""))
+        if req.get("cachedContent") and cached_prefix is None:
+            self._send_json({"error": {"code": 404, "message": "cached content not found", "status": "NOT_FOUND"}}, code=404)
+            return
+        prefix = cached_prefix or _text_of(req.get("systemInstruction", ""))
+        total, cached, _ = self._prefill(prefix, _text_of(parts), cache=cached_prefix is not None)
+        usage = {"promptTokenCount": total, "candidatesTokenCount": len(text), "totalTokenCount": total + len(text)}
+        if cached:
+            usage["cachedContentTokenCount"] = cached
+
+        def response(t, finish=None):
+            candidate = {"content": {"parts": [{"text": t}], "role": "model"}, "index": 0}
+            if finish:
+                candidate["finishReason"] = finish
+            return {"candidates": [candidate], "usageMetadata": usage}
+
+        if ":streamGenerateContent" not in path:
+            self._send_json(response(self._generate_all(text), "STOP"))
+            return
+        self._start_stream("text/event-stream")
+        for token in self._tokens(text):
+            self._write_chunk(f"data: {json.dumps(response(token), ensure_ascii=False)}\n\n")
+        self._write_chunk(f"data: {json.dumps(response('', 'STOP'))}\n\n")
+        self._end_stream()
+
+    def _gemini_create_cache(self, req: dict):
+        self._count("gemini_cache_create")
+        prefix = _text_of(req.get("systemInstruction", ""))
+        with self._cache_lock:
+            name = f"cachedContents/mock{len(self.prompt_caches)}"
+            # 以快取名稱登錄，generateContent 帶 cachedContent 時前綴一律命中
+            self.prompt_caches[name] = prefix
+            self.prompt_caches[prefix] = True
+        self._send_json({"name": name, "model": req.get("model", ""), "expireTime": "2099-01-01T00:00:00Z",
+                         "usageMetadata": {"totalTokenCount": self._prompt_tokens(prefix)}})
+
+    # ── Ollama ───────────────────────────────────────────────────────────────
+
+    def _ollama_chat(self, req: dict):
+        self._count("ollama_chat")
+        text = polish_text(req["messages"][-1]["content"])
+        model = req.get("model", "mock")
+        if not req.get("stream", True):
+            self._send_json({"model": model, "message": {"role": "assistant", "content": self._generate_all(text)},
+                             "done": True})
+            return
+        self._start_stream("application/x-ndjson")
+        for token in self._tokens(text):
+            line = {"model": model, "message": {"role": "assistant", "content": token}, "done": False}
+            self._write_chunk(json.dumps(line, ensure_ascii=False) + "\n")
+        self._write_chunk(json.dumps({"model": model, "message": {"role": "assistant", "content": ""},
+                                      "done": True}) + "\n")
+        self._end_stream()
+
+
+class MockServer:
+    """在背景執行緒啟動模擬伺服器"""
+
+    def __init__(self, profile: MockProfile | None = None, host: str = "127.0.0.1", port: int = 0):
+        handler = type("Handler", (MockAPIHandler,), {"profile": profile or MockProfile(), "stats": {}, "prompt_caches": {}})
+        self.handler = handler
+        self.httpd = ThreadingHTTPServer((host, port), handler)
+        self.httpd.daemon_threads = True
+        self._thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+
+    @property
+    def url(self) -> str:
+        host, port = self.httpd.server_address[:2]
+        return f"http://{host}:{port}"
+
+    @property
+    def profile(self) -> MockProfile:
+        return self.handler.profile
+
+    @property
+    def stats(self) -> dict:
+        return self.handler.stats
+
+    def env(self, providers: list[str] | None = None) -> dict:
+        """指向此伺服器的環境變數（API 端點 + 假金鑰）；providers 指定時只回傳這些引擎的端點"""
+        env = {
+            "GROQ_API_BASE": f"{self.url}/v1",
+            "OPENAI_API_BASE": f"{self.url}/v1",
+            "ANTHROPIC_API_BASE": self.url,
+            "GEMINI_API_BASE": self.url,
+            "OLLAMA_API_BASE": self.url,
+            "GROQ_API_KEY": "mock",
+            "OPENAI_API_KEY": "mock",
+            "ANTHROPIC_API_KEY": "mock",
+            "GEMINI_API_KEY": "mock",
+        }
+        if providers is not None:
+            env = {k: v for k, v in env.items() if k.split("_")[0].lower() in providers}
+        return env
+
+    def start(self) -> "MockServer":
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+
+def add_profile_args(parser: argparse.ArgumentParser):
+    d = MockProfile()
+    parser.add_argument("--latency", type=float, default=d.latency_ms, help="網路延遲 ms")
+    parser.add_argument("--jitter", type=float, default=d.jitter_ms, help="延遲抖動 ms (標準差)")
+    parser.add_argument("--stt-rtf", type=float, default=d.stt_rtf, help="STT 伺服器處理時間 / 音訊秒數")
+    parser.add_argument("--ttft", type=float, default=d.ttft_ms, help="LLM 首字延遲 ms")
+    parser.add_argument("--tps", type=float, default=d.tokens_per_sec, help="LLM 每秒 token 數")
+    parser.add_argument("--transcript", default=d.transcript, help="STT 回傳的文字")
+    parser.add_argument("--stall-ms", type=float, default=d.stall_ms, help="模擬卡住的額外延遲 ms")
+    parser.add_argument("--stall-rate", type=float, default=d.stall_rate, help="卡住的機率 (0~1)")
+    parser.add_argument("--prefill-ms", type=float, default=d.prefill_ms_per_1k, help="每 1000 個未快取輸入 token 的 prefill 延遲 ms")
+    parser.add_argument("--no-prompt-cache", action="store_true", help="不模擬供應商端提示詞快取")
+    parser.add_argument("--error-rate", type=float, default=d.error_rate, help="回傳 503 的機率 (0~1)")
+
+
+def profile_from_args(args) -> MockProfile:
+    return MockProfile(
+        latency_ms=args.latency, jitter_ms=args.jitter, stt_rtf=args.stt_rtf,
+        ttft_ms=args.ttft, tokens_per_sec=args.tps, transcript=args.transcript,
+        stall_ms=args.stall_ms, stall_rate=args.stall_rate,
+        prefill_ms_per_1k=args.prefill_ms, prompt_cache=not args.no_prompt_cache,
+        error_rate=args.error_rate,
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description="VoiceType 模擬 API 伺服器")
+    parser.add_argument("--port", type=int, default=8900)
+    add_profile_args(parser)
+    args = parser.parse_args()
+
+    server = MockServer(profile_from_args(args), port=args.port)
+    print(f"Mock API server listening on {server.url}")
+    for k, v in server.env().items():
+        print(f"  {k}={v}")
+    try:
+        server.httpd.serve_forever()
+    except KeyboardInterrupt:
+        server.stop()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,85 @@
+"""
+設定熱重載
+ConfigWatcher 定期檢查 config.json 是否被外部修改（手動編輯、其他程式），有變更時重新載入；
+ConfigDispatcher 比對新舊設定快照，只通知關心這些鍵的元件，
+其他元件（已建立的 SDK 客戶端、連線池、已載入的本地 Whisper 模型）維持不變
+
+用法：
+  dispatcher = ConfigDispatcher(settings)
+  dispatcher.on({"hotkey"}, lambda cfg, changed: rebind_hotkey(cfg), name="hotkey")
+  watcher = ConfigWatcher(settings).start()
+"""
+
+import logging
+import threading
+
+logger = logging.getLogger("VoiceType.HotReload")
+
+WATCH_INTERVAL_SECONDS = 1.0
+
+
+def changed_keys(old: dict, new: dict) -> set[str]:
+    """回傳兩份設定之間值不同的頂層鍵（apiKeys 等巢狀設定以頂層鍵表示）"""
+    return {key for key in old.keys() | new.keys() if old.get(key) != new.get(key)}
+
+
+class ConfigDispatcher:
+    """設定變更分派器：訂閱 Settings 的變更通知，依鍵分派給各元件"""
+
+    def __init__(self, settings):
+        self._handlers: list[tuple[str, frozenset, object]] = []
+        settings.subscribe(self.dispatch)
+
+    def on(self, keys, handler, name: str = ""):
+        """
+        註冊處理函式 handler(新設定, 變更的鍵)，只在 keys 中有任何一個鍵變更時呼叫
+
+        Args:
+            keys: 關心的設定鍵
+            name: 顯示於日誌的元件名稱
+        """
+        self._handlers.append((name or getattr(handler, "__name__", "handler"), frozenset(keys), handler))
+
+    def dispatch(self, old: dict, new: dict) -> set[str]:
+        """比對新舊設定並通知相關元件，回傳變更的鍵"""
+        changed = changed_keys(old, new)
+        if not changed:
+            return changed
+        applied = []
+        for name, keys, handler in self._handlers:
+            hit = changed & keys
+            if not hit:
+                continue
+            try:
+                handler(new, hit)
+                applied.append(name)
+            except Exception as e:
+                logger.error("套用設定變更失敗 (%s): %s", name, e, exc_info=True)
+        logger.info("設定變更 %s → %s", sorted(changed), ", ".join(applied) or "不需重建任何元件")
+        return changed
+
+
+class ConfigWatcher:
+    """在背景執行緒定期檢查設定檔（以 mtime / 大小判斷，不需要額外的檔案監看套件）"""
+
+    def __init__(self, settings, interval: float = WATCH_INTERVAL_SECONDS):
+        self.settings = settings
+        self.interval = interval
+        self._stop = threading.Event()
+        self._thread: threading.Thread | None = None
+
+    def start(self) -> "ConfigWatcher":
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, name="config-watcher", daemon=True)
+            self._thread.start()
+        return self
+
+    def stop(self):
+        self._stop.set()
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            try:
+                self.settings.reload_if_changed()
+            except Exception as e:
+                logger.error("檢查設定檔失敗: %s", e)
@@ -1,10 +1,13 @@
+import atexit
 import json
 import logging
 import os
+import tempfile
+import threading
 from pathlib import Path
-from typing import Dict, List, Literal
+from typing import Dict, List, Literal, Union
 
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, Field, create_model
 from pydantic_settings import BaseSettings as PydanticBaseSettings
 from pydantic_settings import SettingsConfigDict
 
@@ -25,6 +28,31 @@ class ApiKeys(BaseModel):
     ollama: str = "http://localhost:11434"
 
 
+class ContextRule(BaseModel):
+    """語境規則：執行檔名稱（任一相符，空白代表不限）與視窗標題 Regex（不分大小寫，空白代表不限）都符合時採用 context"""
+    context: str
+    exe: List[str] = Field(default_factory=list)
+    title: str = ""
+
+
+_BROWSERS = ["chrome.exe", "msedge.exe", "firefox.exe", "brave.exe", "arc.exe"]
+
+# 預設語境規則（依序比對，第一條符合的規則勝出）；context 為 core/llm.py CONTEXT_PROMPTS 的鍵
+DEFAULT_CONTEXT_RULES = [
+    {"exe": _BROWSERS, "title": "gmail|outlook|mail", "context": "web_mail"},
+    {"exe": _BROWSERS, "title": "chat|messenger|line|discord", "context": "web_chat"},
+    {"exe": _BROWSERS, "context": "browser"},
+    {"exe": ["code.exe", "pycharm.exe", "idea.exe", "devenv.exe", "cursor.exe",
+             "windows terminal.exe", "powershell.exe", "cmd.exe"], "context": "code"},
+    {"exe": ["winword.exe", "excel.exe", "powerpnt.exe", "obsidian.exe", "notion.exe", "evernote.exe"],
+     "context": "document"},
+    {"exe": ["slack.exe", "teams.exe"], "context": "work_chat"},
+    {"exe": ["discord.exe", "line.exe", "telegram.exe", "whatsapp.exe"], "context": "chat"},
+    {"title": "outlook|gmail|mail|thunderbird", "context": "mail"},
+    {"title": "word|docs|notion|obsidian", "context": "web_document"},
+]
+
+
 class VoiceTypeConfig(PydanticBaseSettings):
     """應用程式設定的 Pydantic 模型"""
     sttProvider: Literal["groq", "openai", "local"] = "groq"
@@ -36,10 +64,64 @@ class VoiceTypeConfig(PydanticBaseSettings):
     language: Literal["auto", "zh-TW", "zh-CN", "en", "ja"] = "auto"
     outputMode: str = "clipboard"
     streamOutput: bool = False
+    streamInjectMode: Literal["chunked", "typing"] = "chunked"
+    streamFlushMs: int = Field(default=400, ge=50, le=5000)
     playSounds: bool = True
     removeFiller: bool = True
     autoFormat: bool = True
+    convertTraditional: bool = True
     contextAware: bool = True
+    warmCapture: bool = False
+    prerollMs: int = Field(default=300, ge=0, le=2000)
+    warmIdleSuspendSeconds: int = 600
+    maxRecordingSeconds: int = Field(default=300, ge=5, le=3600)
+    uploadCodec: Literal["wav", "flac", "opus"] = "wav"
+    vadEnabled: bool = True
+    vadMaxPauseMs: int = 500
+    incrementalStt: bool = False
+    segmentSilenceMs: int = 700
+    minSegmentSeconds: float = 4.0
+    chunkedStt: bool = True
+    chunkThresholdSeconds: float = Field(default=60.0, ge=10)
+    chunkSeconds: float = Field(default=30.0, ge=5, le=600)
+    chunkOverlapSeconds: float = Field(default=1.0, ge=0, le=5)
+    chunkWorkers: int = Field(default=4, ge=1, le=16)
+    localWhisperProfile: Literal["auto", "fast", "balanced", "accurate"] = "auto"
+    localCpuThreads: int = Field(default=0, ge=0, le=64)
+    localWorkers: int = Field(default=1, ge=1, le=8)
+    localWhisperOverrides: Dict[str, Union[bool, int, float, str]] = Field(default_factory=dict)
+    latencyBudgetMs: int = Field(default=20000, ge=0)
+    sttDeadlineMs: int = Field(default=12000, ge=0)
+    llmDeadlineMs: int = Field(default=8000, ge=0)
+    dictationQueueDepth: int = Field(default=3, ge=1, le=10)
+    dictationQueuePolicy: Literal["drop_oldest", "reject_new"] = "drop_oldest"
+    traceFile: str = ""
+    httpHttp2: bool = False
+    httpKeepaliveSeconds: int = Field(default=25, ge=0)
+    hedgeSttProvider: Literal["", "groq", "openai", "local"] = ""
+    hedgeSttModel: str = ""
+    hedgeLlmProvider: Literal["", "openai", "anthropic", "groq", "ollama", "gemini"] = ""
+    hedgeLlmModel: str = ""
+    hedgePercentile: int = Field(default=95, ge=50, le=99)
+    hedgeMinDelayMs: int = Field(default=300, ge=0)
+    hedgeSttDelayMs: int = Field(default=2000, ge=0)
+    hedgeLlmDelayMs: int = Field(default=1500, ge=0)
+    sttProviders: List[Literal["groq", "openai", "local"]] = Field(default_factory=list)
+    llmProviders: List[Literal["openai", "anthropic", "groq", "ollama", "gemini"]] = Field(default_factory=list)
+    polishCache: bool = True
+    promptCaching: bool = True
+    polishCacheSize: int = Field(default=500, ge=0, le=10000)
+    polishCacheTtlHours: int = Field(default=168, ge=1)
+    fastPath: bool = True
+    fastPathThreshold: float = Field(default=0.8, ge=0.0, le=1.0)
+    fastPathMaxChars: int = Field(default=40, ge=0)
+    fastPathCustomPrompt: bool = False
+    fastPathContexts: Dict[str, bool] = Field(default_factory=lambda: {
+        "mail": False, "document": True, "code": True, "chat": True, "browser": True, "default": True,
+    })
+    contextRules: List[ContextRule] = Field(
+        default_factory=lambda: [ContextRule(**rule) for rule in DEFAULT_CONTEXT_RULES]
+    )
     dictionary: List[str] = Field(default_factory=list)
     systemPrompt: str = (
         "你是一個語音轉文字的智能編輯器。請對用戶的口述內容進行以下處理：\n"
@@ -65,9 +147,72 @@ class VoiceTypeConfig(PydanticBaseSettings):
     )
 
 
+# 各雲端引擎的預設 API 端點，可透過環境變數覆寫（例如指向本地測試用的模擬伺服器）
+DEFAULT_BASE_URLS = {
+    "groq": "https://api.groq.com/openai/v1",
+    "openai": "https://api.openai.com/v1",
+    "anthropic": "https://api.anthropic.com",
+    "gemini": "https://generativelanguage.googleapis.com",
+}
+
+BASE_URL_ENV_KEYS = {
+    "groq": "GROQ_API_BASE",
+    "openai": "OPENAI_API_BASE",
+    "anthropic": "ANTHROPIC_API_BASE",
+    "gemini": "GEMINI_API_BASE",
+}
+
+
 # 匯出預設系統提示詞，供 llm.py 等模組使用，因為 Pydantic 在實例化前我們需要預設字串
 DEFAULT_SYSTEM_PROMPT = VoiceTypeConfig.model_fields["systemPrompt"].default
 
+# 與 VoiceTypeConfig 欄位相同的一般 Pydantic 模型：更新設定時只做型別檢查，
+# 不像 BaseSettings 每次實例化都重新讀取 .env 與環境變數（約 2ms → 15µs）
+_ConfigValues = create_model(
+    "ConfigValues",
+    **{name: (field.annotation, field) for name, field in VoiceTypeConfig.model_fields.items()},
+)
+
+SAVE_DEBOUNCE_SECONDS = 0.5  # 連續修改設定（Web UI 一次送出多個欄位）合併為一次寫檔
+
+
+class FrozenDict(dict):
+    """唯讀的 dict（仍可 json.dumps、dict(...) 複製）；巢狀的 dict / list 一併凍結"""
+
+    def __init__(self, data=()):
+        super().__init__((k, _freeze(v)) for k, v in dict(data).items())
+
+    def _readonly(self, *args, **kwargs):
+        raise TypeError("設定快照為唯讀，請使用 Settings.update() / update_all() 修改設定")
+
+    __setitem__ = __delitem__ = __ior__ = _readonly
+    clear = pop = popitem = setdefault = update = _readonly
+
+    def __reduce__(self):
+        return (type(self), (dict(self),))
+
+
+class ConfigSnapshot(FrozenDict):
+    """
+    某一版設定的唯讀快照：設定變更前所有呼叫端共用同一個物件，
+    get_config() 不必每次 model_dump()；version 每次變更遞增，可用來判斷設定是否改變
+    """
+
+    def __init__(self, data=(), version: int = 0):
+        super().__init__(data)
+        self.version = version
+
+    def __reduce__(self):
+        return (type(self), (dict(self), self.version))
+
+
+def _freeze(value):
+    if isinstance(value, dict):
+        return FrozenDict(value)
+    if isinstance(value, list):
+        return tuple(_freeze(v) for v in value)
+    return value
+
 
 class Settings:
     """設定管理器 (與舊版相容的封裝)"""
@@ -84,78 +229,196 @@ class Settings:
 
         self.config_path = self.config_dir / "config.json"
         self._config_model: VoiceTypeConfig | None = None
+        self._snapshot: ConfigSnapshot | None = None
+        self._version = 0
+        self._lock = threading.RLock()
+        self._save_timer: threading.Timer | None = None
+        self._file_stat: tuple[int, int] | None = None   # 最近一次讀寫後設定檔的 (mtime_ns, size)
+        self._subscribers: list = []
+        atexit.register(self.flush)
 
-    def load(self) -> dict:
-        """載入設定檔，不存在則建立預設設定"""
-        if self.config_path.exists():
+    @property
+    def version(self) -> int:
+        """設定版本號（每次載入或變更遞增）"""
+        return self._version
+
+    def subscribe(self, callback):
+        """註冊設定變更通知 callback(舊快照, 新快照)；在變更設定的執行緒上呼叫"""
+        self._subscribers.append(callback)
+
+    def _notify(self, old: ConfigSnapshot | None):
+        new = self._snapshot
+        if old is None or old is new:
+            return
+        for callback in list(self._subscribers):
             try:
-                with open(self.config_path, "r", encoding="utf-8") as f:
-                    saved = json.load(f)
-                
-                # Pydantic 自動處理合併與預設值
-                self._config_model = VoiceTypeConfig(**saved)
-                logger.info("設定已載入: %s", self.config_path)
+                callback(old, new)
             except Exception as e:
-                logger.error("設定檔讀取或驗證失敗: %s，使用預設值", e)
-                self._config_model = VoiceTypeConfig()
-        else:
-            logger.info("設定檔不存在，建立預設設定...")
-            self._config_model = VoiceTypeConfig()
-            self.save()
+                logger.error("設定變更通知失敗: %s", e, exc_info=True)
 
-        return self._config_model.model_dump()
+    def load(self) -> ConfigSnapshot:
+        """載入設定檔，不存在則建立預設設定"""
+        with self._lock:
+            old = self._snapshot
+            self.flush()  # 尚未寫檔的變更先寫入，避免讀到舊的設定檔
+            if self.config_path.exists():
+                try:
+                    self._file_stat = self._stat()
+                    with open(self.config_path, "r", encoding="utf-8") as f:
+                        saved = json.load(f)
+
+                    # Pydantic 自動處理合併與預設值（.env / 環境變數只在載入時讀取）
+                    self._set_model(VoiceTypeConfig(**saved))
+                    logger.info("設定已載入: %s", self.config_path)
+                except Exception as e:
+                    logger.error("設定檔讀取或驗證失敗: %s，使用預設值", e)
+                    self._set_model(VoiceTypeConfig())
+            else:
+                logger.info("設定檔不存在，建立預設設定...")
+                self._set_model(VoiceTypeConfig())
+                self.save()
+
+            snapshot = self._snapshot
+        self._notify(old)
+        return snapshot
+
+    def _stat(self) -> tuple[int, int]:
+        stat = os.stat(self.config_path)
+        return stat.st_mtime_ns, stat.st_size
+
+    def reload_if_changed(self) -> bool:
+        """設定檔被外部修改（手動編輯、其他程式）時重新載入，回傳是否已重新載入；自己寫入的變更不會觸發"""
+        try:
+            stat = self._stat()
+        except OSError:
+            return False
+        if stat == self._file_stat or self._save_timer:
+            return False
+        try:
+            with open(self.config_path, "r", encoding="utf-8") as f:
+                saved = json.load(f)
+            model = VoiceTypeConfig(**saved)
+        except Exception as e:
+            # 可能是編輯器寫到一半，保留目前設定，等下一次變更
+            self._file_stat = stat
+            logger.warning("設定檔內容無效，保留目前設定: %s", e)
+            return False
+
+        with self._lock:
+            old = self._snapshot
+            self._file_stat = stat
+            self._set_model(model)
+        logger.info("偵測到設定檔變更，已重新載入: %s", self.config_path)
+        self._notify(old)
+        return True
+
+    def _set_model(self, model):
+        """替換設定並產生新版的唯讀快照"""
+        self._config_model = model
+        self._version += 1
+        self._snapshot = ConfigSnapshot(model.model_dump(), self._version)
 
     def save(self):
-        """儲存設定到檔案 (將 Pydantic Model 轉回 Dict 儲存)"""
-        self.config_dir.mkdir(parents=True, exist_ok=True)
-        if not self._config_model:
-            self._config_model = VoiceTypeConfig()
+        """立即儲存設定到檔案（先寫入暫存檔再改名，寫到一半中斷也不會留下損毀的 config.json）"""
+        with self._lock:
+            self._cancel_pending_save()
+            self.config_dir.mkdir(parents=True, exist_ok=True)
+            if not self._config_model:
+                self._set_model(VoiceTypeConfig())
+            self._write(self._snapshot)
 
-        with open(self.config_path, "w", encoding="utf-8") as f:
-            json.dump(self._config_model.model_dump(), f, ensure_ascii=False, indent=2)
-        logger.info("設定已儲存: %s", self.config_path)
+    def _write(self, snapshot: ConfigSnapshot):
+        fd, tmp_path = tempfile.mkstemp(prefix=".config-", suffix=".json", dir=self.config_dir)
+        try:
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                json.dump(snapshot, f, ensure_ascii=False, indent=2)
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(tmp_path, self.config_path)
+            self._file_stat = self._stat()
+        except BaseException:
+            Path(tmp_path).unlink(missing_ok=True)
+            raise
+        logger.info("設定已儲存: %s (版本 %d)", self.config_path, snapshot.version)
 
-    def get_config(self) -> dict:
-        """取得當前設定（若未載入則自動載入）"""
-        if not self._config_model:
-            self.load()
-        return self._config_model.model_dump()
+    def _schedule_save(self):
+        """延後寫檔：SAVE_DEBOUNCE_SECONDS 內的連續修改只寫一次"""
+        self._cancel_pending_save()
+        self._save_timer = threading.Timer(SAVE_DEBOUNCE_SECONDS, self.flush)
+        self._save_timer.daemon = True
+        self._save_timer.start()
+
+    def _cancel_pending_save(self):
+        if self._save_timer:
+            self._save_timer.cancel()
+            self._save_timer = None
+
+    def flush(self):
+        """立即寫入尚未寫檔的設定變更（結束程式前呼叫）"""
+        with self._lock:
+            if not self._save_timer:
+                return
+            self._save_timer = None
+            if not self.config_dir.exists():
+                # 設定目錄已被移除（例如測試用的暫存目錄），不重新建立
+                return
+            try:
+                self._write(self._snapshot)
+            except Exception as e:
+                logger.error("設定儲存失敗: %s", e)
+
+    def get_config(self) -> ConfigSnapshot:
+        """取得當前設定的唯讀快照（若未載入則自動載入）；設定變更前回傳同一個物件"""
+        snapshot = self._snapshot
+        if snapshot is None:
+            return self.load()
+        return snapshot
+
+    def _apply(self, values: dict):
+        """型別檢查後套用新設定，並排程寫檔"""
+        model = _ConfigValues.model_validate(values)
+        self._set_model(model)
+        self._schedule_save()
 
     def update(self, key: str, value):
         """更新單一設定值"""
-        if not self._config_model:
-            self.load()
-        
-        # 建立一個新的 dict 再重新實例化，依靠 Pydantic 做型別檢查
-        current = self._config_model.model_dump()
-        current[key] = value
-        
-        try:
-            self._config_model = VoiceTypeConfig(**current)
-            self.save()
-        except Exception as e:
-            logger.error("設定值無效: %s", e)
-            raise ValueError(f"設定值無效: {e}")
+        with self._lock:
+            if not self._config_model:
+                self.load()
+            old = self._snapshot
+
+            # 建立一個新的 dict 再重新驗證，依靠 Pydantic 做型別檢查
+            current = self._config_model.model_dump()
+            current[key] = value
+
+            try:
+                self._apply(current)
+            except Exception as e:
+                logger.error("設定值無效: %s", e)
+                raise ValueError(f"設定值無效: {e}")
+        self._notify(old)
 
     def update_all(self, new_config: dict):
         """批次更新設定"""
-        if not self._config_model:
-            self.load()
-        
-        current = self._config_model.model_dump()
-        # 遞迴更新 apiKeys 等字典
-        if "apiKeys" in new_config and "apiKeys" in current:
-            current["apiKeys"].update(new_config["apiKeys"])
-            del new_config["apiKeys"]
-            
-        current.update(new_config)
-        
-        try:
-            self._config_model = VoiceTypeConfig(**current)
-            self.save()
-        except Exception as e:
-            logger.error("更新設定失敗: %s", e)
-            raise ValueError(f"更新設定失敗: {e}")
+        with self._lock:
+            if not self._config_model:
+                self.load()
+            old = self._snapshot
+
+            new_config = dict(new_config)
+            current = self._config_model.model_dump()
+            # 遞迴更新 apiKeys 等字典
+            if "apiKeys" in new_config and "apiKeys" in current:
+                current["apiKeys"].update(new_config.pop("apiKeys"))
+
+            current.update(new_config)
+
+            try:
+                self._apply(current)
+            except Exception as e:
+                logger.error("更新設定失敗: %s", e)
+                raise ValueError(f"更新設定失敗: {e}")
+        self._notify(old)
 
     def get_api_key_with_source(self, provider: str) -> tuple[str, str]:
         """取得指定引擎的 API Key 以及來源 (.env/環境變數 或 config.json)"""
@@ -183,22 +446,30 @@ class Settings:
         key, _ = self.get_api_key_with_source(provider)
         return key
 
+    def get_base_url(self, provider: str) -> str:
+        """取得指定引擎的 API 端點 (優先讀取 .env 或環境變數)"""
+        env_var_name = BASE_URL_ENV_KEYS.get(provider)
+        if env_var_name:
+            env_val = os.environ.get(env_var_name)
+            if env_val:
+                return env_val.rstrip("/")
+        return DEFAULT_BASE_URLS.get(provider, "")
+
     def set_api_key(self, provider: str, key: str):
         """設定 API Key (僅寫入 config.json)"""
-        if not self._config_model:
-            self.load()
-            
-        current_keys = self._config_model.apiKeys.model_dump()
-        current_keys[provider] = key
-        
-        current_config = self._config_model.model_dump()
-        current_config["apiKeys"] = current_keys
-        
-        try:
-            self._config_model = VoiceTypeConfig(**current_config)
-            self.save()
-        except Exception as e:
-            logger.error("更新 API Key 失敗: %s", e)
+        with self._lock:
+            if not self._config_model:
+                self.load()
+            old = self._snapshot
+
+            current_config = self._config_model.model_dump()
+            current_config["apiKeys"][provider] = key
+
+            try:
+                self._apply(current_config)
+            except Exception as e:
+                logger.error("更新 API Key 失敗: %s", e)
+        self._notify(old)
 
     def validate(self) -> list[str]:
         """驗證設定值，回傳警告訊息列表 (因 Pydantic 會自動阻擋無效值，此處基本上只會空陣列)"""
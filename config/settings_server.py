@@ -12,6 +12,9 @@ from http.server import HTTPServer, SimpleHTTPRequestHandler
 from pathlib import Path
 from urllib.parse import urlparse
 
+from core.metrics import metrics
+from core.router import get_router
+
 logger = logging.getLogger("VoiceType.SettingsServer")
 
 _server_thread = None
@@ -33,6 +36,15 @@ class SettingsAPIHandler(SimpleHTTPRequestHandler):
         if parsed.path == "/api/config":
             # 回傳當前設定
             self._send_json(self.settings.get_config())
+        elif parsed.path == "/api/metrics":
+            # 各階段延遲 p50/p95/p99（依引擎分組）
+            self._send_json(metrics.summary())
+        elif parsed.path == "/api/metrics/trace":
+            # Chrome trace-event JSON（chrome://tracing 或 https://ui.perfetto.dev 開啟）
+            self._send_json(metrics.trace_events())
+        elif parsed.path == "/api/routing":
+            # 各引擎的延遲 / 錯誤率移動平均與熔斷狀態
+            self._send_json(get_router(self.settings.config_dir).snapshot())
         elif parsed.path == "/api/health":
             self._send_json({"status": "ok", "version": "0.1.0"})
         else:
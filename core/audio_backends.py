@@ -0,0 +1,134 @@
+"""
+模擬音訊輸入裝置
+提供與 sounddevice 相同介面的假裝置，讓 AudioRecorder 能在沒有麥克風、
+沒有 PortAudio 的環境（CI、Linux 伺服器）中運作
+
+用法：
+  mic = FakeSoundDevice()
+  recorder = AudioRecorder(backend=mic)
+  mic.play(audio)        # 把 int16 音訊「說」進麥克風，播完後輸出靜音
+  mic.play_file("a.wav") # 從 WAV 檔播放
+"""
+
+import logging
+import threading
+import time
+import wave
+
+import numpy as np
+
+logger = logging.getLogger("VoiceType.FakeAudio")
+
+
+def load_wav(path, sample_rate: int = 16000) -> np.ndarray:
+    """讀取 16-bit PCM WAV 為 int16 mono（多聲道取平均；取樣率不同時線性重取樣）"""
+    with wave.open(str(path), "rb") as wf:
+        if wf.getsampwidth() != 2:
+            raise ValueError(f"{path}: 只支援 16-bit PCM WAV")
+        channels = wf.getnchannels()
+        rate = wf.getframerate()
+        audio = np.frombuffer(wf.readframes(wf.getnframes()), dtype=np.int16)
+    if channels > 1:
+        audio = audio.reshape(-1, channels).mean(axis=1).astype(np.int16)
+    if rate != sample_rate and len(audio):
+        n = int(len(audio) * sample_rate / rate)
+        positions = np.linspace(0, len(audio) - 1, n)
+        audio = np.interp(positions, np.arange(len(audio)), audio).astype(np.int16)
+    return audio
+
+
+class FakeInputStream:
+    """模擬 sounddevice.InputStream：背景執行緒依區塊大小定期呼叫 callback"""
+
+    def __init__(self, device, samplerate, channels, dtype, blocksize, callback, **kwargs):
+        self._device = device
+        self.samplerate = samplerate
+        self.channels = channels
+        self.blocksize = blocksize
+        self._callback = callback
+        self._running = False
+        self._thread = None
+        self.closed = False
+
+    def start(self):
+        if self._device.open_latency:
+            time.sleep(self._device.open_latency)
+        self._running = True
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    def _run(self):
+        interval = self.blocksize / self.samplerate
+        next_tick = time.perf_counter()
+        while self._running:
+            block = self._device.read(self.blocksize).reshape(-1, 1)
+            self._callback(block, self.blocksize, None, None)
+            if self._device.realtime:
+                next_tick += interval
+                delay = next_tick - time.perf_counter()
+                if delay > 0:
+                    time.sleep(delay)
+            elif self._device.exhausted:
+                # 非即時模式下音訊播完就讓出 CPU，避免空轉產生大量靜音
+                time.sleep(interval)
+
+    def stop(self):
+        self._running = False
+        if self._thread and self._thread is not threading.current_thread():
+            self._thread.join()
+
+    def close(self):
+        self.closed = True
+
+    @property
+    def active(self) -> bool:
+        return self._running
+
+
+class FakeSoundDevice:
+    """
+    取代 sounddevice 模組的假麥克風
+
+    Args:
+        realtime: True 時依實際時間速率產生區塊；False 時盡快送出（基準測試用）
+        open_latency: 模擬開啟裝置所需的秒數
+        noise: 靜音時的背景噪音振幅
+    """
+
+    def __init__(self, realtime: bool = True, open_latency: float = 0.0, noise: float = 0.0, seed: int = 0):
+        self.realtime = realtime
+        self.open_latency = open_latency
+        self.noise = noise
+        self.streams_opened = 0
+        self._rng = np.random.default_rng(seed)
+        self._pending = np.zeros(0, dtype=np.int16)
+        self._lock = threading.Lock()
+
+    def InputStream(self, **kwargs):  # noqa: N802 - 與 sounddevice 介面一致
+        self.streams_opened += 1
+        return FakeInputStream(self, **kwargs)
+
+    def play(self, audio: np.ndarray):
+        """將音訊排入麥克風輸入佇列"""
+        with self._lock:
+            self._pending = np.concatenate((self._pending, audio.astype(np.int16).reshape(-1)))
+
+    def play_file(self, path):
+        """將 WAV 檔排入麥克風輸入佇列"""
+        self.play(load_wav(path))
+
+    @property
+    def exhausted(self) -> bool:
+        return len(self._pending) == 0
+
+    def read(self, frames: int) -> np.ndarray:
+        with self._lock:
+            block = self._pending[:frames]
+            self._pending = self._pending[frames:]
+        if len(block) < frames:
+            silence = (
+                self._rng.normal(0, self.noise, frames - len(block)).astype(np.int16)
+                if self.noise else np.zeros(frames - len(block), dtype=np.int16)
+            )
+            block = np.concatenate((block, silence))
+        return block
@@ -0,0 +1,114 @@
+"""
+長錄音分段辨識
+超過門檻的錄音在低能量處（停頓）切成數段、相鄰兩段保留少量重疊，
+各段同時送出辨識，最後拼接並去除重疊處重複辨識的文字
+
+  - 每段長度不超過 chunkSeconds，切點只往前找，單段上傳大小有上限（避開 API 約 25 MB 的限制）
+  - 切點以平滑後的音框能量選最安靜的位置，盡量不切在字中間
+  - 重疊文字比對時忽略標點、空白與大小寫；英數字只在完整單字邊界去除
+
+用法：
+  spans = split_audio(audio, chunk_seconds=30, overlap_seconds=1.0)
+  texts = [transcribe(audio[s:e]) for s, e in spans]
+  text = stitch_transcripts(texts, overlap_seconds=1.0)
+"""
+
+import re
+
+import numpy as np
+
+from core.incremental import join_segments
+from core.recorder import SAMPLE_RATE
+from core.vad import FRAME_MS, frame_energy
+
+# 尋找切點時，往前搜尋的範圍（佔每段長度的比例）
+SEARCH_RATIO = 0.25
+# 切點能量的平滑視窗：偏好持續的停頓，而不是單一安靜的音框
+SMOOTH_MS = 200
+# API 上傳大小上限（保留餘裕）；未壓縮 WAV 超過時即使停用分段也會強制切割
+MAX_UPLOAD_BYTES = 24 * 1024 * 1024
+# 去除重疊時，每秒重疊音訊最多比對的字元數（中文語速約每秒 4–6 字）
+OVERLAP_CHARS_PER_SECOND = 12
+MIN_OVERLAP_CHARS = 2
+
+_WORD_CHAR = re.compile(r"\w")
+_ASCII_WORD = re.compile(r"[A-Za-z0-9]")
+_LEADING_JUNK = re.compile(r"^[\s\W_]+")
+
+
+def wav_bytes(samples: int) -> int:
+    """未壓縮 16-bit mono WAV 的大小"""
+    return samples * 2 + 44
+
+
+def split_audio(
+    audio: np.ndarray,
+    chunk_seconds: float = 30.0,
+    overlap_seconds: float = 1.0,
+    sample_rate: int = SAMPLE_RATE,
+) -> list[tuple[int, int]]:
+    """
+    將音訊切成不超過 chunk_seconds 的數段，回傳各段的 (起點, 終點) 樣本索引
+
+    切點在每段目標長度之前 SEARCH_RATIO 的範圍內找最安靜的位置；
+    除第一段外，每段的起點往前延伸 overlap_seconds 與前一段重疊。
+    """
+    total = len(audio)
+    chunk = int(chunk_seconds * sample_rate)
+    if total <= chunk:
+        return [(0, total)]
+
+    frame_len = sample_rate * FRAME_MS // 1000
+    energy = frame_energy(audio, frame_len)
+    window = max(1, SMOOTH_MS // FRAME_MS)
+    smoothed = np.convolve(energy, np.ones(window, dtype=np.float32) / window, mode="same")
+
+    overlap = int(overlap_seconds * sample_rate)
+    search = max(frame_len, int(chunk * SEARCH_RATIO))
+    spans = []
+    start = 0
+    while total - start > chunk:
+        # 起點已往前延伸 overlap，切點要在 start + chunk - overlap 之前才不會超過單段長度
+        limit = start + chunk - (overlap if spans else 0)
+        lo = max(start + frame_len, limit - search) // frame_len
+        hi = max(lo + 1, limit // frame_len)
+        cut = (lo + int(np.argmin(smoothed[lo:hi]))) * frame_len + frame_len // 2
+        spans.append((max(0, start - overlap) if spans else 0, cut))
+        start = cut
+    spans.append((max(0, start - overlap), total))
+    return spans
+
+
+def _word_chars(text: str) -> list[tuple[str, int]]:
+    """回傳文字中的字元（忽略標點與空白，轉小寫）及其在原文中的位置"""
+    return [(c.lower(), i) for i, c in enumerate(text) if _WORD_CHAR.match(c)]
+
+
+def trim_overlap(previous: str, text: str, max_chars: int) -> str:
+    """去除 text 開頭與 previous 結尾重複的部分（兩段重疊音訊各自辨識出的文字）"""
+    tail = _word_chars(previous)[-max_chars:]
+    head = _word_chars(text)[:max_chars]
+    for k in range(min(len(tail), len(head)), MIN_OVERLAP_CHARS - 1, -1):
+        if [c for c, _ in tail[-k:]] != [c for c, _ in head[:k]]:
+            continue
+        begin, cut = tail[-k][1], head[k - 1][1] + 1
+        # 英數字只在完整單字邊界去除，避免把 "in" 與 "install" 當成重複
+        if _ASCII_WORD.match(previous[begin]) and begin > 0 and _ASCII_WORD.match(previous[begin - 1]):
+            continue
+        if _ASCII_WORD.match(text[cut - 1]) and cut < len(text) and _ASCII_WORD.match(text[cut]):
+            continue
+        return _LEADING_JUNK.sub("", text[cut:])
+    return text
+
+
+def stitch_transcripts(texts: list[str], overlap_seconds: float = 1.0) -> str:
+    """依序拼接各段辨識結果，並去除重疊處重複的文字"""
+    max_chars = max(MIN_OVERLAP_CHARS, int(overlap_seconds * OVERLAP_CHARS_PER_SECOND)) if overlap_seconds > 0 else 0
+    parts: list[str] = []
+    for text in texts:
+        text = text.strip()
+        if parts and text and max_chars:
+            text = trim_overlap(parts[-1], text, max_chars)
+        if text:
+            parts.append(text)
+    return join_segments(parts)
@@ -0,0 +1,248 @@
+"""
+語境偵測
+依前景視窗的執行檔名稱與標題判斷使用者正在做什麼（寫郵件、聊天、寫程式…），讓 LLM 調整語氣
+
+  - 規則來自設定 contextRules，編譯成「執行檔 → 規則」的 dict 查表加上預先編譯的標題 Regex
+  - pid → 執行檔名稱有 TTL 快取（psutil 查詢約數 ms），查詢失敗時移除該筆
+  - 平台相關的查詢放在 WindowProvider 之後：Windows 使用 Win32WindowProvider，
+    其他平台或基準測試可換成 FakeWindowProvider
+  - 按下快捷鍵時就在背景解析（resolve_async），STT 完成後直接取用結果，不佔用 LLM 前的時間
+
+用法：
+  detector = get_detector()
+  future = detector.resolve_async(hwnd, cfg, trace)   # 按下快捷鍵時
+  context_key = future.result()                        # 呼叫 LLM 前
+"""
+
+import logging
+import re
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+
+from core.metrics import Trace
+
+logger = logging.getLogger("VoiceType.Context")
+
+PROCESS_CACHE_TTL_SECONDS = 30.0
+PROCESS_CACHE_MAX_ENTRIES = 256
+
+
+class Win32WindowProvider:
+    """以 win32gui / psutil 查詢前景視窗（缺少套件時建立失敗，語境偵測停用）"""
+
+    def __init__(self):
+        import psutil
+        import win32gui
+        import win32process
+
+        self._psutil = psutil
+        self._win32gui = win32gui
+        self._win32process = win32process
+
+    def foreground_window(self) -> int:
+        return self._win32gui.GetForegroundWindow()
+
+    def window_title(self, hwnd: int) -> str:
+        return self._win32gui.GetWindowText(hwnd)
+
+    def window_pid(self, hwnd: int) -> int:
+        _, pid = self._win32process.GetWindowThreadProcessId(hwnd)
+        return pid
+
+    def process_name(self, pid: int) -> str:
+        return self._psutil.Process(pid).name()
+
+
+class FakeWindowProvider:
+    """
+    模擬的視窗查詢（無桌面環境測試、基準測試用）
+
+    Args:
+        windows: hwnd -> (標題, pid)
+        processes: pid -> 執行檔名稱
+        call_ms: 每次查詢的模擬成本，例如 {"process_name": 2.0}
+    """
+
+    def __init__(self, windows: dict | None = None, processes: dict | None = None, call_ms: dict | None = None):
+        self.windows = dict(windows or {})
+        self.processes = dict(processes or {})
+        self.foreground = next(iter(self.windows), 0)
+        self.call_ms = call_ms or {}
+        self.calls: dict[str, int] = {}
+
+    def _cost(self, name: str):
+        self.calls[name] = self.calls.get(name, 0) + 1
+        ms = self.call_ms.get(name, 0)
+        if ms:
+            time.sleep(ms / 1000)
+
+    def foreground_window(self) -> int:
+        self._cost("foreground_window")
+        return self.foreground
+
+    def window_title(self, hwnd: int) -> str:
+        self._cost("window_title")
+        return self.windows.get(hwnd, ("", 0))[0]
+
+    def window_pid(self, hwnd: int) -> int:
+        self._cost("window_pid")
+        return self.windows.get(hwnd, ("", 0))[1]
+
+    def process_name(self, pid: int) -> str:
+        self._cost("process_name")
+        if pid not in self.processes:
+            raise ProcessLookupError(pid)
+        return self.processes[pid]
+
+
+class ProcessNameCache:
+    """pid → 執行檔名稱的 TTL 快取（pid 可能被重複使用，所以不永久保存）"""
+
+    def __init__(self, provider, ttl: float = PROCESS_CACHE_TTL_SECONDS, max_entries: int = PROCESS_CACHE_MAX_ENTRIES):
+        self.provider = provider
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._entries: dict[int, tuple[str, float]] = {}
+        self._lock = threading.Lock()
+
+    def get(self, pid: int) -> str:
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(pid)
+        if entry and entry[1] > now:
+            return entry[0]
+        try:
+            name = self.provider.process_name(pid).lower()
+        except Exception:
+            # 行程已結束或沒有權限：移除舊的記錄，下次重新查詢
+            self.invalidate(pid)
+            return ""
+        with self._lock:
+            if len(self._entries) >= self.max_entries:
+                self._entries = {p: e for p, e in self._entries.items() if e[1] > now}
+                if len(self._entries) >= self.max_entries:
+                    self._entries.clear()
+            self._entries[pid] = (name, now + self.ttl)
+        return name
+
+    def invalidate(self, pid: int | None = None):
+        """移除指定 pid（省略時清空全部）"""
+        with self._lock:
+            if pid is None:
+                self._entries.clear()
+            else:
+                self._entries.pop(pid, None)
+
+
+class CompiledRules:
+    """編譯後的語境規則：執行檔 dict 查表 + 預先編譯的標題 Regex，保留設定中的順序"""
+
+    def __init__(self, rules):
+        self.by_exe: dict[str, list[tuple[int, re.Pattern | None, str]]] = {}
+        self.title_only: list[tuple[int, re.Pattern, str]] = []
+        for order, rule in enumerate(rules):
+            context = rule.get("context", "")
+            title = rule.get("title", "")
+            try:
+                pattern = re.compile(title, re.IGNORECASE) if title else None
+            except re.error as e:
+                logger.warning("語境規則的標題 Regex 無效，已略過 (%s): %s", title, e)
+                continue
+            exes = rule.get("exe", ())
+            if exes:
+                for exe in exes:
+                    self.by_exe.setdefault(exe.lower(), []).append((order, pattern, context))
+            elif pattern:
+                self.title_only.append((order, pattern, context))
+
+    def match(self, exe: str, title: str) -> str:
+        """回傳第一條符合的規則的語境鍵（沒有符合時回傳空字串）"""
+        for order, pattern, context in self.by_exe.get(exe, ()):
+            if pattern is None or pattern.search(title):
+                # 指定執行檔的規則之前若有更早的純標題規則也符合，依設定順序以較早者為準
+                return self._earlier_title_match(order, title) or context
+        return self._earlier_title_match(None, title)
+
+    def _earlier_title_match(self, before: int | None, title: str) -> str:
+        for order, pattern, context in self.title_only:
+            if before is not None and order > before:
+                break
+            if pattern.search(title):
+                return context
+        return ""
+
+
+class ContextDetector:
+    """語境偵測器；規則在設定變更時重新編譯"""
+
+    def __init__(self, provider=None):
+        self._provider = provider
+        self._processes: ProcessNameCache | None = None
+        self._rules: CompiledRules | None = None
+        self._rules_source = None
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="context")
+        self._unavailable = False
+
+    @property
+    def provider(self):
+        if self._provider is None:
+            self._provider = Win32WindowProvider()
+        return self._provider
+
+    def rules(self, cfg: dict) -> CompiledRules:
+        source = cfg.get("contextRules", ())
+        # 設定快照在變更前共用同一個物件，以物件本身判斷規則是否改變
+        if self._rules is None or source is not self._rules_source:
+            self._rules = CompiledRules(source)
+            self._rules_source = source
+        return self._rules
+
+    def detect(self, cfg: dict, hwnd=None) -> str:
+        """偵測視窗（省略時為前景視窗）的語境鍵，無法判斷時回傳空字串"""
+        if self._unavailable:
+            return ""
+        try:
+            provider = self.provider
+            if self._processes is None:
+                self._processes = ProcessNameCache(provider)
+            hwnd = hwnd or provider.foreground_window()
+            title = provider.window_title(hwnd)
+            exe = self._processes.get(provider.window_pid(hwnd))
+            return self.rules(cfg).match(exe, title)
+        except ImportError:
+            self._unavailable = True
+            logger.debug("win32gui / psutil not installed, context detection disabled.")
+        except Exception as e:
+            logger.debug("Context detection failed: %s", e)
+        return ""
+
+    def resolve_async(self, hwnd, cfg: dict, trace: Trace | None = None) -> Future:
+        """在背景偵測語境（按下快捷鍵時呼叫，與錄音、STT 同時進行）"""
+        start = time.perf_counter()
+
+        def _run():
+            key = self.detect(cfg, hwnd)
+            if trace:
+                trace.add("context", start, time.perf_counter(), key or "none")
+            return key
+
+        return self._executor.submit(_run)
+
+    def invalidate(self):
+        """清除 pid 快取"""
+        if self._processes:
+            self._processes.invalidate()
+
+
+_detector: ContextDetector | None = None
+_detector_lock = threading.Lock()
+
+
+def get_detector() -> ContextDetector:
+    """取得全域共用的語境偵測器"""
+    global _detector
+    with _detector_lock:
+        if _detector is None:
+            _detector = ContextDetector()
+        return _detector
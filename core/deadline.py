@@ -0,0 +1,125 @@
+"""
+端對端延遲預算 (Latency Budget)
+每次語音輸入有一個整體預算（latencyBudgetMs），STT 與 LLM 各有期限（sttDeadlineMs / llmDeadlineMs），
+各階段的實際期限為「階段期限」與「整體預算剩餘時間」中較早者；錄音超過 BUDGET_REFERENCE_SECONDS 時依長度等比例放寬
+
+  - 處理管線以 within() 執行各階段，超過期限時取消進行中的請求並拋出 DeadlineExceeded（由呼叫端降級處理）
+  - 期限存放在 contextvar，各引擎的 SDK 呼叫以 request_timeout() 取得剩餘時間（加上少許寬限）作為請求逾時，
+    同步呼叫（增量辨識、對沖的工作執行緒）也不會無限期等待
+
+用法：
+  budget = LatencyBudget(cfg, audio_seconds=12.0)
+  try:
+      text = await within(budget.stage("stt"), stt.atranscribe(audio))
+  except DeadlineExceeded as e:
+      ...  # e.stage == "stt"
+"""
+
+import asyncio
+import contextvars
+import time
+from contextlib import contextmanager
+
+# 預算以此長度的錄音為準，更長的錄音等比例放寬
+BUDGET_REFERENCE_SECONDS = 30.0
+# SDK 請求逾時比期限多留的時間：讓處理管線的取消先到（兩者同時到期時，
+# httpx/anyio 可能把取消當成自己的逾時，SDK 接著重試，請求反而拖過期限）
+REQUEST_TIMEOUT_GRACE = 0.5
+
+_current: contextvars.ContextVar["Deadline | None"] = contextvars.ContextVar("deadline", default=None)
+
+
+class DeadlineExceeded(TimeoutError):
+    """某個階段超過期限"""
+
+    def __init__(self, stage: str, seconds: float):
+        super().__init__(f"{stage} 超過期限 {seconds:.1f}s")
+        self.stage = stage
+        self.seconds = seconds
+
+
+class Deadline:
+    """單一階段的期限（time.perf_counter() 時間軸）"""
+
+    def __init__(self, stage: str, seconds: float):
+        self.stage = stage
+        self.seconds = seconds
+        self.expires_at = time.perf_counter() + seconds
+
+    def remaining(self) -> float:
+        return self.expires_at - time.perf_counter()
+
+    def expired(self) -> bool:
+        return self.remaining() <= 0
+
+    def __repr__(self):
+        return f"<Deadline {self.stage} {self.remaining():.2f}s left>"
+
+
+class LatencyBudget:
+    """一次語音輸入的整體預算；latencyBudgetMs 為 0 時停用（stage() 回傳 None）"""
+
+    def __init__(self, cfg: dict, audio_seconds: float = 0.0, start: float | None = None):
+        self.cfg = cfg
+        self.scale = max(1.0, audio_seconds / BUDGET_REFERENCE_SECONDS)
+        self.start = time.perf_counter() if start is None else start
+        total_ms = cfg.get("latencyBudgetMs", 20000)
+        self.total = total_ms / 1000 * self.scale if total_ms > 0 else None
+
+    def stage(self, stage: str) -> Deadline | None:
+        """建立階段期限：階段設定值（0 為不限）與整體預算剩餘時間取較小者"""
+        if self.total is None:
+            return None
+        limits = [self.total - (time.perf_counter() - self.start)]
+        stage_ms = self.cfg.get(f"{stage}DeadlineMs", 0)
+        if stage_ms > 0:
+            limits.append(stage_ms / 1000 * self.scale)
+        return Deadline(stage, max(0.0, min(limits)))
+
+
+@contextmanager
+def deadline_scope(deadline: Deadline | None):
+    """在此範圍內的 SDK 呼叫（含 asyncio.to_thread 與複製 context 的工作執行緒）使用此期限"""
+    token = _current.set(deadline)
+    try:
+        yield deadline
+    finally:
+        _current.reset(token)
+
+
+def current_deadline() -> Deadline | None:
+    return _current.get()
+
+
+def deadline_expired() -> bool:
+    """目前的期限是否已過（用於區分「超過期限被取消」與使用者取消）"""
+    deadline = _current.get()
+    return deadline is not None and deadline.expired()
+
+
+def request_timeout(default: float | None = None) -> float | None:
+    """SDK 請求逾時秒數：目前期限的剩餘時間（加上寬限）與 default 取較小者；都沒有時回傳 None（不限）"""
+    deadline = _current.get()
+    if deadline is None:
+        return default
+    remaining = max(deadline.remaining(), 0.0) + REQUEST_TIMEOUT_GRACE
+    return remaining if default is None else min(default, remaining)
+
+
+def timeout_kwargs() -> dict:
+    """OpenAI / Anthropic SDK 的 timeout 參數；沒有期限時不傳入（沿用客戶端預設值）"""
+    timeout = request_timeout()
+    return {"timeout": timeout} if timeout is not None else {}
+
+
+async def within(deadline: Deadline | None, awaitable):
+    """在期限內等待 awaitable，超過時取消並拋出 DeadlineExceeded；deadline 為 None 時直接等待"""
+    if deadline is None:
+        return await awaitable
+    with deadline_scope(deadline):
+        try:
+            return await asyncio.wait_for(awaitable, timeout=max(deadline.remaining(), 0.0))
+        except TimeoutError:
+            if not deadline.expired():
+                raise    # 請求本身的逾時錯誤
+            raise DeadlineExceeded(deadline.stage, deadline.seconds) from None
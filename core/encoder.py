@@ -0,0 +1,164 @@
+"""
+音訊編碼模組
+錄音的同時在背景將音訊區塊壓縮為 WAV / FLAC / Ogg Opus，
+放開快捷鍵時上傳內容已準備好，並以單一 BytesIO 直接交給 API 客戶端（不再額外複製）
+
+FLAC / Opus 需要安裝 soundfile（內含 libsndfile）：
+  uv pip install soundfile
+未安裝時自動退回 WAV。
+"""
+
+import io
+import logging
+import queue
+import threading
+import wave
+
+import numpy as np
+
+from core.recorder import SAMPLE_RATE, CHANNELS
+
+logger = logging.getLogger("VoiceType.Encoder")
+
+# 編碼格式 → (libsndfile format, subtype, 副檔名)
+SOUNDFILE_CODECS = {
+    "flac": ("FLAC", "PCM_16", "flac"),
+    "opus": ("OGG", "OPUS", "ogg"),
+}
+
+
+class WavEncoder:
+    """未壓縮 WAV（不需額外套件）"""
+
+    extension = "wav"
+
+    def __init__(self, sample_rate: int = SAMPLE_RATE):
+        self.buffer = io.BytesIO()
+        self._wav = wave.open(self.buffer, "wb")
+        self._wav.setnchannels(CHANNELS)
+        self._wav.setsampwidth(2)  # int16 = 2 bytes
+        self._wav.setframerate(sample_rate)
+
+    def write(self, block: np.ndarray):
+        self._wav.writeframes(block.tobytes())
+
+    def close(self):
+        # wave 會回頭補寫檔頭長度，但不會關閉我們傳入的 BytesIO
+        self._wav.close()
+
+
+class SoundFileEncoder:
+    """透過 libsndfile 編碼 FLAC / Ogg Opus"""
+
+    def __init__(self, codec: str, sample_rate: int = SAMPLE_RATE):
+        import soundfile as sf
+
+        fmt, subtype, self.extension = SOUNDFILE_CODECS[codec]
+        self.buffer = io.BytesIO()
+        self._file = sf.SoundFile(
+            self.buffer, mode="w", samplerate=sample_rate, channels=CHANNELS,
+            format=fmt, subtype=subtype,
+        )
+
+    def write(self, block: np.ndarray):
+        self._file.write(block)
+
+    def close(self):
+        self._file.close()
+
+
+def create_encoder(codec: str = "wav", sample_rate: int = SAMPLE_RATE):
+    """依設定建立編碼器；soundfile 未安裝或不支援該格式時退回 WAV"""
+    if codec in SOUNDFILE_CODECS:
+        try:
+            return SoundFileEncoder(codec, sample_rate)
+        except ImportError:
+            logger.warning("未安裝 soundfile，%s 編碼不可用，改用 WAV", codec)
+        except Exception as e:
+            logger.warning("%s 編碼器初始化失敗 (%s)，改用 WAV", codec, e)
+    return WavEncoder(sample_rate)
+
+
+def _finish(encoder) -> io.BytesIO:
+    """結束編碼並回傳可直接上傳的檔案物件（共用同一塊記憶體，不複製）"""
+    encoder.close()
+    buf = encoder.buffer
+    buf.seek(0)
+    buf.name = f"recording.{encoder.extension}"
+    return buf
+
+
+def encode_audio(audio: np.ndarray, codec: str = "wav", sample_rate: int = SAMPLE_RATE) -> io.BytesIO:
+    """一次性編碼整段音訊"""
+    encoder = create_encoder(codec, sample_rate)
+    encoder.write(audio)
+    return _finish(encoder)
+
+
+class StreamingEncoder:
+    """
+    錄音期間的背景編碼器
+
+    feed() 由錄音執行緒呼叫，只把區塊放進佇列；實際編碼在背景執行緒進行，
+    避免壓縮運算拖慢音訊回呼造成掉音。
+    指定 trimmer (core.vad.StreamingTrimmer) 時先在背景裁掉靜音再編碼，放開時以 finish(expected) 確認與 VAD 裁剪的結果相同。
+    """
+
+    def __init__(self, codec: str = "wav", sample_rate: int = SAMPLE_RATE, trimmer=None):
+        self._encoder = create_encoder(codec, sample_rate)
+        self._trimmer = trimmer
+        self._samples = 0   # 已編碼的樣本數
+        self._queue: queue.Queue = queue.Queue()
+        self._worker = threading.Thread(target=self._run, daemon=True)
+        self._worker.start()
+
+    @property
+    def extension(self) -> str:
+        return self._encoder.extension
+
+    def feed(self, block: np.ndarray):
+        """錄音回呼：加入一個音訊區塊"""
+        self._queue.put(block)
+
+    def _run(self):
+        while True:
+            block = self._queue.get()
+            try:
+                if block is None:
+                    if self._trimmer:
+                        self._write(self._trimmer.finish())
+                    break
+                self._write(self._trimmer.feed(block) if self._trimmer else [block])
+            except Exception as e:
+                logger.error("音訊編碼失敗: %s", e)
+            finally:
+                self._queue.task_done()
+
+    def _write(self, pieces: list[np.ndarray]):
+        if pieces:
+            block = np.concatenate(pieces) if len(pieces) > 1 else pieces[0]
+            self._encoder.write(block)
+            self._samples += len(block)
+
+    def drain(self):
+        """等待已加入的區塊全部編碼完成（基準測試用：模擬錄音期間已編碼完畢）"""
+        self._queue.join()
+
+    def finish(self, expected: np.ndarray | None = None) -> io.BytesIO | None:
+        """
+        等待剩餘區塊編碼完成，回傳完整的上傳內容
+
+        expected 為實際要上傳的音訊（VAD 裁剪後）：已編碼的內容與之不同時
+        （背景裁剪的噪音底估計不同，或錄音後才切換 VAD）回傳 None，由呼叫端重新編碼
+        """
+        self._queue.put(None)
+        self._worker.join()
+        payload = _finish(self._encoder)
+        if expected is not None:
+            same = np.array_equal(self._trimmer.audio, expected) if self._trimmer else self._samples == len(expected)
+            if not same:
+                return None
+        return payload
+
+    def cancel(self):
+        self._queue.put(None)
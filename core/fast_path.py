@@ -0,0 +1,144 @@
+"""
+本地規則修飾（LLM 快速通道）
+Whisper 的輸出常常已經很乾淨，仍要付出 300–1500ms 的 LLM 延遲；
+先在本地以規則處理：去除口頭禪（清單取自預設系統提示詞）、補上句尾標點、中英夾雜加空格，
+再以信心分數判斷是否仍需要送給 LLM（含英文單字時交給 LLM 修正大小寫與專有名詞）
+"""
+
+import logging
+import re
+from dataclasses import dataclass, field
+from typing import Iterable
+
+from config.settings import DEFAULT_SYSTEM_PROMPT
+
+logger = logging.getLogger("VoiceType.FastPath")
+
+
+def _parse_fillers(prompt: str) -> list[str]:
+    """從系統提示詞「移除口頭禪和贅字（嗯、啊、那個…）」一行取出贅字清單"""
+    match = re.search(r"口頭禪[^（(]*[（(]([^）)]*)[）)]", prompt)
+    if not match:
+        return []
+    words = (w.strip(" .…") for w in match.group(1).split("、"))
+    return [w for w in words if w]
+
+
+FILLERS = _parse_fillers(DEFAULT_SYSTEM_PROMPT) + ["呃", "欸", "呃呃", "嗯嗯"]
+
+# 純語氣詞任何位置都可以刪；多字的贅字（那個、然後…）也可能是有意義的詞，只在句首或標點後刪除；
+# 單字的（對…）多半是實際回答，保留給 LLM 判斷
+_INTERJECTIONS = sorted({w for w in FILLERS if all(c in "嗯啊呃欸唔喔哦" for c in w)}, key=len, reverse=True)
+_DISCOURSE = sorted({w for w in FILLERS if len(w) > 1} - set(_INTERJECTIONS), key=len, reverse=True)
+
+_PUNCT = "，。！？、；：,.!?;:"
+_INTERJECTION_RE = re.compile(rf"(?:{'|'.join(map(re.escape, _INTERJECTIONS))})[{_PUNCT}\s]*") if _INTERJECTIONS else None
+_DISCOURSE_RE = re.compile(
+    rf"(^|[{_PUNCT}]\s*)(?:(?:{'|'.join(map(re.escape, _DISCOURSE))})[，,\s]*)+"
+) if _DISCOURSE else None
+
+_END_PUNCT = tuple("。！？.!?…」』）)\"'")
+_QUESTION_ENDINGS = ("嗎", "呢", "麼")
+_CJK_RANGE = r"\u3400-\u4dbf\u4e00-\u9fff\uf900-\ufaff"
+_CJK = re.compile(rf"[{_CJK_RANGE}]")
+_CJK_SPACE = re.compile(rf"(?<=[{_CJK_RANGE}])\s+(?=[{_CJK_RANGE}])")
+_LONG_UNPUNCTUATED = re.compile(r"[^，。！？、；：,.!?;:\s]{20,}")
+# 英文單字：預設提示詞要求修正大小寫、專有名詞與縮寫（python → Python、api → API），本地規則無法判斷
+_LATIN_WORD = re.compile(r"[A-Za-z][A-Za-z0-9.+#'-]*")
+
+# 需要 LLM 判斷的語句特徵
+_SELF_CORRECTION = re.compile(r"不對|不是啦|我是說|我的意思是|應該說|更正|重來|算了")
+_LIST_MARKERS = re.compile(r"第[一二三四五六七八九十\d]+[點個項步]|首先|其次|最後|步驟")
+# 常見的簡體專用字：Whisper 常輸出簡體中文；關閉本地簡轉繁 (convertTraditional) 時需交給 LLM 轉為繁體
+_SIMPLIFIED = re.compile("[这们个说来时会对为国过还没见么发开关问题实现样写让给请谢应该东车书长从点两间边记觉钱电话网页图买卖]")
+
+
+def fast_path_allowed(cfg: dict) -> bool:
+    """
+    是否允許本地快速修飾略過 LLM
+    本地規則只做預設提示詞要求的事；自訂提示詞（例如翻譯成英文）需由 LLM 執行，
+    除非使用者以 fastPathCustomPrompt 明確允許
+    """
+    if not cfg.get("fastPath", True):
+        return False
+    custom = cfg.get("systemPrompt", DEFAULT_SYSTEM_PROMPT).strip() != DEFAULT_SYSTEM_PROMPT.strip()
+    return not custom or cfg.get("fastPathCustomPrompt", False)
+
+
+@dataclass
+class FastPathResult:
+    text: str
+    confidence: float
+    reasons: list[str] = field(default_factory=list)
+
+
+def remove_fillers(text: str) -> tuple[str, int]:
+    """移除口頭禪，回傳 (結果, 移除的個數)"""
+    count = 0
+    if _INTERJECTION_RE:
+        text, n = _INTERJECTION_RE.subn("", text)
+        count += n
+    if _DISCOURSE_RE:
+        text, n = _DISCOURSE_RE.subn(r"\1", text)
+        count += n
+    return text.strip(_PUNCT + " "), count
+
+
+def add_end_punctuation(text: str) -> str:
+    if not text or text.endswith(_END_PUNCT):
+        return text
+    if _CJK.search(text[-1]):
+        return text + ("？" if text.endswith(_QUESTION_ENDINGS) else "。")
+    return text + "."
+
+
+def local_polish(
+    raw_text: str, remove_filler: bool = True, max_chars: int = 40, known_terms: Iterable[str] = (),
+) -> FastPathResult:
+    """
+    以本地規則修飾文字並評估信心分數（1.0 = 可以直接輸出，不需要 LLM）；
+    簡轉繁與中英夾雜空格由呼叫端以 core.postprocess 的後處理鏈處理
+
+    Args:
+        raw_text: STT 原始文字
+        remove_filler: 是否移除口頭禪
+        max_chars: 超過此長度的文字一律交給 LLM（長句需要斷句、分段）
+        known_terms: 已知寫法正確的英文詞（使用者字典）；其他英文單字一律交給 LLM 修正大小寫與拼寫
+    """
+    # Whisper 常以空白表示中文的停頓，改為逗號
+    text = _CJK_SPACE.sub("，", re.sub(r"\s+", " ", raw_text).strip())
+    reasons = []
+    confidence = 1.0
+
+    if len(text) > max_chars:
+        reasons.append("too_long")
+        confidence = 0.0
+    if _SELF_CORRECTION.search(text):
+        reasons.append("self_correction")
+        confidence = 0.0
+    if _LIST_MARKERS.search(text):
+        reasons.append("list")
+        confidence = 0.0
+    if _SIMPLIFIED.search(text):
+        reasons.append("simplified")
+        confidence = 0.0
+    known = {w for term in known_terms for w in _LATIN_WORD.findall(term)}
+    unknown = [w for w in _LATIN_WORD.findall(text) if w.rstrip(".") not in known]
+    if unknown:
+        reasons.append(f"latin:{len(unknown)}")
+        confidence = 0.0
+
+    if remove_filler:
+        text, removed = remove_fillers(text)
+        if removed:
+            # 每個被刪除的贅字都代表原文較口語，LLM 可能會有更好的改寫
+            reasons.append(f"fillers:{removed}")
+            confidence -= 0.1 * removed
+    if len(text) < 2:
+        reasons.append("empty")
+        confidence = 0.0
+    if _LONG_UNPUNCTUATED.search(text):
+        reasons.append("unpunctuated")
+        confidence -= 0.5
+
+    return FastPathResult(text=add_end_punctuation(text), confidence=max(confidence, 0.0), reasons=reasons)
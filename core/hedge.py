@@ -0,0 +1,160 @@
+"""
+對沖請求 (Hedged Requests)
+主要引擎在「近期延遲的第 N 百分位」內仍未回應（串流模式為尚未送出第一個 token）時，
+把同一個請求也送給備援引擎，採用先完成的結果，較慢的一方直接捨棄；
+主要引擎在期限內就失敗時，備援引擎同時作為錯誤回退
+
+arun_hedged 為 asyncio 版本：落後的請求直接取消（中斷 HTTP 連線），不必等它完成
+"""
+
+import asyncio
+import contextvars
+import logging
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from typing import Callable
+
+from core.metrics import metrics
+
+logger = logging.getLogger("VoiceType.Hedge")
+
+MIN_SAMPLES = 10        # 樣本數不足時改用設定的預設期限
+
+_executor = ThreadPoolExecutor(max_workers=6, thread_name_prefix="hedge")
+
+
+def hedge_delay(stage: str, provider: str, cfg: dict, default_ms: int) -> float:
+    """
+    計算對沖期限（秒）：該引擎此階段近期延遲的 hedgePercentile 百分位，
+    不低於 hedgeMinDelayMs；樣本不足時使用 default_ms
+    """
+    percentile = None
+    if metrics.count(stage, provider) >= MIN_SAMPLES:
+        percentile = metrics.percentile(stage, provider, cfg.get("hedgePercentile", 95))
+    delay = percentile if percentile is not None else default_ms / 1000
+    return max(delay, cfg.get("hedgeMinDelayMs", 300) / 1000)
+
+
+def _discard(future: Future, cleanup: Callable | None):
+    """捨棄落後的請求：尚未開始就取消，已在執行則等完成後清理（例如關閉串流連線）"""
+    if future.cancel() or cleanup is None:
+        return
+
+    def _on_done(f: Future):
+        if not f.cancelled() and f.exception() is None:
+            try:
+                cleanup(f.result())
+            except Exception as e:
+                logger.debug("清理落後的請求失敗: %s", e)
+
+    future.add_done_callback(_on_done)
+
+
+def run_hedged(
+    stage: str,
+    primary: tuple[str, Callable],
+    secondary: tuple[str, Callable] | None,
+    delay: float,
+    cleanup: Callable | None = None,
+):
+    """
+    執行對沖請求，回傳 (勝出的引擎, 結果)
+
+    Args:
+        stage: 用於計數器名稱（hedge.<stage>.fired / won）
+        primary / secondary: (引擎名稱, 無參數的呼叫函式)；secondary 為 None 時直接呼叫主要引擎
+        delay: 主要引擎的等待期限（秒）
+        cleanup: 捨棄落後結果時的清理函式（例如關閉串流 generator）
+    """
+    primary_name, primary_call = primary
+    if secondary is None:
+        return primary_name, primary_call()
+
+    secondary_name, secondary_call = secondary
+    # 工作執行緒沿用呼叫端的 context（延遲預算的期限等）
+    first = _executor.submit(contextvars.copy_context().run, primary_call)
+    done, _ = wait([first], timeout=delay)
+    if done and first.exception() is None:
+        return primary_name, first.result()
+
+    if done:
+        logger.warning("%s 主要引擎 %s 失敗 (%s)，改用 %s", stage, primary_name, first.exception(), secondary_name)
+    else:
+        logger.info("%s 主要引擎 %s 超過 %.0fms 未回應，同時送給 %s", stage, primary_name, delay * 1000, secondary_name)
+    metrics.increment(f"hedge.{stage}.fired")
+    second = _executor.submit(contextvars.copy_context().run, secondary_call)
+    names = {first: primary_name, second: secondary_name}
+
+    pending = {first, second} - done
+    errors = [first.exception()] if done else []
+    while pending:
+        finished, pending = wait(pending, return_when=FIRST_COMPLETED)
+        for future in finished:
+            if future.exception() is not None:
+                errors.append(future.exception())
+                continue
+            for loser in (finished | pending) - {future}:
+                _discard(loser, cleanup)
+            winner = names[future]
+            if future is second:
+                metrics.increment(f"hedge.{stage}.won")
+            logger.info("%s 對沖結果：%s 勝出", stage, winner)
+            return winner, future.result()
+    raise errors[0]
+
+
+async def arun_hedged(
+    stage: str,
+    primary: tuple[str, Callable],
+    secondary: tuple[str, Callable] | None,
+    delay: float,
+    cleanup: Callable | None = None,
+):
+    """
+    run_hedged 的 asyncio 版本，回傳 (勝出的引擎, 結果)
+
+    Args:
+        primary / secondary: (引擎名稱, 無參數、回傳 coroutine 的函式)
+        cleanup: 兩者同時完成時用來捨棄落後結果的 async 清理函式（例如關閉串流 generator）
+    """
+    primary_name, primary_call = primary
+    if secondary is None:
+        return primary_name, await primary_call()
+
+    secondary_name, secondary_call = secondary
+    first = asyncio.ensure_future(primary_call())
+    second = None
+    try:
+        done, _ = await asyncio.wait([first], timeout=delay)
+        if done and first.exception() is None:
+            return primary_name, first.result()
+
+        if done:
+            logger.warning("%s 主要引擎 %s 失敗 (%s)，改用 %s", stage, primary_name, first.exception(), secondary_name)
+        else:
+            logger.info("%s 主要引擎 %s 超過 %.0fms 未回應，同時送給 %s", stage, primary_name, delay * 1000, secondary_name)
+        metrics.increment(f"hedge.{stage}.fired")
+        second = asyncio.ensure_future(secondary_call())
+        names = {first: primary_name, second: secondary_name}
+
+        pending = {first, second} - done
+        errors = [first.exception()] if done else []
+        while pending:
+            finished, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+            for task in finished:
+                if task.exception() is not None:
+                    errors.append(task.exception())
+                    continue
+                for loser in finished - {task}:
+                    if cleanup is not None and loser.exception() is None:
+                        await cleanup(loser.result())
+                winner = names[task]
+                if task is second:
+                    metrics.increment(f"hedge.{stage}.won")
+                logger.info("%s 對沖結果：%s 勝出", stage, winner)
+                return winner, task.result()
+        raise errors[0]
+    finally:
+        # 落後（或整個管線被取消時）仍在進行的請求一律取消
+        for task in (first, second):
+            if task is not None and not task.done():
+                task.cancel()
@@ -0,0 +1,341 @@
+"""
+共用 HTTP 連線池
+STT 與 LLM 共用同一組 SDK 客戶端（以「引擎 + API 端點 + 金鑰」為鍵，例如 Groq 同時做 STT 與 LLM 時只有一個連線池），
+連線池使用調整過的 httpx 上限，可選擇 HTTP/2；
+啟動時與按下快捷鍵時在背景預先連線（說話的同時完成 DNS + TCP + TLS），閒置時定期送出保活請求；
+登錄表存在模組層級，重新載入設定時不會被丟棄
+
+非同步客戶端（AsyncOpenAI 等）供 asyncio 處理管線使用，可在請求途中取消；
+連線池綁定於管線的事件迴圈 (bind_loop)，綁定後預先連線與保活改為針對非同步連線池
+"""
+
+import asyncio
+import importlib
+import logging
+import threading
+import time
+
+logger = logging.getLogger("VoiceType.HttpClients")
+
+MAX_CONNECTIONS = 10
+MAX_KEEPALIVE_CONNECTIONS = 5
+KEEPALIVE_EXPIRY_SECONDS = 120      # 用戶端保留閒置連線的時間
+CONNECT_TIMEOUT_SECONDS = 5.0
+WARM_TIMEOUT_SECONDS = 3.0
+KEEPALIVE_IDLE_LIMIT_SECONDS = 600  # 超過這段時間沒有語音輸入就停止保活
+
+# 各引擎使用的 SDK（決定連線池類型）
+PROVIDER_SDKS = {"groq": "openai", "openai": "openai", "anthropic": "anthropic", "gemini": "gemini", "ollama": "requests"}
+
+
+def _http2_available() -> bool:
+    try:
+        import h2  # noqa: F401
+        return True
+    except ImportError:
+        return False
+
+
+def _httpx_module(client_cls):
+    """取得客戶端類別所屬的 httpx 模組（Limits / Timeout 必須來自同一個模組）"""
+    base = next(c for c in client_cls.__mro__ if c.__name__ in ("Client", "AsyncClient"))
+    return importlib.import_module(base.__module__.split(".")[0])
+
+
+class ClientRegistry:
+    """全域共用的 SDK 客戶端與連線池"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._clients: dict[tuple, object] = {}
+        self._pools: dict[tuple[str, str], object] = {}   # (sdk, base_url) -> httpx.Client / requests.Session
+        self._async_pools: dict[tuple[str, str], object] = {}   # (sdk, base_url) -> httpx.AsyncClient
+        self._loop: asyncio.AbstractEventLoop | None = None
+        self._warming: set[tuple[bool, tuple[str, str]]] = set()   # (是否非同步, (sdk, base_url))
+        self.http2 = False
+        self.keepalive_seconds = 0
+        self._last_activity = time.monotonic()
+        self._keepalive_thread: threading.Thread | None = None
+
+    def configure(self, cfg: dict):
+        """套用 httpHttp2 / httpKeepaliveSeconds；切換 HTTP/2 時重建所有連線池"""
+        http2 = cfg.get("httpHttp2", False)
+        if http2 and not _http2_available():
+            logger.warning("HTTP/2 需要安裝 h2 (pip install httpx[http2])，改用 HTTP/1.1")
+            http2 = False
+        if http2 != self.http2:
+            self.close()
+            self.http2 = http2
+        self.keepalive_seconds = cfg.get("httpKeepaliveSeconds", 25)
+        if self.keepalive_seconds > 0 and self._keepalive_thread is None:
+            self._keepalive_thread = threading.Thread(target=self._keepalive_loop, name="http-keepalive", daemon=True)
+            self._keepalive_thread.start()
+
+    # ── 客戶端 ───────────────────────────────────────────────────────────────
+
+    def _limits(self, client_cls) -> dict:
+        httpx = _httpx_module(client_cls)
+        return {
+            "limits": httpx.Limits(
+                max_connections=MAX_CONNECTIONS,
+                max_keepalive_connections=MAX_KEEPALIVE_CONNECTIONS,
+                keepalive_expiry=KEEPALIVE_EXPIRY_SECONDS,
+            ),
+            "timeout": httpx.Timeout(60.0, connect=CONNECT_TIMEOUT_SECONDS),
+            "http2": self.http2,
+        }
+
+    def _pool(self, sdk: str, base_url: str):
+        key = (sdk, base_url)
+        with self._lock:
+            pool = self._pools.get(key)
+            if pool is not None:
+                return pool
+        if sdk == "requests":
+            import requests
+            pool = requests.Session()
+        else:
+            # 使用各 SDK 自帶的 httpx 預設客戶端類別，確保與 SDK 相容
+            if sdk == "openai":
+                from openai import DefaultHttpxClient as client_cls
+            elif sdk == "anthropic":
+                from anthropic import DefaultHttpxClient as client_cls
+            else:
+                from httpx import Client as client_cls
+            pool = client_cls(**self._limits(client_cls))
+        with self._lock:
+            # 其他執行緒可能同時建立了同一個連線池，以先建立者為準
+            existing = self._pools.setdefault(key, pool)
+        if existing is not pool:
+            pool.close()
+        return existing
+
+    def _async_pool(self, sdk: str, base_url: str):
+        """非同步連線池；Ollama 也改用 httpx.AsyncClient（requests 不支援取消）"""
+        key = (sdk, base_url)
+        with self._lock:
+            pool = self._async_pools.get(key)
+            if pool is not None:
+                return pool
+        if sdk == "openai":
+            from openai import DefaultAsyncHttpxClient as client_cls
+        elif sdk == "anthropic":
+            from anthropic import DefaultAsyncHttpxClient as client_cls
+        else:
+            from httpx import AsyncClient as client_cls
+        pool = client_cls(**self._limits(client_cls))
+        with self._lock:
+            existing = self._async_pools.setdefault(key, pool)
+        if existing is not pool:
+            self._aclose([pool])
+        return existing
+
+    def _client(self, key: tuple, factory):
+        with self._lock:
+            client = self._clients.get(key)
+        if client is None:
+            client = factory()
+            with self._lock:
+                client = self._clients.setdefault(key, client)
+        return client
+
+    def openai(self, provider: str, api_key: str, base_url: str):
+        """OpenAI 相容客戶端（OpenAI、Groq）"""
+        def factory():
+            from openai import OpenAI
+            return OpenAI(api_key=api_key, base_url=base_url, http_client=self._pool("openai", base_url))
+        return self._client(("openai", provider, base_url, api_key), factory)
+
+    def anthropic(self, api_key: str, base_url: str):
+        def factory():
+            import anthropic
+            return anthropic.Anthropic(api_key=api_key, base_url=base_url, http_client=self._pool("anthropic", base_url))
+        return self._client(("anthropic", base_url, api_key), factory)
+
+    def gemini(self, api_key: str, base_url: str):
+        def factory():
+            from google import genai
+            from google.genai import types
+            try:
+                http_options = types.HttpOptions(base_url=base_url, httpx_client=self._pool("gemini", base_url))
+            except Exception:
+                # 舊版 google-genai 不支援注入 httpx 客戶端
+                http_options = types.HttpOptions(base_url=base_url)
+            return genai.Client(api_key=api_key, http_options=http_options)
+        return self._client(("gemini", base_url, api_key), factory)
+
+    def session(self, base_url: str):
+        """Ollama 使用的 requests.Session"""
+        return self._pool("requests", base_url)
+
+    def async_openai(self, provider: str, api_key: str, base_url: str):
+        def factory():
+            from openai import AsyncOpenAI
+            return AsyncOpenAI(api_key=api_key, base_url=base_url, http_client=self._async_pool("openai", base_url))
+        return self._client(("async-openai", provider, base_url, api_key), factory)
+
+    def async_anthropic(self, api_key: str, base_url: str):
+        def factory():
+            import anthropic
+            return anthropic.AsyncAnthropic(
+                api_key=api_key, base_url=base_url, http_client=self._async_pool("anthropic", base_url),
+            )
+        return self._client(("async-anthropic", base_url, api_key), factory)
+
+    def async_gemini(self, api_key: str, base_url: str):
+        """回傳 genai.Client.aio（非同步介面）"""
+        def factory():
+            from google import genai
+            from google.genai import types
+            try:
+                http_options = types.HttpOptions(
+                    base_url=base_url, httpx_async_client=self._async_pool("gemini", base_url),
+                )
+            except Exception:
+                http_options = types.HttpOptions(base_url=base_url)
+            return genai.Client(api_key=api_key, http_options=http_options).aio
+        return self._client(("async-gemini", base_url, api_key), factory)
+
+    def async_session(self, base_url: str):
+        """Ollama 使用的 httpx.AsyncClient"""
+        return self._async_pool("httpx", base_url)
+
+    def bind_loop(self, loop: asyncio.AbstractEventLoop):
+        """綁定 asyncio 處理管線的事件迴圈（非同步連線池只能在該迴圈上使用）"""
+        self._loop = loop
+
+    # ── 預先連線與保活 ───────────────────────────────────────────────────────
+
+    def warm(self, settings, cfg: dict):
+        """在背景對目前設定會用到的引擎預先建立客戶端與連線（不阻塞呼叫端）"""
+        self._last_activity = time.monotonic()
+        threading.Thread(target=self._warm, args=(settings, cfg), name="http-warm", daemon=True).start()
+
+    def _warm(self, settings, cfg: dict):
+        providers = {
+            cfg.get("sttProvider"), cfg.get("llmProvider"),
+            cfg.get("hedgeSttProvider"), cfg.get("hedgeLlmProvider"),
+            *cfg.get("sttProviders", []), *cfg.get("llmProviders", []),
+        }
+        for provider in providers:
+            if provider not in PROVIDER_SDKS:
+                continue
+            if provider == "ollama":
+                base_url = settings.get_api_key("ollama") or "http://localhost:11434"
+                if self._loop:
+                    self._warm_async(self.async_session(base_url), "httpx", base_url)
+                else:
+                    self._warm_async(self.session(base_url), "requests", base_url)
+                continue
+            api_key = settings.get_api_key(provider)
+            if not api_key:
+                continue
+            base_url = settings.get_base_url(provider)
+            sdk = PROVIDER_SDKS[provider]
+            try:
+                prefix = "async_" if self._loop else ""
+                if sdk == "openai":
+                    getattr(self, prefix + "openai")(provider, api_key, base_url)
+                else:
+                    getattr(self, prefix + sdk)(api_key, base_url)
+                pool = self._async_pool(sdk, base_url) if self._loop else self._pool(sdk, base_url)
+            except Exception as e:
+                logger.debug("建立 %s 客戶端失敗: %s", provider, e)
+                continue
+            self._warm_async(pool, sdk, base_url)
+
+    def _warm_async(self, pool, sdk: str, base_url: str):
+        """在背景送出預先連線請求（同步連線池用執行緒，非同步連線池排入事件迴圈）"""
+        key = (sdk, base_url)
+        is_async = hasattr(pool, "aclose")
+        with self._lock:
+            if (is_async, key) in self._warming:
+                return
+            self._warming.add((is_async, key))
+        if is_async:
+            try:
+                asyncio.run_coroutine_threadsafe(self._aping(pool, key), self._loop)
+            except Exception:
+                with self._lock:
+                    self._warming.discard((True, key))
+            return
+        threading.Thread(target=self._ping, args=(pool, key), name="http-warm", daemon=True).start()
+
+    def _ping(self, pool, key):
+        """送出輕量的 HEAD 請求以建立（或維持）連線；回應狀態碼不重要"""
+        sdk, base_url = key
+        start = time.perf_counter()
+        try:
+            pool.head(base_url, timeout=WARM_TIMEOUT_SECONDS)
+            logger.debug("預先連線 %s 完成 (%.0fms)", base_url, (time.perf_counter() - start) * 1000)
+        except Exception as e:
+            logger.debug("預先連線 %s 失敗: %s", base_url, e)
+        finally:
+            with self._lock:
+                self._warming.discard((False, key))
+
+    async def _aping(self, pool, key):
+        sdk, base_url = key
+        start = time.perf_counter()
+        try:
+            await pool.head(base_url, timeout=WARM_TIMEOUT_SECONDS)
+            logger.debug("預先連線 %s 完成 (%.0fms)", base_url, (time.perf_counter() - start) * 1000)
+        except Exception as e:
+            logger.debug("預先連線 %s 失敗: %s", base_url, e)
+        finally:
+            with self._lock:
+                self._warming.discard((True, key))
+
+    def _keepalive_loop(self):
+        while True:
+            interval = self.keepalive_seconds
+            time.sleep(interval if interval > 0 else 60)
+            if interval <= 0 or time.monotonic() - self._last_activity > KEEPALIVE_IDLE_LIMIT_SECONDS:
+                continue
+            with self._lock:
+                pools = list(self._async_pools.items() if self._loop else self._pools.items())
+            for key, pool in pools:
+                self._warm_async(pool, *key)
+
+    def close(self):
+        """關閉所有連線池（下次使用時重新建立）"""
+        with self._lock:
+            pools = list(self._pools.values())
+            async_pools = list(self._async_pools.values())
+            self._pools.clear()
+            self._async_pools.clear()
+            self._clients.clear()
+        for pool in pools:
+            try:
+                pool.close()
+            except Exception:
+                pass
+        self._aclose(async_pools)
+
+    def _aclose(self, pools):
+        """非同步連線池必須在所屬的事件迴圈上關閉；迴圈不存在時直接捨棄"""
+        loop = self._loop
+        if not pools or loop is None or loop.is_closed():
+            return
+
+        async def _close_all():
+            for pool in pools:
+                try:
+                    await pool.aclose()
+                except Exception:
+                    pass
+
+        asyncio.run_coroutine_threadsafe(_close_all(), loop)
+
+
+_registry: ClientRegistry | None = None
+_registry_lock = threading.Lock()
+
+
+def get_clients() -> ClientRegistry:
+    """取得全域共用的客戶端登錄表（跨設定重新載入保留）"""
+    global _registry
+    with _registry_lock:
+        if _registry is None:
+            _registry = ClientRegistry()
+        return _registry
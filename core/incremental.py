@@ -0,0 +1,156 @@
+"""
+增量語音辨識模組
+在按住快捷鍵說話的同時，於停頓處切出已完成的句段並在背景送出辨識，
+放開快捷鍵時只需等待最後一段，最後依序拼接各段文字
+"""
+
+import logging
+import queue
+import re
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+from core.recorder import SAMPLE_RATE
+
+logger = logging.getLogger("VoiceType.Incremental")
+
+# 低於此 RMS 能量的區塊視為靜音 (int16 振幅)
+SPEECH_RMS_THRESHOLD = 400.0
+
+# 句段拼接時需要補空格的邊界（英數字與英數字相鄰）
+_ASCII_TAIL = re.compile(r"[A-Za-z0-9.,!?;:]$")
+_ASCII_HEAD = re.compile(r"^[A-Za-z0-9]")
+
+
+class PauseSegmenter:
+    """依停頓切割句段：已有語音且連續靜音超過門檻時，於靜音處切出一段"""
+
+    def __init__(self, silence_ms: int = 700, min_segment_seconds: float = 4.0,
+                 sample_rate: int = SAMPLE_RATE):
+        self.sample_rate = sample_rate
+        self.silence_samples = int(sample_rate * silence_ms / 1000)
+        self.min_segment_samples = int(sample_rate * min_segment_seconds)
+        self._blocks: list[np.ndarray] = []
+        self._samples = 0
+        self._silent_run = 0
+        self._has_speech = False
+
+    def push(self, block: np.ndarray) -> np.ndarray | None:
+        """加入一個音訊區塊；若剛好形成完整句段則回傳該段音訊"""
+        self._blocks.append(block)
+        self._samples += len(block)
+
+        rms = np.sqrt(np.mean(block.astype(np.float32) ** 2)) if len(block) else 0.0
+        if rms >= SPEECH_RMS_THRESHOLD:
+            self._has_speech = True
+            self._silent_run = 0
+            return None
+
+        self._silent_run += len(block)
+        if (
+            self._has_speech
+            and self._silent_run >= self.silence_samples
+            and self._samples >= self.min_segment_samples
+        ):
+            return self._cut()
+        return None
+
+    def flush(self) -> np.ndarray | None:
+        """取出剩餘尚未切割的音訊（放開快捷鍵時呼叫）"""
+        if not self._blocks:
+            return None
+        has_speech = self._has_speech
+        segment = self._cut()
+        return segment if has_speech else None
+
+    def _cut(self) -> np.ndarray:
+        segment = np.concatenate(self._blocks)
+        self._blocks = []
+        self._samples = 0
+        self._silent_run = 0
+        self._has_speech = False
+        return segment
+
+
+def join_segments(texts: list[str]) -> str:
+    """依序拼接各段文字；英數字相鄰時補半形空格，中文直接相接"""
+    result = ""
+    for text in texts:
+        text = text.strip()
+        if not text:
+            continue
+        if result and _ASCII_TAIL.search(result) and _ASCII_HEAD.search(text):
+            result += " "
+        result += text
+    return result
+
+
+class IncrementalTranscriber:
+    """
+    單次錄音的增量辨識工作階段
+
+    feed() 由錄音執行緒呼叫，只負責把區塊放進佇列；
+    切割與送出辨識都在背景執行緒完成，不阻塞音訊回呼。
+    """
+
+    def __init__(self, stt, cfg: dict):
+        self.stt = stt
+        self.segmenter = PauseSegmenter(
+            silence_ms=cfg.get("segmentSilenceMs", 700),
+            min_segment_seconds=cfg.get("minSegmentSeconds", 4.0),
+        )
+        # 本地模型同一時間只能處理一段；雲端引擎可並行上傳
+        workers = 1 if cfg.get("sttProvider") == "local" else 3
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="stt-segment")
+        self._futures = []
+        self._queue: queue.Queue = queue.Queue()
+        self._cancelled = False
+        self._worker = threading.Thread(target=self._run, daemon=True)
+        self._worker.start()
+
+    def feed(self, block: np.ndarray):
+        """錄音回呼：加入一個音訊區塊"""
+        self._queue.put(block)
+
+    def _run(self):
+        while True:
+            block = self._queue.get()
+            if block is None:
+                break
+            segment = self.segmenter.push(block)
+            if segment is not None and not self._cancelled:
+                self._submit(segment)
+
+    def _submit(self, segment: np.ndarray):
+        index = len(self._futures)
+        logger.info("Segment %d cut (%.1fs), transcribing in background", index, len(segment) / SAMPLE_RATE)
+        self._futures.append(self._executor.submit(self.stt.transcribe, segment))
+
+    def finish(self) -> str:
+        """停止接收音訊，送出最後一段並等待所有句段完成，回傳拼接後的文字"""
+        self._queue.put(None)
+        self._worker.join()
+
+        tail = self.segmenter.flush()
+        if tail is not None:
+            self._submit(tail)
+
+        try:
+            texts = [f.result() for f in self._futures]
+        finally:
+            self._executor.shutdown(wait=False)
+        return join_segments(texts)
+
+    @property
+    def segment_count(self) -> int:
+        return len(self._futures)
+
+    def cancel(self):
+        """取消工作階段，丟棄尚未開始的句段"""
+        self._cancelled = True
+        self._queue.put(None)
+        for f in self._futures:
+            f.cancel()
+        self._executor.shutdown(wait=False)
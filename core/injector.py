@@ -3,28 +3,58 @@
 將修飾後的文字注入到當前游標位置
 
 使用剪貼簿 + Ctrl+V 方式，相容所有應用程式（Chrome、Firefox、桌面應用）
-支援串流打字 (streaming) 注入
+支援串流注入 (streaming)：預設累積 token 到句子 / 子句邊界（或超過等待上限）後整段貼上，
+也可改回逐字模擬打字 (streamInjectMode = "typing")
 """
 
-import time
 import logging
+import queue
+import re
+import threading
+import time
 from typing import Generator, Union
 
-import pyperclip
-import pyautogui
-import keyboard
-
 logger = logging.getLogger("VoiceType.Injector")
 
 CLIPBOARD_SETTLE_SECONDS = 0.1
 STREAM_TYPING_DELAY = 0.005  # 模擬打字的延遲
+STREAM_PASTE_SETTLE_SECONDS = 0.03  # 串流貼上：寫入剪貼簿到按下 Ctrl+V 的間隔
+STREAM_CLAUSE_MIN_CHARS = 8         # 子句邊界（逗號等）至少累積這麼多字才送出，避免過度零碎
+
+_SENTENCE_END = re.compile(r"[。！？!?…\n]|[.;](?=\s|$)")
+_CLAUSE_END = re.compile(r"[，、；：,;:]")
+
+_END = object()
+
+
+def find_flush_point(buffer: str, min_clause_chars: int = STREAM_CLAUSE_MIN_CHARS) -> int:
+    """回傳緩衝區中最後一個可送出的位置（該位置之前的文字可以貼上），沒有則回傳 0"""
+    cut = 0
+    for match in _SENTENCE_END.finditer(buffer):
+        cut = match.end()
+    for match in _CLAUSE_END.finditer(buffer, cut):
+        if match.end() >= min_clause_chars:
+            cut = match.end()
+    return cut
 
 
 class TextInjector:
     """文字注入引擎"""
 
-    def __init__(self, settings):
+    def __init__(self, settings, backend=None):
+        """
+        Args:
+            backend: 輸入後端（預設為實際剪貼簿與鍵盤），可替換為 FakeInputBackend 以便無桌面環境測試
+        """
         self.settings = settings
+        self._backend = backend
+
+    @property
+    def backend(self):
+        if self._backend is None:
+            from core.input_backends import SystemInputBackend
+            self._backend = SystemInputBackend()
+        return self._backend
 
     def inject(self, text_or_generator: Union[str, Generator[str, None, None]]):
         """
@@ -34,24 +64,27 @@ class TextInjector:
             if not text_or_generator:
                 return
             self._inject_clipboard(text_or_generator)
-        else:
+        elif self.settings.get_config().get("streamInjectMode", "chunked") == "typing":
             self._inject_stream(text_or_generator)
+        else:
+            self._inject_chunked(text_or_generator)
 
     def _inject_clipboard(self, text: str):
         """將文字注入到當前游標位置（保護原有剪貼簿內容）"""
+        backend = self.backend
         try:
             # 1. 備份原有剪貼簿內容
-            original_clipboard = pyperclip.paste()
-            
+            original_clipboard = backend.get_clipboard()
+
             # 2. 寫入新文字並貼上
-            pyperclip.copy(text)
+            backend.set_clipboard(text)
             time.sleep(CLIPBOARD_SETTLE_SECONDS)
-            pyautogui.hotkey("ctrl", "v")
+            backend.paste()
             time.sleep(CLIPBOARD_SETTLE_SECONDS)
-            
+
             # 3. 還原剪貼簿內容
-            pyperclip.copy(original_clipboard)
-            
+            backend.set_clipboard(original_clipboard)
+
             logger.info("Injected %d characters via clipboard (and restored original content)", len(text))
         except Exception as e:
             logger.error("Text injection failed: %s", e)
@@ -63,10 +96,106 @@ class TextInjector:
             count = 0
             for chunk in generator:
                 if chunk:
-                    # 使用 keyboard.write 來輸出，因為它支援 Unicode
-                    keyboard.write(chunk, delay=STREAM_TYPING_DELAY)
+                    self.backend.type_text(chunk, STREAM_TYPING_DELAY)
                     count += len(chunk)
             logger.info("Stream injected %d characters", count)
         except Exception as e:
             logger.error("Stream injection failed: %s", e)
             raise
+
+    def _inject_chunked(self, generator: Generator[str, None, None]):
+        """
+        串流分段貼上：在背景讀取 token，於句子 / 子句邊界或等待超過 streamFlushMs 時整段貼上；
+        原有剪貼簿只在開始時備份一次、結束時還原
+        """
+        backend = self.backend
+        max_wait = self.settings.get_config().get("streamFlushMs", 400) / 1000
+
+        # 讀取 token 與貼上分開進行：貼上等待剪貼簿的期間，LLM 的輸出繼續累積
+        chunks: queue.Queue = queue.Queue()
+
+        def _reader():
+            try:
+                for chunk in generator:
+                    if chunk:
+                        chunks.put(chunk)
+            except Exception as e:
+                chunks.put(e)
+            chunks.put(_END)
+
+        threading.Thread(target=_reader, name="stream-reader", daemon=True).start()
+
+        original_clipboard = backend.get_clipboard()
+        buffer = ""
+        buffered_at = 0.0   # 緩衝區中最早一段文字的到達時間
+        last_paste = 0.0
+        count = flushes = 0
+
+        def _flush(text: str):
+            nonlocal last_paste, count, flushes
+            backend.set_clipboard(text)
+            time.sleep(STREAM_PASTE_SETTLE_SECONDS)
+            backend.paste()
+            last_paste = time.perf_counter()
+            count += len(text)
+            flushes += 1
+
+        def _take(item) -> bool:
+            """把一個讀到的項目併入緩衝區，回傳串流是否已結束"""
+            nonlocal buffer, buffered_at
+            if item is _END:
+                return True
+            if isinstance(item, Exception):
+                raise item
+            if item is not None:
+                if not buffer:
+                    buffered_at = time.perf_counter()
+                buffer += item
+            return False
+
+        def _drain(done: bool) -> bool:
+            """併入所有已到達的 token（貼上較慢時一次送出較長的一段，減少貼上次數）"""
+            while not done:
+                try:
+                    done = _take(chunks.get_nowait())
+                except queue.Empty:
+                    break
+            return done
+
+        def _cut(done: bool) -> int:
+            if done or (buffer and time.perf_counter() - buffered_at >= max_wait):
+                return len(buffer)
+            return find_flush_point(buffer)
+
+        try:
+            done = False
+            while not done:
+                timeout = None if not buffer else max(buffered_at + max_wait - time.perf_counter(), 0)
+                try:
+                    done = _take(chunks.get(timeout=timeout))
+                except queue.Empty:
+                    pass
+                done = _drain(done)
+                if not _cut(done):
+                    continue
+                # 目標程式在處理 Ctrl+V 時才讀取剪貼簿，上一段貼上後要等它讀完才能覆寫；
+                # 等待期間到達的 token 一併送出
+                wait = last_paste + CLIPBOARD_SETTLE_SECONDS - time.perf_counter()
+                if wait > 0:
+                    time.sleep(wait)
+                    done = _drain(done)
+                cut = _cut(done)
+                text, buffer = buffer[:cut], buffer[cut:]
+                buffered_at = time.perf_counter()
+                _flush(text)
+
+            logger.info("Stream pasted %d characters in %d chunks", count, flushes)
+        except Exception as e:
+            logger.error("Stream injection failed: %s", e)
+            raise
+        finally:
+            if flushes:
+                wait = last_paste + CLIPBOARD_SETTLE_SECONDS - time.perf_counter()
+                if wait > 0:
+                    time.sleep(wait)
+            backend.set_clipboard(original_clipboard)
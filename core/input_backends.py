@@ -0,0 +1,87 @@
+"""
+文字注入的輸入後端
+SystemInputBackend 使用實際的剪貼簿與鍵盤（pyperclip、pyautogui、keyboard）；
+FakeInputBackend 只記錄「畫面上」出現的文字與時間，並模擬按鍵與貼上的成本，
+讓 TextInjector 能在沒有桌面環境的機器上量測吞吐量
+
+用法：
+  screen = FakeInputBackend()
+  injector = TextInjector(settings, backend=screen)
+  injector.inject(generator)
+  screen.text, screen.first_visible_at
+"""
+
+import logging
+import threading
+import time
+
+logger = logging.getLogger("VoiceType.InputBackend")
+
+
+class SystemInputBackend:
+    """實際的剪貼簿與鍵盤輸入"""
+
+    def __init__(self):
+        import keyboard
+        import pyautogui
+        import pyperclip
+
+        self._keyboard = keyboard
+        self._pyautogui = pyautogui
+        self._pyperclip = pyperclip
+
+    def get_clipboard(self) -> str:
+        return self._pyperclip.paste()
+
+    def set_clipboard(self, text: str):
+        self._pyperclip.copy(text)
+
+    def paste(self):
+        self._pyautogui.hotkey("ctrl", "v")
+
+    def type_text(self, text: str, delay: float):
+        # 使用 keyboard.write 來輸出，因為它支援 Unicode
+        self._keyboard.write(text, delay=delay)
+
+
+class FakeInputBackend:
+    """
+    模擬的輸入裝置
+
+    Args:
+        key_event_ms: 每個合成按鍵事件的額外成本（SendInput + 目標程式處理）
+        paste_ms: 目標程式處理一次 Ctrl+V 的時間
+    """
+
+    def __init__(self, key_event_ms: float = 1.0, paste_ms: float = 8.0, clipboard: str = ""):
+        self.key_event_ms = key_event_ms
+        self.paste_ms = paste_ms
+        self.clipboard = clipboard
+        self.text = ""
+        self.first_visible_at: float | None = None
+        self.key_events = 0
+        self.pastes = 0
+        self._lock = threading.Lock()
+
+    def _show(self, text: str):
+        with self._lock:
+            if text and self.first_visible_at is None:
+                self.first_visible_at = time.perf_counter()
+            self.text += text
+
+    def get_clipboard(self) -> str:
+        return self.clipboard
+
+    def set_clipboard(self, text: str):
+        self.clipboard = text
+
+    def paste(self):
+        time.sleep(self.paste_ms / 1000)
+        self.pastes += 1
+        self._show(self.clipboard)
+
+    def type_text(self, text: str, delay: float):
+        for ch in text:
+            time.sleep(delay + self.key_event_ms / 1000)
+            self.key_events += 1
+            self._show(ch)
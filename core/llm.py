@@ -1,25 +1,88 @@
 """
 LLM 智能修飾模組
 將 STT 原始文字送給 LLM 進行去贅字、修正、格式化
-支援 OpenAI ChatGPT、Anthropic Claude、Groq、Ollama
+支援 OpenAI ChatGPT、Anthropic Claude、Groq、Ollama、Gemini
+系統提示詞的固定前綴每次完全相同，由各供應商的提示詞快取重複使用（core/prompt_cache.py）
+設定多個引擎（llmProviders）時由 core/router.py 選擇最健康的引擎，失敗時自動改用下一個
+polish 為同步版本；apolish 為 asyncio 版本（供可取消的處理管線使用，取消時會中斷 HTTP 請求）
 """
 
+import itertools
+import json
 import logging
-import re
-from typing import Generator, Union
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass
+from typing import AsyncGenerator, Generator, Union
 
 from config.settings import DEFAULT_SYSTEM_PROMPT
+from core.fast_path import fast_path_allowed, local_polish
+from core.context import get_detector
+from core.deadline import request_timeout, timeout_kwargs
+from core.hedge import arun_hedged, hedge_delay, run_hedged
+from core.http_clients import get_clients
+from core.metrics import Trace, metrics
+from core.polish_cache import get_cache
+from core.postprocess import ProcessorChain, S2TConverter, build_chain, s2t_enabled
+from core.prompt_cache import (
+    anthropic_system, get_gemini_cache, record_anthropic_usage, record_gemini_usage, record_openai_usage,
+)
+from core.router import get_router
 
 logger = logging.getLogger("VoiceType.LLM")
 
+LLM_PROVIDERS = ("openai", "anthropic", "groq", "ollama", "gemini")
 
-def _format_mixed_text(text: str) -> str:
-    """中英夾雜自動加空格 Regex 後處理"""
-    # 英文/數字後面接著中文字
-    text = re.sub(r'([a-zA-Z0-9])([\u4e00-\u9fa5])', r'\1 \2', text)
-    # 中文字後面接著英文/數字
-    text = re.sub(r'([\u4e00-\u9fa5])([a-zA-Z0-9])', r'\1 \2', text)
-    return text
+# 語境鍵 -> (類別, 提示詞)；類別用於 fastPathContexts 等依語境調整的設定
+CONTEXT_PROMPTS = {
+    "web_mail": ("mail", "用戶正在瀏覽器中撰寫郵件，語氣應正式專業"),
+    "web_chat": ("chat", "用戶正在網頁版通訊軟體聊天，語氣可以輕鬆口語"),
+    "browser": ("browser", "用戶在瀏覽網頁，可能在填寫表單或撰筆記，語氣應清晰有理"),
+    "code": ("code", "用戶在寫程式，可能是在寫註解、撰寫技術文件或 Commit Message，語氣應技術性且簡潔"),
+    "document": ("document", "用戶在撰寫文件或筆記，語氣應清晰有條理"),
+    "work_chat": ("chat", "用戶在工作通訊軟體，語氣應簡潔專業"),
+    "chat": ("chat", "用戶正在通訊軟體聊天，語氣可以輕鬆口語"),
+    "mail": ("mail", "用戶正在撰寫郵件，語氣應正式專業"),
+    "web_document": ("document", "用戶在撰寫文件，語氣應清晰有條理"),
+}
+
+
+def _once(text: str):
+    yield text
+
+
+async def _aonce(text: str):
+    yield text
+
+
+async def _achain(first: str, rest):
+    yield first
+    async for chunk in rest:
+        yield chunk
+
+
+@dataclass
+class _PolishRequest:
+    """一次修飾請求的狀態（同步與 asyncio 版本共用前後處理）"""
+    raw_text: str
+    cfg: dict
+    trace: Trace
+    provider: str
+    stream: bool
+    start: float
+    chain: ProcessorChain | None = None  # 輸出後處理（簡轉繁、中英夾雜空格），串流與非串流共用
+    system_prompt: str = ""
+    cache: object = None
+    key: str | None = None
+    text: str | None = None     # 不需要呼叫 LLM 時（短句、快速通道、快取命中）直接輸出的文字
+
+    def use_winner(self, winner: str):
+        """對沖或路由由主要引擎以外的引擎回應時，結果不寫入主要引擎的快取鍵"""
+        if winner != self.provider:
+            self.key = None
+            self.provider = winner
+        if self.provider not in LLM_PROVIDERS:
+            self.key = None
 
 
 class LLMProcessor:
@@ -27,136 +90,370 @@ class LLMProcessor:
 
     def __init__(self, settings):
         self.settings = settings
-        self._clients = {}
-        self._session = None
+        self._clients = get_clients()  # 全域共用的客戶端與連線池
 
-    def polish(self, raw_text: str, process_hwnd=None) -> Union[str, Generator[str, None, None]]:
-        """將 STT 原始文字修飾為乾淨的輸出 (可能是字串，或字串生成器)"""
+    def polish(self, raw_text: str, process_hwnd=None, trace: Trace | None = None, context_key: str | None = None) -> Union[str, Generator[str, None, None]]:
+        """
+        將 STT 原始文字修飾為乾淨的輸出 (可能是字串，或字串生成器)
+
+        Args:
+            process_hwnd: 目標視窗（用於語境偵測，省略時為前景視窗）
+            context_key: 已預先解析的語境鍵（按下快捷鍵時於背景偵測）；省略時在此同步偵測
+        """
+        trace = trace or Trace()
         cfg = self.settings.get_config()
-        provider = cfg.get("llmProvider", "openai")
         stream = cfg.get("streamOutput", False)
+        try:
+            req = self._prepare(raw_text, cfg, process_hwnd, trace, context_key)
+            if req.text is not None:
+                text = req.chain.process(req.text)
+                return _once(text) if stream else text
+
+            router = get_router(self.settings.config_dir)
+            order = router.order("llm", self._providers(cfg))
+            hedge_provider = cfg.get("hedgeLlmProvider", "")
+            if hedge_provider and hedge_provider != order[0]:
+                winner, result = self._polish_hedged(raw_text, cfg, stream, req.system_prompt, order[0], hedge_provider)
+            else:
+                winner, result = router.call(
+                    "llm", order, lambda p: self._first_response(p, raw_text, self._provider_cfg(cfg, p), stream, req.system_prompt),
+                )
+                if stream:
+                    first, rest = result
+                    result = itertools.chain([first], rest)
+            req.use_winner(winner)
 
-        # 如果文字很短且乾淨，可以跳過 LLM
-        if len(raw_text.strip()) < 3:
             if stream:
-                def _short_gen():
-                    yield raw_text.strip()
-                return _short_gen()
-            else:
-                return raw_text.strip()
+                return self._stream_generator_wrapper(result, req)
+            return self._finish(req, result)
+
+        except Exception as e:
+            logger.error("LLM 修飾失敗: %s，回退為原文", e)
+            text = self.passthrough(raw_text, cfg)
+            return _once(text) if stream else text
 
+    async def apolish(self, raw_text: str, process_hwnd=None, trace: Trace | None = None, context_key: str | None = None) -> Union[str, AsyncGenerator[str, None]]:
+        """polish 的 asyncio 版本 (字串，或 async 字串生成器)；工作被取消時進行中的請求會立即中斷"""
+        trace = trace or Trace()
+        cfg = self.settings.get_config()
+        stream = cfg.get("streamOutput", False)
         try:
-            if provider == "openai":
-                result = self._polish_openai(raw_text, cfg, stream, process_hwnd)
-            elif provider == "anthropic":
-                result = self._polish_anthropic(raw_text, cfg, stream, process_hwnd)
-            elif provider == "groq":
-                result = self._polish_groq(raw_text, cfg, stream, process_hwnd)
-            elif provider == "ollama":
-                result = self._polish_ollama(raw_text, cfg, stream, process_hwnd)
-            elif provider == "gemini":
-                result = self._polish_gemini(raw_text, cfg, stream, process_hwnd)
+            req = self._prepare(raw_text, cfg, process_hwnd, trace, context_key)
+            if req.text is not None:
+                text = req.chain.process(req.text)
+                return _aonce(text) if stream else text
+
+            router = get_router(self.settings.config_dir)
+            order = router.order("llm", self._providers(cfg))
+            hedge_provider = cfg.get("hedgeLlmProvider", "")
+            if hedge_provider and hedge_provider != order[0]:
+                winner, result = await self._apolish_hedged(raw_text, cfg, stream, req.system_prompt, order[0], hedge_provider)
             else:
-                logger.warning("未知 LLM 引擎 %s，直接輸出原文", provider)
-                result = [raw_text.strip()] if stream else raw_text.strip()
+                winner, result = await router.acall(
+                    "llm", order, lambda p: self._afirst_response(p, raw_text, self._provider_cfg(cfg, p), stream, req.system_prompt),
+                )
+                if stream:
+                    first, rest = result
+                    result = _achain(first, rest)
+            req.use_winner(winner)
 
             if stream:
-                return self._stream_generator_wrapper(result, cfg)
-            else:
-                # Regex 後處理確保中英夾雜排版一致 (僅非串流模式支援)
-                if cfg.get("autoFormat", True) and isinstance(result, str):
-                    result = _format_mixed_text(result)
-                return result
+                return self._astream_generator_wrapper(result, req)
+            return self._finish(req, result)
 
         except Exception as e:
+            # asyncio.CancelledError 不是 Exception，取消會直接往上傳遞
             logger.error("LLM 修飾失敗: %s，回退為原文", e)
-            if stream:
-                def _error_gen():
-                    yield raw_text.strip()
-                return _error_gen()
-            return raw_text.strip()
+            text = self.passthrough(raw_text, cfg)
+            return _aonce(text) if stream else text
 
-    def _stream_generator_wrapper(self, generator, cfg):
-        """包裝原始的 generator，以符合返回類型 (串流模式下暫無法輕易做到完整 Regex)"""
-        for chunk in generator:
+    def passthrough(self, raw_text: str, cfg: dict | None = None) -> str:
+        """不經 LLM 的輸出：原文只做本地後處理（修飾失敗或超過期限時使用）"""
+        return build_chain(cfg or self.settings.get_config()).process(raw_text.strip())
+
+    def _prepare(self, raw_text: str, cfg: dict, process_hwnd, trace: Trace, context_key: str | None = None) -> _PolishRequest:
+        """呼叫 LLM 前的處理：短句略過、語境偵測、本地快速通道、系統提示詞、快取查詢"""
+        stream = cfg.get("streamOutput", False)
+        req = _PolishRequest(
+            raw_text=raw_text, cfg=cfg, trace=trace, provider=cfg.get("llmProvider", "openai"),
+            stream=stream, start=time.perf_counter(), chain=build_chain(cfg),
+        )
+
+        # 如果文字很短且乾淨，可以跳過 LLM
+        if len(raw_text.strip()) < 3:
+            req.text = raw_text.strip()
+            return req
+
+        if not cfg.get("contextAware", True):
+            context_key = ""
+        elif context_key is None:
+            with trace.span("context"):
+                context_key = get_detector().detect(cfg, process_hwnd)
+
+        if fast_path_allowed(cfg):
+            fast_text = self._try_fast_path(raw_text, cfg, context_key, req.provider, trace)
+            if fast_text is not None:
+                end = time.perf_counter()
+                trace.add("llm.ttft", req.start, end, "fastpath")
+                trace.add("llm", req.start, end, "fastpath")
+                req.text = fast_text
+                return req
+
+        req.system_prompt = self._get_system_prompt(cfg, context_key, trace)
+
+        if cfg.get("polishCache", True):
+            req.cache = cache = get_cache(self.settings.config_dir)
+            cache.configure(cfg)
+            req.key = cache.make_key(req.provider, cfg.get("llmModel", ""), req.system_prompt, raw_text)
+            cached = cache.get(req.key)
+            if cached is not None:
+                end = time.perf_counter()
+                trace.add("llm.ttft", req.start, end, "cache")
+                trace.add("llm", req.start, end, "cache")
+                logger.info("命中修飾快取 (命中率 %.0f%%，%d 筆)", cache.hit_rate * 100, len(cache))
+                req.text = cached
+        return req
+
+    def _finish(self, req: _PolishRequest, result):
+        """非串流結果：記錄時間、寫入快取（LLM 原始輸出）、後處理"""
+        end = time.perf_counter()
+        req.trace.add("llm.ttft", req.start, end, req.provider)
+        req.trace.add("llm", req.start, end, req.provider)
+        if req.key and isinstance(result, str):
+            req.cache.put(req.key, result)
+        if isinstance(result, str):
+            result = req.chain.process(result)
+        return result
+
+    def _dispatch(self, provider: str, raw_text: str, cfg: dict, stream: bool, system_prompt: str):
+        if provider == "openai":
+            return self._polish_openai(raw_text, cfg, stream, system_prompt)
+        elif provider == "anthropic":
+            return self._polish_anthropic(raw_text, cfg, stream, system_prompt)
+        elif provider == "groq":
+            return self._polish_groq(raw_text, cfg, stream, system_prompt)
+        elif provider == "ollama":
+            return self._polish_ollama(raw_text, cfg, stream, system_prompt)
+        elif provider == "gemini":
+            return self._polish_gemini(raw_text, cfg, stream, system_prompt)
+        else:
+            logger.warning("未知 LLM 引擎 %s，直接輸出原文", provider)
+            return [raw_text.strip()] if stream else raw_text.strip()
+
+    async def _adispatch(self, provider: str, raw_text: str, cfg: dict, stream: bool, system_prompt: str):
+        if provider == "openai":
+            return await self._apolish_openai_compatible("openai", "gpt-4o-mini", raw_text, cfg, stream, system_prompt)
+        elif provider == "anthropic":
+            return await self._apolish_anthropic(raw_text, cfg, stream, system_prompt)
+        elif provider == "groq":
+            return await self._apolish_openai_compatible("groq", "llama-3.3-70b-versatile", raw_text, cfg, stream, system_prompt)
+        elif provider == "ollama":
+            return await self._apolish_ollama(raw_text, cfg, stream, system_prompt)
+        elif provider == "gemini":
+            return await self._apolish_gemini(raw_text, cfg, stream, system_prompt)
+        else:
+            logger.warning("未知 LLM 引擎 %s，直接輸出原文", provider)
+            return _aonce(raw_text.strip()) if stream else raw_text.strip()
+
+    def _first_response(self, provider: str, raw_text: str, cfg: dict, stream: bool, system_prompt: str):
+        """送出請求；串流模式讀到第一個非空 chunk 才算回應，回傳 (第一個 chunk, 其餘)，連線失敗時才能改用其他引擎"""
+        result = self._dispatch(provider, raw_text, cfg, stream, system_prompt)
+        if not stream:
+            return result
+        result = iter(result)
+        for chunk in result:
+            if chunk:
+                return chunk, result
+        return "", result
+
+    async def _afirst_response(self, provider: str, raw_text: str, cfg: dict, stream: bool, system_prompt: str):
+        result = await self._adispatch(provider, raw_text, cfg, stream, system_prompt)
+        if not stream:
+            return result
+        async for chunk in result:
             if chunk:
-                yield chunk
+                return chunk, result
+        return "", result
+
+    def _polish_hedged(self, raw_text: str, cfg: dict, stream: bool, system_prompt: str, provider: str, hedge_provider: str):
+        """同時對主要與備援引擎發出對沖請求，回傳 (勝出的引擎, 結果)；串流模式以第一個 token 決勝"""
+        router = get_router(self.settings.config_dir)
+
+        def _call(name, call_cfg):
+            # 經由路由器送出，對沖的兩個請求也計入各引擎的健康狀態
+            _, result = router.call("llm", [name], lambda p: self._first_response(p, raw_text, call_cfg, stream, system_prompt))
+            return result
+
+        winner, result = run_hedged(
+            "llm",
+            (provider, lambda: _call(provider, self._provider_cfg(cfg, provider))),
+            (hedge_provider, lambda: _call(hedge_provider, self._hedge_cfg(cfg))),
+            hedge_delay("llm.ttft", provider, cfg, cfg.get("hedgeLlmDelayMs", 1500)),
+            cleanup=(lambda r: getattr(r[1], "close", lambda: None)()) if stream else None,
+        )
+        if stream:
+            first, rest = result
+            return winner, itertools.chain([first], rest)
+        return winner, result
 
-    def _get_system_prompt(self, cfg: dict, process_hwnd=None) -> str:
-        """取得系統提示詞（含語境資訊）"""
-        base_prompt = cfg.get("systemPrompt", DEFAULT_SYSTEM_PROMPT)
+    async def _apolish_hedged(self, raw_text: str, cfg: dict, stream: bool, system_prompt: str, provider: str, hedge_provider: str):
+        """_polish_hedged 的 asyncio 版本：落後的請求直接取消"""
+        router = get_router(self.settings.config_dir)
 
-        if cfg.get("contextAware", True):
-            context = self._detect_context(process_hwnd)
-            if context:
-                base_prompt += f"\n\n當前語境：{context}"
+        async def _call(name, call_cfg):
+            _, result = await router.acall(
+                "llm", [name], lambda p: self._afirst_response(p, raw_text, call_cfg, stream, system_prompt),
+            )
+            return result
 
-        base_prompt += "\n\n重要規則：請一律使用繁體中文 (Traditional Chinese, zh-TW) 輸出，絕對不要輸出簡體字。"
-        return base_prompt
+        async def _cleanup(result):
+            await result[1].aclose()
 
-    def _detect_context(self, process_hwnd=None) -> str:
-        """偵測當前使用的 App 來調整語氣"""
+        winner, result = await arun_hedged(
+            "llm",
+            (provider, lambda: _call(provider, self._provider_cfg(cfg, provider))),
+            (hedge_provider, lambda: _call(hedge_provider, self._hedge_cfg(cfg))),
+            hedge_delay("llm.ttft", provider, cfg, cfg.get("hedgeLlmDelayMs", 1500)),
+            cleanup=_cleanup if stream else None,
+        )
+        if stream:
+            first, rest = result
+            return winner, _achain(first, rest)
+        return winner, result
+
+    @staticmethod
+    def _providers(cfg: dict) -> list[str]:
+        """依偏好排序的候選引擎：主要引擎在前，其後為 llmProviders 中的備援引擎"""
+        return list(dict.fromkeys([cfg.get("llmProvider", "openai"), *cfg.get("llmProviders", [])]))
+
+    @staticmethod
+    def _provider_cfg(cfg: dict, provider: str) -> dict:
+        """路由到主要引擎以外的引擎時，移除 llmModel 讓 _polish_* 使用該引擎的預設模型"""
+        if provider == cfg.get("llmProvider", "openai"):
+            return cfg
+        return {k: v for k, v in cfg.items() if k != "llmModel"}
+
+    @staticmethod
+    def _hedge_cfg(cfg: dict) -> dict:
+        # 備援引擎未指定模型時，移除 llmModel 讓 _polish_* 使用該引擎的預設模型
+        hedge_cfg = {k: v for k, v in cfg.items() if k != "llmModel"}
+        if cfg.get("hedgeLlmModel"):
+            hedge_cfg["llmModel"] = cfg["hedgeLlmModel"]
+        return hedge_cfg
+
+    def _stream_generator_wrapper(self, generator, req: _PolishRequest):
+        """包裝原始的 generator：逐段經過後處理鏈輸出，記錄首字與總時間，完整輸出後寫入快取"""
+        first = True
+        chunks = []
+        for chunk in generator:
+            if chunk:
+                chunks.append(chunk)
+                out = req.chain.feed(chunk)
+                if out:
+                    if first:
+                        req.trace.add("llm.ttft", req.start, time.perf_counter(), req.provider)
+                        first = False
+                    yield out
+        tail = req.chain.flush()
+        if tail:
+            yield tail
+        req.trace.add("llm", req.start, time.perf_counter(), req.provider)
+        if req.key:
+            req.cache.put(req.key, "".join(chunks).strip())
+
+    async def _astream_generator_wrapper(self, generator, req: _PolishRequest):
+        """_stream_generator_wrapper 的 async 版本"""
+        first = True
+        chunks = []
         try:
-            import win32gui
-            import win32process
-            import psutil
-            
-            hwnd = process_hwnd if process_hwnd else win32gui.GetForegroundWindow()
-            title = win32gui.GetWindowText(hwnd).lower()
-            
-            _, pid = win32process.GetWindowThreadProcessId(hwnd)
-            try:
-                process = psutil.Process(pid)
-                exe_name = process.name().lower()
-            except Exception:
-                exe_name = ""
-
-            if exe_name in ["chrome.exe", "msedge.exe", "firefox.exe", "brave.exe", "arc.exe"]:
-                if any(k in title for k in ["gmail", "outlook", "mail"]):
-                    return "用戶正在瀏覽器中撰寫郵件，語氣應正式專業"
-                elif any(k in title for k in ["chat", "messenger", "line", "discord"]):
-                    return "用戶正在網頁版通訊軟體聊天，語氣可以輕鬆口語"
-                else:
-                    return "用戶在瀏覽網頁，可能在填寫表單或撰筆記，語氣應清晰有理"
-
-            elif exe_name in ["code.exe", "pycharm.exe", "idea.exe", "devenv.exe", "cursor.exe", "windows terminal.exe", "powershell.exe", "cmd.exe"]:
-                return "用戶在寫程式，可能是在寫註解、撰寫技術文件或 Commit Message，語氣應技術性且簡潔"
-
-            elif exe_name in ["winword.exe", "excel.exe", "powerpnt.exe", "obsidian.exe", "notion.exe", "evernote.exe"]:
-                return "用戶在撰寫文件或筆記，語氣應清晰有條理"
-
-            elif exe_name in ["discord.exe", "line.exe", "slack.exe", "teams.exe", "telegram.exe", "whatsapp.exe"]:
-                if exe_name in ["slack.exe", "teams.exe"]:
-                    return "用戶在工作通訊軟體，語氣應簡潔專業"
-                return "用戶正在通訊軟體聊天，語氣可以輕鬆口語"
-                
-            if any(k in title for k in ["outlook", "gmail", "mail", "thunderbird"]):
-                return "用戶正在撰寫郵件，語氣應正式專業"
-            elif any(k in title for k in ["word", "docs", "notion", "obsidian"]):
-                return "用戶在撰寫文件，語氣應清晰有條理"
-
-        except ImportError:
-            logger.debug("win32gui / psutil not installed, context detection disabled.")
-        except Exception as e:
-            logger.debug("Context detection failed: %s", e)
-            
-        return ""
+            async for chunk in generator:
+                if chunk:
+                    chunks.append(chunk)
+                    out = req.chain.feed(chunk)
+                    if out:
+                        if first:
+                            req.trace.add("llm.ttft", req.start, time.perf_counter(), req.provider)
+                            first = False
+                        yield out
+            tail = req.chain.flush()
+            if tail:
+                yield tail
+        finally:
+            # 中途被取消時也要關閉底層串流，釋放連線
+            if hasattr(generator, "aclose"):
+                await generator.aclose()
+        req.trace.add("llm", req.start, time.perf_counter(), req.provider)
+        if req.key:
+            req.cache.put(req.key, "".join(chunks).strip())
+
+    def _try_fast_path(self, raw_text: str, cfg: dict, context_key: str, provider: str, trace: Trace) -> str | None:
+        """本地規則修飾；信心足夠時回傳結果（略過 LLM），否則回傳 None"""
+        category = CONTEXT_PROMPTS.get(context_key, ("default", ""))[0]
+        contexts = cfg.get("fastPathContexts", {})
+        if not contexts.get(category, contexts.get("default", True)):
+            return None
+
+        with trace.span("llm.fastpath"):
+            # Whisper 常輸出簡體；先在本地轉為繁體，避免因簡體字而交給 LLM
+            if s2t_enabled(cfg):
+                raw_text = S2TConverter().process(raw_text)
+            result = local_polish(
+                raw_text, cfg.get("removeFiller", True), cfg.get("fastPathMaxChars", 40), cfg.get("dictionary", []),
+            )
+        if result.confidence < cfg.get("fastPathThreshold", 0.8):
+            metrics.increment("llm.fastpath.miss")
+            logger.debug("本地規則修飾信心不足 (%.2f %s)，交給 LLM", result.confidence, result.reasons)
+            return None
+
+        # 以該引擎最近的 LLM 中位延遲估算省下的時間
+        metrics.increment("llm.fastpath.bypass")
+        saved = metrics.percentile("llm", provider, 50)
+        if saved is not None:
+            metrics.observe("llm.fastpath.saved", saved, provider)
+        logger.info(
+            "本地規則修飾 (信心 %.2f)，略過 LLM%s", result.confidence,
+            f"，約省下 {saved * 1000:.0f}ms" if saved is not None else "",
+        )
+        return result.text
+
+    def _get_system_prompt(self, cfg: dict, context_key: str = "", trace=None) -> str:
+        """取得系統提示詞：固定前綴（每次完全相同，可被供應商快取）在前，語境資訊在最後"""
+        start = time.perf_counter()
+        prompt = self._prompt_prefix(cfg)
+
+        context = CONTEXT_PROMPTS.get(context_key, ("", ""))[1]
+        if context:
+            prompt += f"\n\n當前語境：{context}"
+        if trace:
+            trace.add("prompt_build", start, time.perf_counter())
+        return prompt
+
+    @staticmethod
+    def _prompt_prefix(cfg: dict) -> str:
+        """系統提示詞的固定前綴（不含每次語音輸入不同的語境資訊）"""
+        prefix = cfg.get("systemPrompt", DEFAULT_SYSTEM_PROMPT)
+        # 啟用本地簡轉繁時由後處理鏈保證繁體輸出，不必每次都多送這段提示詞
+        if not s2t_enabled(cfg):
+            prefix += "\n\n重要規則：請一律使用繁體中文 (Traditional Chinese, zh-TW) 輸出，絕對不要輸出簡體字。"
+        return prefix
+
+    def _split_prompt(self, cfg: dict, system_prompt: str) -> tuple[str, str]:
+        """拆成 (固定前綴, 語境資訊)；前綴不符時（例如外部傳入的提示詞）整段視為前綴"""
+        prefix = self._prompt_prefix(cfg)
+        if system_prompt.startswith(prefix):
+            return prefix, system_prompt[len(prefix):]
+        return system_prompt, ""
 
     # ── OpenAI ChatGPT ───────────────────────────────────────────────────────
 
-    def _polish_openai(self, raw_text: str, cfg: dict, stream: bool, process_hwnd=None):
-        from openai import OpenAI
-
+    def _polish_openai(self, raw_text: str, cfg: dict, stream: bool, system_prompt: str):
         api_key = self.settings.get_api_key("openai")
         if not api_key:
             raise ValueError("OpenAI API Key 未設定")
 
-        if "openai" not in self._clients:
-            self._clients["openai"] = OpenAI(api_key=api_key)
-        client = self._clients["openai"]
+        client = self._clients.openai("openai", api_key, self.settings.get_base_url("openai"))
         
         model = cfg.get("llmModel", "gpt-4o-mini")
-        system_prompt = self._get_system_prompt(cfg, process_hwnd)
 
         response = client.chat.completions.create(
             model=model,
@@ -167,77 +464,75 @@ class LLMProcessor:
             temperature=0.3,
             max_tokens=2048,
             stream=stream,
+            # 串流模式最後一個 chunk 附上 token 用量（含快取命中的輸入 token）
+            **({"stream_options": {"include_usage": True}} if stream else {}),
+            **timeout_kwargs(),
         )
 
         if stream:
             def _gen(keepalive_client, resp):
                 for chunk in resp:
-                    content = chunk.choices[0].delta.content
+                    if chunk.usage:
+                        record_openai_usage("openai", chunk.usage)
+                    content = chunk.choices[0].delta.content if chunk.choices else None
                     if content:
                         yield content
             return _gen(client, response)
         else:
+            record_openai_usage("openai", response.usage)
             return response.choices[0].message.content.strip()
 
     # ── Anthropic Claude ─────────────────────────────────────────────────────
 
-    def _polish_anthropic(self, raw_text: str, cfg: dict, stream: bool, process_hwnd=None):
-        import anthropic
-
+    def _polish_anthropic(self, raw_text: str, cfg: dict, stream: bool, system_prompt: str):
         api_key = self.settings.get_api_key("anthropic")
         if not api_key:
             raise ValueError("Anthropic API Key 未設定")
 
-        if "anthropic" not in self._clients:
-            self._clients["anthropic"] = anthropic.Anthropic(api_key=api_key)
-        client = self._clients["anthropic"]
+        client = self._clients.anthropic(api_key, self.settings.get_base_url("anthropic"))
         
         model = cfg.get("llmModel", "claude-haiku-4-5-20251001")
-        system_prompt = self._get_system_prompt(cfg, process_hwnd)
+        system = anthropic_system(*self._split_prompt(cfg, system_prompt), cache=cfg.get("promptCaching", True))
 
         if stream:
             response = client.messages.stream(
                 model=model,
                 max_tokens=2048,
-                system=system_prompt,
+                system=system,
                 messages=[
                     {"role": "user", "content": raw_text},
                 ],
+                **timeout_kwargs(),
             )
             def _gen(keepalive_client, stream_resp):
                 with stream_resp as stream_manager:
                     for text_event in stream_manager.text_stream:
                         yield text_event
+                    record_anthropic_usage(stream_manager.get_final_message().usage)
             return _gen(client, response)
         else:
             response = client.messages.create(
                 model=model,
                 max_tokens=2048,
-                system=system_prompt,
+                system=system,
                 messages=[
                     {"role": "user", "content": raw_text},
                 ],
+                **timeout_kwargs(),
             )
+            record_anthropic_usage(response.usage)
             return response.content[0].text.strip()
 
     # ── Groq（OpenAI 相容）───────────────────────────────────────────────────
 
-    def _polish_groq(self, raw_text: str, cfg: dict, stream: bool, process_hwnd=None):
-        from openai import OpenAI
-
+    def _polish_groq(self, raw_text: str, cfg: dict, stream: bool, system_prompt: str):
         api_key = self.settings.get_api_key("groq")
         if not api_key:
             raise ValueError("Groq API Key 未設定")
 
-        if "groq" not in self._clients:
-            self._clients["groq"] = OpenAI(
-                api_key=api_key,
-                base_url="https://api.groq.com/openai/v1",
-            )
-        client = self._clients["groq"]
+        client = self._clients.openai("groq", api_key, self.settings.get_base_url("groq"))
         
         model = cfg.get("llmModel", "llama-3.3-70b-versatile")
-        system_prompt = self._get_system_prompt(cfg, process_hwnd)
 
         response = client.chat.completions.create(
             model=model,
@@ -248,32 +543,27 @@ class LLMProcessor:
             temperature=0.3,
             max_tokens=2048,
             stream=stream,
+            **timeout_kwargs(),
         )
 
         if stream:
             def _gen(keepalive_client, resp):
                 for chunk in resp:
-                    content = chunk.choices[0].delta.content
+                    content = chunk.choices[0].delta.content if chunk.choices else None
                     if content:
                         yield content
             return _gen(client, response)
         else:
+            record_openai_usage("groq", response.usage)
             return response.choices[0].message.content.strip()
 
     # ── Ollama 本地 ──────────────────────────────────────────────────────────
 
-    def _polish_ollama(self, raw_text: str, cfg: dict, stream: bool, process_hwnd=None):
-        import requests
-        import json
-
+    def _polish_ollama(self, raw_text: str, cfg: dict, stream: bool, system_prompt: str):
         endpoint = self.settings.get_api_key("ollama") or "http://localhost:11434"
         model = cfg.get("llmModel", "qwen3:8b")
-        system_prompt = self._get_system_prompt(cfg, process_hwnd)
         
-        if self._session is None:
-            self._session = requests.Session()
-
-        response = self._session.post(
+        response = self._clients.session(endpoint).post(
             f"{endpoint}/api/chat",
             json={
                 "model": model,
@@ -285,7 +575,7 @@ class LLMProcessor:
                 "options": {"temperature": 0.3},
             },
             stream=stream,
-            timeout=30 if not stream else None,
+            timeout=request_timeout(30 if not stream else None),
         )
         response.raise_for_status()
 
@@ -302,42 +592,199 @@ class LLMProcessor:
 
     # ── Gemini (Google GenAI) ────────────────────────────────────────────────
 
-    def _polish_gemini(self, raw_text: str, cfg: dict, stream: bool, process_hwnd=None):
-        from google import genai
-        from google.genai import types
-
+    def _polish_gemini(self, raw_text: str, cfg: dict, stream: bool, system_prompt: str):
         api_key = self.settings.get_api_key("gemini")
         if not api_key:
             raise ValueError("Gemini API Key 未設定")
 
-        if "gemini" not in self._clients:
-            self._clients["gemini"] = genai.Client(api_key=api_key)
-        client = self._clients["gemini"]
+        client = self._clients.gemini(api_key, self.settings.get_base_url("gemini"))
         
         model = cfg.get("llmModel", "gemini-2.5-flash-lite")
-        system_prompt = self._get_system_prompt(cfg, process_hwnd)
-
-        config = types.GenerateContentConfig(
-            system_instruction=system_prompt,
-            temperature=0.3,
-            max_output_tokens=2048,
-        )
+        contents, config, cached = self._gemini_request(client, model, raw_text, cfg, system_prompt)
 
         if stream:
             response_stream = client.models.generate_content_stream(
                 model=model,
-                contents=raw_text,
+                contents=contents,
                 config=config,
             )
             def _gen(keepalive_client, resp):
-                for chunk in resp:
-                    if chunk.text:
-                        yield chunk.text
+                usage = None
+                with self._gemini_cache_guard(client, model, cached):
+                    for chunk in resp:
+                        usage = chunk.usage_metadata or usage
+                        if chunk.text:
+                            yield chunk.text
+                record_gemini_usage(usage)
             return _gen(client, response_stream)
         else:
-            response = client.models.generate_content(
-                model=model,
-                contents=raw_text,
-                config=config,
-            )
+            with self._gemini_cache_guard(client, model, cached):
+                response = client.models.generate_content(
+                    model=model,
+                    contents=contents,
+                    config=config,
+                )
+            record_gemini_usage(response.usage_metadata)
             return response.text.strip() if response.text else ""
+
+    def _gemini_request(self, client, model: str, raw_text: str, cfg: dict, system_prompt: str):
+        """
+        回傳 (contents, config, 使用的快取前綴)
+
+        已有 cachedContents 時固定前綴由快取提供（此時不能再指定 system_instruction），語境資訊隨使用者訊息送出；
+        快取尚未建立完成時照常送出完整的系統提示詞
+        """
+        from google.genai import types
+
+        prefix, tail = self._split_prompt(cfg, system_prompt)
+        cache_name = get_gemini_cache().lookup(client, model, prefix) if cfg.get("promptCaching", True) else None
+        if not cache_name:
+            config = types.GenerateContentConfig(
+                system_instruction=system_prompt, temperature=0.3, max_output_tokens=2048, **self._gemini_timeout(),
+            )
+            return raw_text, config, None
+        config = types.GenerateContentConfig(
+            cached_content=cache_name, temperature=0.3, max_output_tokens=2048, **self._gemini_timeout(),
+        )
+        contents = raw_text
+        if tail.strip():
+            contents = [types.Content(role="user", parts=[types.Part(text=tail.strip()), types.Part(text=raw_text)])]
+        return contents, config, prefix
+
+    @staticmethod
+    def _gemini_timeout() -> dict:
+        """Gemini 的請求逾時放在 http_options（毫秒）；沒有期限時不指定"""
+        from google.genai import types
+
+        timeout = request_timeout()
+        return {"http_options": types.HttpOptions(timeout=int(timeout * 1000))} if timeout is not None else {}
+
+    @staticmethod
+    @contextmanager
+    def _gemini_cache_guard(client, model: str, prefix: str | None):
+        """使用快取的請求失敗時（例如快取已在伺服器端過期）移除該快取，下次重新建立"""
+        try:
+            yield
+        except Exception:
+            if prefix is not None:
+                get_gemini_cache().invalidate(client, model, prefix)
+            raise
+
+    # ── asyncio 版本（可取消）─────────────────────────────────────────────────
+
+    async def _apolish_openai_compatible(self, provider: str, default_model: str, raw_text: str, cfg: dict, stream: bool, system_prompt: str):
+        """OpenAI / Groq（OpenAI 相容）"""
+        api_key = self.settings.get_api_key(provider)
+        if not api_key:
+            raise ValueError(f"{'Groq' if provider == 'groq' else 'OpenAI'} API Key 未設定")
+
+        client = self._clients.async_openai(provider, api_key, self.settings.get_base_url(provider))
+        response = await client.chat.completions.create(
+            model=cfg.get("llmModel", default_model),
+            messages=[
+                {"role": "system", "content": system_prompt},
+                {"role": "user", "content": raw_text},
+            ],
+            temperature=0.3,
+            max_tokens=2048,
+            stream=stream,
+            **({"stream_options": {"include_usage": True}} if stream and provider == "openai" else {}),
+            **timeout_kwargs(),
+        )
+
+        if stream:
+            async def _gen():
+                async with response:
+                    async for chunk in response:
+                        if chunk.usage:
+                            record_openai_usage(provider, chunk.usage)
+                        content = chunk.choices[0].delta.content if chunk.choices else None
+                        if content:
+                            yield content
+            return _gen()
+        record_openai_usage(provider, response.usage)
+        return response.choices[0].message.content.strip()
+
+    async def _apolish_anthropic(self, raw_text: str, cfg: dict, stream: bool, system_prompt: str):
+        api_key = self.settings.get_api_key("anthropic")
+        if not api_key:
+            raise ValueError("Anthropic API Key 未設定")
+
+        client = self._clients.async_anthropic(api_key, self.settings.get_base_url("anthropic"))
+        kwargs = {
+            "model": cfg.get("llmModel", "claude-haiku-4-5-20251001"),
+            "max_tokens": 2048,
+            "system": anthropic_system(*self._split_prompt(cfg, system_prompt), cache=cfg.get("promptCaching", True)),
+            "messages": [{"role": "user", "content": raw_text}],
+            **timeout_kwargs(),
+        }
+
+        if stream:
+            async def _gen():
+                async with client.messages.stream(**kwargs) as stream_manager:
+                    async for text_event in stream_manager.text_stream:
+                        yield text_event
+                    record_anthropic_usage((await stream_manager.get_final_message()).usage)
+            return _gen()
+        response = await client.messages.create(**kwargs)
+        record_anthropic_usage(response.usage)
+        return response.content[0].text.strip()
+
+    async def _apolish_ollama(self, raw_text: str, cfg: dict, stream: bool, system_prompt: str):
+        endpoint = self.settings.get_api_key("ollama") or "http://localhost:11434"
+        client = self._clients.async_session(endpoint)
+        body = {
+            "model": cfg.get("llmModel", "qwen3:8b"),
+            "messages": [
+                {"role": "system", "content": system_prompt},
+                {"role": "user", "content": raw_text},
+            ],
+            "stream": stream,
+            "options": {"temperature": 0.3},
+        }
+
+        if stream:
+            async def _gen():
+                async with client.stream("POST", f"{endpoint}/api/chat", json=body, timeout=request_timeout()) as response:
+                    response.raise_for_status()
+                    async for line in response.aiter_lines():
+                        if line:
+                            yield json.loads(line)["message"]["content"]
+            return _gen()
+        response = await client.post(f"{endpoint}/api/chat", json=body, timeout=request_timeout(30))
+        response.raise_for_status()
+        return response.json()["message"]["content"].strip()
+
+    async def _apolish_gemini(self, raw_text: str, cfg: dict, stream: bool, system_prompt: str):
+        api_key = self.settings.get_api_key("gemini")
+        if not api_key:
+            raise ValueError("Gemini API Key 未設定")
+
+        base_url = self.settings.get_base_url("gemini")
+        client = self._clients.async_gemini(api_key, base_url)
+        model = cfg.get("llmModel", "gemini-2.5-flash-lite")
+        # 快取以同步客戶端在背景建立
+        sync_client = self._clients.gemini(api_key, base_url)
+        contents, config, cached = self._gemini_request(sync_client, model, raw_text, cfg, system_prompt)
+
+        if stream:
+            with self._gemini_cache_guard(sync_client, model, cached):
+                response_stream = await client.models.generate_content_stream(model=model, contents=contents, config=config)
+
+            async def _gen():
+                usage = None
+                try:
+                    with self._gemini_cache_guard(sync_client, model, cached):
+                        async for chunk in response_stream:
+                            usage = chunk.usage_metadata or usage
+                            if chunk.text:
+                                yield chunk.text
+                finally:
+                    if hasattr(response_stream, "aclose"):
+                        await response_stream.aclose()
+                record_gemini_usage(usage)
+            return _gen()
+        with self._gemini_cache_guard(sync_client, model, cached):
+            response = await client.models.generate_content(model=model, contents=contents, config=config)
+        record_gemini_usage(response.usage_metadata)
+        return response.text.strip() if response.text else ""
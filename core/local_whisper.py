@@ -0,0 +1,230 @@
+"""
+本地 Whisper 常駐工作執行緒
+由專屬執行緒持有 faster-whisper 模型，啟動時即在背景載入並做一次暖機推理，
+辨識請求透過佇列送入；模型存放在模組層級，重新載入設定時除非 sttModel 或模型參數改變否則不會重新載入
+
+推論設定檔（localWhisperProfile）決定量化精度與解碼方式，見 PROFILES；
+localWorkers > 1 時模型以多個 worker 載入，辨識請求可同時進行（長錄音可分段同時辨識）
+"""
+
+import logging
+import os
+import queue
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from functools import lru_cache
+
+import numpy as np
+
+logger = logging.getLogger("VoiceType.LocalWhisper")
+
+WARMUP_SECONDS = 1.0
+
+# 推論設定檔：model 為 WhisperModel 參數，decode 為 transcribe 參數
+PROFILES = {
+    # 原本的行為：裝置與精度自動選擇、beam search 5、不過濾靜音；品質最好，適合有 GPU 的電腦
+    "accurate": {
+        "model": {"device": "auto", "compute_type": "auto"},
+        "decode": {"beam_size": 5, "vad_filter": False, "without_timestamps": False, "condition_on_previous_text": True},
+    },
+    # CPU int8 量化、小 beam、內建 VAD 略過停頓、不產生時間戳、不以前文為條件（避免重複與幻覺延續）
+    "balanced": {
+        "model": {"device": "cpu", "compute_type": "int8"},
+        "decode": {"beam_size": 2, "vad_filter": True, "without_timestamps": True, "condition_on_previous_text": False},
+    },
+    # CPU int8 貪婪解碼：延遲最低，適合只有 CPU 的筆電
+    "fast": {
+        "model": {"device": "cpu", "compute_type": "int8"},
+        "decode": {"beam_size": 1, "best_of": 1, "vad_filter": True, "without_timestamps": True,
+                   "condition_on_previous_text": False},
+    },
+}
+
+# localWhisperOverrides 可覆寫的參數
+MODEL_OPTIONS = ("device", "compute_type")
+DECODE_OPTIONS = (
+    "beam_size", "best_of", "patience", "temperature", "vad_filter",
+    "without_timestamps", "condition_on_previous_text", "no_speech_threshold",
+)
+
+
+@lru_cache(maxsize=1)
+def cuda_available() -> bool:
+    try:
+        import ctranslate2
+        return ctranslate2.get_cuda_device_count() > 0
+    except Exception:
+        return False
+
+
+def physical_cores() -> int:
+    """實體核心數的估計值（邏輯核心數的一半；超執行緒對 CTranslate2 的 CPU 推論幫助不大）"""
+    return max(1, (os.cpu_count() or 2) // 2)
+
+
+def resolve_profile(cfg: dict) -> tuple[str, dict, dict]:
+    """
+    依設定決定推論參數，回傳 (設定檔名稱, WhisperModel 參數, transcribe 參數)
+
+    localWhisperProfile 為 auto 時，有 CUDA 用 accurate、只有 CPU 用 balanced；
+    localCpuThreads 為 0 時由各 worker 平分實體核心
+    """
+    name = cfg.get("localWhisperProfile", "auto")
+    if name not in PROFILES:
+        name = "accurate" if cuda_available() else "balanced"
+    model_options = dict(PROFILES[name]["model"])
+    decode_options = dict(PROFILES[name]["decode"])
+    for key, value in cfg.get("localWhisperOverrides", {}).items():
+        if key in MODEL_OPTIONS:
+            model_options[key] = value
+        elif key in DECODE_OPTIONS:
+            decode_options[key] = value
+    workers = cfg.get("localWorkers", 1)
+    model_options["num_workers"] = workers
+    model_options["cpu_threads"] = cfg.get("localCpuThreads", 0) or max(1, physical_cores() // workers)
+    return name, model_options, decode_options
+
+
+class LocalWhisperWorker:
+    """持有 WhisperModel 的常駐工作執行緒"""
+
+    def __init__(self):
+        self._queue: queue.Queue = queue.Queue()
+        self._model = None
+        self._model_key = None     # 目前已載入（或正在載入）的模型參數
+        self._load_error: Exception | None = None
+        self._pool: ThreadPoolExecutor | None = None   # num_workers > 1 時同時執行辨識請求
+        self.ready = threading.Event()
+        self.ready_seconds: float | None = None   # 從要求載入到可用的時間
+        self.cold_latency: float | None = None    # 暖機推理（首次推理）耗時
+        self.warm_latency: float | None = None    # 最近一次正式推理耗時
+        self._thread = threading.Thread(target=self._run, name="local-whisper", daemon=True)
+        self._thread.start()
+
+    @property
+    def model_name(self) -> str | None:
+        return self._model_key[0] if self._model_key else None
+
+    @property
+    def loaded(self) -> bool:
+        """模型已載入完成且可用（不會觸發載入）"""
+        return self.ready.is_set() and self._model is not None and self._load_error is None
+
+    def ensure_model(self, model: str, **options):
+        """要求載入指定模型（非阻塞）；options 為 WhisperModel 參數，與目前模型相同且已成功載入時不做任何事"""
+        key = (model, tuple(sorted(options.items())))
+        if key == self._model_key and self._load_error is None:
+            return
+        self._model_key = key
+        self._load_error = None
+        self.ready.clear()
+        self._queue.put(("load", key, None))
+
+    def transcribe(self, audio: np.ndarray, timeout: float | None = None, **kwargs) -> str:
+        """送出辨識請求並等待結果（模型尚未載入完成時會排隊等待）；逾時時尚未開始的請求不再執行"""
+        future: Future = Future()
+        self._queue.put(("transcribe", (audio, kwargs), future))
+        try:
+            return future.result(timeout=timeout)
+        except TimeoutError:
+            future.cancel()
+            raise
+
+    def _run(self):
+        while True:
+            kind, payload, future = self._queue.get()
+            if kind == "load":
+                self._load(payload)
+            elif kind == "transcribe":
+                if self._pool is not None:
+                    self._pool.submit(self._run_transcribe, payload, future)
+                else:
+                    self._run_transcribe(payload, future)
+
+    def _run_transcribe(self, payload, future: Future):
+        if not future.set_running_or_notify_cancel():
+            return
+        try:
+            future.set_result(self._transcribe(*payload))
+        except Exception as e:
+            future.set_exception(e)
+
+    def _load(self, key):
+        # 佇列中若還有更新的載入要求，跳過這次（避免連續切換模型時重複載入）
+        if key != self._model_key:
+            return
+        model, options = key[0], dict(key[1])
+        try:
+            from faster_whisper import WhisperModel
+        except ImportError:
+            self._load_error = ImportError(
+                "本地 Whisper 需要安裝 faster-whisper：\n"
+                "pip install faster-whisper --break-system-packages"
+            )
+            logger.error("%s", self._load_error)
+            self.ready.set()
+            return
+
+        t0 = time.perf_counter()
+        logger.info("載入本地 Whisper 模型: %s %s ...", model, options)
+        try:
+            self._model = None  # 先釋放舊模型的記憶體
+            self._model = WhisperModel(model, **options)
+            self._set_pool(options.get("num_workers", 1))
+            load_seconds = time.perf_counter() - t0
+
+            # 暖機推理：讓首次正式請求不必承擔初始化成本
+            t1 = time.perf_counter()
+            segments, _ = self._model.transcribe(np.zeros(int(16000 * WARMUP_SECONDS), dtype=np.float32))
+            list(segments)
+            self.cold_latency = time.perf_counter() - t1
+            self.ready_seconds = time.perf_counter() - t0
+            logger.info(
+                "本地 Whisper 模型就緒: %s (載入 %.1fs + 暖機 %.2fs)",
+                model, load_seconds, self.cold_latency,
+            )
+        except Exception as e:
+            self._model = None
+            self._load_error = e
+            logger.error("本地 Whisper 模型載入失敗: %s", e)
+        finally:
+            self.ready.set()
+
+    def _set_pool(self, workers: int):
+        """依 worker 數建立辨識執行緒池；進行中的請求在舊的執行緒池中完成"""
+        if self._pool is not None:
+            self._pool.shutdown(wait=False)
+        self._pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="local-whisper") if workers > 1 else None
+
+    def _transcribe(self, audio: np.ndarray, kwargs: dict) -> str:
+        if self._load_error:
+            raise self._load_error
+        if self._model is None:
+            raise RuntimeError("本地 Whisper 模型尚未載入")
+
+        t0 = time.perf_counter()
+        # faster-whisper 需要 float32 音訊
+        audio_f32 = audio.astype(np.float32) / 32768.0
+        segments, info = self._model.transcribe(audio_f32, **kwargs)
+        text = " ".join(seg.text for seg in segments).strip()
+        latency = time.perf_counter() - t0
+        self.warm_latency = latency
+        logger.info(
+            "本地 Whisper 辨識 %.1fs 音訊耗時 %.2fs (暖機推理 %.2fs)",
+            len(audio) / 16000, latency, self.cold_latency or 0.0,
+        )
+        return text
+
+
+_worker: LocalWhisperWorker | None = None
+_worker_lock = threading.Lock()
+
+
+def get_worker() -> LocalWhisperWorker:
+    """取得全域唯一的本地 Whisper 工作執行緒（跨設定重新載入保留）"""
+    global _worker
+    with _worker_lock:
+        if _worker is None:
+            _worker = LocalWhisperWorker()
+        return _worker
@@ -0,0 +1,173 @@
+"""
+管線延遲量測模組
+以 span 記錄每次語音輸入各階段耗時（快捷鍵→開啟串流、錄音、編碼、STT 上傳/伺服器、
+提示詞組合、LLM 首字/總時間、焦點恢復、注入），
+依「階段 + 引擎」維護滾動直方圖，提供 p50/p95/p99 與 Chrome trace-event JSON 匯出
+"""
+
+import itertools
+import json
+import logging
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from pathlib import Path
+
+import numpy as np
+
+logger = logging.getLogger("VoiceType.Metrics")
+
+WINDOW_SIZE = 200     # 每個直方圖保留最近幾筆樣本
+MAX_TRACES = 50       # 保留最近幾次語音輸入的完整 span（供 trace 匯出）
+
+
+class RollingHistogram:
+    """保留最近 N 筆耗時樣本的滾動直方圖"""
+
+    def __init__(self, size: int = WINDOW_SIZE):
+        self._samples: deque = deque(maxlen=size)
+        self.count = 0
+
+    def add(self, seconds: float):
+        self._samples.append(seconds)
+        self.count += 1
+
+    @property
+    def window(self) -> int:
+        return len(self._samples)
+
+    def percentile(self, q: float) -> float | None:
+        if not self._samples:
+            return None
+        return float(np.percentile(np.fromiter(self._samples, dtype=np.float64), q))
+
+    def summary(self) -> dict:
+        samples = np.fromiter(self._samples, dtype=np.float64)
+        if len(samples) == 0:
+            return {"count": self.count}
+        p50, p95, p99 = np.percentile(samples, [50, 95, 99])
+        return {
+            "count": self.count,
+            "window": len(samples),
+            "p50_ms": round(p50 * 1000, 1),
+            "p95_ms": round(p95 * 1000, 1),
+            "p99_ms": round(p99 * 1000, 1),
+            "mean_ms": round(float(samples.mean()) * 1000, 1),
+            "last_ms": round(samples[-1] * 1000, 1),
+        }
+
+
+class MetricsRegistry:
+    """全域延遲統計：依 (階段, 引擎) 分組的滾動直方圖 + 最近的 trace"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._histograms: dict[tuple[str, str], RollingHistogram] = {}
+        self._counters: dict[str, int] = {}
+        self._traces: deque = deque(maxlen=MAX_TRACES)
+        self.epoch = time.perf_counter()
+
+    def observe(self, stage: str, seconds: float, provider: str = ""):
+        with self._lock:
+            hist = self._histograms.get((stage, provider))
+            if hist is None:
+                hist = self._histograms[(stage, provider)] = RollingHistogram()
+            hist.add(seconds)
+
+    def increment(self, name: str, amount: int = 1):
+        with self._lock:
+            self._counters[name] = self._counters.get(name, 0) + amount
+
+    def percentile(self, stage: str, provider: str, q: float) -> float | None:
+        with self._lock:
+            hist = self._histograms.get((stage, provider))
+            return hist.percentile(q) if hist else None
+
+    def count(self, stage: str, provider: str) -> int:
+        """目前視窗內的樣本數"""
+        with self._lock:
+            hist = self._histograms.get((stage, provider))
+            return hist.window if hist else 0
+
+    def add_trace(self, trace: "Trace"):
+        with self._lock:
+            self._traces.append(trace)
+
+    def summary(self) -> dict:
+        """回傳 {"stages": {"stage": {"provider": {...}}}, "counters": {...}}"""
+        with self._lock:
+            stages: dict = {}
+            for (stage, provider), hist in sorted(self._histograms.items()):
+                stages.setdefault(stage, {})[provider or "-"] = hist.summary()
+            return {"stages": stages, "counters": dict(self._counters)}
+
+    def trace_events(self) -> dict:
+        """匯出 Chrome trace-event 格式（可用 chrome://tracing 或 Perfetto 開啟）"""
+        with self._lock:
+            traces = list(self._traces)
+        events = []
+        for trace in traces:
+            events.append({
+                "name": "thread_name", "ph": "M", "pid": 1, "tid": trace.id,
+                "args": {"name": f"dictation #{trace.id}"},
+            })
+            for span in trace.spans:
+                events.append({
+                    "name": span["stage"],
+                    "cat": span["provider"] or "pipeline",
+                    "ph": "X",
+                    "pid": 1,
+                    "tid": trace.id,
+                    "ts": round((span["start"] - self.epoch) * 1e6),
+                    "dur": round((span["end"] - span["start"]) * 1e6),
+                    "args": span["args"],
+                })
+        return {"traceEvents": events, "displayTimeUnit": "ms"}
+
+    def dump_trace(self, path: str | Path):
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(self.trace_events(), f, ensure_ascii=False)
+
+    def reset(self):
+        with self._lock:
+            self._histograms.clear()
+            self._counters.clear()
+            self._traces.clear()
+
+
+metrics = MetricsRegistry()
+
+_trace_ids = itertools.count(1)
+
+
+class Trace:
+    """單次語音輸入的 span 記錄器；每個 span 同時寫入全域直方圖"""
+
+    def __init__(self, registry: MetricsRegistry = metrics):
+        self.registry = registry
+        self.id = next(_trace_ids)
+        self.spans: list[dict] = []
+
+    def add(self, stage: str, start: float, end: float, provider: str = "", **args):
+        """記錄一段已完成的 span（時間為 time.perf_counter()）"""
+        self.spans.append({"stage": stage, "provider": provider, "start": start, "end": end, "args": args})
+        self.registry.observe(stage, end - start, provider)
+
+    @contextmanager
+    def span(self, stage: str, provider: str = "", **args):
+        start = time.perf_counter()
+        try:
+            yield args
+        finally:
+            self.add(stage, start, time.perf_counter(), provider, **args)
+
+    def duration(self, stage: str) -> float:
+        """同名 span 的耗時總和（秒）"""
+        return sum(s["end"] - s["start"] for s in self.spans if s["stage"] == stage)
+
+    def finish(self):
+        """結束此次記錄，保留供 trace 匯出"""
+        self.registry.add_trace(self)
@@ -0,0 +1,291 @@
+"""
+可取消的 asyncio 處理管線
+在常駐背景執行緒上執行一個 asyncio 事件迴圈，每次語音輸入（STT → LLM → 注入）為一個 Task；
+Esc 取消時進行中的 HTTP 請求會在下一個 await 點中斷並釋放連線，不必等待雲端 API 回應
+
+連續口述時多個工作同時進行（第 N+1 段的 STT 與第 N 段的 LLM 重疊），
+輸出依送出順序排隊 (wait_turn)，且使用者正在錄音（按住快捷鍵）時暫停輸出 (hold_output)
+"""
+
+import asyncio
+import contextvars
+import itertools
+import logging
+import threading
+import time
+from concurrent.futures import CancelledError, Future
+from typing import Callable
+
+from core.http_clients import get_clients
+from core.metrics import metrics
+
+logger = logging.getLogger("VoiceType.Pipeline")
+
+_current: contextvars.ContextVar["DictationHandle | None"] = contextvars.ContextVar("dictation", default=None)
+
+
+class DictationHandle:
+    """單次語音輸入的工作把手（可跨執行緒取消與等待）"""
+
+    def __init__(self, job_id: int, name: str):
+        self.id = job_id
+        self.name = name
+        self.future: Future | None = None
+        self.submitted_at = time.perf_counter()
+        self.cancel_requested_at: float | None = None
+        self.finished_at: float | None = None
+        self._finished = threading.Event()   # Task 在事件迴圈上真正結束（取消時 future 會先一步完成）
+        self.status = "排隊中"                # 顯示於系統托盤提示文字
+        self._prev: "DictationHandle | None" = None     # 前一個工作（輸出順序）
+        self._turn_done: asyncio.Future | None = None   # 本工作已輸出完畢（或放棄輸出）
+        self._task: asyncio.Task | None = None          # 事件迴圈上的 Task（開始執行後才有）
+
+    def cancel(self) -> bool:
+        """要求取消；實際中斷發生在事件迴圈的下一個 await 點"""
+        if self.future is None or self.future.done():
+            return False
+        self.cancel_requested_at = time.perf_counter()
+        return self.future.cancel()
+
+    def done(self) -> bool:
+        return self.future.done()
+
+    def cancelled(self) -> bool:
+        return self.future.cancelled()
+
+    def result(self, timeout: float | None = None):
+        return self.future.result(timeout)
+
+    def wait_finished(self, timeout: float | None = None) -> bool:
+        """等待 Task 真正結束（取消後 HTTP 請求已中斷、連線已釋放）"""
+        return self._finished.wait(timeout)
+
+    @property
+    def cancel_latency(self) -> float | None:
+        """從要求取消到 Task 實際結束的秒數"""
+        if self.cancel_requested_at is None or self.finished_at is None:
+            return None
+        return max(self.finished_at - self.cancel_requested_at, 0.0)
+
+    def __repr__(self):
+        state = "cancelled" if self.cancelled() else "done" if self.done() else "running"
+        return f"<DictationHandle #{self.id} {self.name} {state}>"
+
+
+class AsyncPipeline:
+    """常駐的 asyncio 事件迴圈與進行中的語音輸入工作"""
+
+    def __init__(self):
+        self._loop: asyncio.AbstractEventLoop | None = None
+        self._thread: threading.Thread | None = None
+        self._started = threading.Event()
+        self._lock = threading.Lock()
+        self._ids = itertools.count(1)
+        self._active: dict[int, DictationHandle] = {}
+        self._last: DictationHandle | None = None
+        self._output_open: asyncio.Event | None = None
+        self._reading: dict[int, asyncio.Task] = {}    # id(async generator) -> 進行中的讀取（iterate）
+        self.on_change: Callable[[], None] | None = None   # 工作狀態變更時呼叫（在事件迴圈執行緒）
+
+    @property
+    def loop(self) -> asyncio.AbstractEventLoop:
+        self._ensure_loop()
+        return self._loop
+
+    def _ensure_loop(self):
+        with self._lock:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run_loop, name="pipeline-loop", daemon=True)
+                self._thread.start()
+        self._started.wait()
+
+    def _run_loop(self):
+        self._loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(self._loop)
+        # 非同步連線池只能在這個迴圈上使用，預先連線也改由此迴圈送出
+        get_clients().bind_loop(self._loop)
+        self._output_open = asyncio.Event()
+        self._output_open.set()
+        self._started.set()
+        self._loop.run_forever()
+
+    def submit(self, coro_fn, *args, name: str = "dictation") -> DictationHandle:
+        """在管線事件迴圈上執行 coro_fn(*args)，立即回傳工作把手"""
+        self._ensure_loop()
+        handle = DictationHandle(next(self._ids), name)
+        with self._lock:
+            self._active[handle.id] = handle
+        handle.future = asyncio.run_coroutine_threadsafe(self._run(handle, coro_fn, args), self._loop)
+        # 開始執行前就被取消的工作不會進入 _run 的 finally，由此收尾（移出進行中的工作、讓出輸出順序）
+        handle.future.add_done_callback(lambda _: self._loop.call_soon_threadsafe(self._settle, handle))
+        return handle
+
+    async def _run(self, handle: DictationHandle, coro_fn, args):
+        handle._task = asyncio.current_task()
+        if handle.future is not None and handle.future.cancelled():
+            # 開始前已取消：不執行工作內容（由 _settle 收尾）
+            raise asyncio.CancelledError
+        _current.set(handle)
+        handle._prev, self._last = self._last, handle
+        handle._turn_done = self._loop.create_future()
+        try:
+            return await coro_fn(*args)
+        except asyncio.CancelledError:
+            logger.info("語音輸入 #%d 已取消", handle.id)
+            raise
+        except Exception as e:
+            logger.error("語音輸入 #%d 失敗: %s", handle.id, e, exc_info=True)
+            raise
+        finally:
+            self._finish(handle)
+
+    def _settle(self, handle: DictationHandle):
+        """handle.future 完成後（事件迴圈上）：Task 從未開始執行時直接收尾，否則等 _run 的 finally"""
+        if handle._task is None or handle._task.done():
+            self._finish(handle)
+
+    def _finish(self, handle: DictationHandle):
+        """工作真正結束：讓出輸出順序並移出進行中的工作（可重複呼叫）"""
+        if handle._finished.is_set():
+            return
+        handle.finished_at = time.perf_counter()
+        self.release_turn(handle)
+        handle._prev = None
+        if self._last is handle:
+            self._last = None
+        with self._lock:
+            self._active.pop(handle.id, None)
+        if handle.cancel_latency is not None:
+            metrics.observe("pipeline.cancel", handle.cancel_latency)
+        handle._finished.set()
+        self._notify()
+
+    # ── 工作內呼叫（事件迴圈上）──────────────────────────────────────────────
+
+    @staticmethod
+    def current() -> DictationHandle | None:
+        """目前 coroutine 所屬的工作"""
+        return _current.get()
+
+    def set_status(self, status: str):
+        handle = _current.get()
+        if handle is not None:
+            handle.status = status
+            self._notify()
+
+    async def wait_turn(self):
+        """等待輪到本工作輸出：前面的工作都已輸出完畢，且使用者沒有正在錄音"""
+        handle = _current.get()
+        if handle is not None and handle._prev is not None:
+            self.set_status("等待輸出")
+            # shield：本工作被取消時不可連帶取消前一個工作的 future
+            await asyncio.shield(handle._prev._turn_done)
+            handle._prev = None
+        if not self._output_open.is_set():
+            self.set_status("等待放開快捷鍵")
+            await self._output_open.wait()
+        self.set_status("輸出中")
+
+    def release_turn(self, handle: DictationHandle | None = None):
+        """提前讓出輸出順序（例如發生錯誤、只剩顯示錯誤狀態時）"""
+        handle = handle or _current.get()
+        if handle is not None and handle._turn_done is not None and not handle._turn_done.done():
+            handle._turn_done.set_result(None)
+
+    def _notify(self):
+        if self.on_change:
+            try:
+                self.on_change()
+            except Exception as e:
+                logger.debug("工作狀態回呼失敗: %s", e)
+
+    # ── 輸出閘門（跨執行緒）──────────────────────────────────────────────────
+
+    def hold_output(self):
+        """使用者開始錄音：暫停輸出（避免按住快捷鍵時注入按鍵）"""
+        self.loop.call_soon_threadsafe(self._output_open.clear)
+
+    def release_output(self):
+        self.loop.call_soon_threadsafe(self._output_open.set)
+
+    def active(self) -> list[DictationHandle]:
+        """進行中的工作（依送出順序）"""
+        with self._lock:
+            return sorted(self._active.values(), key=lambda h: h.id)
+
+    def cancel_all(self) -> int:
+        """取消所有進行中的工作，回傳取消的數量"""
+        return sum(handle.cancel() for handle in self.active())
+
+    def run(self, coro_fn, *args, timeout: float | None = None):
+        """同步呼叫端使用：送出並等待結果（取消時拋出 concurrent.futures.CancelledError）"""
+        return self.submit(coro_fn, *args).result(timeout)
+
+    def iterate(self, agen, stop: threading.Event | None = None):
+        """
+        在其他執行緒中以一般 generator 逐段讀取管線上的 async generator
+        （文字注入器在工作執行緒中執行，需要同步的 chunk 來源）；stop 設定後不再讀取與輸出
+        """
+        while stop is None or not stop.is_set():
+            try:
+                chunk = asyncio.run_coroutine_threadsafe(self._anext(agen, stop), self.loop).result()
+            except (StopAsyncIteration, CancelledError):
+                return
+            if stop is not None and stop.is_set():
+                return
+            yield chunk
+
+    async def _anext(self, agen, stop: threading.Event | None):
+        """讀取下一段；記錄進行中的讀取，讓 stream_to_thread 取消時可以中斷"""
+        if stop is not None and stop.is_set():
+            raise StopAsyncIteration
+        self._reading[id(agen)] = asyncio.current_task()
+        try:
+            return await agen.__anext__()
+        finally:
+            self._reading.pop(id(agen), None)
+
+    @staticmethod
+    async def to_thread(fn, *args, on_cancel: Callable[[], None] | None = None):
+        """
+        與 asyncio.to_thread 相同，但本工作被取消時先呼叫 on_cancel，並等待執行緒結束才拋出 CancelledError
+        （執行緒無法中斷；呼叫端的 finally 與後面排隊的工作不可與仍在注入的執行緒同時進行）
+        """
+        worker = asyncio.ensure_future(asyncio.to_thread(fn, *args))
+        try:
+            return await asyncio.shield(worker)
+        except asyncio.CancelledError:
+            if on_cancel:
+                on_cancel()
+            await asyncio.wait({worker})
+            raise
+
+    async def stream_to_thread(self, agen, consumer: Callable):
+        """
+        在工作執行緒中執行 consumer(chunks)，chunks 為 agen 的同步 generator（例如串流注入）；
+        本工作被取消時停止讀取、中斷進行中的讀取，等待執行緒結束後關閉 agen（中斷 HTTP 串流）
+        """
+        stop = threading.Event()
+
+        def interrupt():
+            stop.set()
+            reading = self._reading.get(id(agen))
+            if reading is not None:
+                reading.cancel()
+
+        try:
+            return await self.to_thread(consumer, self.iterate(agen, stop), on_cancel=interrupt)
+        finally:
+            await agen.aclose()
+
+_pipeline: AsyncPipeline | None = None
+_pipeline_lock = threading.Lock()
+
+
+def get_pipeline() -> AsyncPipeline:
+    """取得全域共用的處理管線（事件迴圈在第一次使用時啟動）"""
+    global _pipeline
+    with _pipeline_lock:
+        if _pipeline is None:
+            _pipeline = AsyncPipeline()
+        return _pipeline
@@ -0,0 +1,184 @@
+"""
+LLM 修飾結果快取
+常用短句（「好的，收到」、「明天見」）每次都要完整跑一次 LLM 往返；
+以「引擎 + 模型 + 有效系統提示詞雜湊 + 正規化原文」為鍵快取修飾結果，
+記憶體內為 LRU，並持久化到設定目錄下的 polish_cache.json，依筆數與存活時間淘汰；
+systemPrompt 或 dictionary 變更時整個快取失效
+"""
+
+import hashlib
+import json
+import logging
+import os
+import re
+import threading
+import time
+import unicodedata
+from collections import OrderedDict
+from pathlib import Path
+
+from core.metrics import metrics
+
+logger = logging.getLogger("VoiceType.PolishCache")
+
+CACHE_FILENAME = "polish_cache.json"
+SAVE_DELAY_SECONDS = 2.0    # 寫入磁碟前的合併延遲，避免每次命中/寫入都觸發 I/O
+_WHITESPACE = re.compile(r"\s+")
+
+
+def normalize_text(text: str) -> str:
+    """正規化原文：全半形統一 (NFKC)、合併空白、去除首尾空白"""
+    return _WHITESPACE.sub(" ", unicodedata.normalize("NFKC", text)).strip()
+
+
+def _sha256(text: str) -> str:
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+def settings_fingerprint(cfg: dict) -> str:
+    """會讓整個快取失效的設定（systemPrompt、dictionary）的指紋"""
+    return _sha256(json.dumps([cfg.get("systemPrompt", ""), cfg.get("dictionary", [])], ensure_ascii=False))
+
+
+class PolishCache:
+    """
+    LRU + TTL 的修飾結果快取
+
+    Args:
+        path: 持久化檔案路徑（None 表示只存在記憶體中）
+        max_entries: 最多保留幾筆（0 表示停用）
+        ttl_seconds: 每筆的存活時間
+    """
+
+    def __init__(self, path: Path | None, max_entries: int = 500, ttl_seconds: float = 7 * 86400):
+        self.path = Path(path) if path else None
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.hits = 0
+        self.misses = 0
+        self._entries: OrderedDict[str, tuple[str, float]] = OrderedDict()   # key -> (text, 建立時間)
+        self._fingerprint = ""
+        self._lock = threading.Lock()
+        self._save_timer: threading.Timer | None = None
+        self._load()
+
+    @staticmethod
+    def make_key(provider: str, model: str, system_prompt: str, raw_text: str) -> str:
+        return _sha256("\x1f".join((provider, model, _sha256(system_prompt), normalize_text(raw_text))))
+
+    def configure(self, cfg: dict):
+        """套用設定：更新筆數/存活時間上限；systemPrompt 或 dictionary 變更時清空"""
+        fingerprint = settings_fingerprint(cfg)
+        with self._lock:
+            self.max_entries = cfg.get("polishCacheSize", self.max_entries)
+            self.ttl_seconds = cfg.get("polishCacheTtlHours", self.ttl_seconds / 3600) * 3600
+            changed = fingerprint != self._fingerprint
+            if changed:
+                if self._entries:
+                    logger.info("systemPrompt 或 dictionary 已變更，清除 %d 筆修飾快取", len(self._entries))
+                self._entries.clear()
+                self._fingerprint = fingerprint
+            self._evict()
+        if changed:
+            self._schedule_save()
+
+    def get(self, key: str) -> str | None:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and time.time() - entry[1] > self.ttl_seconds:
+                del self._entries[key]
+                entry = None
+            if entry is None:
+                self.misses += 1
+            else:
+                self._entries.move_to_end(key)
+                self.hits += 1
+        metrics.increment("llm.cache.hit" if entry else "llm.cache.miss")
+        return entry[0] if entry else None
+
+    def put(self, key: str, text: str):
+        if self.max_entries <= 0 or not text:
+            return
+        with self._lock:
+            self._entries[key] = (text, time.time())
+            self._entries.move_to_end(key)
+            self._evict()
+        self._schedule_save()
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+        self._schedule_save()
+
+    @property
+    def hit_rate(self) -> float:
+        total = self.hits + self.misses
+        return self.hits / total if total else 0.0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def _evict(self):
+        """移除過期項目，並依 LRU 順序淘汰超出上限的項目（呼叫端需持有鎖）"""
+        now = time.time()
+        for key in [k for k, (_, created) in self._entries.items() if now - created > self.ttl_seconds]:
+            del self._entries[key]
+        while len(self._entries) > max(self.max_entries, 0):
+            self._entries.popitem(last=False)
+
+    # ── 持久化 ───────────────────────────────────────────────────────────────
+
+    def _load(self):
+        if not self.path or not self.path.exists():
+            return
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+            self._fingerprint = data.get("fingerprint", "")
+            for key, text, created in data.get("entries", []):
+                self._entries[key] = (text, created)
+            logger.info("已載入 %d 筆修飾快取", len(self._entries))
+        except Exception as e:
+            logger.warning("修飾快取讀取失敗，重新建立: %s", e)
+            self._entries.clear()
+
+    def _schedule_save(self):
+        if not self.path:
+            return
+        with self._lock:
+            if self._save_timer is not None:
+                return
+            self._save_timer = threading.Timer(SAVE_DELAY_SECONDS, self.save)
+            self._save_timer.daemon = True
+            self._save_timer.start()
+
+    def save(self):
+        """寫入磁碟（先寫暫存檔再取代，避免寫到一半損毀）"""
+        with self._lock:
+            self._save_timer = None
+            data = {
+                "fingerprint": self._fingerprint,
+                "entries": [[k, text, created] for k, (text, created) in self._entries.items()],
+            }
+        try:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            tmp = self.path.with_suffix(".tmp")
+            with open(tmp, "w", encoding="utf-8") as f:
+                json.dump(data, f, ensure_ascii=False)
+            os.replace(tmp, self.path)
+        except Exception as e:
+            logger.warning("修飾快取寫入失敗: %s", e)
+
+
+_caches: dict[Path, PolishCache] = {}
+_caches_lock = threading.Lock()
+
+
+def get_cache(config_dir: Path) -> PolishCache:
+    """取得設定目錄對應的全域快取（跨設定重新載入保留，不會重複讀檔）"""
+    path = Path(config_dir) / CACHE_FILENAME
+    with _caches_lock:
+        cache = _caches.get(path)
+        if cache is None:
+            cache = _caches[path] = PolishCache(path)
+        return cache
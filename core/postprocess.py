@@ -0,0 +1,179 @@
+"""
+LLM 輸出後處理鏈
+串流與非串流共用同一組有狀態的處理器：每個處理器記住 chunk 邊界附近需要的上下文
+（上一個輸出的字元、尚未能判斷的詞首），讓逐段處理的結果與整段處理完全一致
+
+  MixedSpacing   中英夾雜加空格（涵蓋完整的 CJK 範圍，含擴充區與假名）
+  S2TConverter   本地簡轉繁（台灣用字），以字典樹最長比對處理一對多的詞
+
+用法：
+  chain = build_chain(cfg)
+  for chunk in stream:
+      yield chain.feed(chunk)
+  yield chain.flush()
+"""
+
+import re
+from functools import lru_cache
+
+# CJK 部首、假名、注音、圈字、擴充 A、基本區、相容字、擴充 B 之後（補充平面）
+CJK_RANGES = (
+    r"\u2e80-\u2fdf\u3040-\u30ff\u3100-\u312f\u3200-\u32ff"
+    r"\u3400-\u4dbf\u4e00-\u9fff\uf900-\ufaff\U00020000-\U0003134f"
+)
+_MIXED_BOUNDARY = re.compile(rf"(?<=[A-Za-z0-9])(?=[{CJK_RANGES}])|(?<=[{CJK_RANGES}])(?=[A-Za-z0-9])")
+
+_PHRASE_END = ""  # 字典樹節點中標記詞尾的鍵（不會與任何字元衝突）
+
+
+class PostProcessor:
+    """
+    後處理器介面
+    feed 回傳可以立即輸出的文字（可能暫留結尾幾個字）；flush 輸出暫留的文字並重設狀態
+    """
+
+    name = ""
+
+    def feed(self, chunk: str) -> str:
+        return chunk
+
+    def flush(self) -> str:
+        return ""
+
+    def process(self, text: str) -> str:
+        """處理一段完整的文字"""
+        return self.feed(text) + self.flush()
+
+
+class MixedSpacing(PostProcessor):
+    """中英夾雜自動加空格；記住上一段的最後一個字元，chunk 邊界兩側也能正確加上空格"""
+
+    name = "spacing"
+
+    def __init__(self):
+        self._last = ""
+
+    def feed(self, chunk: str) -> str:
+        if not chunk:
+            return ""
+        out = _MIXED_BOUNDARY.sub(" ", self._last + chunk)[len(self._last):]
+        self._last = chunk[-1]
+        return out
+
+    def flush(self) -> str:
+        self._last = ""
+        return ""
+
+
+@lru_cache(maxsize=1)
+def _s2t_tables() -> tuple[dict, dict]:
+    """載入對照表：(單字 str.translate 表, 詞的字典樹)"""
+    from core.s2t_data import CHARS, PHRASES
+
+    chars = {ord(pair[0]): pair[1] for pair in CHARS.split()}
+    trie: dict = {}
+    for line in PHRASES.strip().splitlines():
+        simplified, traditional = line.split()
+        # 以繁體詞為鍵也加入一次，已經是繁體的文字（干擾、公里）不會被單字對照轉錯
+        for key in (simplified, traditional):
+            node = trie
+            for ch in key:
+                node = node.setdefault(ch, {})
+            node[_PHRASE_END] = traditional
+    return chars, trie
+
+
+class S2TConverter(PostProcessor):
+    """
+    簡體轉繁體：詞以字典樹最長比對（頭髮、關係、週末），其餘逐字查表
+    chunk 結尾若可能是某個詞的開頭（例如「头」後面可能接「发」）會暫留到下一段再決定
+    """
+
+    name = "s2t"
+
+    def __init__(self):
+        self._chars, self._trie = _s2t_tables()
+        self._pending = ""
+
+    def feed(self, chunk: str) -> str:
+        if not chunk:
+            return ""
+        out, self._pending = self._convert(self._pending + chunk, final=False)
+        return out
+
+    def flush(self) -> str:
+        out, _ = self._convert(self._pending, final=True)
+        self._pending = ""
+        return out
+
+    def _convert(self, text: str, final: bool) -> tuple[str, str]:
+        """回傳 (轉換完成的文字, 暫留的結尾)"""
+        trie, chars = self._trie, self._chars
+        out = []
+        n = len(text)
+        i = start = 0
+        while i < n:
+            node = trie.get(text[i])
+            if node is None:
+                i += 1
+                continue
+            match_end, value = 0, None
+            j = i + 1
+            while True:
+                if _PHRASE_END in node:
+                    match_end, value = j, node[_PHRASE_END]
+                if j == n:
+                    # 文字已到結尾但詞可能還沒完，等下一段
+                    if not final and len(node) > (_PHRASE_END in node):
+                        out.append(text[start:i].translate(chars))
+                        return "".join(out), text[i:]
+                    break
+                node = node.get(text[j])
+                if node is None:
+                    break
+                j += 1
+            if value is None:
+                i += 1
+                continue
+            out.append(text[start:i].translate(chars))
+            out.append(value)
+            i = start = match_end
+        out.append(text[start:].translate(chars))
+        return "".join(out), ""
+
+
+class ProcessorChain(PostProcessor):
+    """依序串接多個後處理器；前一個處理器 flush 出的文字會再交給後面的處理器"""
+
+    name = "chain"
+
+    def __init__(self, processors: list[PostProcessor]):
+        self.processors = processors
+
+    def feed(self, chunk: str) -> str:
+        for processor in self.processors:
+            if not chunk:
+                return ""
+            chunk = processor.feed(chunk)
+        return chunk
+
+    def flush(self) -> str:
+        text = ""
+        for processor in self.processors:
+            text = processor.feed(text) + processor.flush()
+        return text
+
+
+def s2t_enabled(cfg: dict) -> bool:
+    """是否以本地轉換取代提示詞中的繁體規則（指定簡體中文或日文時不轉換）"""
+    return cfg.get("convertTraditional", True) and cfg.get("language", "auto") not in ("zh-CN", "ja")
+
+
+def build_chain(cfg: dict) -> ProcessorChain:
+    """依設定建立一次請求用的後處理鏈（處理器有狀態，每次請求各自建立）"""
+    processors: list[PostProcessor] = []
+    if s2t_enabled(cfg):
+        processors.append(S2TConverter())
+    if cfg.get("autoFormat", True):
+        processors.append(MixedSpacing())
+    return ProcessorChain(processors)
@@ -0,0 +1,155 @@
+"""
+供應商端提示詞快取 (Prompt Caching)
+系統提示詞分為固定前綴（systemPrompt + 固定規則，每次完全相同）與放在最後的語境說明，
+讓各家 API 重複使用已計算過的前綴，減少 prefill 時間與輸入 token 費用：
+
+  - OpenAI / Groq：相同前綴自動快取，只需保持前綴不變
+  - Anthropic：在固定前綴的 system 區塊加上 cache_control
+  - Gemini：以固定前綴建立 cachedContents（在背景建立，建立完成前照常送出完整提示詞）
+
+各引擎回報的輸入 / 快取讀取 / 快取寫入 token 數記錄在 metrics 計數器
+llm.prompt.<引擎>.input / .cached / .cache_write（可在 /api/metrics 查看）
+"""
+
+import hashlib
+import logging
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from core.metrics import metrics
+
+logger = logging.getLogger("VoiceType.PromptCache")
+
+GEMINI_CACHE_TTL_SECONDS = 3600
+GEMINI_RENEW_MARGIN_SECONDS = 300     # 到期前多久重新建立，避免請求送出時剛好過期
+GEMINI_RETRY_SECONDS = 1800           # 建立失敗（例如提示詞低於最小快取長度）後多久再試
+
+
+def record_usage(provider: str, input_tokens: int | None, cached_tokens: int | None = 0, cache_write_tokens: int | None = 0):
+    """記錄一次請求的輸入 token 數（input_tokens 為包含快取部分的總數）"""
+    if not input_tokens:
+        return
+    metrics.increment(f"llm.prompt.{provider}.input", input_tokens)
+    if cached_tokens:
+        metrics.increment(f"llm.prompt.{provider}.cached", cached_tokens)
+    if cache_write_tokens:
+        metrics.increment(f"llm.prompt.{provider}.cache_write", cache_write_tokens)
+    logger.debug("%s 輸入 %d tokens（快取讀取 %d、寫入 %d）", provider, input_tokens, cached_tokens or 0, cache_write_tokens or 0)
+
+
+def record_openai_usage(provider: str, usage):
+    """OpenAI / Groq：prompt_tokens 含快取部分，快取數量在 prompt_tokens_details.cached_tokens"""
+    if usage is None:
+        return
+    details = getattr(usage, "prompt_tokens_details", None)
+    record_usage(provider, getattr(usage, "prompt_tokens", 0), getattr(details, "cached_tokens", 0) if details else 0)
+
+
+def record_anthropic_usage(usage):
+    """Anthropic：input_tokens 不含快取讀取 / 寫入的部分"""
+    if usage is None:
+        return
+    cached = getattr(usage, "cache_read_input_tokens", 0) or 0
+    written = getattr(usage, "cache_creation_input_tokens", 0) or 0
+    record_usage("anthropic", (getattr(usage, "input_tokens", 0) or 0) + cached + written, cached, written)
+
+
+def record_gemini_usage(usage_metadata):
+    """Gemini：prompt_token_count 含快取部分"""
+    if usage_metadata is None:
+        return
+    record_usage(
+        "gemini",
+        getattr(usage_metadata, "prompt_token_count", 0),
+        getattr(usage_metadata, "cached_content_token_count", 0),
+    )
+
+
+def anthropic_system(prefix: str, tail: str, cache: bool = True):
+    """Anthropic 的 system 參數：固定前綴加上 cache_control，語境說明放在後面的獨立區塊"""
+    if not cache:
+        return prefix + tail
+    blocks = [{"type": "text", "text": prefix, "cache_control": {"type": "ephemeral"}}]
+    if tail.strip():
+        blocks.append({"type": "text", "text": tail.strip()})
+    return blocks
+
+
+class GeminiPromptCache:
+    """
+    Gemini cachedContents 登錄表：每個 (模型, 固定前綴) 對應一個伺服器端快取
+
+    lookup() 不會阻塞：尚未建立時在背景建立並回傳 None（本次照常送出完整提示詞）
+    """
+
+    def __init__(self, ttl: float = GEMINI_CACHE_TTL_SECONDS):
+        self.ttl = ttl
+        self._entries: dict[tuple, tuple[str | None, float]] = {}   # key -> (快取名稱, 有效期限；名稱為 None 表示建立失敗)
+        self._pending: set[tuple] = set()
+        self._lock = threading.Lock()
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="gemini-cache")
+
+    @staticmethod
+    def _key(client, model: str, prefix: str) -> tuple:
+        return id(client), model, hashlib.sha256(prefix.encode("utf-8")).hexdigest()
+
+    def lookup(self, client, model: str, prefix: str) -> str | None:
+        """
+        回傳可用的快取名稱；沒有時在背景建立
+
+        Args:
+            client: 同步的 genai.Client（建立快取用）
+        """
+        key = self._key(client, model, prefix)
+        now = time.time()
+        with self._lock:
+            name, expires = self._entries.get(key, (None, 0.0))
+            if name is None and expires > now:
+                return None    # 最近建立失敗，稍後再試
+            usable = name if name and expires > now else None
+            if usable and expires - GEMINI_RENEW_MARGIN_SECONDS > now or key in self._pending:
+                return usable
+            self._pending.add(key)
+        self._executor.submit(self._create, client, key, model, prefix)
+        return usable
+
+    def _create(self, client, key: tuple, model: str, prefix: str):
+        from google.genai import types
+
+        try:
+            cache = client.caches.create(
+                model=model,
+                config=types.CreateCachedContentConfig(system_instruction=prefix, ttl=f"{int(self.ttl)}s"),
+            )
+            entry = (cache.name, time.time() + self.ttl)
+            logger.info("已建立 Gemini 提示詞快取 %s (%s)", cache.name, model)
+        except Exception as e:
+            # 常見原因：提示詞低於該模型的最小快取長度；此時仍有 Gemini 的隱式前綴快取
+            entry = (None, time.time() + GEMINI_RETRY_SECONDS)
+            logger.info("無法建立 Gemini 提示詞快取，改用一般請求: %s", e)
+        with self._lock:
+            self._entries[key] = entry
+            self._pending.discard(key)
+
+    def invalidate(self, client, model: str, prefix: str):
+        """快取在伺服器端已失效（請求失敗）時移除，下次重新建立"""
+        with self._lock:
+            self._entries.pop(self._key(client, model, prefix), None)
+
+    def wait(self, timeout: float | None = None):
+        """等待背景建立完成（基準測試用）"""
+        self._executor.submit(lambda: None).result(timeout)
+
+
+_gemini_cache: GeminiPromptCache | None = None
+_gemini_cache_lock = threading.Lock()
+
+
+def get_gemini_cache() -> GeminiPromptCache:
+    """取得全域共用的 Gemini 提示詞快取登錄表"""
+    global _gemini_cache
+    with _gemini_cache_lock:
+        if _gemini_cache is None:
+            _gemini_cache = GeminiPromptCache()
+        return _gemini_cache
@@ -1,10 +1,9 @@
 """
 音訊錄製模組
-使用 sounddevice 進行即時錄音，支援 Push-to-Talk
+使用 sounddevice 進行即時錄音，支援 Push-to-Talk 與常駐暖機（預錄）模式
 """
 
 import numpy as np
-import sounddevice as sd
 import logging
 import threading
 import io
@@ -16,53 +15,261 @@ logger = logging.getLogger("VoiceType.Recorder")
 SAMPLE_RATE = 16000  # Whisper 推薦 16kHz
 CHANNELS = 1
 DTYPE = "int16"
+BLOCK_SIZE = 1024
+INITIAL_BUFFER_SECONDS = 30   # 預先配置的緩衝長度，超過時倍增
+DEFAULT_MAX_SECONDS = 300     # 錄音長度上限（記憶體上限 = 秒數 × 32KB）
+
+
+class AudioBuffer:
+    """
+    預先配置、可倍增的 int16 錄音緩衝區
+
+    音訊回呼直接寫入預先配置的陣列，不再每個區塊 copy 一次；
+    容量不足時倍增（攤銷後每次錄音只配置 O(log n) 次），達到上限後丟棄後續音訊。
+    """
+
+    def __init__(self, max_seconds: float = DEFAULT_MAX_SECONDS, sample_rate: int = SAMPLE_RATE):
+        self.max_samples = int(max_seconds * sample_rate)
+        initial = min(INITIAL_BUFFER_SECONDS * sample_rate, self.max_samples)
+        self._data = np.empty(initial, dtype=np.int16)
+        self._length = 0
+        self.allocations = 1
+        self.overflowed = False
+
+    @property
+    def capacity(self) -> int:
+        return len(self._data)
+
+    def __len__(self) -> int:
+        return self._length
+
+    def write(self, block: np.ndarray) -> np.ndarray | None:
+        """寫入一個區塊，回傳指向緩衝區內該區塊的 view（已達上限則回傳 None）"""
+        block = block.reshape(-1)
+        end = self._length + len(block)
+        if end > self.max_samples:
+            self.overflowed = True
+            block = block[: self.max_samples - self._length]
+            end = self.max_samples
+            if len(block) == 0:
+                return None
+        if end > len(self._data):
+            self._grow(end)
+        self._data[self._length:end] = block
+        view = self._data[self._length:end]
+        self._length = end
+        return view
+
+    def _grow(self, needed: int):
+        capacity = min(max(needed, len(self._data) * 2), self.max_samples)
+        grown = np.empty(capacity, dtype=np.int16)
+        grown[: self._length] = self._data[: self._length]
+        self._data = grown
+        self.allocations += 1
+
+    def view(self) -> np.ndarray:
+        """回傳目前錄音內容的 view（不複製）"""
+        return self._data[: self._length]
+
+
+class PrerollRing:
+    """固定長度的環形緩衝區，保留最近 N 個樣本（暖機模式的預錄音訊）"""
+
+    def __init__(self, samples: int):
+        self._data = np.zeros(max(1, samples), dtype=np.int16)
+        self._pos = 0
+        self._filled = 0
+
+    def write(self, block: np.ndarray):
+        block = block.reshape(-1)
+        size = len(self._data)
+        if len(block) >= size:
+            self._data[:] = block[-size:]
+            self._pos = 0
+            self._filled = size
+            return
+        first = min(len(block), size - self._pos)
+        self._data[self._pos:self._pos + first] = block[:first]
+        self._data[: len(block) - first] = block[first:]
+        self._pos = (self._pos + len(block)) % size
+        self._filled = min(size, self._filled + len(block))
+
+    def snapshot(self) -> np.ndarray:
+        """依時間順序回傳目前保留的樣本"""
+        if self._filled < len(self._data):
+            return self._data[self._pos - self._filled:self._pos].copy()
+        return np.concatenate((self._data[self._pos:], self._data[: self._pos]))
+
+    def clear(self):
+        self._pos = 0
+        self._filled = 0
 
 
 class AudioRecorder:
-    """Push-to-Talk 錄音器"""
+    """
+    Push-to-Talk 錄音器
+
+    一般模式：每次按下快捷鍵才開啟輸入裝置。
+    暖機模式 (enable_warm)：輸入串流常駐開啟並寫入預錄環形緩衝區，
+    start()/stop() 只切換寫入目標，按下前最近 N 毫秒的音訊也會包含在錄音中；
+    閒置超過指定時間自動關閉串流，下次按下時再重新開啟。
+
+    backend 為提供 InputStream 的模組（預設 sounddevice），可替換為假裝置以便無音效卡測試。
+    """
 
-    def __init__(self):
-        self._chunks: list[np.ndarray] = []
+    def __init__(self, max_seconds: float = DEFAULT_MAX_SECONDS, backend=None):
+        self.max_seconds = max_seconds
+        self._backend = backend
+        self._buffer = AudioBuffer(max_seconds)
         self._stream = None
         self._lock = threading.Lock()
+        self._buffer_lock = threading.Lock()  # 保護音訊回呼與 start/stop 切換寫入目標
+        self._listeners = []
+        self._recording = False
+        self._warm = False
+        self._preroll: PrerollRing | None = None
+        self._idle_suspend_seconds = 0.0
+        self._idle_timer: threading.Timer | None = None
+
+    @property
+    def backend(self):
+        if self._backend is None:
+            import sounddevice
+            self._backend = sounddevice
+        return self._backend
+
+    def add_listener(self, listener):
+        """註冊音訊區塊監聽器（在音訊執行緒中呼叫，必須快速返回）"""
+        with self._lock:
+            # copy-on-write：音訊執行緒迭代時不需要加鎖
+            if listener not in self._listeners:
+                self._listeners = self._listeners + [listener]
+
+    def remove_listener(self, listener):
+        """移除音訊區塊監聽器"""
+        with self._lock:
+            self._listeners = [l for l in self._listeners if l is not listener]
+
+    # ── 暖機模式 ─────────────────────────────────────────────────────────────
+
+    def enable_warm(self, preroll_ms: int = 300, idle_suspend_seconds: float = 600):
+        """啟用暖機模式：立即開啟輸入串流並持續保留最近 preroll_ms 的音訊"""
+        with self._lock:
+            self._warm = True
+            self._preroll = PrerollRing(SAMPLE_RATE * preroll_ms // 1000)
+            self._idle_suspend_seconds = idle_suspend_seconds
+            if self._stream is None:
+                self._open_stream()
+            self._schedule_suspend()
+        logger.info("Warm capture enabled (pre-roll %dms, idle suspend %.0fs)", preroll_ms, idle_suspend_seconds)
+
+    def disable_warm(self):
+        """關閉暖機模式並釋放輸入裝置（錄音中則於 stop() 時釋放）"""
+        with self._lock:
+            self._warm = False
+            self._preroll = None
+            self._cancel_suspend()
+            if not self._recording:
+                self._close_stream()
+
+    def _schedule_suspend(self):
+        self._cancel_suspend()
+        if self._idle_suspend_seconds > 0:
+            self._idle_timer = threading.Timer(self._idle_suspend_seconds, self._suspend)
+            self._idle_timer.daemon = True
+            self._idle_timer.start()
+
+    def _cancel_suspend(self):
+        if self._idle_timer:
+            self._idle_timer.cancel()
+            self._idle_timer = None
+
+    def _suspend(self):
+        """閒置過久：關閉輸入串流（保留暖機設定，下次 start() 時重新開啟）"""
+        with self._lock:
+            if self._recording or self._stream is None:
+                return
+            self._close_stream()
+            if self._preroll:
+                self._preroll.clear()
+        logger.info("Warm capture suspended after %.0fs idle", self._idle_suspend_seconds)
+
+    # ── 錄音控制 ─────────────────────────────────────────────────────────────
+
+    def _open_stream(self):
+        self._stream = self.backend.InputStream(
+            samplerate=SAMPLE_RATE,
+            channels=CHANNELS,
+            dtype=DTYPE,
+            blocksize=BLOCK_SIZE,
+            callback=self._callback,
+        )
+        self._stream.start()
+
+    def _close_stream(self):
+        if self._stream:
+            self._stream.stop()
+            self._stream.close()
+            self._stream = None
 
     def start(self):
         """開始錄音"""
         with self._lock:
-            self._chunks = []
-            self._stream = sd.InputStream(
-                samplerate=SAMPLE_RATE,
-                channels=CHANNELS,
-                dtype=DTYPE,
-                blocksize=1024,
-                callback=self._callback,
-            )
-            self._stream.start()
+            self._cancel_suspend()
+            # 每次錄音使用新的緩衝區：上一段錄音的 view 可能仍在背景處理中，不能覆寫
+            buffer = AudioBuffer(self.max_seconds)
+            preroll = None
+            with self._buffer_lock:
+                if self._warm and self._stream is not None and self._preroll:
+                    preroll = buffer.write(self._preroll.snapshot())
+                self._buffer = buffer
+                self._recording = True
+            if preroll is not None and len(preroll):
+                self._notify(preroll)
+            if self._stream is None:
+                self._open_stream()
 
     def stop(self) -> np.ndarray:
-        """停止錄音，回傳音訊 numpy array (int16, 16kHz, mono)"""
+        """停止錄音，回傳音訊 numpy array (int16, 16kHz, mono；指向錄音緩衝區的 view，不複製)"""
         with self._lock:
-            if self._stream:
-                self._stream.stop()
-                self._stream.close()
-                self._stream = None
-
-            if not self._chunks:
-                return np.array([], dtype=np.int16)
+            with self._buffer_lock:
+                self._recording = False
+            if self._warm:
+                self._schedule_suspend()
+            else:
+                self._close_stream()
 
-            audio = np.concatenate(self._chunks, axis=0).flatten()
-            self._chunks = []
-            return audio
+            if self._buffer.overflowed:
+                logger.warning("錄音超過上限 %.0f 秒，超出部分已捨棄", self.max_seconds)
+            return self._buffer.view()
 
     def _callback(self, indata, frames, time_info, status):
-        """sounddevice 回呼：收集音訊片段"""
+        """sounddevice 回呼：將音訊區塊直接寫入預先配置的緩衝區（暖機待命時寫入預錄環形緩衝區）"""
         if status:
             logger.warning("錄音狀態: %s", status)
-        self._chunks.append(indata.copy())
+        with self._buffer_lock:
+            if not self._recording:
+                if self._preroll:
+                    self._preroll.write(indata)
+                return
+            block = self._buffer.write(indata)
+        if block is not None:
+            self._notify(block)
+
+    def _notify(self, block: np.ndarray):
+        for listener in self._listeners:
+            try:
+                listener(block)
+            except Exception as e:
+                logger.debug("Listener error: %s", e)
 
     @property
     def is_recording(self) -> bool:
-        return self._stream is not None and self._stream.active
+        return self._recording and self._stream is not None and self._stream.active
+
+    @property
+    def is_warm(self) -> bool:
+        return self._warm and self._stream is not None
 
 
 def audio_to_wav_bytes(audio: np.ndarray, sample_rate: int = SAMPLE_RATE) -> bytes:
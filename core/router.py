@@ -0,0 +1,315 @@
+"""
+自適應引擎路由 (Adaptive Provider Routing)
+每個階段（stt / llm）有一份依偏好排序的可用引擎清單；為每個引擎記錄延遲與錯誤率的
+指數移動平均 (EWMA)，每次請求送給最健康、最快的引擎，失敗時依序改用下一個
+
+  - 連續失敗 FAILURE_THRESHOLD 次後熔斷（open），冷卻期間不再送出請求；
+    冷卻結束後進入半開（half_open），只放行一個探測請求，成功即恢復、失敗則再次熔斷（冷卻時間加倍）
+  - 偏好順序較前的引擎只要分數不比最佳者差 SWITCH_MARGIN 以上就優先使用，避免在相近的引擎間來回切換
+  - 錯誤率隨時間衰減（半衰期 ERROR_HALF_LIFE_SECONDS），短暫故障過後不會長期被排在後面
+  - 因為較慢或錯誤率較高而被略過的引擎超過 EXPLORE_SECONDS 沒有新樣本時，放行一個請求重新量測，恢復後即可切回
+  - 狀態持久化到設定目錄下的 routing_state.json，重新啟動後沿用（熔斷中的引擎不會一啟動就被重試）
+
+用法：
+  router = get_router(settings.config_dir)
+  order = router.order("stt", ["groq", "openai"])
+  provider, text = router.call("stt", order, lambda provider: transcribe_with(provider))
+"""
+
+import asyncio
+import json
+import logging
+import os
+import threading
+import time
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from typing import Callable
+
+from core.deadline import deadline_expired
+from core.metrics import metrics
+
+logger = logging.getLogger("VoiceType.Router")
+
+STATE_FILENAME = "routing_state.json"
+SAVE_DELAY_SECONDS = 2.0
+
+EWMA_ALPHA = 0.2                # 新樣本的權重
+ERROR_PENALTY = 4.0             # 分數 = 延遲 × (1 + ERROR_PENALTY × 錯誤率)
+SWITCH_MARGIN = 0.5             # 偏好較前的引擎分數在最佳者的 1.5 倍內時仍優先使用
+FAILURE_THRESHOLD = 3           # 連續失敗幾次後熔斷
+COOLDOWN_SECONDS = 30.0         # 第一次熔斷的冷卻時間
+MAX_COOLDOWN_SECONDS = 600.0
+EXPLORE_SECONDS = 60.0          # 被略過的引擎多久重新量測一次
+ERROR_HALF_LIFE_SECONDS = 120.0 # 錯誤率的衰減半衰期
+
+CLOSED, OPEN, HALF_OPEN = "closed", "open", "half_open"
+
+
+@dataclass
+class ProviderHealth:
+    """單一引擎在某個階段的健康狀態"""
+    latency: float | None = None    # 成功請求延遲的 EWMA（秒）
+    error_rate: float = 0.0         # 失敗率的 EWMA（0~1）
+    samples: int = 0
+    failures: int = 0               # 連續失敗次數
+    state: str = CLOSED
+    opened_at: float = 0.0          # 熔斷時間（time.time()，跨重新啟動有效）
+    cooldown: float = COOLDOWN_SECONDS
+    probing: bool = False           # 半開狀態下已有探測請求在進行
+    last_error: str = ""
+    updated_at: float = 0.0         # 最後一次送出請求的時間（time.time()）
+
+    def current_error_rate(self, now: float, half_life: float) -> float:
+        """依距離上次請求的時間衰減後的錯誤率"""
+        if not self.error_rate or half_life <= 0:
+            return self.error_rate
+        return self.error_rate * 0.5 ** (max(0.0, now - self.updated_at) / half_life)
+
+    def score(self, now: float, half_life: float) -> float | None:
+        if self.latency is None:
+            return None
+        return self.latency * (1 + ERROR_PENALTY * self.current_error_rate(now, half_life))
+
+    def available(self, now: float) -> bool:
+        """是否可以送出請求（熔斷冷卻結束時轉為半開）"""
+        if self.state == OPEN and now - self.opened_at >= self.cooldown:
+            self.state = HALF_OPEN
+            self.probing = False
+        if self.state == HALF_OPEN:
+            return not self.probing
+        return self.state == CLOSED
+
+
+class ProviderRouter:
+    """依延遲與錯誤率選擇引擎，並在失敗時自動切換"""
+
+    def __init__(self, path: Path | None = None):
+        self.path = Path(path) if path else None
+        self.cooldown = COOLDOWN_SECONDS
+        self.explore_seconds = EXPLORE_SECONDS
+        self.error_half_life = ERROR_HALF_LIFE_SECONDS
+        self._health: dict[str, dict[str, ProviderHealth]] = {}   # stage -> provider -> 狀態
+        self._lock = threading.Lock()
+        self._save_timer: threading.Timer | None = None
+        self._load()
+
+    def _get(self, stage: str, provider: str) -> ProviderHealth:
+        """取得（必要時建立）狀態（呼叫端需持有鎖）"""
+        providers = self._health.setdefault(stage, {})
+        if provider not in providers:
+            providers[provider] = ProviderHealth(cooldown=self.cooldown)
+        return providers[provider]
+
+    def order(self, stage: str, candidates: list[str]) -> list[str]:
+        """
+        回傳本次請求的嘗試順序
+
+        可用的引擎中，依偏好順序選第一個分數不比最佳者差 SWITCH_MARGIN 以上的引擎（沒有樣本的引擎視為可用），
+        其餘可用引擎依偏好順序排在後面作為失敗時的備援；熔斷中的引擎不列入（全部熔斷時依偏好順序全部嘗試）。
+        偏好順序較前、但超過 explore_seconds 沒有新樣本的引擎會優先放行一次，重新量測延遲
+        """
+        if len(candidates) <= 1:
+            return list(candidates)
+        now = time.time()
+        with self._lock:
+            health = {p: self._get(stage, p) for p in candidates}
+            usable = [p for p in candidates if health[p].available(now)]
+            score = {p: health[p].score(now, self.error_half_life) for p in usable}
+            scores = [s for s in score.values() if s is not None]
+            best = min(scores) if scores else None
+            chosen = next(
+                (p for p in usable if best is None or score[p] is None or score[p] <= best * (1 + SWITCH_MARGIN)),
+                None,
+            )
+            for p in usable[:usable.index(chosen)] if chosen else []:
+                if now - health[p].updated_at >= self.explore_seconds:
+                    health[p].updated_at = now   # 同時間的其他請求不重複量測
+                    chosen = p
+                    break
+        ordered = ([chosen] if chosen else []) + [p for p in usable if p != chosen]
+        return ordered or list(candidates)
+
+    def begin(self, stage: str, provider: str):
+        """送出請求前呼叫：半開狀態的引擎標記為探測中"""
+        with self._lock:
+            health = self._get(stage, provider)
+            if health.state == HALF_OPEN:
+                health.probing = True
+
+    def record_success(self, stage: str, provider: str, seconds: float):
+        with self._lock:
+            health = self._get(stage, provider)
+            health.latency = seconds if health.latency is None else (1 - EWMA_ALPHA) * health.latency + EWMA_ALPHA * seconds
+            now = time.time()
+            health.error_rate = (1 - EWMA_ALPHA) * health.current_error_rate(now, self.error_half_life)
+            health.samples += 1
+            health.updated_at = now
+            health.failures = 0
+            if health.state != CLOSED:
+                logger.info("%s 引擎 %s 已恢復", stage, provider)
+            health.state = CLOSED
+            health.probing = False
+            health.cooldown = self.cooldown
+        self._schedule_save()
+
+    def record_failure(self, stage: str, provider: str, error: Exception | str):
+        with self._lock:
+            health = self._get(stage, provider)
+            now = time.time()
+            health.error_rate = (1 - EWMA_ALPHA) * health.current_error_rate(now, self.error_half_life) + EWMA_ALPHA
+            health.samples += 1
+            health.updated_at = now
+            health.failures += 1
+            health.last_error = str(error)[:200]
+            if health.state == HALF_OPEN:
+                # 探測失敗：再次熔斷，冷卻時間加倍
+                health.cooldown = min(health.cooldown * 2, MAX_COOLDOWN_SECONDS)
+                self._open(stage, provider, health)
+            elif health.state == CLOSED and health.failures >= FAILURE_THRESHOLD:
+                self._open(stage, provider, health)
+        self._schedule_save()
+
+    @staticmethod
+    def _open(stage: str, provider: str, health: ProviderHealth):
+        health.state = OPEN
+        health.opened_at = time.time()
+        health.probing = False
+        metrics.increment(f"router.{stage}.opened")
+        logger.warning("%s 引擎 %s 連續失敗 %d 次，暫停使用 %.0f 秒", stage, provider, health.failures, health.cooldown)
+
+    def call(self, stage: str, order: list[str], fn: Callable[[str], object]):
+        """依序嘗試各引擎直到成功，回傳 (引擎, 結果)；全部失敗時拋出第一個錯誤"""
+        errors = []
+        for i, provider in enumerate(order):
+            self.begin(stage, provider)
+            start = time.perf_counter()
+            try:
+                result = fn(provider)
+            except Exception as e:
+                self._failed(stage, order, i, e)
+                errors.append(e)
+                continue
+            finally:
+                self._end(stage, provider)
+            self.record_success(stage, provider, time.perf_counter() - start)
+            return provider, result
+        raise errors[0]
+
+    async def acall(self, stage: str, order: list[str], fn: Callable[[str], object]):
+        """call 的 asyncio 版本；fn 回傳 coroutine，使用者取消不計為失敗（超過延遲預算時計為失敗）"""
+        errors = []
+        for i, provider in enumerate(order):
+            self.begin(stage, provider)
+            start = time.perf_counter()
+            try:
+                result = await fn(provider)
+            except Exception as e:
+                self._failed(stage, order, i, e)
+                errors.append(e)
+                continue
+            except asyncio.CancelledError:
+                # 超過延遲預算而被取消視為失敗（卡住的引擎下次會排在後面）；使用者取消不計
+                if deadline_expired():
+                    self.record_failure(stage, provider, "超過期限")
+                raise
+            finally:
+                self._end(stage, provider)
+            self.record_success(stage, provider, time.perf_counter() - start)
+            return provider, result
+        raise errors[0]
+
+    def _failed(self, stage: str, order: list[str], index: int, error: Exception):
+        self.record_failure(stage, order[index], error)
+        if index + 1 < len(order):
+            logger.warning("%s 引擎 %s 失敗 (%s)，改用 %s", stage, order[index], error, order[index + 1])
+            metrics.increment(f"router.{stage}.failover")
+
+    def _end(self, stage: str, provider: str):
+        """請求結束（含被取消）：解除半開探測的標記"""
+        with self._lock:
+            self._get(stage, provider).probing = False
+
+    def snapshot(self) -> dict:
+        """各階段各引擎的狀態（設定頁面顯示用）"""
+        now = time.time()
+        with self._lock:
+            result = {}
+            for stage, providers in self._health.items():
+                result[stage] = {}
+                for provider, health in providers.items():
+                    health.available(now)
+                    result[stage][provider] = {
+                        "state": health.state,
+                        "latency_ms": round(health.latency * 1000) if health.latency is not None else None,
+                        "error_rate": round(health.current_error_rate(now, self.error_half_life), 3),
+                        "samples": health.samples,
+                        "retry_in": max(0, round(health.opened_at + health.cooldown - now)) if health.state == OPEN else 0,
+                        "last_error": health.last_error,
+                    }
+            return result
+
+    def reset(self, stage: str | None = None):
+        """清除狀態（省略 stage 時清除全部）"""
+        with self._lock:
+            if stage is None:
+                self._health.clear()
+            else:
+                self._health.pop(stage, None)
+        self._schedule_save()
+
+    # ── 持久化 ───────────────────────────────────────────────────────────────
+
+    def _load(self):
+        if not self.path or not self.path.exists():
+            return
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+            for stage, providers in data.items():
+                for provider, fields in providers.items():
+                    health = ProviderHealth(**{k: v for k, v in fields.items() if k in ProviderHealth.__dataclass_fields__})
+                    health.probing = False
+                    self._health.setdefault(stage, {})[provider] = health
+            logger.info("已載入引擎路由狀態")
+        except Exception as e:
+            logger.warning("引擎路由狀態讀取失敗，重新建立: %s", e)
+            self._health.clear()
+
+    def _schedule_save(self):
+        if not self.path:
+            return
+        with self._lock:
+            if self._save_timer is not None:
+                return
+            self._save_timer = threading.Timer(SAVE_DELAY_SECONDS, self.save)
+            self._save_timer.daemon = True
+            self._save_timer.start()
+
+    def save(self):
+        """寫入磁碟（先寫暫存檔再取代，避免寫到一半損毀）"""
+        with self._lock:
+            self._save_timer = None
+            data = {stage: {p: asdict(h) for p, h in providers.items()} for stage, providers in self._health.items()}
+        try:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            tmp = self.path.with_suffix(".tmp")
+            with open(tmp, "w", encoding="utf-8") as f:
+                json.dump(data, f, ensure_ascii=False, indent=2)
+            os.replace(tmp, self.path)
+        except Exception as e:
+            logger.warning("引擎路由狀態寫入失敗: %s", e)
+
+
+_routers: dict[Path, ProviderRouter] = {}
+_routers_lock = threading.Lock()
+
+
+def get_router(config_dir: Path) -> ProviderRouter:
+    """取得設定目錄對應的全域路由器（跨設定重新載入保留）"""
+    path = Path(config_dir) / STATE_FILENAME
+    with _routers_lock:
+        router = _routers.get(path)
+        if router is None:
+            router = _routers[path] = ProviderRouter(path)
+        return router
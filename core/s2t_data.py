@@ -0,0 +1,562 @@
+"""
+簡體 → 繁體（台灣用字）對照表
+CHARS 為單字對照（每個項目兩個字：簡體、繁體），一對多的字取台灣最常見的寫法；
+本身也是常用繁體字的簡體字（范、里、后、干、几…）不放在 CHARS，只透過 PHRASES 轉換，
+已經是繁體的文字（范先生、一里路、佣金、皇后）才不會被改錯；
+PHRASES 為需要依上下文決定的詞（頭髮、關係、週末…），以最長比對優先於單字
+"""
+
+CHARS = """
+爱愛 碍礙 袄襖 肮骯
+坝壩 罢罷 摆擺 败敗 颁頒 办辦 帮幫 绑綁 谤謗 宝寶 饱飽 报報 鲍鮑 辈輩 贝貝 备備 惫憊 笔筆 币幣 毕畢
+闭閉 边邊 编編 贬貶 变變 辩辯 辫辮 标標 鳖鱉 别別 宾賓 滨濱 摈擯 饼餅 并並 拨撥 钵缽 铂鉑 驳駁 补補
+财財 参參 蚕蠶 残殘 惭慚 惨慘 灿燦 仓倉 苍蒼 舱艙 厕廁 侧側 测測 层層 搀攙 馋饞 缠纏 产產 阐闡
+颤顫 长長 偿償 肠腸 尝嘗 场場 厂廠 畅暢 钞鈔 车車 彻徹 尘塵 陈陳 衬襯 称稱 惩懲 诚誠 骋騁 痴癡 迟遲
+驰馳 齿齒 冲衝 虫蟲 宠寵 筹籌 础礎 处處 触觸 传傳 疮瘡 闯闖 创創 锤錘 纯純 词詞 辞辭 赐賜 聪聰
+葱蔥 从從 丛叢 凑湊 窜竄 错錯 储儲 册冊 厨廚
+达達 带帶 贷貸 单單 担擔 胆膽 惮憚 诞誕 弹彈 当當 挡擋 党黨 档檔 导導 岛島 祷禱 盗盜 灯燈 邓鄧 敌敵
+涤滌 递遞 缔締 颠顛 点點 垫墊 电電 淀澱 钓釣 调調 谍諜 叠疊 钉釘 顶頂 订訂 东東 动動 栋棟 冻凍 
+独獨 读讀 赌賭 镀鍍 锻鍛 断斷 缎緞 队隊 对對 吨噸 夺奪 堕墮 丢丟 兑兌 顿頓
+额額 恶惡 饿餓 儿兒 尔爾 饵餌 贰貳
+罚罰 阀閥 贩販 饭飯 访訪 纺紡 飞飛 废廢 费費 纷紛 坟墳 奋奮 愤憤 粪糞 丰豐 风風 枫楓 疯瘋
+冯馮 缝縫 讽諷 凤鳳 肤膚 辐輻 抚撫 辅輔 赋賦 复復 负負 讣訃 妇婦 缚縛 烦煩
+该該 钙鈣 盖蓋 赶趕 秆稈 赣贛 冈岡 刚剛 钢鋼 纲綱 岗崗 镐鎬 搁擱 鸽鴿 阁閣 个個 给給 龚龔 巩鞏
+贡貢 钩鉤 沟溝 构構 购購 够夠 蛊蠱 顾顧 剐剮 关關 观觀 馆館 惯慣 贯貫 广廣 规規 归歸 龟龜 闺閨 轨軌
+诡詭 柜櫃 贵貴 刽劊 辊輥 滚滾 锅鍋 国國 过過 挂掛
+骇駭 韩韓 汉漢 号號 颢顥 贺賀 恒恆 轰轟 红紅 鸿鴻 壶壺 护護 沪滬 哗嘩 华華 画畫 话話 怀懷
+坏壞 欢歡 环環 还還 缓緩 换換 唤喚 痪瘓 焕煥 涣渙 谎謊 挥揮 辉輝 毁毀 贿賄 秽穢 会會 烩燴 汇匯 讳諱
+诲誨 绘繪 荤葷 浑渾 获獲 货貨 祸禍
+击擊 机機 积積 饥飢 迹跡 讥譏 鸡雞 绩績 缉緝 极極 辑輯 级級 挤擠 蓟薊 剂劑 济濟 计計 记記 际際
+继繼 纪紀 夹夾 荚莢 颊頰 贾賈 钾鉀 价價 驾駕 歼殲 监監 坚堅 笺箋 间間 艰艱 缄緘 茧繭 检檢 碱鹼 拣揀
+捡撿 简簡 俭儉 减減 荐薦 槛檻 鉴鑑 践踐 贱賤 见見 键鍵 舰艦 剑劍 饯餞 渐漸 溅濺 涧澗 将將 浆漿 蒋蔣
+桨槳 奖獎 讲講 酱醬 胶膠 浇澆 骄驕 娇嬌 搅攪 铰鉸 矫矯 侥僥 脚腳 饺餃 缴繳 绞絞 轿轎 较較 阶階 节節
+洁潔 结結 诫誡 届屆 紧緊 锦錦 仅僅 谨謹 进進 晋晉 烬燼 尽盡 劲勁 荆荊 茎莖 惊驚 经經 颈頸 镜鏡 径徑
+痉痙 竞競 净淨 纠糾 厩廄 旧舊 驹駒 举舉 据據 锯鋸 惧懼 剧劇 鹃鵑 绢絹 决決 诀訣 绝絕 觉覺 军軍
+骏駿
+开開 凯凱 颗顆 壳殼 课課 垦墾 恳懇 抠摳 库庫 裤褲 夸誇 块塊 侩儈 宽寬 矿礦 旷曠 况況 亏虧 窥窺 馈饋
+溃潰 扩擴 阔闊
+腊臘 蜡蠟 来來 赖賴 蓝藍 栏欄 拦攔 篮籃 阑闌 兰蘭 澜瀾 谰讕 揽攬 览覽 懒懶 缆纜 烂爛 滥濫 捞撈 劳勞
+涝澇 乐樂 镭鐳 垒壘 类類 泪淚 篱籬 离離 鲤鯉 礼禮 丽麗 厉厲 励勵 砾礫 历歷 沥瀝 隶隸 俩倆 联聯
+莲蓮 连連 镰鐮 怜憐 涟漣 帘簾 敛斂 脸臉 链鏈 恋戀 炼煉 练練 粮糧 凉涼 两兩 辆輛 谅諒 疗療 辽遼 镣鐐
+猎獵 临臨 邻鄰 鳞鱗 凛凜 赁賃 龄齡 铃鈴 灵靈 岭嶺 领領 馏餾 刘劉 龙龍 聋聾 咙嚨 笼籠 垄壟 拢攏 陇隴
+楼樓 娄婁 搂摟 篓簍 芦蘆 卢盧 颅顱 庐廬 炉爐 掳擄 卤滷 虏虜 鲁魯 赂賂 禄祿 录錄 陆陸 驴驢 吕呂 铝鋁
+侣侶 屡屢 缕縷 虑慮 滤濾 绿綠 峦巒 挛攣 孪孿 乱亂 抡掄 轮輪 伦倫 仑侖 沦淪 纶綸 论論 萝蘿 罗羅 逻邏
+锣鑼 箩籮 骡騾 骆駱 络絡 莱萊 啰囉
+妈媽 玛瑪 码碼 蚂螞 马馬 骂罵 吗嗎 买買 麦麥 卖賣 迈邁 脉脈 瞒瞞 馒饅 蛮蠻 满滿 谩謾 猫貓 锚錨 铆鉚
+贸貿 么麼 没沒 镁鎂 门門 闷悶 们們 锰錳 梦夢 谜謎 弥彌 觅覓 绵綿 缅緬 庙廟 灭滅 悯憫 闽閩 鸣鳴 铭銘
+谬謬 谋謀 亩畝
+钠鈉 纳納 难難 挠撓 脑腦 恼惱 闹鬧 馁餒 内內 拟擬 腻膩 撵攆 酿釀 鸟鳥 聂聶 镊鑷 镍鎳 柠檸 狞獰 宁寧
+拧擰 泞濘 钮鈕 纽紐 脓膿 浓濃 农農 疟瘧 诺諾
+欧歐 鸥鷗 殴毆 呕嘔 沤漚
+盘盤 庞龐 赔賠 喷噴 鹏鵬 骗騙 飘飄 频頻 贫貧 苹蘋 凭憑 评評 泼潑 颇頗 扑撲 铺鋪 谱譜 抛拋
+栖棲 凄淒 脐臍 齐齊 骑騎 岂豈 启啟 气氣 弃棄 讫訖 牵牽 铅鉛 迁遷 签簽 谦謙 钱錢 钳鉗 潜潛 浅淺 谴譴
+堑塹 枪槍 呛嗆 墙牆 蔷薔 强強 抢搶 锹鍬 桥橋 乔喬 侨僑 翘翹 窍竅 窃竊 钦欽 亲親 寝寢 轻輕 氢氫 倾傾
+顷頃 请請 庆慶 琼瓊 穷窮 趋趨 区區 躯軀 驱驅 龋齲 颧顴 权權 劝勸 却卻 确確
+让讓 饶饒 扰擾 绕繞 热熱 韧韌 认認 纫紉 荣榮 绒絨 软軟 锐銳 闰閏 润潤
+洒灑 萨薩 鳃鰓 赛賽 伞傘 丧喪 骚騷 扫掃 涩澀 杀殺 纱紗 筛篩 晒曬 闪閃 陕陝 赡贍 缮繕 伤傷 赏賞 烧燒
+绍紹 赊賒 摄攝 慑懾 设設 绅紳 审審 婶嬸 肾腎 渗滲 声聲 绳繩 胜勝 圣聖 师師 狮獅 湿濕 诗詩 尸屍 时時
+蚀蝕 实實 识識 驶駛 势勢 适適 释釋 饰飾 视視 试試 寿壽 兽獸 枢樞 输輸 书書 赎贖 属屬 术術 树樹 竖豎
+数數 帅帥 双雙 谁誰 税稅 顺順 说說 硕碩 烁爍 丝絲 饲飼 耸聳 怂慫 颂頌 讼訟 诵誦 擞擻 苏蘇 诉訴 肃肅
+虽雖 随隨 绥綏 岁歲 孙孫 损損 笋筍 缩縮 琐瑣 锁鎖 删刪 剥剝 刹剎
+獭獺 挞撻 态態 摊攤 贪貪 瘫癱 滩灘 坛壇 谭譚 谈談 叹嘆 汤湯 烫燙 涛濤 讨討 腾騰 誊謄 锑銻 题題 体體
+屉屜 条條 贴貼 铁鐵 厅廳 听聽 烃烴 铜銅 统統 头頭 秃禿 图圖 团團 颓頹 蜕蛻 脱脫 鸵鴕 驮馱 驼駝
+椭橢 洼窪
+袜襪 弯彎 湾灣 顽頑 万萬 网網 韦韋 违違 围圍 为為 潍濰 维維 苇葦 伟偉 伪偽 纬緯 谓謂 卫衛 温溫 闻聞
+纹紋 稳穩 问問 瓮甕 挝撾 蜗蝸 涡渦 窝窩 卧臥 呜嗚 钨鎢 乌烏 诬誣 无無 芜蕪 吴吳 坞塢 雾霧 务務
+误誤
+锡錫 牺犧 袭襲 习習 铣銑 戏戲 细細 虾蝦 辖轄 峡峽 侠俠 狭狹 厦廈 吓嚇 鲜鮮 纤纖 贤賢 衔銜 闲閒
+显顯 险險 现現 献獻 县縣 馅餡 羡羨 宪憲 线線 厢廂 镶鑲 乡鄉 详詳 响響 项項 萧蕭 嚣囂 销銷 晓曉 啸嘯
+协協 挟挾 携攜 胁脅 谐諧 写寫 泻瀉 谢謝 锌鋅 衅釁 兴興 汹洶 锈鏽 绣繡 须須 虚虛 嘘噓 许許 叙敘 绪緒
+续續 轩軒 悬懸 选選 癣癬 绚絢 学學 勋勳 询詢 寻尋 驯馴 训訓 讯訊 逊遜
+压壓 鸦鴉 鸭鴨 哑啞 亚亞 讶訝 阉閹 烟煙 盐鹽 严嚴 颜顏 阎閻 艳豔 厌厭 砚硯 彦彥 谚諺 验驗 鸯鴦 杨楊
+扬揚 疡瘍 阳陽 痒癢 养養 样樣 钥鑰 药藥 尧堯 遥遙 窑窯 谣謠 爷爺 页頁 业業 叶葉 医醫 铱銥 颐頤 遗遺
+仪儀 蚁蟻 艺藝 亿億 忆憶 义義 诣詣 议議 谊誼 译譯 异異 绎繹 荫蔭 阴陰 银銀 饮飲 隐隱 樱櫻 婴嬰 鹰鷹
+应應 缨纓 莹瑩 萤螢 营營 荧熒 蝇蠅 赢贏 颖穎 哟喲 拥擁 痈癰 踊踴 咏詠 涌湧 优優 忧憂 邮郵 铀鈾
+犹猶 诱誘 舆輿 鱼魚 渔漁 娱娛 与與 屿嶼 语語 狱獄 誉譽 预預 驭馭 鸳鴛 渊淵 辕轅 园園 员員 圆圓
+缘緣 远遠 愿願 约約 跃躍 粤粵 悦悅 阅閱 郧鄖 匀勻 陨隕 运運 蕴蘊 酝醞 晕暈 韵韻 鹅鵝 蔼藹
+杂雜 灾災 载載 攒攢 暂暫 赞讚 赃贓 脏髒 凿鑿 枣棗 责責 择擇 则則 泽澤 贼賊 赠贈 轧軋 铡鍘 闸閘
+诈詐 斋齋 债債 毡氈 盏盞 斩斬 辗輾 崭嶄 栈棧 战戰 绽綻 张張 涨漲 帐帳 账帳 胀脹 赵趙 蛰蟄 辙轍 锗鍺
+这這 贞貞 针針 侦偵 诊診 镇鎮 阵陣 挣掙 睁睜 狰猙 争爭 帧幀 郑鄭 证證 织織 职職 执執 纸紙 挚摯 掷擲
+帜幟 质質 滞滯 钟鐘 终終 种種 肿腫 众眾 诌謅 轴軸 皱皺 昼晝 骤驟 猪豬 诸諸 诛誅 烛燭 瞩矚 嘱囑 贮貯
+铸鑄 筑築 驻駐 专專 砖磚 转轉 赚賺 桩樁 庄莊 装裝 妆妝 壮壯 状狀 锥錐 赘贅 坠墜 缀綴 谆諄 浊濁
+兹茲 资資 渍漬 踪蹤 综綜 总總 纵縱 邹鄒 诅詛 组組 钻鑽 着著 摇搖 撑撐 叽嘰 亵褻 刍芻
+"""
+
+# 簡體詞 繁體詞（每行一組）
+PHRASES = """
+头发 頭髮
+理发 理髮
+发型 髮型
+白发 白髮
+染发 染髮
+假发 假髮
+洗发 洗髮
+发廊 髮廊
+皇后 皇后
+王后 王后
+太后 太后
+干净 乾淨
+干燥 乾燥
+饼干 餅乾
+干杯 乾杯
+干脆 乾脆
+干货 乾貨
+晒干 曬乾
+干扰 干擾
+干涉 干涉
+干预 干預
+若干 若干
+相干 相干
+公里 公里
+英里 英里
+千里 千里
+里程 里程
+邻里 鄰里
+里长 里長
+一只 一隻
+两只 兩隻
+几只 幾隻
+关系 關係
+没关系 沒關係
+联系 聯繫
+系鞋带 繫鞋帶
+复杂 複雜
+复制 複製
+重复 重複
+复印 複印
+复数 複數
+复习 複習
+回复 回覆
+答复 答覆
+反复 反覆
+复苏 復甦
+日历 日曆
+农历 農曆
+阳历 陽曆
+挂历 掛曆
+历法 曆法
+批准 批准
+准许 准許
+不准 不准
+手表 手錶
+钟表 鐘錶
+面条 麵條
+面包 麵包
+面粉 麵粉
+拉面 拉麵
+泡面 泡麵
+方便面 方便麵
+松树 松樹
+松鼠 松鼠
+松山 松山
+放松 放鬆
+轻松 輕鬆
+标签 標籤
+书签 書籤
+抽签 抽籤
+划船 划船
+划算 划算
+划不来 划不來
+北斗 北斗
+漏斗 漏斗
+熨斗 熨斗
+茶几 茶几
+收获 收穫
+尽管 儘管
+尽量 儘量
+尽快 儘快
+心脏 心臟
+内脏 內臟
+肝脏 肝臟
+别扭 彆扭
+卷起 捲起
+风采 風采
+神采 神采
+文采 文采
+占卜 占卜
+分布 分佈
+折叠 摺疊
+精致 精緻
+细致 細緻
+制作 製作
+制造 製造
+制品 製品
+录制 錄製
+绘制 繪製
+研制 研製
+印制 印製
+定制 訂製
+胡须 鬍鬚
+胡子 鬍子
+小丑 小丑
+谷物 穀物
+稻谷 稻穀
+防御 防禦
+抵御 抵禦
+恶心 噁心
+词汇 詞彙
+饭团 飯糰
+舍不得 捨不得
+舍弃 捨棄
+取舍 取捨
+施舍 施捨
+周末 週末
+周一 週一
+周二 週二
+周三 週三
+周四 週四
+周五 週五
+周六 週六
+周日 週日
+周刊 週刊
+周报 週報
+周年 週年
+每周 每週
+上周 上週
+下周 下週
+本周 本週
+这周 這週
+一周 一週
+两周 兩週
+游泳 游泳
+上游 上游
+下游 下游
+游标 游標
+秋千 鞦韆
+伙食 伙食
+凶手 兇手
+注册 註冊
+注释 註釋
+备注 備註
+注解 註解
+沈阳 瀋陽
+开辟 開闢
+扎实 紮實
+忧郁 憂鬱
+抑郁 抑鬱
+郁闷 鬱悶
+生姜 生薑
+老板 老闆
+赞成 贊成
+赞助 贊助
+征服 征服
+长征 長征
+出征 出征
+冲泡 沖泡
+冲洗 沖洗
+冲澡 沖澡
+台风 颱風
+以后 以後
+之后 之後
+然后 然後
+后来 後來
+最后 最後
+后面 後面
+前后 前後
+后天 後天
+后悔 後悔
+后果 後果
+背后 背後
+落后 落後
+后台 後台
+后端 後端
+随后 隨後
+先后 先後
+今后 今後
+此后 此後
+午后 午後
+后续 後續
+后期 後期
+饭后 飯後
+后退 後退
+稍后 稍後
+事后 事後
+往后 往後
+后者 後者
+后边 後邊
+后头 後頭
+身后 身後
+后门 後門
+后方 後方
+后代 後代
+日后 日後
+几个 幾個
+几乎 幾乎
+几天 幾天
+几次 幾次
+几年 幾年
+几点 幾點
+好几 好幾
+几十 幾十
+几百 幾百
+几千 幾千
+几位 幾位
+几分 幾分
+几种 幾種
+几遍 幾遍
+几句 幾句
+几岁 幾歲
+几何 幾何
+几条 幾條
+几件 幾件
+几本 幾本
+几张 幾張
+几家 幾家
+几周 幾週
+几月 幾月
+几号 幾號
+几秒 幾秒
+几小时 幾小時
+几样 幾樣
+没几 沒幾
+干什么 幹什麼
+干嘛 幹嘛
+干吗 幹嘛
+干啥 幹啥
+干活 幹活
+能干 能幹
+干部 幹部
+树干 樹幹
+主干 主幹
+骨干 骨幹
+干劲 幹勁
+苦干 苦幹
+实干 實幹
+才干 才幹
+干掉 幹掉
+干洗 乾洗
+干旱 乾旱
+干枯 乾枯
+烘干 烘乾
+吹干 吹乾
+擦干 擦乾
+干果 乾果
+干粮 乾糧
+干妈 乾媽
+干爹 乾爹
+干冰 乾冰
+干电池 乾電池
+发现 發現
+发生 發生
+发展 發展
+发送 發送
+发布 發布
+出发 出發
+开发 開發
+发表 發表
+发出 發出
+发给 發給
+发起 發起
+发票 發票
+发音 發音
+发言 發言
+发动 發動
+发明 發明
+发挥 發揮
+发觉 發覺
+发烧 發燒
+发信 發信
+发邮件 發郵件
+发消息 發消息
+发射 發射
+发行 發行
+发放 發放
+激发 激發
+爆发 爆發
+引发 引發
+触发 觸發
+研发 研發
+批发 批發
+发货 發貨
+分发 分發
+转发 轉發
+发愁 發愁
+发呆 發呆
+发脾气 發脾氣
+发火 發火
+发财 發財
+发达 發達
+发育 發育
+启发 啟發
+发酵 發酵
+发热 發熱
+发抖 發抖
+发光 發光
+发怒 發怒
+蒸发 蒸發
+散发 散發
+颁发 頒發
+突发 突發
+发件 發件
+发到 發到
+发一下 發一下
+发过来 發過來
+发过去 發過去
+范围 範圍
+规范 規範
+示范 示範
+模范 模範
+防范 防範
+范例 範例
+典范 典範
+范本 範本
+范畴 範疇
+师范 師範
+风范 風範
+这里 這裡
+那里 那裡
+哪里 哪裡
+里面 裡面
+里边 裡邊
+里头 裡頭
+心里 心裡
+家里 家裡
+夜里 夜裡
+手里 手裡
+眼里 眼裡
+城里 城裡
+店里 店裡
+屋里 屋裡
+嘴里 嘴裡
+梦里 夢裡
+公司里 公司裡
+佣人 傭人
+雇佣 僱傭
+女佣 女傭
+佣兵 傭兵
+佣金 佣金
+丑陋 醜陋
+丑闻 醜聞
+丑恶 醜惡
+出丑 出醜
+丢丑 丟醜
+很丑 很醜
+好丑 好醜
+太丑 太醜
+变丑 變醜
+美丑 美醜
+丑八怪 醜八怪
+战斗 戰鬥
+奋斗 奮鬥
+斗争 鬥爭
+争斗 爭鬥
+打斗 打鬥
+搏斗 搏鬥
+格斗 格鬥
+决斗 決鬥
+斗志 鬥志
+斗嘴 鬥嘴
+斗智 鬥智
+游戏 遊戲
+旅游 旅遊
+游客 遊客
+导游 導遊
+游览 遊覽
+游行 遊行
+游玩 遊玩
+游乐 遊樂
+游记 遊記
+周游 周遊
+郊游 郊遊
+出游 出遊
+手游 手遊
+网游 網遊
+合伙 合夥
+伙伴 夥伴
+团伙 團夥
+家伙 傢伙
+伙计 夥計
+大伙 大夥
+同伙 同夥
+计划 計劃
+规划 規劃
+划分 劃分
+策划 策劃
+企划 企劃
+笔划 筆劃
+划清 劃清
+划定 劃定
+划拨 劃撥
+划时代 劃時代
+杰出 傑出
+杰作 傑作
+豪杰 豪傑
+标准 標準
+准备 準備
+准确 準確
+不准确 不準確
+不准备 不準備
+不准时 不準時
+水准 水準
+准时 準時
+对准 對準
+瞄准 瞄準
+基准 基準
+精准 精準
+准则 準則
+采用 採用
+采取 採取
+采访 採訪
+采购 採購
+采集 採集
+开采 開採
+采纳 採納
+采样 採樣
+采摘 採摘
+朴素 樸素
+简朴 簡樸
+纯朴 純樸
+朴实 樸實
+质朴 質樸
+关于 關於
+由于 由於
+对于 對於
+等于 等於
+属于 屬於
+于是 於是
+位于 位於
+至于 至於
+终于 終於
+善于 善於
+用于 用於
+在于 在於
+基于 基於
+处于 處於
+大于 大於
+小于 小於
+高于 高於
+低于 低於
+多于 多於
+少于 少於
+过于 過於
+鉴于 鑑於
+敢于 敢於
+便于 便於
+易于 易於
+急于 急於
+出于 出於
+归于 歸於
+免于 免於
+勇于 勇於
+乐于 樂於
+取决于 取決於
+涂抹 塗抹
+涂鸦 塗鴉
+糊涂 糊塗
+涂料 塗料
+涂改 塗改
+云端 雲端
+白云 白雲
+乌云 烏雲
+云朵 雲朵
+多云 多雲
+云层 雲層
+云彩 雲彩
+云计算 雲計算
+云服务 雲服務
+咸味 鹹味
+咸鱼 鹹魚
+咸蛋 鹹蛋
+太咸 太鹹
+很咸 很鹹
+"""
@@ -0,0 +1,100 @@
+"""
+啟動計畫 (Startup Plan)
+啟動時只載入系統列與快捷鍵需要的模組；引擎 SDK（openai / anthropic / google-genai 各需數百毫秒）、
+錄音與注入後端等第一次語音輸入才會用到的模組，在快捷鍵註冊後於背景執行緒預先載入，
+第一次語音輸入不必再承擔 import 時間
+
+  - 預先載入只 import 模組並建立錄音 / 注入等後端，不建立連線（預先連線由 http_clients.warm 負責）
+  - 已載入的模組直接略過，設定變更（切換引擎）時再呼叫一次即可
+  - 啟動期間不應載入的模組列在 DEFERRED_MODULES（benchmarks/check_startup.py 檢查）
+
+用法：
+  preloader = preload(cfg, lambda: recorder.backend)
+  preloader.done.wait()
+"""
+
+import importlib
+import logging
+import sys
+import threading
+import time
+from typing import Callable
+
+logger = logging.getLogger("VoiceType.Startup")
+
+# 各引擎使用的 SDK 模組；httpx 在第一次建立客戶端時才載入 httpcore（約 100ms），一併預先載入
+PROVIDER_MODULES = {
+    "groq": ("openai", "httpcore"),
+    "openai": ("openai", "httpcore"),
+    "anthropic": ("anthropic", "httpcore"),
+    "gemini": ("google.genai", "google.genai.types", "httpcore"),
+    "ollama": ("httpx", "httpcore", "requests"),
+}
+
+# 啟動時（系統列與快捷鍵就緒前）不應載入的模組
+DEFERRED_MODULES = (
+    "openai", "anthropic", "google.genai", "httpx", "httpcore", "requests", "sounddevice", "pyautogui", "pyperclip",
+    "soundfile", "faster_whisper", "psutil", "win32gui",
+)
+
+
+def preload_modules(cfg: dict) -> list[str]:
+    """目前設定會用到的 SDK 模組（主要、對沖與備援引擎，以及上傳編碼）"""
+    providers = [
+        cfg.get("sttProvider"), cfg.get("llmProvider"),
+        cfg.get("hedgeSttProvider"), cfg.get("hedgeLlmProvider"),
+        *cfg.get("sttProviders", []), *cfg.get("llmProviders", []),
+    ]
+    modules = [m for provider in providers for m in PROVIDER_MODULES.get(provider, ())]
+    if cfg.get("uploadCodec", "wav") in ("flac", "opus"):
+        modules.append("soundfile")
+    return list(dict.fromkeys(modules))
+
+
+class Preloader:
+    """在背景執行緒依序 import 模組並執行暖機函式，記錄各項耗時"""
+
+    def __init__(self, modules: list[str], warmups: tuple[Callable, ...] = ()):
+        self.modules = modules
+        self.warmups = warmups
+        self.times: dict[str, float] = {}   # 模組名稱（或暖機函式名稱）-> 秒數
+        self.done = threading.Event()
+
+    def start(self) -> "Preloader":
+        threading.Thread(target=self._run, name="preload", daemon=True).start()
+        return self
+
+    def _run(self):
+        start = time.perf_counter()
+        try:
+            for module in self.modules:
+                if module in sys.modules:
+                    continue
+                t0 = time.perf_counter()
+                try:
+                    importlib.import_module(module)
+                except ImportError as e:
+                    logger.debug("預先載入 %s 失敗: %s", module, e)
+                    continue
+                self.times[module] = time.perf_counter() - t0
+            for warmup in self.warmups:
+                t0 = time.perf_counter()
+                try:
+                    warmup()
+                except Exception as e:
+                    # 後端建立失敗時保留原本的行為：第一次使用時再建立並回報錯誤
+                    logger.debug("預先建立後端失敗: %s", e)
+                    continue
+                self.times[getattr(warmup, "__name__", "warmup")] = time.perf_counter() - t0
+            if self.times:
+                logger.info(
+                    "背景預先載入完成 %.0fms (%s)", (time.perf_counter() - start) * 1000,
+                    ", ".join(f"{name} {seconds * 1000:.0f}ms" for name, seconds in self.times.items()),
+                )
+        finally:
+            self.done.set()
+
+
+def preload(cfg: dict, *warmups: Callable) -> Preloader:
+    """在背景預先載入目前設定會用到的 SDK，並執行 warmups（例如建立錄音與注入後端）"""
+    return Preloader(preload_modules(cfg), warmups).start()
@@ -1,67 +1,322 @@
 """
 語音轉文字模組 (Speech-to-Text)
 支援 Groq Whisper、OpenAI Whisper、本地 Whisper
+transcribe 為同步版本；atranscribe 為 asyncio 版本（供可取消的處理管線使用，取消時會中斷上傳）
+超過 chunkThresholdSeconds 的長錄音在停頓處分段，各段同時送出辨識後拼接（core/chunking.py）
+設定多個引擎（sttProviders）時由 core/router.py 選擇最健康的引擎，失敗時自動改用下一個
 """
 
+import asyncio
 import io
 import logging
+import time
+from concurrent.futures import ThreadPoolExecutor
 import numpy as np
-from core.recorder import audio_to_wav_bytes
+from core.chunking import MAX_UPLOAD_BYTES, split_audio, stitch_transcripts, wav_bytes
+from core.deadline import current_deadline, deadline_scope, request_timeout, timeout_kwargs
+from core.encoder import encode_audio
+from core.hedge import arun_hedged, hedge_delay, run_hedged
+from core.http_clients import get_clients
+from core.local_whisper import get_worker, resolve_profile
+from core.metrics import Trace
+from core.recorder import SAMPLE_RATE
+from core.router import get_router
 
 logger = logging.getLogger("VoiceType.STT")
 
 # Whisper 使用 ISO 639-1 語言碼
 LANGUAGE_MAP = {"zh-TW": "zh", "zh-CN": "zh", "en": "en", "ja": "ja"}
 
+# 各引擎的預設模型（對沖與路由備援引擎未指定模型時使用）
+DEFAULT_MODELS = {"groq": "whisper-large-v3-turbo", "openai": "whisper-1", "local": "small"}
+
 
 class SpeechToText:
     """語音轉文字引擎"""
 
     def __init__(self, settings):
         self.settings = settings
-        self._clients = {}
+        self._clients = get_clients()  # 全域共用的客戶端與連線池
+
+    def transcribe(self, audio: np.ndarray, payload=None, trace: Trace | None = None) -> str:
+        """
+        將音訊轉為文字
+
+        Args:
+            audio: int16, 16kHz, mono 音訊
+            payload: 錄音期間已編碼完成的上傳內容（BytesIO），省略時依 uploadCodec 即時編碼
+            trace: 延遲量測記錄器（省略時仍會寫入全域統計）
+        """
+        trace = trace or Trace()
+        cfg = self.settings.get_config()
+        router = get_router(self.settings.config_dir)
+        order = router.order("stt", self._providers(cfg))
+
+        def _attempt(provider):
+            # 第一個引擎沿用錄音期間已編碼的內容；失敗改用其他引擎時另外準備一份
+            attempt_payload = payload if provider == order[0] else self._hedge_payload(provider, audio, payload, cfg, trace)
+            return self._transcribe_once(audio, attempt_payload, cfg, trace, provider)
+
+        _, text = router.call("stt", order, _attempt)
+        return text
+
+    def _transcribe_once(self, audio: np.ndarray, payload, cfg: dict, trace: Trace, provider: str) -> str:
+        provider, model, language, whisper_prompt = self._request_options(cfg, provider)
+
+        spans = self._chunk_spans(audio, cfg, provider)
+        if spans:
+            return self._transcribe_chunked(audio, spans, cfg, trace, provider)
+
+        if provider in ("groq", "openai") and payload is None:
+            payload = self._encode(audio, cfg, trace)
+
+        secondary = None
+        hedge_provider, hedge_model = self._hedge_options(cfg, provider, model)
+        if hedge_provider:
+            def _secondary():
+                hedge_payload = self._hedge_payload(hedge_provider, audio, payload, cfg, trace)
+                return self._transcribe_with(hedge_provider, audio, hedge_payload, hedge_model, language, whisper_prompt, trace)
+
+            secondary = (hedge_provider, _secondary)
+
+        start = time.perf_counter()
+        winner, text = run_hedged(
+            "stt",
+            (provider, lambda: self._transcribe_with(provider, audio, payload, model, language, whisper_prompt, trace)),
+            secondary,
+            hedge_delay("stt", provider, cfg, cfg.get("hedgeSttDelayMs", 2000)) if secondary else 0,
+        )
+        trace.add("stt", start, time.perf_counter(), winner, audio_seconds=round(len(audio) / 16000, 2))
+        return text
+
+    async def atranscribe(self, audio: np.ndarray, payload=None, trace: Trace | None = None) -> str:
+        """transcribe 的 asyncio 版本；工作被取消時進行中的 HTTP 請求會立即中斷並釋放連線"""
+        trace = trace or Trace()
+        cfg = self.settings.get_config()
+        router = get_router(self.settings.config_dir)
+        order = router.order("stt", self._providers(cfg))
+
+        async def _attempt(provider):
+            attempt_payload = payload
+            if provider != order[0]:
+                attempt_payload = await asyncio.to_thread(self._hedge_payload, provider, audio, payload, cfg, trace)
+            return await self._atranscribe_once(audio, attempt_payload, cfg, trace, provider)
+
+        _, text = await router.acall("stt", order, _attempt)
+        return text
+
+    async def _atranscribe_once(self, audio: np.ndarray, payload, cfg: dict, trace: Trace, provider: str) -> str:
+        provider, model, language, whisper_prompt = self._request_options(cfg, provider)
+
+        spans = self._chunk_spans(audio, cfg, provider)
+        if spans:
+            return await self._atranscribe_chunked(audio, spans, cfg, trace, provider)
+
+        if provider in ("groq", "openai") and payload is None:
+            payload = await asyncio.to_thread(self._encode, audio, cfg, trace)
+
+        secondary = None
+        hedge_provider, hedge_model = self._hedge_options(cfg, provider, model)
+        if hedge_provider:
+            async def _secondary():
+                hedge_payload = await asyncio.to_thread(self._hedge_payload, hedge_provider, audio, payload, cfg, trace)
+                return await self._atranscribe_with(
+                    hedge_provider, audio, hedge_payload, hedge_model, language, whisper_prompt, trace,
+                )
 
-    def transcribe(self, audio: np.ndarray) -> str:
-        """將音訊轉為文字"""
+            secondary = (hedge_provider, _secondary)
+
+        start = time.perf_counter()
+        winner, text = await arun_hedged(
+            "stt",
+            (provider, lambda: self._atranscribe_with(provider, audio, payload, model, language, whisper_prompt, trace)),
+            secondary,
+            hedge_delay("stt", provider, cfg, cfg.get("hedgeSttDelayMs", 2000)) if secondary else 0,
+        )
+        trace.add("stt", start, time.perf_counter(), winner, audio_seconds=round(len(audio) / 16000, 2))
+        return text
+
+    def can_fallback_local(self) -> bool:
+        """雲端 STT 超過期限時能否改用本地 Whisper（主要引擎不是本地，且模型已載入）"""
+        return self.settings.get_config().get("sttProvider", "groq") != "local" and get_worker().loaded
+
+    async def afallback_local(self, audio: np.ndarray, trace: Trace | None = None) -> str:
+        """
+        以已載入的本地 Whisper 模型辨識（雲端 STT 超過期限時使用，先以 can_fallback_local 確認）
+
+        沿用目前已載入的模型與其載入參數（設定的 localWhisperProfile 已變更也不重新載入），不受已過期的 STT 期限限制
+        """
         cfg = self.settings.get_config()
-        provider = cfg.get("sttProvider", "groq")
+        worker = get_worker()
+        trace = trace or Trace()
+        start = time.perf_counter()
+        with deadline_scope(None):
+            text = await asyncio.to_thread(
+                self._transcribe_local, audio, worker.model_name, cfg.get("language", "auto"), True,
+            )
+        trace.add("stt", start, time.perf_counter(), "local", audio_seconds=round(len(audio) / SAMPLE_RATE, 2), fallback=True)
+        return text
+
+    # ── 長錄音分段 ───────────────────────────────────────────────────────────
+
+    @staticmethod
+    def _chunk_spans(audio: np.ndarray, cfg: dict, provider: str) -> list[tuple[int, int]] | None:
+        """
+        長錄音的分段範圍；不需要分段時回傳 None
+
+        本地模型只有 localWorkers > 1 時才能同時推論（單一 worker 時 faster-whisper 本身已逐 30 秒處理，分段不會比較快）。
+        雲端引擎超過上傳大小上限的錄音即使停用 chunkedStt 也會分段。
+        """
+        if provider not in ("groq", "openai") and not (provider == "local" and cfg.get("localWorkers", 1) > 1):
+            return None
+        chunk_seconds = cfg.get("chunkSeconds", 30.0)
+        too_large = provider != "local" and wav_bytes(len(audio)) > MAX_UPLOAD_BYTES
+        if too_large:
+            chunk_seconds = min(chunk_seconds, MAX_UPLOAD_BYTES / 2 / SAMPLE_RATE)
+        elif not cfg.get("chunkedStt", True) or len(audio) < cfg.get("chunkThresholdSeconds", 60.0) * SAMPLE_RATE:
+            return None
+        spans = split_audio(audio, chunk_seconds, cfg.get("chunkOverlapSeconds", 1.0))
+        return spans if len(spans) > 1 else None
+
+    @staticmethod
+    def _chunk_workers(cfg: dict, provider: str) -> int:
+        """同時辨識的段數上限；本地模型不超過其 worker 數"""
+        workers = cfg.get("chunkWorkers", 4)
+        return min(workers, cfg.get("localWorkers", 1)) if provider == "local" else workers
+
+    def _transcribe_chunk(self, audio, index, span, cfg, trace, provider) -> str:
+        provider, model, language, whisper_prompt = self._request_options(cfg, provider)
+        chunk = audio[span[0]:span[1]]
+        payload = None if provider == "local" else self._encode(chunk, cfg, trace)
+        start = time.perf_counter()
+        text = self._transcribe_with(provider, chunk, payload, model, language, whisper_prompt, trace)
+        trace.add("stt.chunk", start, time.perf_counter(), provider, index=index)
+        return text
+
+    def _transcribe_chunked(self, audio: np.ndarray, spans, cfg: dict, trace: Trace, provider: str) -> str:
+        """各段在有上限的執行緒池中同時辨識，依序拼接（分段模式不使用對沖）"""
+        logger.info("Long recording (%.1fs), transcribing %d chunks in parallel", len(audio) / SAMPLE_RATE, len(spans))
+        start = time.perf_counter()
+        workers = min(self._chunk_workers(cfg, provider), len(spans))
+        deadline = current_deadline()
+
+        def _chunk(item):
+            with deadline_scope(deadline):
+                return self._transcribe_chunk(audio, item[0], item[1], cfg, trace, provider)
+
+        with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="stt-chunk") as executor:
+            texts = list(executor.map(_chunk, enumerate(spans)))
+        text = stitch_transcripts(texts, cfg.get("chunkOverlapSeconds", 1.0))
+        trace.add("stt", start, time.perf_counter(), provider, audio_seconds=round(len(audio) / SAMPLE_RATE, 2), chunks=len(spans))
+        return text
+
+    async def _atranscribe_chunked(self, audio: np.ndarray, spans, cfg: dict, trace: Trace, provider: str) -> str:
+        """_transcribe_chunked 的 asyncio 版本；取消或任一段失敗時中斷其餘各段"""
+        provider, model, language, whisper_prompt = self._request_options(cfg, provider)
+        logger.info("Long recording (%.1fs), transcribing %d chunks in parallel", len(audio) / SAMPLE_RATE, len(spans))
+        start = time.perf_counter()
+        limit = asyncio.Semaphore(self._chunk_workers(cfg, provider))
+
+        async def _one(index, span):
+            async with limit:
+                chunk = audio[span[0]:span[1]]
+                payload = None if provider == "local" else await asyncio.to_thread(self._encode, chunk, cfg, trace)
+                chunk_start = time.perf_counter()
+                text = await self._atranscribe_with(provider, chunk, payload, model, language, whisper_prompt, trace)
+                trace.add("stt.chunk", chunk_start, time.perf_counter(), provider, index=index)
+                return text
+
+        tasks = [asyncio.ensure_future(_one(i, span)) for i, span in enumerate(spans)]
+        try:
+            texts = await asyncio.gather(*tasks)
+        except BaseException:
+            for task in tasks:
+                task.cancel()
+            raise
+        text = stitch_transcripts(texts, cfg.get("chunkOverlapSeconds", 1.0))
+        trace.add("stt", start, time.perf_counter(), provider, audio_seconds=round(len(audio) / SAMPLE_RATE, 2), chunks=len(spans))
+        return text
+
+    @staticmethod
+    def _providers(cfg: dict) -> list[str]:
+        """依偏好排序的候選引擎：主要引擎在前，其後為 sttProviders 中的備援引擎"""
+        return list(dict.fromkeys([cfg.get("sttProvider", "groq"), *cfg.get("sttProviders", [])]))
+
+    @staticmethod
+    def _request_options(cfg: dict, provider: str | None = None):
+        """回傳 (引擎, 模型, 語言, Whisper prompt)；備援引擎使用其預設模型"""
+        primary = cfg.get("sttProvider", "groq")
+        provider = provider or primary
         model = cfg.get("sttModel", "whisper-large-v3-turbo")
-        language = cfg.get("language", "auto")
+        if provider != primary:
+            model = DEFAULT_MODELS.get(provider, model)
         dictionary = cfg.get("dictionary", [])
-
         # 組合自訂詞彙作為 Whisper prompt
         whisper_prompt = "、".join(dictionary) if dictionary else None
+        return provider, model, cfg.get("language", "auto"), whisper_prompt
 
+    @staticmethod
+    def _hedge_options(cfg: dict, provider: str, model: str):
+        """回傳 (對沖備援引擎, 模型)；未設定或與主要引擎相同時引擎為空字串"""
+        hedge_provider = cfg.get("hedgeSttProvider", "")
+        if not hedge_provider or hedge_provider == provider:
+            return "", ""
+        return hedge_provider, cfg.get("hedgeSttModel") or DEFAULT_MODELS.get(hedge_provider, model)
+
+    def _hedge_payload(self, hedge_provider: str, audio: np.ndarray, payload, cfg: dict, trace: Trace):
+        """兩個請求同時上傳，各自使用一份獨立的 BytesIO"""
+        if hedge_provider == "local":
+            return None
+        if payload is not None:
+            hedge_payload = io.BytesIO(payload.getvalue())
+            hedge_payload.name = payload.name
+            return hedge_payload
+        return self._encode(audio, cfg, trace)
+
+    def _encode(self, audio: np.ndarray, cfg: dict, trace: Trace):
+        codec = cfg.get("uploadCodec", "wav")
+        with trace.span("encode", codec):
+            return encode_audio(audio, codec)
+
+    def _transcribe_with(self, provider, audio, payload, model, language, prompt, trace) -> str:
         if provider == "groq":
-            return self._transcribe_groq(audio, model, language, whisper_prompt)
+            return self._transcribe_groq(payload, model, language, prompt, trace)
         elif provider == "openai":
-            return self._transcribe_openai(audio, model, language, whisper_prompt)
+            return self._transcribe_openai(payload, model, language, prompt, trace)
         elif provider == "local":
             return self._transcribe_local(audio, model, language)
         else:
             raise ValueError(f"不支援的 STT 引擎: {provider}")
 
-    # ── Groq Whisper ─────────────────────────────────────────────────────────
-
-    def _transcribe_groq(self, audio, model, language, prompt):
-        """使用 Groq API 進行語音辨識（OpenAI 相容介面）"""
-        from openai import OpenAI
+    def _create_transcription(self, client, kwargs, provider: str, trace: Trace) -> str:
+        """送出轉錄請求，並依回應標頭拆分伺服器處理時間與上傳/網路時間"""
+        start = time.perf_counter()
+        raw = client.audio.transcriptions.with_raw_response.create(**kwargs, **timeout_kwargs())
+        return self._parse_transcription(raw, start, time.perf_counter(), provider, trace)
 
-        api_key = self.settings.get_api_key("groq")
-        if not api_key:
-            raise ValueError("Groq API Key 未設定")
+    async def _acreate_transcription(self, client, kwargs, provider: str, trace: Trace) -> str:
+        start = time.perf_counter()
+        raw = await client.audio.transcriptions.with_raw_response.create(**kwargs, **timeout_kwargs())
+        return self._parse_transcription(raw, start, time.perf_counter(), provider, trace)
 
-        if "groq" not in self._clients:
-            self._clients["groq"] = OpenAI(
-                api_key=api_key,
-                base_url="https://api.groq.com/openai/v1",
-            )
-        client = self._clients["groq"]
+    @staticmethod
+    def _parse_transcription(raw, start: float, end: float, provider: str, trace: Trace) -> str:
+        result = raw.parse()
 
-        wav_bytes = audio_to_wav_bytes(audio)
-        audio_file = io.BytesIO(wav_bytes)
-        audio_file.name = "recording.wav"
+        # OpenAI 相容服務會回傳伺服器處理毫秒數，其餘即為上傳與網路往返
+        server_ms = raw.headers.get("openai-processing-ms")
+        if server_ms:
+            try:
+                server = min(float(server_ms) / 1000, end - start)
+                trace.add("stt.server", end - server, end, provider)
+                trace.add("stt.upload", start, end - server, provider)
+            except ValueError:
+                pass
+        return result.strip() if isinstance(result, str) else result.text.strip()
 
+    @staticmethod
+    def _transcription_kwargs(audio_file, model, language, prompt) -> dict:
+        # audio_file 為已編碼的 BytesIO，直接交給 SDK 上傳（不再複製一份）
         kwargs = {
             "model": model,
             "file": audio_file,
@@ -72,66 +327,62 @@ class SpeechToText:
             kwargs["language"] = LANGUAGE_MAP.get(language, language)
         if prompt:
             kwargs["prompt"] = prompt
+        return kwargs
 
-        result = client.audio.transcriptions.create(**kwargs)
-        return result.strip() if isinstance(result, str) else result.text.strip()
+    async def _atranscribe_with(self, provider, audio, payload, model, language, prompt, trace) -> str:
+        if provider in ("groq", "openai"):
+            api_key = self.settings.get_api_key(provider)
+            if not api_key:
+                raise ValueError(f"{'Groq' if provider == 'groq' else 'OpenAI'} API Key 未設定")
+            client = self._clients.async_openai(provider, api_key, self.settings.get_base_url(provider))
+            kwargs = self._transcription_kwargs(payload, model, language, prompt)
+            return await self._acreate_transcription(client, kwargs, provider, trace)
+        elif provider == "local":
+            # 本地模型在工作執行緒中推論，無法中途停止；取消時結果直接捨棄
+            return await asyncio.to_thread(self._transcribe_local, audio, model, language)
+        else:
+            raise ValueError(f"不支援的 STT 引擎: {provider}")
+
+    # ── Groq Whisper ─────────────────────────────────────────────────────────
+
+    def _transcribe_groq(self, audio_file, model, language, prompt, trace):
+        """使用 Groq API 進行語音辨識（OpenAI 相容介面）"""
+        api_key = self.settings.get_api_key("groq")
+        if not api_key:
+            raise ValueError("Groq API Key 未設定")
+
+        client = self._clients.openai("groq", api_key, self.settings.get_base_url("groq"))
+
+        kwargs = self._transcription_kwargs(audio_file, model, language, prompt)
+        return self._create_transcription(client, kwargs, "groq", trace)
 
     # ── OpenAI Whisper ───────────────────────────────────────────────────────
 
-    def _transcribe_openai(self, audio, model, language, prompt):
+    def _transcribe_openai(self, audio_file, model, language, prompt, trace):
         """使用 OpenAI Whisper API"""
-        from openai import OpenAI
-
         api_key = self.settings.get_api_key("openai")
         if not api_key:
             raise ValueError("OpenAI API Key 未設定")
 
-        if "openai" not in self._clients:
-            self._clients["openai"] = OpenAI(api_key=api_key)
-        client = self._clients["openai"]
-
-        wav_bytes = audio_to_wav_bytes(audio)
-        audio_file = io.BytesIO(wav_bytes)
-        audio_file.name = "recording.wav"
-
-        kwargs = {
-            "model": model,
-            "file": audio_file,
-            "response_format": "text",
-        }
-        if language and language != "auto":
-            kwargs["language"] = LANGUAGE_MAP.get(language, language)
-        if prompt:
-            kwargs["prompt"] = prompt
+        client = self._clients.openai("openai", api_key, self.settings.get_base_url("openai"))
 
-        result = client.audio.transcriptions.create(**kwargs)
-        return result.strip() if isinstance(result, str) else result.text.strip()
+        kwargs = self._transcription_kwargs(audio_file, model, language, prompt)
+        return self._create_transcription(client, kwargs, "openai", trace)
 
     # ── 本地 Whisper ─────────────────────────────────────────────────────────
 
-    def _transcribe_local(self, audio, model, language):
-        """使用本地 faster-whisper 模型"""
-        try:
-            from faster_whisper import WhisperModel
-        except ImportError:
-            raise ImportError(
-                "本地 Whisper 需要安裝 faster-whisper：\n"
-                "pip install faster-whisper --break-system-packages"
-            )
-
-        # 快取模型實例
-        if not hasattr(self, "_local_model") or self._local_model_name != model:
-            logger.info("載入本地 Whisper 模型: %s ...", model)
-            self._local_model = WhisperModel(model, device="auto", compute_type="auto")
-            self._local_model_name = model
+    def _transcribe_local(self, audio, model, language, reuse_loaded: bool = False):
+        """
+        使用本地 faster-whisper 模型（由常駐工作執行緒持有，跨設定重新載入保留）；推論參數依 localWhisperProfile
 
-        # faster-whisper 需要 float32 音訊
-        audio_f32 = audio.astype(np.float32) / 32768.0
+        reuse_loaded=True 時直接使用已載入的模型與其載入參數，不依目前的設定重新載入（超過期限的備援使用）
+        """
+        _, model_options, kwargs = resolve_profile(self.settings.get_config())
+        worker = get_worker()
+        if not reuse_loaded:
+            worker.ensure_model(model, **model_options)
 
-        kwargs = {"beam_size": 5}
         if language and language != "auto":
             kwargs["language"] = LANGUAGE_MAP.get(language, language)
 
-        segments, info = self._local_model.transcribe(audio_f32, **kwargs)
-        text = " ".join(seg.text for seg in segments)
-        return text.strip()
+        return worker.transcribe(audio, timeout=request_timeout(), **kwargs)
@@ -0,0 +1,202 @@
+"""
+語音活動偵測模組 (VAD)
+以 NumPy 向量化計算音框能量，上傳 STT 前裁掉頭尾靜音、壓縮過長的停頓，
+並在完全沒有語音時直接回報，省下上傳流量、計費秒數與辨識時間
+"""
+
+import logging
+from collections import deque
+from dataclasses import dataclass
+
+import numpy as np
+
+from core.recorder import SAMPLE_RATE
+
+logger = logging.getLogger("VoiceType.VAD")
+
+FRAME_MS = 20               # 音框長度
+CALIBRATION_MS = 200        # 以錄音開頭（說話前）的音框估計噪音底
+NOISE_RATIO = 3.0           # 能量高於噪音底幾倍視為語音
+MIN_SPEECH_RMS = 200.0      # 語音門檻下限，避免極安靜環境下把底噪當成語音
+MAX_NOISE_FLOOR = 300.0     # 噪音底上限：一按下就說話時開頭音框是語音，不能當成噪音底
+FALLBACK_MIN_MS = 3000      # 錄音至少這麼長才以低百分位數估計噪音底（短句可能整段都在說話）
+HANGOVER_MS = 150           # 語音音框前後保留的緩衝，避免切掉字頭字尾
+MIN_SPEECH_MS = 200         # 總語音長度低於此值視為沒有說話
+
+
+@dataclass
+class VadResult:
+    """VAD 處理結果"""
+    audio: np.ndarray
+    has_speech: bool
+    speech_seconds: float
+    removed_seconds: float
+    noise_floor: float
+
+
+def frame_energy(audio: np.ndarray, frame_len: int) -> np.ndarray:
+    """計算每個音框的 RMS 能量（不足一框的尾端補零）"""
+    n_frames = -(-len(audio) // frame_len)
+    padded = np.zeros(n_frames * frame_len, dtype=np.float32)
+    padded[: len(audio)] = audio
+    frames = padded.reshape(n_frames, frame_len)
+    return np.sqrt(np.mean(frames * frames, axis=1))
+
+
+def calibrate_noise_floor(energy: np.ndarray, calibration_frames: int) -> float:
+    """
+    以說話前的音框估計噪音底
+
+    若使用者一按下就開始說話，開頭音框已含語音：錄音夠長（FALLBACK_MIN_MS）時改用整段能量的低百分位數，
+    短句則可能整段都在說話，不使用百分位數；兩種情況下噪音底都不超過 MAX_NOISE_FLOOR，
+    避免把語音本身當成噪音底而丟棄整段輸入。
+    """
+    if len(energy) == 0:
+        return 0.0
+    lead = energy[: max(1, calibration_frames)]
+    floor = float(np.median(lead))
+    if len(energy) * FRAME_MS >= FALLBACK_MIN_MS:
+        floor = min(floor, float(np.percentile(energy, 20)))
+    return min(floor, MAX_NOISE_FLOOR)
+
+
+def _dilate(mask: np.ndarray, radius: int) -> np.ndarray:
+    """將 True 區段向前後延伸 radius 個音框"""
+    if radius <= 0 or not mask.any():
+        return mask
+    kernel = np.ones(2 * radius + 1, dtype=np.int32)
+    return np.convolve(mask.astype(np.int32), kernel, mode="same") > 0
+
+
+def trim_silence(
+    audio: np.ndarray,
+    max_pause_ms: int = 500,
+    trim: bool = True,
+    sample_rate: int = SAMPLE_RATE,
+) -> VadResult:
+    """
+    裁掉頭尾靜音並將超過 max_pause_ms 的停頓壓縮為 max_pause_ms
+
+    trim=False 時只做語音偵測，回傳原始音訊。
+    """
+    frame_len = sample_rate * FRAME_MS // 1000
+    if len(audio) == 0:
+        return VadResult(audio, False, 0.0, 0.0, 0.0)
+
+    energy = frame_energy(audio, frame_len)
+    noise_floor = calibrate_noise_floor(energy, CALIBRATION_MS // FRAME_MS)
+    threshold = max(noise_floor * NOISE_RATIO, MIN_SPEECH_RMS)
+
+    speech = energy > threshold
+    speech_seconds = speech.sum() * FRAME_MS / 1000
+    if speech_seconds * 1000 < MIN_SPEECH_MS:
+        return VadResult(audio[:0], False, float(speech_seconds), len(audio) / sample_rate, noise_floor)
+
+    if not trim:
+        return VadResult(audio, True, float(speech_seconds), 0.0, noise_floor)
+
+    keep = _dilate(speech, HANGOVER_MS // FRAME_MS)
+
+    # 找出所有靜音區段 [start, end)，過長者只保留前後各一半的 max_pause
+    max_pause_frames = max(1, max_pause_ms // FRAME_MS)
+    edges = np.diff(np.concatenate(([1], keep.astype(np.int8), [1])))
+    starts = np.flatnonzero(edges == -1)
+    ends = np.flatnonzero(edges == 1)
+    for start, end in zip(starts, ends):
+        if start == 0 or end == len(keep):
+            continue  # 頭尾靜音整段裁掉
+        length = end - start
+        if length > max_pause_frames:
+            half = max_pause_frames // 2
+            keep[start:start + half] = True
+            keep[end - (max_pause_frames - half):end] = True
+        else:
+            keep[start:end] = True
+
+    sample_keep = np.repeat(keep, frame_len)[: len(audio)]
+    trimmed = audio[sample_keep]
+    removed = (len(audio) - len(trimmed)) / sample_rate
+    return VadResult(trimmed, True, float(speech_seconds), removed, noise_floor)
+
+
+class StreamingTrimmer:
+    """
+    錄音期間逐段執行與 trim_silence 相同的裁剪，讓背景編碼器在說話的同時只編碼會上傳的音訊
+
+    錄音總長度未知，噪音底只以開頭音框估計（不使用 FALLBACK_MIN_MS 的百分位數），
+    與 trim_silence 的門檻不同時結果也不同：放開時仍以 trim_silence 為準，呼叫端比對 audio 後再使用編碼結果
+    """
+
+    def __init__(self, max_pause_ms: int = 500, sample_rate: int = SAMPLE_RATE):
+        self.frame_len = sample_rate * FRAME_MS // 1000
+        self._radius = HANGOVER_MS // FRAME_MS
+        self._max_pause = max(1, max_pause_ms // FRAME_MS)
+        self._rest = np.zeros(0, dtype=np.int16)     # 不足一框的樣本
+        self._energy = np.zeros(0, dtype=np.float32)
+        self._speech = np.zeros(0, dtype=bool)
+        self._threshold: float | None = None
+        self._pending: deque[np.ndarray] = deque()     # 尚未決定保留與否的音框（等待後面 HANGOVER_MS 的音框）
+        self._gap: list[np.ndarray] = []               # 目前這段不保留的音框（停頓或頭尾靜音）
+        self._started = False                          # 已出現保留的音框（之前的靜音屬於開頭，整段裁掉）
+        self._kept: list[np.ndarray] = []
+
+    @property
+    def audio(self) -> np.ndarray:
+        """目前為止保留的音訊"""
+        return np.concatenate(self._kept) if self._kept else np.zeros(0, dtype=np.int16)
+
+    def feed(self, block: np.ndarray) -> list[np.ndarray]:
+        """加入錄音區塊，回傳已確定保留的音訊片段（依時間順序）"""
+        samples = np.concatenate((self._rest, block.reshape(-1)))
+        usable = len(samples) - len(samples) % self.frame_len
+        self._rest = samples[usable:]
+        self._add(samples[:usable])
+        return self._decide(final=False)
+
+    def finish(self) -> list[np.ndarray]:
+        """錄音結束：處理最後不足一框的樣本並回傳剩餘保留的片段（結尾靜音捨棄）"""
+        self._add(self._rest)
+        self._rest = self._rest[:0]
+        return self._decide(final=True)
+
+    def _add(self, samples: np.ndarray):
+        if not len(samples):
+            return
+        self._energy = np.concatenate((self._energy, frame_energy(samples, self.frame_len)))
+        self._pending.extend(samples[i:i + self.frame_len] for i in range(0, len(samples), self.frame_len))
+
+    def _decide(self, final: bool) -> list[np.ndarray]:
+        calibration = CALIBRATION_MS // FRAME_MS
+        if self._threshold is None:
+            if len(self._energy) < calibration and not final:
+                return []
+            noise_floor = calibrate_noise_floor(self._energy[:calibration], calibration)
+            self._threshold = max(noise_floor * NOISE_RATIO, MIN_SPEECH_RMS)
+        self._speech = np.concatenate((self._speech, self._energy[len(self._speech):] > self._threshold))
+
+        out = []
+        total = len(self._speech)
+        # 保留與否取決於前後 HANGOVER_MS 內是否有語音，結束前最後幾個音框要等後面的音框到齊
+        decided = total - len(self._pending)
+        limit = total if final else total - self._radius
+        for i in range(decided, limit):
+            frame = self._pending.popleft()
+            if not self._speech[max(0, i - self._radius): i + self._radius + 1].any():
+                self._gap.append(frame)
+                continue
+            if self._gap and self._started:
+                out.extend(self._pause(self._gap))
+            self._gap = []
+            self._started = True
+            out.append(frame)
+        if final:
+            self._gap = []
+        self._kept.extend(out)
+        return out
+
+    def _pause(self, gap: list[np.ndarray]) -> list[np.ndarray]:
+        """句中停頓：超過 max_pause_ms 時只保留前後各一半"""
+        if len(gap) <= self._max_pause:
+            return gap
+        half = self._max_pause // 2
+        return gap[:half] + gap[len(gap) - (self._max_pause - half):]
@@ -6,33 +6,61 @@ VoiceType - 類 Typeless 語音輸入工具
   1. 設定 config/config.json 或 .env 中的 API Key
   2. uv run main.py
   3. 按住 Right Alt 說話，放開即輸出
-  4. 按下 Esc 可取消本次錄音
+  4. 按下 Esc 可取消本次錄音（處理中按下 Esc 會中斷進行中的 STT / LLM 請求）
+  5. 上一段還在處理時可以直接按住快捷鍵說下一段，結果依序輸出
 """
 
+import time
+START_TIME = time.perf_counter()   # 量測啟動到就緒（快捷鍵可用）的時間
+
 import ctypes
 # 在 import sounddevice 之前初始化 COM 為 STA 模式
 # 避免 PortAudio 將 COM 初始化為 MTA，導致 SendInput 無法被 Chrome 接收
 ctypes.windll.ole32.CoInitializeEx(None, 2)  # COINIT_APARTMENTTHREADED
 
+import asyncio
 import threading
 import os
 import sys
-import time
 import logging
 
 from core.recorder import AudioRecorder
 from core.stt import SpeechToText
+from core.incremental import IncrementalTranscriber
+from core.vad import StreamingTrimmer, trim_silence
+from core.encoder import StreamingEncoder
+from core.local_whisper import get_worker as get_local_whisper, resolve_profile as local_whisper_profile
+from core.metrics import Trace, metrics
+from core.deadline import DeadlineExceeded, LatencyBudget, within
 from core.llm import LLMProcessor
+from core.context import get_detector as get_context_detector
+from core.http_clients import get_clients as get_http_clients
+from core.pipeline import get_pipeline
+from core.startup import preload
 from core.injector import TextInjector
 from core.hotkey import HotkeyManager
 from core.tray_icons import create_tray_icon
 from core.sounds import play_start, play_stop
 from config.settings import Settings
+from config.hot_reload import ConfigDispatcher, ConfigWatcher
 
 # ── 常數 ─────────────────────────────────────────────────────────────────────
-MIN_RECORDING_SECONDS = 0.3
 INJECT_DELAY_SECONDS = 0.1
 ERROR_DISPLAY_SECONDS = 3
+CONTEXT_WAIT_SECONDS = 1.0  # STT 完成後最多再等待語境偵測的時間（偵測通常在錄音期間就已完成）
+MIN_AUDIO_SECONDS = 0.1  # 短於此長度的錄音（誤觸快捷鍵、空的緩衝區）不送出，與是否開啟 VAD 無關
+TRAY_TITLE_MAX_CHARS = 127  # Windows 系統托盤提示文字上限
+
+# 變更時需要重新預先連線的設定（連線池本身跨設定變更保留，只有切換 HTTP/2 時重建）
+HTTP_CONFIG_KEYS = {
+    "httpHttp2", "httpKeepaliveSeconds", "apiKeys",
+    "sttProvider", "llmProvider", "hedgeSttProvider", "hedgeLlmProvider", "sttProviders", "llmProviders",
+}
+
+# 變更時需要預先載入其他 SDK 的設定
+PRELOAD_CONFIG_KEYS = {
+    "sttProvider", "llmProvider", "hedgeSttProvider", "hedgeLlmProvider", "sttProviders", "llmProviders", "uploadCodec",
+}
 
 # ── Logging ───────────────────────────────────────────────────────────────────
 logging.basicConfig(
@@ -48,147 +76,322 @@ class VoiceType:
 
     def __init__(self):
         self.settings = Settings()
-        self.recorder = AudioRecorder()
+        self.recorder = AudioRecorder(
+            max_seconds=self.settings.get_config().get("maxRecordingSeconds", 300)
+        )
         self.stt = SpeechToText(self.settings)
         self.llm = LLMProcessor(self.settings)
         self.injector = TextInjector(self.settings)
         self.hotkey = HotkeyManager(self.settings)
-        
+        # STT → LLM → 注入在 asyncio 事件迴圈上執行，每次語音輸入一個可取消的工作
+        self.pipeline = get_pipeline()
+        self.pipeline.loop  # 先啟動事件迴圈，讓預先連線使用非同步連線池
+        self.pipeline.on_change = self._refresh_status
+        # 設定變更（Web 介面、手動編輯設定檔、重新載入）只套用到受影響的元件
+        self.config_dispatcher = ConfigDispatcher(self.settings)
+        self.config_watcher = ConfigWatcher(self.settings)
+        self._register_config_handlers()
+
         self.is_recording = False
-        self.processing = False
-        self.cancelled = False
         self.tray_icon = None
         self._target_hwnd = None
+        self._session = None  # 增量辨識工作階段
+        self._encoder = None  # 錄音期間的背景編碼器
+        self._trace = None    # 本次語音輸入的延遲量測
+        self._context = None  # 按下快捷鍵時開始的語境偵測 (Future)
+        self._press_time = 0.0
 
     # ── 快捷鍵回呼 ───────────────────────────────────────────────────────────
 
     def on_hotkey_press(self):
-        """快捷鍵按下：開始錄音"""
-        if self.is_recording or self.processing:
+        """快捷鍵按下：開始錄音（上一段仍在處理中時照常錄音，處理完依序輸出）"""
+        if self.is_recording:
+            return
+        cfg = self.settings.get_config()
+        if not self._admit_job(cfg):
             return
+        self._press_time = time.perf_counter()
+        self._trace = Trace()
         # 記住目前的前景視窗（使用者正在操作的視窗）
         self._target_hwnd = ctypes.windll.user32.GetForegroundWindow()
+        # 語境偵測與錄音同時在背景進行，STT 完成後直接取用結果
+        self._context = (
+            get_context_detector().resolve_async(self._target_hwnd, cfg, self._trace)
+            if cfg.get("contextAware", True) else None
+        )
         self.is_recording = True
-        self.cancelled = False
-        if self.settings.get_config().get("playSounds", True):
+        # 按住快捷鍵期間暫停輸出前面的結果（否則注入的按鍵會與快捷鍵組合）
+        self.pipeline.hold_output()
+        if cfg.get("playSounds", True):
             play_start()
+        if cfg.get("incrementalStt", False):
+            # 說話的同時於停頓處切段並在背景辨識
+            self._session = IncrementalTranscriber(self.stt, cfg)
+            self.recorder.add_listener(self._session.feed)
+        elif cfg.get("sttProvider") != "local":
+            # 錄音的同時壓縮上傳內容，放開時即可直接上傳
+            # （VAD 裁剪開啟時在背景同步裁掉靜音，只編碼會上傳的音訊）
+            trimmer = StreamingTrimmer(cfg.get("vadMaxPauseMs", 500)) if cfg.get("vadEnabled", True) else None
+            self._encoder = StreamingEncoder(cfg.get("uploadCodec", "wav"), trimmer=trimmer)
+            self.recorder.add_listener(self._encoder.feed)
         self.recorder.start()
+        self._trace.add("stream_open", self._press_time, time.perf_counter())
+        # 使用者說話的同時在背景確認連線仍然有效（過期則重新連線）
+        get_http_clients().warm(self.settings, cfg)
         logger.info("Recording started...")
-        self._update_tray("錄音中...", "recording")
+        self._refresh_status()
+
+    def _admit_job(self, cfg) -> bool:
+        """佇列已滿時依 dictationQueuePolicy 卸載：取消最舊的工作，或拒絕這次錄音"""
+        jobs = self.pipeline.active()
+        depth = cfg.get("dictationQueueDepth", 3)
+        if len(jobs) < depth:
+            return True
+        if cfg.get("dictationQueuePolicy", "drop_oldest") == "reject_new":
+            logger.warning("Dictation queue full (%d jobs), press ignored", len(jobs))
+            metrics.increment("queue.rejected")
+            return False
+        for job in jobs[:len(jobs) - depth + 1]:
+            if job.cancel():
+                logger.warning("Dictation queue full, dropped #%d (%s)", job.id, job.status)
+                metrics.increment("queue.dropped")
+        return True
 
     def on_hotkey_release(self):
         """快捷鍵釋放：停止錄音 → STT → LLM → 注入"""
         if not self.is_recording:
             return
         self.is_recording = False
-        self.processing = True
+        self.pipeline.release_output()
         
         audio_data = self.recorder.stop()
-        
-        # 如果使用者透過 Esc 取消了錄音，就不做後續處理
-        if self.cancelled:
-            logger.info("Recording cancelled by user.")
-            self._reset_status()
-            return
+        trace = self._trace
+        trace.add("capture", self._press_time, time.perf_counter())
+        session = self._detach_session()
+        encoder = self._detach_encoder()
 
         if self.settings.get_config().get("playSounds", True):
             play_stop()
         logger.info("Recording stopped (%.1f sec), processing...", len(audio_data) / 16000)
-        self._update_tray("處理中...", "processing")
 
-        # 背景執行緒處理，避免阻塞快捷鍵
-        threading.Thread(target=self._process_audio, args=(audio_data,), daemon=True).start()
+        # 在管線事件迴圈上處理，避免阻塞快捷鍵；每段錄音一個工作，帶著各自按下時的目標視窗
+        context, self._context = self._context, None
+        self.pipeline.submit(
+            self._process_audio, audio_data, session, encoder, trace, self._target_hwnd, context, name="dictation",
+        )
+        self._refresh_status()
 
     def on_hotkey_cancel(self):
-        """Esc 鍵按下：取消當前錄音"""
+        """Esc 鍵按下：取消當前錄音，或中斷處理中的 STT / LLM 請求"""
         if self.is_recording:
-            self.cancelled = True
+            # 錄音中取消：直接停止並捨棄，之後放開快捷鍵時 is_recording 已為 False，不會送出處理
             self.is_recording = False
             self.recorder.stop()
+            self._discard(self._detach_session(), self._detach_encoder())
+            self.pipeline.release_output()
             # 可以考慮新增一個"取消"的音效，目前直接回歸靜音狀態
             logger.info("Recording cancelled (Esc pressed).")
-            self._reset_status()
+            self._refresh_status()
+        elif self.pipeline.active():
+            # 取消所有處理中的工作：進行中的 HTTP 請求在事件迴圈上立即中斷並釋放連線
+            count = self.pipeline.cancel_all()
+            logger.info("Processing cancelled (Esc pressed, %d jobs).", count)
+            self._refresh_status()
 
     # ── 語音處理管線 ─────────────────────────────────────────────────────────
 
-    def _process_audio(self, audio_data):
-        """STT → LLM → 文字注入"""
-        # 背景執行緒也需要初始化 COM 為 STA（httpx 可能會改變 COM 模式）
-        ctypes.windll.ole32.CoInitializeEx(None, 2)
+    def _detach_session(self):
+        """解除增量辨識工作階段與錄音器的連結並回傳之"""
+        session, self._session = self._session, None
+        if session:
+            self.recorder.remove_listener(session.feed)
+        return session
+
+    def _detach_encoder(self):
+        """解除背景編碼器與錄音器的連結並回傳之"""
+        encoder, self._encoder = self._encoder, None
+        if encoder:
+            self.recorder.remove_listener(encoder.feed)
+        return encoder
+
+    @staticmethod
+    def _discard(*workers):
+        """取消尚未完成的背景工作（增量辨識、編碼器）"""
+        for worker in workers:
+            if worker:
+                worker.cancel()
+
+    async def _process_audio(self, audio_data, session=None, encoder=None, trace=None, target_hwnd=None, context=None):
+        """
+        STT → LLM → 文字注入（在管線事件迴圈上執行；被取消時於 await 點中斷）
+
+        STT / LLM 各有延遲預算內的期限：STT 超過時改用已載入的本地 Whisper，LLM 超過時直接輸出原文
+        """
+        trace = trace or Trace()
+        cfg = self.settings.get_config()
+        budget_start = time.perf_counter()
         try:
-            # 太短的錄音直接跳過
-            duration = len(audio_data) / 16000
-            if duration < MIN_RECORDING_SECONDS:
-                logger.warning("Recording too short (%.1fs), skipped", duration)
-                self._reset_status()
+            if len(audio_data) < MIN_AUDIO_SECONDS * 16000:
+                logger.warning("Recording too short (%.2fs), skipped", len(audio_data) / 16000)
+                self._discard(session, encoder)
                 return
-
-            # 如果中途被取消
-            if self.cancelled:
-                return
-
-            # 步驟 1：語音轉文字
-            t0 = time.time()
-            raw_text = self.stt.transcribe(audio_data)
-            stt_time = time.time() - t0
+            # VAD：沒有語音直接跳過（不送出任何網路請求），否則裁掉頭尾靜音並壓縮停頓；
+            # 關閉 vadEnabled 時原樣送出，不做語音偵測（不會因為誤判而丟棄輸入）
+            if cfg.get("vadEnabled", True):
+                with trace.span("vad"):
+                    vad = await asyncio.to_thread(trim_silence, audio_data, max_pause_ms=cfg.get("vadMaxPauseMs", 500))
+                if not vad.has_speech:
+                    logger.warning("No speech detected (%.1fs recorded), skipped", len(audio_data) / 16000)
+                    self._discard(session, encoder)
+                    return
+                if vad.removed_seconds > 0:
+                    logger.info(
+                        "VAD removed %.1fs of silence (%.1fs -> %.1fs)",
+                        vad.removed_seconds, len(audio_data) / 16000, len(vad.audio) / 16000,
+                    )
+                audio_data = vad.audio
+            budget = LatencyBudget(cfg, len(audio_data) / 16000, start=budget_start)
+
+            # 錄音期間已編碼完成的上傳內容直接取用；背景裁剪與 VAD 結果不同（或沒有編碼器）時由 STT 編碼裁剪後的音訊一次
+            payload = None
+            if encoder:
+                with trace.span("encode", cfg.get("uploadCodec", "wav")):
+                    payload = await asyncio.to_thread(encoder.finish, audio_data)
+                if payload is None:
+                    logger.debug("背景裁剪與 VAD 結果不同，改為重新編碼")
+                    metrics.increment("encode.stream.mismatch")
+
+            # 步驟 1：語音轉文字（增量模式下只需等待最後一段）
+            self.pipeline.set_status("辨識中")
+            t0 = time.perf_counter()
+            try:
+                if session:
+                    with trace.span("stt.incremental", cfg.get("sttProvider", "")):
+                        raw_text = await within(budget.stage("stt"), asyncio.to_thread(session.finish))
+                    logger.info("Incremental STT: %d segments", session.segment_count)
+                else:
+                    raw_text = await within(
+                        budget.stage("stt"), self.stt.atranscribe(audio_data, payload=payload, trace=trace),
+                    )
+            except DeadlineExceeded as e:
+                self._discard(session)
+                if not self.stt.can_fallback_local():
+                    self._deadline_missed(e, "本地 Whisper 未載入，放棄本次輸入")
+                    raise
+                self._deadline_missed(e, "改用本地 Whisper")
+                raw_text = await self.stt.afallback_local(audio_data, trace)
+            stt_time = time.perf_counter() - t0
 
             if not raw_text or not raw_text.strip():
                 logger.warning("No text recognized")
-                self._reset_status()
                 return
 
             logger.info("Raw text (%.1fs): %s", stt_time, raw_text)
 
             # 步驟 2：LLM 智能修飾
-            t1 = time.time()
-            polished = self.llm.polish(raw_text, process_hwnd=self._target_hwnd)
-
-            # 步驟 3：暫停 keyboard hook → 恢復前景視窗 → 注入 → 重新註冊
+            self.pipeline.set_status("修飾中")
+            context_key = await self._await_context(context, budget)
+            try:
+                polished = await within(
+                    budget.stage("llm"),
+                    self.llm.apolish(raw_text, process_hwnd=target_hwnd, trace=trace, context_key=context_key),
+                )
+            except DeadlineExceeded as e:
+                self._deadline_missed(e, "直接輸出原文")
+                polished = self.llm.passthrough(raw_text, cfg)
+
+            # 步驟 3：依錄音順序輸出 → 暫停 keyboard hook → 恢復前景視窗 → 注入 → 重新註冊
+            with trace.span("queue_wait"):
+                await self.pipeline.wait_turn()
             self.hotkey.unhook()
-            
-            # 短暫延遲讓系統釋放 key states
-            time.sleep(INJECT_DELAY_SECONDS)
-
-            # 恢復使用者原本操作的視窗到前景
-            if self._target_hwnd:
-                try:
-                    ctypes.windll.user32.SetForegroundWindow(self._target_hwnd)
-                    # 輪詢確認視窗是否已到前景，最多等 0.2 秒
-                    for _ in range(10):
-                        if ctypes.windll.user32.GetForegroundWindow() == self._target_hwnd:
-                            break
-                        time.sleep(0.02)
-                except Exception:
-                    pass
-
-            import types
-            if isinstance(polished, types.GeneratorType):
-                logger.info("開始串流輸出 LLM 結果...")
-                self.injector.inject(polished)
-                llm_time = time.time() - t1
-                logger.info("串流輸出完成 (%.1fs)", llm_time)
-            else:
-                llm_time = time.time() - t1
-                logger.info("Polished (%.1fs): %s", llm_time, polished)
-                self.injector.inject(polished)
-
-            # 重新註冊快捷鍵
-            self.hotkey.register(
-                on_press=self.on_hotkey_press,
-                on_release=self.on_hotkey_release,
-                on_cancel=self.on_hotkey_cancel,
+            try:
+                # 短暫延遲讓系統釋放 key states
+                await asyncio.sleep(INJECT_DELAY_SECONDS)
+
+                # 恢復使用者原本操作的視窗到前景
+                with trace.span("focus_restore"):
+                    if target_hwnd:
+                        try:
+                            ctypes.windll.user32.SetForegroundWindow(target_hwnd)
+                            # 輪詢確認視窗是否已到前景，最多等 0.2 秒
+                            for _ in range(10):
+                                if ctypes.windll.user32.GetForegroundWindow() == target_hwnd:
+                                    break
+                                await asyncio.sleep(0.02)
+                        except Exception:
+                            pass
+
+                # 注入執行緒無法中斷：取消時停止串流輸出，並等待執行緒結束才重新註冊快捷鍵、讓出輸出順序
+                if isinstance(polished, str):
+                    logger.info("Polished (%.1fs): %s", trace.duration("llm"), polished)
+                    with trace.span("inject", "clipboard"):
+                        await self.pipeline.to_thread(self._inject, polished)
+                else:
+                    logger.info("開始串流輸出 LLM 結果...")
+                    with trace.span("inject", "stream"):
+                        await self.pipeline.stream_to_thread(polished, self._inject)
+                    logger.info("串流輸出完成 (LLM %.1fs)", trace.duration("llm"))
+            finally:
+                # 重新註冊快捷鍵
+                self._register_hotkey()
+
+            total = time.perf_counter() - t0
+            trace.add("total", t0, time.perf_counter())
+            logger.info(
+                "Done! Total %.1fs (STT %.1fs + LLM %.1fs, first token %.2fs + inject %.1fs)",
+                total, stt_time, trace.duration("llm"), trace.duration("llm.ttft"), trace.duration("inject"),
             )
 
-            total = time.time() - t0
-            logger.info("Done! Total %.1fs (STT %.1fs + LLM %.1fs)", total, stt_time, llm_time)
+        except asyncio.CancelledError:
+            # 取消時不寫入任何文字
+            self._discard(session, encoder)
+            raise
 
         except Exception as e:
             logger.error("Processing failed: %s", e, exc_info=True)
+            # 讓後面排隊的工作先輸出，本工作只保留錯誤狀態一段時間
+            self.pipeline.release_turn()
+            self.pipeline.set_status("錯誤")
             self._update_tray("錯誤", "error")
-            time.sleep(ERROR_DISPLAY_SECONDS)
+            await asyncio.sleep(ERROR_DISPLAY_SECONDS)
 
         finally:
-            self._reset_status()
+            trace.finish()
+            trace_file = cfg.get("traceFile", "")
+            if trace_file:
+                try:
+                    metrics.dump_trace(trace_file)
+                except Exception as e:
+                    logger.debug("Trace dump failed: %s", e)
+
+    @staticmethod
+    async def _await_context(context, budget: LatencyBudget) -> str | None:
+        """
+        取用按下快捷鍵時開始的語境偵測結果；偵測卡住時最多等待 CONTEXT_WAIT_SECONDS（且不超過 LLM 期限），
+        之後改用預設語境（回傳空字串，LLM 不會再偵測一次）
+        """
+        if context is None:
+            return None
+        try:
+            return await within(
+                budget.stage("llm"), asyncio.wait_for(asyncio.wrap_future(context), CONTEXT_WAIT_SECONDS),
+            )
+        except TimeoutError:
+            # DeadlineExceeded 也是 TimeoutError
+            logger.warning("語境偵測逾時，改用預設語境")
+            metrics.increment("context.timeout")
+            return ""
+
+    @staticmethod
+    def _deadline_missed(error: DeadlineExceeded, action: str):
+        """記錄超過期限的階段（計數器 deadline.<stt|llm>.missed）"""
+        logger.warning("延遲預算：%s 階段超過期限 %.1fs，%s", error.stage, error.seconds, action)
+        metrics.increment(f"deadline.{error.stage}.missed")
+
+    def _inject(self, text_or_chunks):
+        """在工作執行緒中注入文字（該執行緒也需要初始化 COM 為 STA，httpx 可能會改變 COM 模式）"""
+        ctypes.windll.ole32.CoInitializeEx(None, 2)
+        self.injector.inject(text_or_chunks)
 
     # ── 輔助方法 ─────────────────────────────────────────────────────────────
 
@@ -201,10 +404,18 @@ class VoiceType:
             except Exception:
                 pass  # 圖標更新非關鍵功能
 
-    def _reset_status(self):
-        self.processing = False
-        self.cancelled = False
-        self._update_tray("就緒", "idle")
+    def _refresh_status(self):
+        """依錄音狀態與佇列中的工作更新系統列（每個工作顯示目前階段）"""
+        jobs = self.pipeline.active()
+        if self.is_recording:
+            status_text, state = "錄音中...", "recording"
+        elif jobs:
+            status_text, state = "處理中...", "processing"
+        else:
+            status_text, state = "就緒", "idle"
+        if jobs:
+            status_text += " " + " | ".join(f"#{job.id} {job.status}" for job in jobs)
+        self._update_tray(status_text[:TRAY_TITLE_MAX_CHARS - len("VoiceType - ")], state)
 
     def _create_tray_icon(self):
         """建立系統托盤圖示"""
@@ -245,23 +456,86 @@ class VoiceType:
             os.startfile(str(config_dir))
 
     def _reload_settings(self, icon=None, item=None):
-        """重新載入設定"""
+        """重新載入設定檔（變更的設定由 config_dispatcher 套用到受影響的元件）"""
         self.settings.load()
-        self.stt = SpeechToText(self.settings)
-        self.llm = LLMProcessor(self.settings)
-        self.injector = TextInjector(self.settings)
-        # 重新註冊快捷鍵
-        self.hotkey.stop()
-        self.hotkey = HotkeyManager(self.settings)
+        logger.info("Settings reloaded")
+
+    def _register_config_handlers(self):
+        """
+        設定變更時只重建受影響的元件；STT / LLM / 注入每次使用時讀取最新的設定快照，
+        SDK 客戶端、連線池與本地 Whisper 模型都是全域共用，不需要重建
+        """
+        on = self.config_dispatcher.on
+        on({"maxRecordingSeconds"}, self._apply_recording_limit, name="recorder")
+        on({"warmCapture", "prerollMs", "warmIdleSuspendSeconds"}, lambda cfg, _: self._apply_warm_capture(cfg), name="warm_capture")
+        on({"sttProvider", "sttModel", "localWhisperProfile", "localCpuThreads", "localWorkers", "localWhisperOverrides"},
+           lambda cfg, _: self._preload_local_whisper(cfg), name="local_whisper")
+        on(HTTP_CONFIG_KEYS, lambda cfg, _: self._warm_connections(cfg), name="http_clients")
+        on(PRELOAD_CONFIG_KEYS, lambda cfg, _: preload(cfg), name="preload")
+        on({"hotkey"}, lambda cfg, _: self._register_hotkey(), name="hotkey")
+
+    def _apply_recording_limit(self, cfg, changed=None):
+        self.recorder.max_seconds = cfg.get("maxRecordingSeconds", 300)
+
+    def _register_hotkey(self):
+        """（重新）註冊快捷鍵；先移除舊的 hook，避免重複註冊"""
+        self.hotkey.unhook()
         self.hotkey.register(
             on_press=self.on_hotkey_press,
             on_release=self.on_hotkey_release,
             on_cancel=self.on_hotkey_cancel,
         )
-        logger.info("Settings reloaded")
+
+    def _preload_local_whisper(self, cfg):
+        """使用本地 Whisper 時於背景預先載入模型（模型未變更時沿用已載入的模型）"""
+        if cfg.get("sttProvider") == "local":
+            _, model_options, _ = local_whisper_profile(cfg)
+            get_local_whisper().ensure_model(cfg.get("sttModel", "base"), **model_options)
+
+    def _preload(self, cfg):
+        """
+        快捷鍵註冊後在背景預先載入引擎 SDK，並建立錄音、注入與語境偵測後端
+        （sounddevice / pyautogui / win32gui 等模組在第一次使用時才 import，避免拖慢啟動）
+        """
+        def recorder_backend():
+            # 與主執行緒相同，在 import sounddevice 之前將本執行緒的 COM 初始化為 STA
+            ctypes.windll.ole32.CoInitializeEx(None, 2)
+            self.recorder.backend
+
+        def injector_backend():
+            self.injector.backend
+
+        def context_provider():
+            get_context_detector().provider
+
+        warmups = [recorder_backend, injector_backend]
+        if cfg.get("contextAware", True):
+            warmups.append(context_provider)
+        preload(cfg, *warmups)
+
+    def _warm_connections(self, cfg):
+        """套用連線池設定並在背景預先連線到目前使用的引擎（連線池跨設定重新載入保留）"""
+        clients = get_http_clients()
+        clients.configure(cfg)
+        clients.warm(self.settings, cfg)
+
+    def _apply_warm_capture(self, cfg):
+        """依設定啟用或關閉常駐暖機錄音（預錄按下前的音訊，避免第一個字被切掉）"""
+        try:
+            if cfg.get("warmCapture", False):
+                self.recorder.enable_warm(
+                    preroll_ms=cfg.get("prerollMs", 300),
+                    idle_suspend_seconds=cfg.get("warmIdleSuspendSeconds", 600),
+                )
+            else:
+                self.recorder.disable_warm()
+        except Exception as e:
+            logger.error("Failed to start warm capture: %s", e)
 
     def _quit(self, icon=None, item=None):
         logger.info("Shutting down VoiceType...")
+        self.config_watcher.stop()
+        self.settings.flush()
         self.hotkey.stop()
         if self.tray_icon:
             self.tray_icon.stop()
@@ -280,6 +554,8 @@ class VoiceType:
         logger.info("  LLM:    %s / %s", cfg.get("llmProvider"), cfg.get("llmModel"))
         logger.info("=" * 55)
 
+        self._preload_local_whisper(cfg)
+
         # 檢查 API Key (若從 .env 吃則 config 可能為空，需從 getter 確認)
         self._check_api_keys(cfg)
         
@@ -295,12 +571,14 @@ class VoiceType:
         logger.info("=" * 55)
 
         # 註冊快捷鍵
-        self.hotkey.register(
-            on_press=self.on_hotkey_press,
-            on_release=self.on_hotkey_release,
-            on_cancel=self.on_hotkey_cancel,
-        )
+        self._register_hotkey()
         logger.info("Hotkey registered: %s", hotkey)
+        self._preload(cfg)
+
+        self._apply_warm_capture(cfg)
+        self._warm_connections(cfg)
+        # 設定檔被手動編輯時自動重新載入
+        self.config_watcher.start()
 
         # 啟動系統托盤（在背景執行緒，避免主執行緒訊息迴圈阻擋鍵盤模擬）
         tray = self._create_tray_icon()
@@ -308,7 +586,10 @@ class VoiceType:
             tray_thread = threading.Thread(target=tray.run, daemon=True)
             tray_thread.start()
 
-        logger.info("VoiceType started! Hold %s to speak, Esc to cancel", hotkey)
+        logger.info(
+            "VoiceType started in %.0fms! Hold %s to speak, Esc to cancel",
+            (time.perf_counter() - START_TIME) * 1000, hotkey,
+        )
         try:
             while True:
                 time.sleep(1)